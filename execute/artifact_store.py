@@ -0,0 +1,519 @@
+"""
+Disk-quota-aware artifact index with LRU eviction.
+
+This module provides the ArtifactStore class which keeps a small SQLite index of
+every artifact written under a storage root (digests, trees, content files and
+saved analyses). The index records sizes and last-access times so quota
+enforcement and garbage collection never need a full directory scan, and
+caches token counts per tokenizer so unchanged artifacts are never recounted.
+
+The index is also the catalog of artifact versions: an extraction made from
+a known commit is archived next to the artifact (see
+StorageManager.version_path) and cataloged by commit, and a latest pointer
+per artifact records which commit the artifact itself holds. The layout
+artifacts are stored in (flat or sharded, see StorageManager) is recorded
+in the index too.
+"""
+
+import os
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import Iterable, Optional
+from exceptions import StorageError, ValidationError
+from reader import remove_index
+
+
+# Index file name, created at the root of the artifact store
+INDEX_FILENAME = ".artifact-index.sqlite"
+
+# Environment variable used to configure the quota (e.g. "5G", "500M")
+QUOTA_ENV_VAR = "GITINGEST_AGENT_QUOTA"
+
+# Artifact kinds that may be evicted when the store exceeds its quota
+EVICTABLE_KINDS = ('digest', 'tree', 'content', 'layer', 'version')
+
+_SIZE_UNITS = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3, 'T': 1024 ** 4}
+
+
+def parse_size(value: str) -> int:
+    """
+    Parse a human-readable size into bytes.
+
+    Args:
+        value: Size string such as "512", "200K", "1.5G" (binary units)
+
+    Returns:
+        Size in bytes
+
+    Raises:
+        ValidationError: If value is not a valid size
+
+    Examples:
+        >>> parse_size("200K")
+        204800
+        >>> parse_size("1G")
+        1073741824
+    """
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([KMGT]?)i?B?\s*', str(value), re.IGNORECASE)
+    if not match:
+        raise ValidationError(f"Invalid size: {value}. Use e.g. 500M or 5G")
+    number, unit = match.groups()
+    return int(float(number) * _SIZE_UNITS[unit.upper()])
+
+
+def format_size(num_bytes: int) -> str:
+    """
+    Format a byte count for user display.
+
+    Examples:
+        >>> format_size(1536)
+        '1.5 KB'
+        >>> format_size(12)
+        '12 B'
+    """
+    size = float(num_bytes)
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f"{int(size)} B" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def _inode(stat: os.stat_result) -> Optional[str]:
+    """Return the identity of a file shared by all of its hard links (None where the file system has none)."""
+    return f"{stat.st_dev}:{stat.st_ino}" if stat.st_ino else None
+
+
+class ArtifactStore:
+    """
+    Index of stored artifacts with quota enforcement.
+
+    Paths are stored relative to the store root so the whole directory can be
+    moved without invalidating the index. Pinned entries (saved analyses by
+    default) count towards the quota but are never evicted. Hard links (an
+    artifact and the archived version it holds) share one file: its size is
+    counted once, and is only freed once every link is evicted.
+
+    Attributes:
+        root: Storage root directory that holds all artifacts
+        index_path: Path to the SQLite index file
+    """
+
+    def __init__(self, root: Path):
+        """
+        Open (or create) the artifact index for a storage root.
+
+        Args:
+            root: Storage root directory
+
+        Raises:
+            StorageError: If the index cannot be opened
+        """
+        self.root = Path(root).resolve()
+        self.index_path = self.root / INDEX_FILENAME
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.index_path)
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS artifacts (
+                    path TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    repo TEXT NOT NULL DEFAULT '',
+                    size INTEGER NOT NULL DEFAULT 0,
+                    last_access REAL NOT NULL,
+                    pinned INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE INDEX IF NOT EXISTS artifacts_lru
+                    ON artifacts (pinned, last_access);
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS token_counts (
+                    path TEXT NOT NULL,
+                    tokenizer TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    tokens INTEGER NOT NULL,
+                    PRIMARY KEY (path, tokenizer)
+                );
+                CREATE TABLE IF NOT EXISTS versions (
+                    artifact TEXT NOT NULL,
+                    commit_id TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    settings TEXT NOT NULL DEFAULT '',
+                    extracted REAL NOT NULL,
+                    PRIMARY KEY (artifact, commit_id)
+                );
+                CREATE TABLE IF NOT EXISTS latest_versions (
+                    artifact TEXT PRIMARY KEY,
+                    commit_id TEXT NOT NULL
+                );
+            """)
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(artifacts)")}
+            if 'inode' not in columns:
+                # Indexes created before versions were hard links
+                with self._conn:
+                    self._conn.execute("ALTER TABLE artifacts ADD COLUMN inode TEXT")
+        except (sqlite3.Error, OSError) as e:
+            raise StorageError(f"Cannot open artifact index {self.index_path}: {e}")
+
+    def close(self) -> None:
+        """Close the underlying index connection."""
+        self._conn.close()
+
+    def __enter__(self) -> "ArtifactStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _relative(self, path: Path) -> str:
+        """Return path relative to the store root (POSIX separators)."""
+        path = Path(path).resolve()
+        try:
+            return path.relative_to(self.root).as_posix()
+        except ValueError:
+            raise StorageError(f"Path is outside the artifact store: {path}")
+
+    def _execute(self, sql: str, params: Iterable = ()) -> sqlite3.Cursor:
+        try:
+            with self._conn:
+                return self._conn.execute(sql, tuple(params))
+        except sqlite3.Error as e:
+            raise StorageError(f"Artifact index error: {e}")
+
+    # Quota configuration
+
+    def get_quota(self) -> Optional[int]:
+        """
+        Resolve the configured quota in bytes.
+
+        The environment variable takes precedence over the quota stored in
+        the index by set_quota(). Returns None when no quota is configured.
+        """
+        env_value = os.environ.get(QUOTA_ENV_VAR)
+        if env_value:
+            return parse_size(env_value)
+        row = self._execute("SELECT value FROM meta WHERE key = 'quota'").fetchone()
+        return int(row[0]) if row else None
+
+    def set_quota(self, quota: Optional[int]) -> None:
+        """Persist a quota for this store (None removes it)."""
+        if quota is None:
+            self._execute("DELETE FROM meta WHERE key = 'quota'")
+        else:
+            self._execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('quota', ?)",
+                (str(int(quota)),)
+            )
+
+    # Layout
+
+    def get_layout(self) -> Optional[str]:
+        """Return the artifact layout recorded for this store (see StorageManager), or None if never set."""
+        row = self._execute("SELECT value FROM meta WHERE key = 'layout'").fetchone()
+        return row[0] if row else None
+
+    def set_layout(self, layout: str) -> None:
+        """Record the artifact layout of this store, so every later extraction uses it."""
+        self._execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('layout', ?)", (layout,))
+
+    # Recording and access tracking
+
+    def record(self, path: Path, kind: str, repo: str = '', pinned: bool = False) -> int:
+        """
+        Record (or refresh) an artifact after it has been written.
+
+        Args:
+            path: Artifact file path (must live under the store root)
+            kind: Artifact kind (digest, tree, content, layer, analysis)
+            repo: Repository identifier for reporting
+            pinned: Never evict this artifact
+
+        Returns:
+            Size of the artifact in bytes
+        """
+        stat = Path(path).stat()
+        self._execute(
+            "INSERT OR REPLACE INTO artifacts (path, kind, repo, size, last_access, pinned, inode) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (self._relative(path), kind, repo, stat.st_size, time.time(), int(pinned), _inode(stat))
+        )
+        return stat.st_size
+
+    def touch(self, path: Path) -> None:
+        """Mark an artifact as accessed now."""
+        self._execute(
+            "UPDATE artifacts SET last_access = ? WHERE path = ?",
+            (time.time(), self._relative(path))
+        )
+
+    def pin(self, path: Path, pinned: bool = True) -> None:
+        """Pin (or unpin) an artifact so it is never evicted."""
+        self._execute(
+            "UPDATE artifacts SET pinned = ? WHERE path = ?",
+            (int(pinned), self._relative(path))
+        )
+
+    def move(self, source: Path, target: Path) -> None:
+        """
+        Re-key the index entries of a moved artifact, or of every artifact in a moved directory.
+
+        Sizes, access times, cached token counts and catalog entries are kept.
+        """
+        old, new = self._relative(source), self._relative(target)
+        for table, column in (('artifacts', 'path'), ('token_counts', 'path'), ('versions', 'path'),
+                              ('versions', 'artifact'), ('latest_versions', 'artifact')):
+            self._execute(
+                f"UPDATE {table} SET {column} = ? || substr({column}, ?) "
+                f"WHERE {column} = ? OR substr({column}, 1, ?) = ?",
+                (new, len(old) + 1, old, len(old) + 1, old + '/')
+            )
+
+    def get_size(self, path: Path) -> Optional[int]:
+        """Return the indexed size of an artifact, or None if not indexed."""
+        row = self._execute(
+            "SELECT size FROM artifacts WHERE path = ?", (self._relative(path),)
+        ).fetchone()
+        return row[0] if row else None
+
+    def total_size(self) -> int:
+        """Return the total size of all indexed artifacts in bytes, counting hard-linked files once."""
+        return self._execute(
+            "SELECT COALESCE(SUM(size), 0) FROM "
+            "(SELECT MAX(size) AS size FROM artifacts GROUP BY COALESCE(inode, path))"
+        ).fetchone()[0]
+
+    def entries(self, kinds: Iterable[str] = (), repo: Optional[str] = None) -> list[dict]:
+        """
+        Return index entries, least recently used first.
+
+        Args:
+            kinds: Only entries of these kinds (default: all)
+            repo: Only entries of this repository
+        """
+        kinds = list(kinds)
+        where = []
+        if kinds:
+            where.append(f"kind IN ({', '.join('?' * len(kinds))})")
+        if repo is not None:
+            where.append("repo = ?")
+        rows = self._execute(
+            "SELECT path, kind, repo, size, last_access, pinned FROM artifacts "
+            + (f"WHERE {' AND '.join(where)} " if where else "") + "ORDER BY last_access",
+            kinds + ([repo] if repo is not None else [])
+        ).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    def _row_to_dict(self, row: tuple) -> dict:
+        path, kind, repo, size, last_access, pinned = row
+        return {
+            'path': self.root / path,
+            'kind': kind,
+            'repo': repo,
+            'size': size,
+            'last_access': last_access,
+            'pinned': bool(pinned),
+        }
+
+    # Token count cache
+
+    def get_token_count(self, path: Path, tokenizer: str) -> Optional[int]:
+        """
+        Return the cached token count of an artifact for a tokenizer.
+
+        Args:
+            path: Artifact file path
+            tokenizer: Tokenizer spec the count was made with
+
+        Returns:
+            Token count, or None if not cached or the file changed since
+        """
+        try:
+            stat = Path(path).stat()
+        except OSError:
+            return None
+        row = self._execute(
+            "SELECT tokens FROM token_counts WHERE path = ? AND tokenizer = ? AND size = ? AND mtime_ns = ?",
+            (self._relative(path), tokenizer, stat.st_size, stat.st_mtime_ns)
+        ).fetchone()
+        return row[0] if row else None
+
+    def record_token_count(self, path: Path, tokenizer: str, tokens: int) -> None:
+        """Cache the token count of an artifact, keyed by tokenizer and file signature."""
+        stat = Path(path).stat()
+        self._execute(
+            "INSERT OR REPLACE INTO token_counts (path, tokenizer, size, mtime_ns, tokens) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (self._relative(path), tokenizer, stat.st_size, stat.st_mtime_ns, tokens)
+        )
+
+    # Version catalog
+
+    def record_version(self, artifact: Path, version: Path, commit: str, settings: str = '',
+                       repo: str = '') -> None:
+        """
+        Catalog an archived version of an artifact and make it the latest.
+
+        Args:
+            artifact: Artifact path (holding the latest version)
+            version: Archived copy of the artifact as extracted from commit
+            commit: Commit id the artifact was extracted from
+            settings: Key of the extraction settings (filters, caps, budget, ...)
+            repo: Repository identifier for reporting
+        """
+        self.record(version, 'version', repo=repo)
+        relative = self._relative(artifact)
+        self._execute(
+            "INSERT OR REPLACE INTO versions (artifact, commit_id, path, settings, extracted) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (relative, commit, self._relative(version), settings, time.time())
+        )
+        self._execute(
+            "INSERT OR REPLACE INTO latest_versions (artifact, commit_id) VALUES (?, ?)",
+            (relative, commit)
+        )
+
+    def clear_latest(self, artifact: Path) -> None:
+        """Drop the latest pointer of an artifact rewritten from an unknown commit."""
+        self._execute("DELETE FROM latest_versions WHERE artifact = ?", (self._relative(artifact),))
+
+    def latest_version(self, artifact: Path) -> Optional[dict]:
+        """Return the catalog entry of the version an artifact holds, or None if unknown."""
+        row = self._execute(
+            "SELECT v.commit_id, v.path, v.settings, v.extracted FROM latest_versions l "
+            "JOIN versions v ON v.artifact = l.artifact AND v.commit_id = l.commit_id WHERE l.artifact = ?",
+            (self._relative(artifact),)
+        ).fetchone()
+        return self._version_to_dict(row, latest=True) if row else None
+
+    def versions(self, artifact: Path) -> list[dict]:
+        """Return the catalog entries of every archived version of an artifact, newest first."""
+        rows = self._execute(
+            "SELECT v.commit_id, v.path, v.settings, v.extracted, l.commit_id IS NOT NULL FROM versions v "
+            "LEFT JOIN latest_versions l ON l.artifact = v.artifact AND l.commit_id = v.commit_id "
+            "WHERE v.artifact = ? ORDER BY v.extracted DESC",
+            (self._relative(artifact),)
+        ).fetchall()
+        return [self._version_to_dict(row[:4], latest=bool(row[4])) for row in rows]
+
+    def _version_to_dict(self, row: tuple, latest: bool) -> dict:
+        commit, path, settings, extracted = row
+        return {
+            'commit': commit,
+            'path': self.root / path,
+            'settings': settings,
+            'extracted': extracted,
+            'latest': latest,
+        }
+
+    def _drop(self, relative: str) -> None:
+        """Remove a path's index entry, cached token counts and catalog entries."""
+        self._execute("DELETE FROM artifacts WHERE path = ?", (relative,))
+        self._execute("DELETE FROM token_counts WHERE path = ?", (relative,))
+        self._execute("DELETE FROM versions WHERE path = ?", (relative,))
+        self._execute("DELETE FROM latest_versions WHERE artifact = ?", (relative,))
+
+    # Eviction
+
+    def plan_eviction(
+        self,
+        incoming_bytes: int = 0,
+        protect: Iterable[Path] = (),
+        quota: Optional[int] = None
+    ) -> list[dict]:
+        """
+        Select least-recently-used artifacts to evict.
+
+        A hard-linked file only counts as freed once all of its indexed
+        links are selected.
+
+        Args:
+            incoming_bytes: Size of content about to be written
+            protect: Artifacts that must not be evicted (e.g. the one being written)
+            quota: Quota override in bytes (default: configured quota)
+
+        Returns:
+            Entries to evict, oldest first (empty if within quota)
+        """
+        quota = self.get_quota() if quota is None else quota
+        if quota is None:
+            return []
+
+        excess = self.total_size() + incoming_bytes - quota
+        if excess <= 0:
+            return []
+
+        protected = {self._relative(p) for p in protect}
+        links = dict(self._execute(
+            "SELECT inode, COUNT(*) FROM artifacts WHERE inode IS NOT NULL GROUP BY inode"
+        ).fetchall())
+        placeholders = ', '.join('?' for _ in EVICTABLE_KINDS)
+        cursor = self._execute(
+            "SELECT path, kind, repo, size, last_access, pinned, inode FROM artifacts "
+            f"WHERE pinned = 0 AND kind IN ({placeholders}) ORDER BY last_access",
+            EVICTABLE_KINDS
+        )
+
+        plan = []
+        for row in cursor:
+            if row[0] in protected:
+                continue
+            plan.append(self._row_to_dict(row[:6]))
+            inode = row[6]
+            if inode is not None:
+                links[inode] -= 1
+                if links[inode] > 0:
+                    continue
+            excess -= row[3]
+            if excess <= 0:
+                break
+        return plan
+
+    def evict(self, entries: Iterable[dict]) -> int:
+        """
+        Delete artifacts and remove them from the index.
+
+        Offset index sidecars built for paginated reading are deleted with
+        their digest. An evicted version leaves the catalog, and an evicted
+        artifact loses its latest pointer.
+
+        Returns:
+            Number of bytes freed (a hard-linked file's once its last link goes)
+        """
+        freed = 0
+        for entry in entries:
+            path = Path(entry['path'])
+            try:
+                links = path.stat().st_nlink if path.exists() else 1
+                path.unlink(missing_ok=True)
+                remove_index(path)
+            except OSError as e:
+                raise StorageError(f"Failed to evict {path}: {e}")
+            self._drop(self._relative(path))
+            if links <= 1:
+                freed += entry['size']
+        return freed
+
+    def enforce_quota(self, incoming_bytes: int = 0, protect: Iterable[Path] = ()) -> list[dict]:
+        """
+        Evict LRU artifacts until incoming_bytes fits within the quota.
+
+        Returns:
+            Entries that were evicted
+        """
+        plan = self.plan_eviction(incoming_bytes, protect=protect)
+        self.evict(plan)
+        return plan
+
+    def find_stale(self) -> list[dict]:
+        """Return index entries whose files no longer exist on disk."""
+        return [entry for entry in self.entries() if not entry['path'].exists()]
+
+    def forget(self, entries: Iterable[dict]) -> None:
+        """Remove entries from the index without touching the file system."""
+        for entry in entries:
+            self._drop(self._relative(entry['path']))
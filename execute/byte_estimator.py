@@ -0,0 +1,299 @@
+"""
+Vectorized byte-class token estimation.
+
+A middle ground between the character heuristics of token_estimator and an
+exact tokenizer: the digest is read in chunks as NumPy uint8 arrays,
+every byte is mapped to a class with one table lookup, and the estimate is a
+linear model over per-class byte and run counts:
+
+    letter, digit, punctuation, space and newline bytes and runs
+    + multi-byte UTF-8 characters by encoded length (2, 3 or 4 bytes)
+
+Runs approximate what a BPE pre-tokenizer splits text into (words, numbers,
+punctuation runs, indentation); byte counts account for long words and
+numbers that take several tokens. All counting is vectorized, so the cost is
+a few passes over memory per chunk and the file is never decoded.
+
+The coefficients were fitted offline with fit_coefficients() against a
+byte-level BPE tokenizer (65k vocabulary) on ~5,500 source, documentation and
+data files. NumPy is an optional dependency (pip install gitingest-agent[fast]).
+
+Run this module to print an accuracy report on a corpus, or a throughput
+comparison with the len // 4 heuristic on a digest:
+
+    python byte_estimator.py tests/fixtures/token_corpus
+    python byte_estimator.py --benchmark data/big-repo/digest.txt
+"""
+
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+from exceptions import ValidationError
+from token_estimator import accuracy_report, estimate_file_tokens, format_accuracy_report, load_corpus
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+
+# Byte classes
+LETTER, DIGIT, PUNCT, SPACE, NEWLINE, CONTINUATION, LEAD2, LEAD3, LEAD4 = range(9)
+CLASS_NAMES = ('letter', 'digit', 'punct', 'space', 'newline', 'continuation', 'lead2', 'lead3', 'lead4')
+
+# Features of the model: byte counts and run counts of the byte classes
+FEATURES = (
+    'letter', 'letter_runs',
+    'digit', 'digit_runs',
+    'punct', 'punct_runs',
+    'space_runs',
+    'newline_runs',
+    'lead2', 'lead3', 'lead4',
+)
+
+# Tokens per unit of each feature (fitted, see module docstring)
+COEFFICIENTS = {
+    'letter': 0.0764,
+    'letter_runs': 0.837,
+    'digit': 0.25,
+    'digit_runs': 0.9729,
+    'punct': 0.0697,
+    'punct_runs': 0.9158,
+    'space_runs': -0.1231,
+    'newline_runs': 1.3764,
+    'lead2': 1.1195,
+    'lead3': 1.1495,
+    'lead4': 5.0848,
+}
+
+# Bytes read and classified at a time (small enough for the temporaries to stay in cache)
+CHUNK_BYTES = 256 * 1024
+
+
+def require_numpy() -> None:
+    """
+    Check that NumPy is installed.
+
+    Raises:
+        ValidationError: If NumPy is not available
+    """
+    if np is None:
+        raise ValidationError(
+            "The bytes tokenizer needs NumPy. Install it with: pip install gitingest-agent[fast]"
+        )
+
+
+def _class_table():
+    table = np.full(256, PUNCT, dtype=np.uint8)
+    table[ord('a'):ord('z') + 1] = LETTER
+    table[ord('A'):ord('Z') + 1] = LETTER
+    table[ord('0'):ord('9') + 1] = DIGIT
+    table[[ord(' '), ord('\t'), 0x0b, 0x0c]] = SPACE
+    table[[ord('\n'), ord('\r')]] = NEWLINE
+    table[0x80:0xc0] = CONTINUATION
+    table[0xc0:0xe0] = LEAD2
+    table[0xe0:0xf0] = LEAD3
+    table[0xf0:0x100] = LEAD4
+    return table
+
+
+_CLASS_TABLE = _class_table() if np is not None else None
+
+
+def byte_class_counts(data, previous: int = -1) -> tuple:
+    """
+    Count the bytes and runs of each byte class in a chunk.
+
+    Args:
+        data: bytes or uint8 array
+        previous: Class of the byte preceding the chunk (-1 at the start of a
+            file), so runs spanning chunk boundaries are counted once
+
+    Returns:
+        (byte counts, run counts, class of the last byte), the counts being
+        arrays indexed by byte class
+
+    Examples:
+        >>> bytes_, runs, last = byte_class_counts(b"foo bar42")
+        >>> int(bytes_[LETTER]), int(runs[LETTER]), int(runs[DIGIT])
+        (6, 2, 1)
+    """
+    require_numpy()
+    array = np.frombuffer(data, dtype=np.uint8) if isinstance(data, (bytes, bytearray, memoryview)) else data
+    classes = len(CLASS_NAMES)
+    if not len(array):
+        zeros = np.zeros(classes, dtype=np.int64)
+        return zeros, zeros.copy(), previous
+    cls = _CLASS_TABLE[array]
+    counts = np.bincount(cls, minlength=classes)
+    starts = np.flatnonzero(cls[1:] != cls[:-1]) + 1
+    runs = np.bincount(cls[starts], minlength=classes)
+    if cls[0] != previous:
+        runs[cls[0]] += 1
+    return counts, runs, int(cls[-1])
+
+
+def features(counts, runs) -> dict[str, int]:
+    """Return the model features for byte and run counts."""
+    return {
+        'letter': int(counts[LETTER]),
+        'letter_runs': int(runs[LETTER]),
+        'digit': int(counts[DIGIT]),
+        'digit_runs': int(runs[DIGIT]),
+        'punct': int(counts[PUNCT]),
+        'punct_runs': int(runs[PUNCT]),
+        'space_runs': int(runs[SPACE]),
+        'newline_runs': int(runs[NEWLINE]),
+        'lead2': int(counts[LEAD2]),
+        'lead3': int(counts[LEAD3]),
+        'lead4': int(counts[LEAD4]),
+    }
+
+
+def predict(values: dict[str, int], coefficients: Optional[dict[str, float]] = None) -> int:
+    """Apply the linear model to a feature dict."""
+    coefficients = coefficients or COEFFICIENTS
+    return round(sum(coefficients[name] * values[name] for name in FEATURES))
+
+
+def text_features(text: str | bytes) -> dict[str, int]:
+    """Return the model features of a piece of text."""
+    data = text.encode('utf-8') if isinstance(text, str) else text
+    counts, runs, _ = byte_class_counts(data)
+    return features(counts, runs)
+
+
+def estimate_bytes_tokens(text: str | bytes) -> int:
+    """
+    Estimate the tokens of a piece of text from its byte classes.
+
+    Examples:
+        >>> estimate_bytes_tokens("def main():\\n    return 42\\n")
+        8
+    """
+    return predict(text_features(text))
+
+
+def estimate_stream_tokens(file_path: str | Path, chunk_bytes: int = CHUNK_BYTES) -> int:
+    """
+    Estimate the tokens of a digest (or any text file) chunk by chunk.
+
+    Memory use is bounded by chunk_bytes whatever the file size.
+
+    Args:
+        file_path: File to estimate
+        chunk_bytes: Bytes read and classified at a time
+
+    Returns:
+        Estimated token count
+
+    Raises:
+        ValidationError: If NumPy is not installed
+    """
+    require_numpy()
+    classes = len(CLASS_NAMES)
+    counts = np.zeros(classes, dtype=np.int64)
+    runs = np.zeros(classes, dtype=np.int64)
+    previous = -1
+    with open(file_path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_bytes)
+            if not chunk:
+                break
+            chunk_counts, chunk_runs, previous = byte_class_counts(chunk, previous)
+            counts += chunk_counts
+            runs += chunk_runs
+    return predict(features(counts, runs))
+
+
+# Fitting and benchmarking (offline tooling)
+
+def fit_coefficients(
+    samples: Iterable[tuple[str, str]],
+    count_tokens: Callable[[str], int]
+) -> dict[str, float]:
+    """
+    Fit the model coefficients to a reference tokenizer by least squares.
+
+    Each sample is weighted by the inverse of its token count, so the fit
+    minimizes relative rather than absolute error and large files don't
+    dominate. Paste the result into COEFFICIENTS to recalibrate.
+
+    Args:
+        samples: (path, text) pairs
+        count_tokens: Reference tokenizer, returning the exact token count of a text
+
+    Returns:
+        Mapping of feature name to tokens per unit, rounded to 4 decimals
+
+    Raises:
+        ValidationError: If NumPy is not installed
+    """
+    require_numpy()
+    rows = []
+    targets = []
+    for _, text in samples:
+        tokens = count_tokens(text)
+        if not tokens:
+            continue
+        values = text_features(text)
+        rows.append([values[name] / tokens for name in FEATURES])
+        targets.append(1.0)
+    if not rows:
+        return {name: 0.0 for name in FEATURES}
+    solution, *_ = np.linalg.lstsq(np.array(rows, dtype=float), np.array(targets), rcond=None)
+    return {name: round(float(value), 4) for name, value in zip(FEATURES, solution)}
+
+
+def benchmark(file_path: str | Path, chunk_bytes: int = CHUNK_BYTES) -> dict:
+    """
+    Time the byte-class estimator against the len // 4 heuristic on a file.
+
+    Args:
+        file_path: Digest to estimate
+        chunk_bytes: Chunk size of the byte-class estimator
+
+    Returns:
+        Dict with the file size and, for 'heuristic' and 'bytes', the token
+        estimate, seconds and throughput in MB/s
+    """
+    size = Path(file_path).stat().st_size
+    results = {'bytes_size': size}
+
+    def heuristic() -> int:
+        chars = 0
+        with open(file_path, encoding='utf-8', errors='replace') as f:
+            while True:
+                chunk = f.read(chunk_bytes)
+                if not chunk:
+                    break
+                chars += len(chunk)
+        return chars // 4
+
+    for name, estimate in (('heuristic', heuristic), ('bytes', lambda: estimate_stream_tokens(file_path, chunk_bytes))):
+        start = time.perf_counter()
+        tokens = estimate()
+        seconds = time.perf_counter() - start
+        results[name] = {
+            'tokens': tokens,
+            'seconds': round(seconds, 3),
+            'mb_per_second': round(size / 1e6 / seconds, 1) if seconds else 0.0,
+        }
+    return results
+
+
+ESTIMATORS = {
+    'heuristic': lambda path, text: len(text) // 4,
+    'calibrated': estimate_file_tokens,
+    'bytes': lambda path, text: estimate_bytes_tokens(text),
+}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == '--benchmark':
+        for name, value in benchmark(sys.argv[2]).items():
+            print(f"{name}: {value}")
+    else:
+        corpus = sys.argv[1] if len(sys.argv) > 1 else Path(__file__).parent / "tests" / "fixtures" / "token_corpus"
+        print(format_accuracy_report(accuracy_report(load_corpus(corpus), ESTIMATORS)))
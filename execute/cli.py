@@ -2,13 +2,27 @@
 
 import sys
 import io
+import json
 import os
+import time
 from pathlib import Path
+from typing import Optional
 import click
 
-from token_counter import count_tokens, should_extract_full, count_tokens_from_file
-from workflow import format_token_count
-from storage import parse_repo_name
+from token_counter import count_tokens, should_extract_full, count_tokens_from_file, count_tokens_sampled
+from workflow import format_token_count, repository_url
+from storage import parse_repo_name, get_storage_root, ensure_data_directory, migrate_layout
+from artifact_store import ArtifactStore, INDEX_FILENAME, parse_size, format_size
+from search_index import SearchIndex, FACETS
+from reader import DigestReader, DEFAULT_PAGE_TOKENS, parse_line_range
+from digest import is_searchable
+from digest_grep import compile_pattern, find_digests, grep_digests
+from stats import GROUP_BY, compute_stats, format_table, iter_file_stats
+from token_backends import TokenizerBackend, get_backend
+from file_caps import FileCaps
+from prefilter import Prefilter, format_report
+from profiles import builtin_profiles, content_types, load_profiles
+from git_mirror import GitMirror
 import extractor
 from exceptions import GitIngestError, ValidationError, StorageError
 
@@ -45,6 +59,211 @@ def ensure_execute_directory():
         current = current.parent
 
 
+# Default --tokenizer of the commands that route on the 200k threshold: check-size
+# and the re-check of extract-full and extract-specific. A misjudged size sends the
+# repository down the wrong route, so these use the calibrated estimate. Commands
+# that budget or report per file or layer (extract-layers, extract-relevant, stats)
+# default to the cheaper heuristic, which keeps their counts comparable between runs.
+ROUTING_TOKENIZER = 'calibrated'
+
+
+def load_tokenizer(spec: str, default: str = 'heuristic') -> TokenizerBackend:
+    """
+    Create the tokenizer backend for a --tokenizer option, or abort.
+
+    Call before ensure_execute_directory() so relative vocabulary paths
+    resolve against the directory the command was started from.
+
+    Args:
+        spec: Option value (None falls back to GITINGEST_AGENT_TOKENIZER)
+        default: Backend used when neither is set
+    """
+    try:
+        return get_backend(spec, default=default)
+    except ValidationError as e:
+        click.echo(f"[ERROR] Invalid input: {e}", err=True)
+        raise click.Abort()
+
+
+def load_file_caps(specs: tuple[str, ...]) -> FileCaps:
+    """Parse --file-cap options, or abort."""
+    try:
+        return FileCaps.from_specs(specs)
+    except ValidationError as e:
+        click.echo(f"[ERROR] Invalid input: {e}", err=True)
+        raise click.Abort()
+
+
+def report_prefilter(prefilter: Prefilter) -> None:
+    """Show the tokens saved by each prefilter rule."""
+    click.echo(format_report(prefilter.report()))
+
+
+def report_mirror_transfers(mirror: Optional[GitMirror]) -> None:
+    """Show the bytes and time of each download into the mirror (nothing when it was current)."""
+    if mirror is None:
+        return
+    for transfer in mirror.transfers:
+        first_byte = f", first byte after {transfer.first_byte:.2f}s" if transfer.first_byte is not None else ""
+        click.echo(f"Mirror {transfer.operation} ({transfer.strategy}): {format_size(transfer.bytes)} "
+                   f"in {transfer.seconds:.2f}s{first_byte}")
+
+
+def report_version(extraction_path: str, output_dir: Optional[Path], since: Optional[float] = None) -> None:
+    """
+    Show the commit an extraction holds, if it is a cataloged version.
+
+    A version extracted before since (when the command started) means the
+    commit was unchanged and the stored version was kept.
+    """
+    root = get_storage_root(output_dir)
+    if not (root / INDEX_FILENAME).exists():
+        return
+    try:
+        with ArtifactStore(root) as store:
+            version = store.latest_version(Path(extraction_path))
+    except StorageError:
+        return
+    if version is not None:
+        extracted = time.strftime('%Y-%m-%d %H:%M', time.localtime(version['extracted']))
+        unchanged = "unchanged, " if since is not None and version['extracted'] < since else ""
+        click.echo(f"Commit: {version['commit'][:12]} ({unchanged}extracted {extracted})")
+
+
+def recount_tokens(extraction_path: Path, backend: TokenizerBackend, sample: bool,
+                   output_dir: Optional[Path] = None) -> tuple[int, str]:
+    """
+    Count the tokens of an extraction for the routing re-check.
+
+    Full counts are cached in the artifact index, if there is one, so an
+    unchanged extraction isn't tokenized again.
+
+    Args:
+        extraction_path: Extracted content file
+        backend: Tokenizer backend
+        sample: Estimate from a sample (see token_counter.count_tokens_sampled)
+        output_dir: Optional custom output directory (locates the artifact index)
+
+    Returns:
+        (token count, note on the sample and its confidence interval, or ''
+        when the content was counted fully)
+    """
+    if not sample:
+        path = Path(extraction_path)
+        root = get_storage_root(output_dir)
+        if not (root / INDEX_FILENAME).exists() or not path.is_file():
+            return count_tokens_from_file(extraction_path, tokenizer=backend), ''
+        with ArtifactStore(root) as store:
+            tokens = store.get_token_count(path, backend.spec)
+            if tokens is None:
+                tokens = count_tokens_from_file(extraction_path, tokenizer=backend)
+                store.record_token_count(path, backend.spec, tokens)
+        return tokens, ''
+    estimate = count_tokens_sampled(extraction_path, tokenizer=backend)
+    if estimate.exact:
+        return estimate.tokens, ''
+    return estimate.tokens, (
+        f"Sampled {format_size(estimate.sampled_bytes)} of {format_size(estimate.total_bytes)}: "
+        f"{estimate.confidence:.0%} interval {estimate.low:,}-{estimate.high:,} tokens"
+    )
+
+
+def report_skipped(extraction_path: Path) -> None:
+    """Warn about files left out of a budget-capped extraction, if any."""
+    manifest_path = extractor.skipped_manifest_path(extraction_path)
+    if not manifest_path.exists():
+        return
+    manifest = json.loads(manifest_path.read_text(encoding='utf-8'))
+    if manifest['complete']:
+        return
+    skipped = manifest['skipped']
+    click.echo(f"\n[WARNING] Token budget reached ({manifest['budget']:,} tokens): "
+               f"{len(skipped)} file(s) skipped", err=True)
+    for path in skipped[:5]:
+        click.echo(f"  - {path}", err=True)
+    if len(skipped) > 5:
+        click.echo(f"  ... and {len(skipped) - 5} more", err=True)
+    click.echo(f"Skipped files: {manifest_path}", err=True)
+
+
+def report_code_profile(extraction_path: Path) -> None:
+    """Show the filters synthesized for an auto-code extraction, if any."""
+    profile_path = extractor.code_profile_path(extraction_path)
+    if not profile_path.exists():
+        return
+    profile = json.loads(profile_path.read_text(encoding='utf-8'))
+    languages = ', '.join(f"{language} ({files:,} files)" for language, files in profile['languages'].items())
+    roots = ', '.join(f"{root}/" if root else "(root)" for root in profile['roots'])
+    click.echo(f"Detected: {languages}")
+    click.echo(f"Source roots: {roots}")
+    click.echo(f"  include: {', '.join(profile['include'])}")
+    if profile['exclude']:
+        click.echo(f"  exclude: {', '.join(profile['exclude'])}")
+    click.echo(f"Selected {profile['files']:,} file(s) ({profile_path.name})")
+
+
+def report_installation_summary(extraction_path: Path) -> None:
+    """Show the manifest summary of an installation extraction read from a mirror, if any."""
+    summary_path = extractor.installation_summary_path(extraction_path)
+    if not summary_path.exists():
+        return
+    summary = json.loads(summary_path.read_text(encoding='utf-8'))
+    title = ' '.join(part for part in (summary['name'], summary['version']) if part) or '(unnamed)'
+    click.echo(f"Manifests: {', '.join(summary['manifests']) or 'none'} ({title})")
+    if summary['runtimes']:
+        click.echo("  runtime: " + ', '.join(f"{name} {spec}" for name, spec in summary['runtimes'].items()))
+    for key, label in (('dependencies', 'dependencies'), ('dev_dependencies', 'dev dependencies')):
+        if summary[key]:
+            counts = ', '.join(f"{len(items)} {ecosystem}" for ecosystem, items in summary[key].items())
+            click.echo(f"  {label}: {counts}")
+    for path, reason in summary.get('errors', {}).items():
+        click.echo(f"[WARNING] Could not parse {path}: {reason}", err=True)
+
+
+def report_truncations(extraction_path: Path) -> None:
+    """Summarize the files capped during extraction, if any."""
+    with DigestReader(Path(extraction_path)) as reader:
+        truncations = reader.truncations()
+    if not truncations:
+        return
+    elided = sum(elided for _, _, elided in truncations.values())
+    click.echo(f"Capped {len(truncations)} file(s), {elided:,} tokens omitted:")
+    ranked = sorted(truncations.items(), key=lambda item: -item[1][2])
+    for path, (tokens, kept, _) in ranked[:5]:
+        click.echo(f"  - {path} (kept {kept:,} of {tokens:,} tokens)")
+    if len(ranked) > 5:
+        click.echo(f"  ... and {len(ranked) - 5} more")
+
+
+class ContentTypeParam(click.ParamType):
+    """
+    Choice of content type for --type: built-in and configured profiles.
+
+    The choices are read when the option is used, so profiles added to a
+    config file (see profiles.py) are accepted right away.
+    """
+    name = 'content_type'
+
+    def choices(self) -> list[str]:
+        try:
+            return content_types()
+        except ValidationError:
+            return list(builtin_profiles())
+
+    def get_metavar(self, param, ctx=None) -> str:
+        return f"[{'|'.join(self.choices())}]"
+
+    def convert(self, value, param, ctx):
+        try:
+            choices = content_types()
+        except ValidationError as e:
+            self.fail(str(e), param, ctx)
+        return click.Choice(choices).convert(value, param, ctx)
+
+    def shell_complete(self, ctx, param, incomplete):
+        return click.Choice(self.choices()).shell_complete(ctx, param, incomplete)
+
+
 @click.group()
 def gitingest_agent():
     """
@@ -60,19 +279,30 @@ def gitingest_agent():
 @click.argument('url')
 @click.option('--output-dir', type=click.Path(), default=None,
               help='Custom output directory (default: auto-detect based on current directory)')
-def check_size(url: str, output_dir: str):
+@click.option('--tokenizer', default=None,
+              help='Token counter: heuristic, calibrated, bytes or bpe:VOCAB_FILE '
+                   '(default: $GITINGEST_AGENT_TOKENIZER, else calibrated)')
+@click.option('--prefilter', is_flag=True,
+              help='Drop or stub lockfiles, minified bundles, vendored, generated and binary-like files')
+def check_size(url: str, output_dir: str, tokenizer: str, prefilter: bool):
     """
     Check token count and determine extraction strategy.
 
     Args:
         url: GitHub repository URL
         output_dir: Optional custom output directory
+        tokenizer: Tokenizer backend spec (default: calibrated, see ROUTING_TOKENIZER)
+        prefilter: Count the digest as the prefilter would leave it
 
     Example:
         gitingest-agent check-size https://github.com/user/repo
         gitingest-agent check-size https://github.com/user/repo --output-dir ./my-analyses
+        gitingest-agent check-size https://github.com/user/repo --prefilter
+        gitingest-agent check-size https://github.com/user/repo --tokenizer bytes
     """
+    backend = load_tokenizer(tokenizer, default=ROUTING_TOKENIZER)
     ensure_execute_directory()
+    filtering = Prefilter(tokenizer=backend) if prefilter else None
 
     # Validate and prepare output directory if provided
     output_path = None
@@ -90,11 +320,13 @@ def check_size(url: str, output_dir: str):
         click.echo("Checking repository size...")
 
         # Count tokens
-        token_count = count_tokens(url)
+        token_count = count_tokens(url, prefilter=filtering, tokenizer=backend)
 
         # Format and display
         formatted = format_token_count(token_count)
-        click.echo(f"Token count: {formatted}")
+        click.echo(f"Token count: {formatted} ({backend.name})")
+        if filtering is not None:
+            report_prefilter(filtering)
 
         # Determine route
         route = "full extraction" if should_extract_full(token_count) else "selective extraction"
@@ -112,7 +344,24 @@ def check_size(url: str, output_dir: str):
 @click.argument('url')
 @click.option('--output-dir', type=click.Path(), default=None,
               help='Custom output directory (default: auto-detect based on current directory)')
-def extract_full(url: str, output_dir: str):
+@click.option('--tokenizer', default=None,
+              help='Token counter: heuristic, calibrated, bytes or bpe:VOCAB_FILE '
+                   '(default: $GITINGEST_AGENT_TOKENIZER, else calibrated)')
+@click.option('--sample', is_flag=True,
+              help='Estimate the token count from a random sample (for very large digests)')
+@click.option('--file-cap', 'file_caps', multiple=True, metavar='[GLOB=]TOKENS',
+              help='Keep only the first and last TOKENS tokens of larger files '
+                   '(GLOB=TOKENS for matching files, 0 for uncapped; repeatable)')
+@click.option('--prefilter', is_flag=True,
+              help='Drop or stub lockfiles, minified bundles, vendored, generated and binary-like files')
+@click.option('--mirror', 'use_mirror', is_flag=True,
+              help='Read the repository from a local bare mirror (created on first use, fetched when older '
+                   'than an hour) instead of a gitingest clone')
+@click.option('--skip-unchanged', is_flag=True,
+              help='Resolve the remote commit first (git ls-remote) and keep the stored extraction '
+                   'if it already holds it')
+def extract_full(url: str, output_dir: str, tokenizer: str, sample: bool, file_caps: tuple[str, ...],
+                 prefilter: bool, use_mirror: bool, skip_unchanged: bool):
     """
     Extract entire repository to data/ directory.
 
@@ -122,11 +371,26 @@ def extract_full(url: str, output_dir: str):
     Args:
         url: GitHub repository URL
         output_dir: Optional custom output directory
+        tokenizer: Optional tokenizer spec for the token count
+        sample: Estimate the token count from a sample
+        file_caps: Per-file token caps ("TOKENS" or "GLOB=TOKENS")
+        prefilter: Drop or stub generated, vendored and binary-like files
+        use_mirror: Build the digest from a local bare mirror
+            ($GITINGEST_AGENT_MIRRORS) instead of a gitingest clone
+        skip_unchanged: Keep the stored digest if the remote's commit is
+            the one it was extracted from (for scheduled refreshes)
 
     Example:
         gitingest-agent extract-full https://github.com/octocat/Hello-World
         gitingest-agent extract-full https://github.com/octocat/Hello-World --output-dir ./my-analyses
+        gitingest-agent extract-full https://github.com/octocat/Hello-World --tokenizer bpe:vocab.tiktoken
+        gitingest-agent extract-full https://github.com/octocat/Hello-World --file-cap 2000 --file-cap "*.md=0"
+        gitingest-agent extract-full https://github.com/octocat/Hello-World --mirror
+        gitingest-agent extract-full https://github.com/octocat/Hello-World --skip-unchanged
     """
+    backend = load_tokenizer(tokenizer, default=ROUTING_TOKENIZER)
+    caps = load_file_caps(file_caps)
+    filtering = Prefilter(tokenizer=backend) if prefilter else None
     ensure_execute_directory()
 
     # Validate and prepare output directory if provided
@@ -141,6 +405,7 @@ def extract_full(url: str, output_dir: str):
                 click.echo("Aborted.")
                 raise click.Abort()
 
+    mirror = None
     try:
         # Parse repository name
         repo_name = parse_repo_name(url)
@@ -148,15 +413,28 @@ def extract_full(url: str, output_dir: str):
         click.echo("Extracting full repository...")
 
         # Extract (returns path and encoding errors)
-        extraction_path, encoding_errors = extractor.extract_full(url, repo_name, output_dir=output_path)
+        started = time.time()
+        mirror = GitMirror(repository_url(url)) if use_mirror else None
+        extraction_path, encoding_errors = extractor.extract_full(
+            url, repo_name, output_dir=output_path, caps=caps or None, tokenizer=backend, prefilter=filtering,
+            mirror=mirror, skip_unchanged=skip_unchanged
+        )
+        report_mirror_transfers(mirror)
+        report_version(extraction_path, output_path, since=started)
 
         # Count tokens in result
-        token_count = count_tokens_from_file(extraction_path)
+        token_count, note = recount_tokens(extraction_path, backend, sample, output_path)
         formatted = format_token_count(token_count)
 
         # Display confirmation
         click.echo(f"[OK] Saved to: {extraction_path}")
-        click.echo(f"Token count: {formatted}")
+        click.echo(f"Token count: {formatted} ({backend.name})")
+        if note:
+            click.echo(note)
+        if filtering is not None:
+            report_prefilter(filtering)
+        if caps:
+            report_truncations(extraction_path)
 
         # Display encoding warnings if present
         if encoding_errors:
@@ -177,13 +455,22 @@ def extract_full(url: str, output_dir: str):
     except GitIngestError as e:
         click.echo(f"[ERROR] Extraction failed: {e}", err=True)
         raise click.Abort()
+    finally:
+        if mirror is not None:
+            mirror.close()
 
 
 @gitingest_agent.command()
 @click.argument('url')
 @click.option('--output-dir', type=click.Path(), default=None,
               help='Custom output directory (default: auto-detect based on current directory)')
-def extract_tree(url: str, output_dir: str):
+@click.option('--mirror', 'use_mirror', is_flag=True,
+              help='Read the repository from a local bare mirror (created on first use, fetched when older '
+                   'than an hour) instead of a gitingest clone')
+@click.option('--skip-unchanged', is_flag=True,
+              help='Resolve the remote commit first (git ls-remote) and keep the stored extraction '
+                   'if it already holds it')
+def extract_tree(url: str, output_dir: str, use_mirror: bool, skip_unchanged: bool):
     """
     Extract repository tree structure.
 
@@ -194,10 +481,15 @@ def extract_tree(url: str, output_dir: str):
     Args:
         url: GitHub repository URL
         output_dir: Optional custom output directory
+        use_mirror: List the whole tree from a local bare mirror
+            ($GITINGEST_AGENT_MIRRORS), without reading any file
+        skip_unchanged: Keep the stored tree if the remote's commit is the
+            one it was extracted from
 
     Example:
         gitingest-agent extract-tree https://github.com/fastapi/fastapi
         gitingest-agent extract-tree https://github.com/fastapi/fastapi --output-dir ./my-analyses
+        gitingest-agent extract-tree https://github.com/fastapi/fastapi --mirror
     """
     ensure_execute_directory()
 
@@ -213,13 +505,20 @@ def extract_tree(url: str, output_dir: str):
                 click.echo("Aborted.")
                 raise click.Abort()
 
+    mirror = None
     try:
         repo_name = parse_repo_name(url)
 
         click.echo("Extracting tree structure...")
 
         # Extract tree (returns path, content, and encoding errors)
-        extraction_path, tree_content, encoding_errors = extractor.extract_tree(url, repo_name, output_dir=output_path)
+        started = time.time()
+        mirror = GitMirror(repository_url(url)) if use_mirror else None
+        extraction_path, tree_content, encoding_errors = extractor.extract_tree(
+            url, repo_name, output_dir=output_path, mirror=mirror, skip_unchanged=skip_unchanged
+        )
+        report_mirror_transfers(mirror)
+        report_version(extraction_path, output_path, since=started)
 
         # Display success and path (tree content saved to file due to encoding issues on Windows)
         click.echo(f"\n[OK] Tree structure extracted")
@@ -241,16 +540,34 @@ def extract_tree(url: str, output_dir: str):
     except GitIngestError as e:
         click.echo(f"[ERROR] Extraction failed: {e}", err=True)
         raise click.Abort()
+    finally:
+        if mirror is not None:
+            mirror.close()
 
 
 @gitingest_agent.command()
 @click.argument('url')
-@click.option('--type', 'content_type', required=True,
-              type=click.Choice(['docs', 'installation', 'code', 'auto']),
-              help='Type of content to extract')
+@click.option('--type', 'content_type', required=True, type=ContentTypeParam(),
+              help='Type of content to extract (built-in or a configured profile, see the profiles command)')
 @click.option('--output-dir', type=click.Path(), default=None,
               help='Custom output directory (default: auto-detect based on current directory)')
-def extract_specific(url: str, content_type: str, output_dir: str):
+@click.option('--tokenizer', default=None,
+              help='Token counter: heuristic, calibrated, bytes or bpe:VOCAB_FILE '
+                   '(default: $GITINGEST_AGENT_TOKENIZER, else calibrated)')
+@click.option('--sample', is_flag=True,
+              help='Estimate the token count from a random sample (for very large digests)')
+@click.option('--budget', type=click.IntRange(min=1), default=None,
+              help='Stop the extraction once the content reaches this many tokens')
+@click.option('--prefilter', is_flag=True,
+              help='Drop or stub lockfiles, minified bundles, vendored, generated and binary-like files')
+@click.option('--mirror', 'use_mirror', is_flag=True,
+              help='Read the repository from a local bare mirror (created on first use, fetched when older '
+                   'than an hour) instead of a gitingest clone')
+@click.option('--skip-unchanged', is_flag=True,
+              help='Resolve the remote commit first (git ls-remote) and keep the stored extraction '
+                   'if it already holds it')
+def extract_specific(url: str, content_type: str, output_dir: str, tokenizer: str, sample: bool, budget: int,
+                     prefilter: bool, use_mirror: bool, skip_unchanged: bool):
     """
     Extract specific content from repository using filters with overflow prevention.
 
@@ -259,6 +576,9 @@ def extract_specific(url: str, content_type: str, output_dir: str):
     - installation: Installation files (README, setup.py, package.json)
     - code: Source code (src/**/*.py, lib/**/*.py)
     - auto: Automatic (README + docs)
+    - outline: Code skeleton (signatures and docstrings, bodies dropped)
+    - auto-code: Core source of the dominant languages, filters built from the tree
+    - any profile from a config file (see the profiles command)
 
     Includes token overflow prevention: if extracted content exceeds 200k tokens,
     prompts user to narrow selection or proceed with partial content.
@@ -267,11 +587,27 @@ def extract_specific(url: str, content_type: str, output_dir: str):
         url: GitHub repository URL
         content_type: Type of content to extract
         output_dir: Optional custom output directory
+        tokenizer: Optional tokenizer spec for the token re-check
+        sample: Estimate the token re-check from a sample; the content is
+            counted fully only when the estimate is too close to 200k to decide
+        budget: Optional token budget; the ingest stops when it is reached and
+            the files left out are listed in [type]-content.skipped.json
+        prefilter: Drop or stub generated, vendored and binary-like files
+        use_mirror: Read the content from a local bare mirror
+            ($GITINGEST_AGENT_MIRRORS) instead of a gitingest clone; for
+            installation content the manifests are summarized in
+            [type]-content.summary.json
+        skip_unchanged: Keep the stored content if the remote's commit is
+            the one it was extracted from, with the same settings
 
     Example:
         gitingest-agent extract-specific https://github.com/fastapi/fastapi --type docs
         gitingest-agent extract-specific https://github.com/fastapi/fastapi --type docs --output-dir ./my-analyses
+        gitingest-agent extract-specific https://github.com/torvalds/linux --type code --budget 150000
+        gitingest-agent extract-specific https://github.com/gin-gonic/gin --type auto-code
+        gitingest-agent extract-specific https://github.com/fastapi/fastapi --type installation --mirror
     """
+    backend = load_tokenizer(tokenizer, default=ROUTING_TOKENIZER)
     ensure_execute_directory()
 
     # Validate and prepare output directory if provided
@@ -286,22 +622,40 @@ def extract_specific(url: str, content_type: str, output_dir: str):
                 click.echo("Aborted.")
                 raise click.Abort()
 
+    mirror = None
     try:
         repo_name = parse_repo_name(url)
 
         # Initial extraction
         click.echo(f"Extracting {content_type} content...")
-        extraction_path, encoding_errors = extractor.extract_specific(url, repo_name, content_type, output_dir=output_path)
+        filtering = Prefilter(tokenizer=backend) if prefilter else None
+        started = time.time()
+        mirror = GitMirror(repository_url(url)) if use_mirror else None
+        extraction_path, encoding_errors = extractor.extract_specific(
+            url, repo_name, content_type, output_dir=output_path, budget=budget, tokenizer=backend,
+            prefilter=filtering, mirror=mirror, skip_unchanged=skip_unchanged
+        )
+        report_mirror_transfers(mirror)
+        report_version(extraction_path, output_path, since=started)
 
         # Token re-check loop for overflow prevention
         while True:
             # Count tokens in extracted content
-            token_count = count_tokens_from_file(extraction_path)
+            token_count, note = recount_tokens(extraction_path, backend, sample, output_path)
             formatted = format_token_count(token_count)
 
             # Display confirmation
             click.echo(f"[OK] Saved to: {extraction_path}")
-            click.echo(f"Token count: {formatted}")
+            click.echo(f"Token count: {formatted} ({backend.name})")
+            if note:
+                click.echo(note)
+            if filtering is not None:
+                report_prefilter(filtering)
+            report_skipped(Path(extraction_path))
+            report_code_profile(Path(extraction_path))
+            report_installation_summary(Path(extraction_path))
+            if load_profiles()[content_type].caps:
+                report_truncations(Path(extraction_path))
 
             # Display encoding warnings if present
             if encoding_errors:
@@ -344,13 +698,22 @@ def extract_specific(url: str, content_type: str, output_dir: str):
 
                 new_type = click.prompt(
                     "Content type",
-                    type=click.Choice(['docs', 'installation', 'code', 'auto']),
+                    type=click.Choice(content_types()),
                     default='installation'
                 )
 
                 # Re-extract with new content type
                 click.echo(f"\nExtracting {new_type} content...")
-                extraction_path, encoding_errors = extractor.extract_specific(url, repo_name, new_type, output_dir=output_path)
+                filtering = Prefilter(tokenizer=backend) if prefilter else None
+                started = time.time()
+                if mirror is not None:
+                    mirror.transfers.clear()  # Only report this extraction's downloads
+                extraction_path, encoding_errors = extractor.extract_specific(
+                    url, repo_name, new_type, output_dir=output_path, budget=budget, tokenizer=backend,
+                    prefilter=filtering, mirror=mirror, skip_unchanged=skip_unchanged
+                )
+                report_mirror_transfers(mirror)
+                report_version(extraction_path, output_path, since=started)
                 content_type = new_type  # Update for next iteration
             else:
                 # Invalid choice - continue loop to re-prompt
@@ -365,6 +728,699 @@ def extract_specific(url: str, content_type: str, output_dir: str):
     except GitIngestError as e:
         click.echo(f"[ERROR] Extraction failed: {e}", err=True)
         raise click.Abort()
+    finally:
+        if mirror is not None:
+            mirror.close()
+
+
+@gitingest_agent.command()
+def profiles():
+    """
+    List the content types available to extract-specific --type.
+
+    Shows the built-in types and the profiles defined in config files
+    (user: ~/.config/gitingest-agent/config.toml; project: the nearest
+    .gitingest-agent.toml or $GITINGEST_AGENT_CONFIG), with their filters,
+    per-file caps and budget. Invalid config files are reported.
+
+    Example:
+        gitingest-agent profiles
+    """
+    try:
+        available = load_profiles()
+    except ValidationError as e:
+        click.echo(f"[ERROR] Invalid input: {e}", err=True)
+        raise click.Abort()
+
+    for profile in available.values():
+        origin = profile.source or 'built-in'
+        description = f": {profile.description}" if profile.description else ''
+        click.echo(f"{profile.name} ({origin}){description}")
+        click.echo(f"  include: {', '.join(profile.include) or '(everything)'}")
+        if profile.exclude:
+            click.echo(f"  exclude: {', '.join(profile.exclude)}")
+        if profile.caps:
+            caps = [str(profile.caps.default)] if profile.caps.default else []
+            caps += [f"{glob}={tokens}" for glob, tokens in profile.caps.rules]
+            click.echo(f"  file caps: {', '.join(caps)}")
+        if profile.budget:
+            click.echo(f"  budget: {format_token_count(profile.budget)}")
+
+
+@gitingest_agent.command()
+@click.argument('url')
+@click.option('--refresh', is_flag=True, default=False,
+              help='Re-extract the digest even if one is already stored')
+@click.option('--output-dir', type=click.Path(), default=None,
+              help='Custom output directory (default: auto-detect based on current directory)')
+@click.option('--tokenizer', default=None,
+              help='Token counter: heuristic, calibrated, bytes or bpe:VOCAB_FILE '
+                   '(default: $GITINGEST_AGENT_TOKENIZER, else heuristic)')
+@click.option('--prefilter', is_flag=True,
+              help='Drop or stub lockfiles, minified bundles, vendored, generated and binary-like files')
+@click.option('--mirror', 'use_mirror', is_flag=True,
+              help='Read the repository from a local bare mirror (created on first use, fetched when older '
+                   'than an hour) instead of a gitingest clone')
+def extract_layers(url: str, refresh: bool, output_dir: str, tokenizer: str, prefilter: bool, use_mirror: bool):
+    """
+    Build layered artifacts (tree, overview, docs, outline, full) from one ingest.
+
+    Layers, from cheapest to most complete:
+    - L0 tree: directory tree with file and directory sizes
+    - L1 overview: README and package manifests
+    - L2 docs: remaining documentation
+    - L3 outline: code skeleton (signatures and docstrings)
+    - L4 full: the full digest
+
+    A layers.json manifest records each layer's file and token count, so
+    stepping up a level is a local file read rather than a new extraction.
+
+    Args:
+        url: GitHub repository URL
+        refresh: Re-extract even if a digest is already stored
+        output_dir: Optional custom output directory
+        tokenizer: Optional tokenizer spec for the layer token counts
+        prefilter: Drop or stub generated, vendored and binary-like files in
+            a new digest and in the overview and docs layers
+        use_mirror: Build a new digest from a local bare mirror
+            ($GITINGEST_AGENT_MIRRORS) instead of a gitingest clone
+
+    Example:
+        gitingest-agent extract-layers https://github.com/fastapi/fastapi
+        gitingest-agent extract-layers https://github.com/fastapi/fastapi --refresh --output-dir ./my-analyses
+    """
+    backend = load_tokenizer(tokenizer)
+    ensure_execute_directory()
+
+    # Validate and prepare output directory if provided
+    output_path = None
+    if output_dir:
+        output_path = Path(output_dir).resolve()
+        if not output_path.exists():
+            if click.confirm(f"Directory {output_path} doesn't exist. Create it?"):
+                output_path.mkdir(parents=True, exist_ok=True)
+                click.echo(f"Created directory: {output_path}")
+            else:
+                click.echo("Aborted.")
+                raise click.Abort()
+
+    mirror = None
+    try:
+        repo_name = parse_repo_name(url)
+
+        click.echo("Building layers...")
+        filtering = Prefilter(tokenizer=backend) if prefilter else None
+        mirror = GitMirror(repository_url(url)) if use_mirror else None
+        manifest_path, built = extractor.extract_layers(
+            url, repo_name, output_dir=output_path, refresh=refresh, tokenizer=backend, prefilter=filtering,
+            mirror=mirror
+        )
+        report_mirror_transfers(mirror)
+
+        for layer in built:
+            click.echo(f"L{layer.level} {layer.name:<9} {format_token_count(layer.tokens):>14}  {layer.path}")
+        click.echo(f"Tokenizer: {backend.spec}")
+        click.echo(f"[OK] Manifest: {manifest_path}")
+        if filtering is not None:
+            report_prefilter(filtering)
+
+    except ValidationError as e:
+        click.echo(f"[ERROR] Invalid URL: {e}", err=True)
+        raise click.Abort()
+    except StorageError as e:
+        click.echo(f"[ERROR] Storage error: {e}", err=True)
+        raise click.Abort()
+    except GitIngestError as e:
+        click.echo(f"[ERROR] Extraction failed: {e}", err=True)
+        raise click.Abort()
+    finally:
+        if mirror is not None:
+            mirror.close()
+
+
+@gitingest_agent.command()
+@click.argument('url')
+@click.option('--query', required=True, help='Question or keywords to rank files against')
+@click.option('--budget', type=int, default=50_000, show_default=True,
+              help='Maximum tokens of selected content')
+@click.option('--source', type=click.Path(exists=True), default=None,
+              help='Local checkout directory or digest file to rank (default: stored digest)')
+@click.option('--output-dir', type=click.Path(), default=None,
+              help='Custom output directory (default: auto-detect based on current directory)')
+@click.option('--tokenizer', default=None,
+              help='Token counter: heuristic, calibrated, bytes or bpe:VOCAB_FILE '
+                   '(default: $GITINGEST_AGENT_TOKENIZER, else heuristic)')
+@click.option('--prefilter', is_flag=True,
+              help='Drop or stub lockfiles, minified bundles, vendored, generated and binary-like files')
+@click.option('--mirror', 'use_mirror', is_flag=True,
+              help='Read the repository from a local bare mirror (created on first use, fetched when older '
+                   'than an hour) instead of a gitingest clone')
+def extract_relevant(url: str, query: str, budget: int, source: str, output_dir: str, tokenizer: str,
+                     prefilter: bool, use_mirror: bool):
+    """
+    Extract the files most relevant to a question within a token budget.
+
+    Ranks files locally with BM25 over paths and contents, then saves the
+    top-ranked files that fit the budget plus a manifest with their scores.
+    Uses the stored full digest when available, otherwise extracts it first.
+
+    Args:
+        url: GitHub repository URL
+        query: Question or keywords
+        budget: Token budget for the selected content
+        source: Optional local checkout or digest to rank instead
+        output_dir: Optional custom output directory
+        tokenizer: Optional tokenizer spec sizing files against the budget
+        prefilter: Leave generated, vendored and binary-like files out of the ranking
+        use_mirror: Build a missing digest from a local bare mirror
+            ($GITINGEST_AGENT_MIRRORS) instead of a gitingest clone
+
+    Example:
+        gitingest-agent extract-relevant https://github.com/fastapi/fastapi --query "how is auth configured"
+        gitingest-agent extract-relevant https://github.com/user/repo --query "retry policy" --budget 20000 --source ../repo
+    """
+    backend = load_tokenizer(tokenizer)
+    ensure_execute_directory()
+
+    # Validate and prepare output directory if provided
+    output_path = None
+    if output_dir:
+        output_path = Path(output_dir).resolve()
+        if not output_path.exists():
+            if click.confirm(f"Directory {output_path} doesn't exist. Create it?"):
+                output_path.mkdir(parents=True, exist_ok=True)
+                click.echo(f"Created directory: {output_path}")
+            else:
+                click.echo("Aborted.")
+                raise click.Abort()
+
+    mirror = None
+    try:
+        repo_name = parse_repo_name(url)
+
+        click.echo(f"Ranking files for: {query}")
+        filtering = Prefilter(tokenizer=backend) if prefilter else None
+        mirror = GitMirror(repository_url(url)) if use_mirror else None
+        extraction_path, manifest_path, token_count = extractor.extract_relevant(
+            url, repo_name, query, budget,
+            source=Path(source).resolve() if source else None,
+            output_dir=output_path,
+            tokenizer=backend,
+            prefilter=filtering,
+            mirror=mirror
+        )
+        report_mirror_transfers(mirror)
+
+        click.echo(f"[OK] Saved to: {extraction_path}")
+        click.echo(f"[OK] Manifest: {manifest_path}")
+        click.echo(f"Token count: {format_token_count(token_count)} (budget: {format_token_count(budget)})")
+        click.echo(f"Tokenizer: {backend.spec}")
+        if filtering is not None:
+            report_prefilter(filtering)
+
+    except ValidationError as e:
+        click.echo(f"[ERROR] Invalid input: {e}", err=True)
+        raise click.Abort()
+    except StorageError as e:
+        click.echo(f"[ERROR] Storage error: {e}", err=True)
+        raise click.Abort()
+    except GitIngestError as e:
+        click.echo(f"[ERROR] Extraction failed: {e}", err=True)
+        raise click.Abort()
+    finally:
+        if mirror is not None:
+            mirror.close()
+
+
+@gitingest_agent.command()
+@click.argument('url')
+@click.option('--type', 'artifact_type', default='digest', show_default=True,
+              help='Artifact: digest, tree or a content type (docs, installation, ...)')
+@click.option('--output-dir', type=click.Path(), default=None,
+              help='Custom output directory (default: auto-detect based on current directory)')
+def versions(url: str, artifact_type: str, output_dir: str):
+    """
+    List the versions of an artifact, by the commit they were extracted from.
+
+    Extractions from a known commit (--mirror) keep each version in
+    versions/<commit>/ next to the artifact, so versions can be diffed. The
+    latest version, which the artifact itself holds, is marked with '*'.
+
+    Args:
+        url: GitHub repository URL
+        artifact_type: digest, tree or a content type
+        output_dir: Optional custom output directory
+
+    Example:
+        gitingest-agent versions https://github.com/fastapi/fastapi
+        gitingest-agent versions https://github.com/fastapi/fastapi --type docs
+    """
+    ensure_execute_directory()
+
+    try:
+        output_path = Path(output_dir).resolve() if output_dir else None
+        data_dir = ensure_data_directory(parse_repo_name(url), output_dir=output_path, repo_url=url)
+        name = f"{artifact_type}.txt" if artifact_type in ('digest', 'tree') else f"{artifact_type}-content.txt"
+        artifact = data_dir / name
+
+        with ArtifactStore(get_storage_root(output_path)) as store:
+            entries = store.versions(artifact)
+
+        if not entries:
+            click.echo(f"No versions of {artifact} (versions are kept for extractions with --mirror or --skip-unchanged)")
+            return
+        click.echo(f"Versions of {artifact}:")
+        for entry in entries:
+            extracted = time.strftime('%Y-%m-%d %H:%M', time.localtime(entry['extracted']))
+            available = "" if entry['path'].exists() else "  (evicted)"
+            click.echo(f"{'*' if entry['latest'] else ' '} {entry['commit'][:12]}  {extracted}  "
+                       f"{entry['path']}{available}")
+
+    except ValidationError as e:
+        click.echo(f"[ERROR] Invalid URL: {e}", err=True)
+        raise click.Abort()
+    except StorageError as e:
+        click.echo(f"[ERROR] Storage error: {e}", err=True)
+        raise click.Abort()
+
+
+@gitingest_agent.command()
+@click.option('--output-dir', type=click.Path(), default=None,
+              help='Custom output directory (default: auto-detect based on current directory)')
+@click.option('--quota', default=None,
+              help='Quota to enforce for this run (e.g. 500M, 5G)')
+@click.option('--set-quota', 'new_quota', default=None,
+              help='Persist a quota for this artifact store ("none" to remove)')
+@click.option('--dry-run', is_flag=True, default=False,
+              help='Report what would be evicted without deleting anything')
+def gc(output_dir: str, quota: str, new_quota: str, dry_run: bool):
+    """
+    Evict least-recently-used artifacts to bring the store under its quota.
+
+    Eviction decisions come from the artifact index, not a directory scan.
+    Digests, trees and content files may be evicted; saved analyses are
+    pinned and never removed.
+
+    Args:
+        output_dir: Optional custom output directory
+        quota: One-off quota override
+        new_quota: Quota to persist in the artifact index
+        dry_run: Only report the eviction plan
+
+    Example:
+        gitingest-agent gc --dry-run
+        gitingest-agent gc --set-quota 5G
+        gitingest-agent gc --quota 500M --output-dir ./my-analyses
+    """
+    ensure_execute_directory()
+
+    try:
+        root = get_storage_root(Path(output_dir).resolve() if output_dir else None)
+
+        with ArtifactStore(root) as store:
+            if new_quota is not None:
+                persisted = None if new_quota.lower() == 'none' else parse_size(new_quota)
+                store.set_quota(persisted)
+                label = format_size(persisted) if persisted is not None else "none"
+                click.echo(f"[OK] Quota set to: {label}")
+
+            limit = parse_size(quota) if quota else store.get_quota()
+
+            # Entries whose files vanished are dropped from the index; in
+            # dry-run mode they are only discounted from the totals
+            stale = store.find_stale()
+            pending_bytes = sum(entry['size'] for entry in stale) if dry_run else 0
+            if stale and not dry_run:
+                store.forget(stale)
+
+            click.echo(f"Artifact store: {root}")
+            click.echo(f"Indexed size: {format_size(store.total_size() - pending_bytes)}")
+            click.echo(f"Quota: {format_size(limit) if limit is not None else 'none'}")
+
+            if stale:
+                verb = "Would forget" if dry_run else "Forgot"
+                click.echo(f"{verb} {len(stale)} index entries for missing files")
+
+            if limit is None:
+                click.echo("No quota configured - nothing to evict.")
+                return
+
+            plan = store.plan_eviction(
+                quota=limit + pending_bytes,
+                protect=[entry['path'] for entry in stale]
+            )
+
+            if not plan:
+                click.echo("Store is within quota - nothing to evict.")
+                return
+
+            freed = sum(entry['size'] for entry in plan)
+            click.echo(f"\n{'Would evict' if dry_run else 'Evicting'} {len(plan)} artifact(s), "
+                       f"{format_size(freed)}:")
+            for entry in plan:
+                click.echo(f"  - {entry['path']} ({entry['kind']}, {format_size(entry['size'])})")
+
+            if not dry_run:
+                store.evict(plan)
+                with SearchIndex.for_root(root) as index:
+                    for entry in plan:
+                        index.remove_digest(entry['path'])
+                click.echo(f"\n[OK] Freed {format_size(freed)}")
+
+    except ValidationError as e:
+        click.echo(f"[ERROR] Invalid input: {e}", err=True)
+        raise click.Abort()
+    except StorageError as e:
+        click.echo(f"[ERROR] Storage error: {e}", err=True)
+        raise click.Abort()
+
+
+@gitingest_agent.command('migrate-layout')
+@click.option('--output-dir', type=click.Path(), default=None,
+              help='Custom output directory (default: auto-detect based on current directory)')
+@click.option('--dry-run', is_flag=True, default=False,
+              help='Report what would be moved without moving anything')
+def migrate_layout_command(output_dir: str, dry_run: bool):
+    """
+    Move a context/related-repos/ store into the sharded layout.
+
+    Every artifact is filed under <shard>/<owner>/<repo>/, where the shard is
+    a hash prefix of owner/repo. Artifacts are found through the artifact
+    index, moved with their versions and sidecar files, and re-keyed in the
+    artifact and search indexes. Later extractions and analyses use the
+    sharded layout.
+
+    Args:
+        output_dir: Optional custom output directory
+        dry_run: Only report the moves
+
+    Example:
+        gitingest-agent migrate-layout --dry-run
+        gitingest-agent migrate-layout --output-dir ./my-analyses
+    """
+    ensure_execute_directory()
+
+    try:
+        output_path = Path(output_dir).resolve() if output_dir else None
+        root = get_storage_root(output_path)
+        if not (root / INDEX_FILENAME).exists():
+            click.echo(f"[ERROR] No artifact index in {root}", err=True)
+            raise click.Abort()
+        moves = migrate_layout(output_path, dry_run=dry_run)
+
+        click.echo(f"Artifact store: {root}")
+        for source, target in moves:
+            click.echo(f"  {source.relative_to(root)} -> {target.relative_to(root)}")
+        if dry_run:
+            click.echo(f"Would move {len(moves)} path(s)")
+        else:
+            click.echo(f"[OK] Moved {len(moves)} path(s); the store now uses the sharded layout")
+
+    except ValidationError as e:
+        click.echo(f"[ERROR] Invalid input: {e}", err=True)
+        raise click.Abort()
+    except StorageError as e:
+        click.echo(f"[ERROR] Storage error: {e}", err=True)
+        raise click.Abort()
+
+
+@gitingest_agent.command()
+@click.argument('query')
+@click.option('--repo', default=None, help='Only search this repository (owner/repo)')
+@click.option('--language', default=None, help='Only search files of this language (e.g. Python)')
+@click.option('--path', 'path_glob', default=None, help='Only search files matching this glob (e.g. "src/*")')
+@click.option('--facet', type=click.Choice(FACETS), default=None,
+              help='Show match counts per repo, language or path instead of matches')
+@click.option('--limit', type=int, default=20, help='Maximum number of matches to show')
+@click.option('--reindex', is_flag=True, default=False,
+              help='Index every stored digest before searching')
+@click.option('--output-dir', type=click.Path(), default=None,
+              help='Custom output directory (default: auto-detect based on current directory)')
+def search(query: str, repo: str, language: str, path_glob: str, facet: str,
+           limit: int, reindex: bool, output_dir: str):
+    """
+    Search all extracted digests with the full-text index.
+
+    The index is updated automatically by extract-full and extract-specific.
+    Use --reindex once to index digests extracted before the index existed.
+
+    Args:
+        query: Search terms (all must match, trailing * for prefix)
+        repo: Optional repository filter
+        language: Optional language filter
+        path_glob: Optional path glob filter
+        facet: Optional facet to count matches by
+        limit: Maximum number of matches
+        reindex: Index all stored digests first
+        output_dir: Optional custom output directory
+
+    Example:
+        gitingest-agent search "APIRouter include_router"
+        gitingest-agent search "Depends" --repo fastapi/fastapi --language Python
+        gitingest-agent search "useEffect" --facet repo
+    """
+    ensure_execute_directory()
+
+    try:
+        root = get_storage_root(Path(output_dir).resolve() if output_dir else None)
+
+        with SearchIndex.for_root(root) as index:
+            if reindex:
+                indexed = 0
+                with ArtifactStore(root) as store:
+                    for entry in store.entries():
+                        if entry['kind'] in ('digest', 'content') and entry['path'].exists():
+                            indexed += index.index_digest(entry['path'], entry['repo'])
+                removed = index.prune()
+                click.echo(f"[OK] Indexed {indexed:,} new sections, pruned {removed} missing digest(s)")
+
+            if facet:
+                counts = index.facet_counts(query, facet, repo=repo, language=language, path_glob=path_glob)
+                for value, count in counts.items():
+                    click.echo(f"{count:>8,}  {value}")
+                if not counts:
+                    click.echo("No matches found.")
+                return
+
+            results = index.search(query, repo=repo, language=language, path_glob=path_glob, limit=limit)
+
+        if not results:
+            click.echo("No matches found.")
+            return
+
+        for result in results:
+            click.echo(f"{result['repo']}:{result['path']}:{result['file_line']}: {result['snippet']}")
+
+    except ValidationError as e:
+        click.echo(f"[ERROR] Invalid input: {e}", err=True)
+        raise click.Abort()
+    except StorageError as e:
+        click.echo(f"[ERROR] Storage error: {e}", err=True)
+        raise click.Abort()
+
+
+@gitingest_agent.command()
+@click.argument('source')
+@click.option('--by', 'group_by', type=click.Choice(GROUP_BY), default='directory', show_default=True,
+              help='Group tokens by top-level directory, file extension or language')
+@click.option('--top', type=int, default=10, show_default=True, help='Number of largest files to list')
+@click.option('--json', 'as_json', is_flag=True, default=False, help='Print the report as JSON')
+@click.option('--tokenizer', default=None,
+              help='Token counter: heuristic, calibrated, bytes or bpe:VOCAB_FILE '
+                   '(default: $GITINGEST_AGENT_TOKENIZER, else heuristic)')
+@click.option('--workers', type=int, default=None, help='Worker processes for the bpe tokenizer (default: all cores)')
+@click.option('--output-dir', type=click.Path(), default=None,
+              help='Custom output directory (default: auto-detect based on current directory)')
+def stats(source: str, group_by: str, top: int, as_json: bool, tokenizer: str, workers: int, output_dir: str):
+    """
+    Show where a repository's tokens are.
+
+    Prints a token histogram by top-level directory, extension or language
+    and the largest files, to help write filters that fit the token budget.
+    SOURCE is a GitHub URL (uses the stored digest, extracting it if
+    needed), a digest file or a local checkout directory.
+
+    Args:
+        source: GitHub URL, digest file or checkout directory
+        group_by: Histogram grouping
+        top: Number of largest files to list
+        as_json: Print JSON instead of a table
+        tokenizer: Optional tokenizer spec for the per-file counts
+        workers: Optional worker process count for the bpe tokenizer
+        output_dir: Optional custom output directory
+
+    Example:
+        gitingest-agent stats https://github.com/fastapi/fastapi
+        gitingest-agent stats data/fastapi/digest.txt --by language --top 20 --json
+        gitingest-agent stats data/fastapi/digest.txt --tokenizer bpe:vocab/cl100k.tiktoken
+    """
+    local = Path(source).resolve()
+    backend = load_tokenizer(tokenizer)
+    ensure_execute_directory()
+
+    try:
+        if local.exists():
+            target = local
+        else:
+            repo_name = parse_repo_name(source)
+            output_path = Path(output_dir).resolve() if output_dir else None
+            target = extractor.get_or_extract_digest(source, repo_name, output_dir=output_path)
+
+        report = compute_stats(
+            iter_file_stats(target, tokenizer=backend, workers=workers),
+            by=group_by, top=top, tokenizer=backend.spec
+        )
+
+        if as_json:
+            click.echo(json.dumps(report, indent=2))
+        else:
+            click.echo(format_table(report))
+
+    except ValidationError as e:
+        click.echo(f"[ERROR] Invalid input: {e}", err=True)
+        raise click.Abort()
+    except StorageError as e:
+        click.echo(f"[ERROR] Storage error: {e}", err=True)
+        raise click.Abort()
+    except GitIngestError as e:
+        click.echo(f"[ERROR] Extraction failed: {e}", err=True)
+        raise click.Abort()
+
+
+@gitingest_agent.command()
+@click.argument('pattern')
+@click.option('-i', '--ignore-case', is_flag=True, default=False, help='Match case-insensitively')
+@click.option('-F', '--fixed-strings', is_flag=True, default=False, help='Treat PATTERN as literal text')
+@click.option('--repo', default=None, help='Only search this repository (owner/repo)')
+@click.option('--path', 'path_glob', default=None, help='Only search files matching this glob (e.g. "src/*")')
+@click.option('--workers', type=int, default=None, help='Worker processes (default: all cores)')
+@click.option('--max-count', type=int, default=None, help='Stop after this many matching lines')
+@click.option('--output-dir', type=click.Path(), default=None,
+              help='Storage root to search (default: auto-detect based on current directory)')
+def grep(pattern: str, ignore_case: bool, fixed_strings: bool, repo: str, path_glob: str,
+         workers: int, max_count: int, output_dir: str):
+    """
+    Search every stored digest with a regular expression.
+
+    Scans all digests under the storage root in parallel and prints matching
+    lines as repo:file:line: text, where line is the line number inside the
+    original file. A repository's full digest is searched instead of its
+    content files; outline and relevant content are never searched. Results
+    stream as they are found.
+
+    Args:
+        pattern: Regular expression (or literal text with -F)
+        ignore_case: Match case-insensitively
+        fixed_strings: Treat pattern as literal text
+        repo: Optional repository filter
+        path_glob: Optional file path glob filter
+        workers: Optional worker process count
+        max_count: Optional limit on matching lines
+        output_dir: Optional storage root
+
+    Example:
+        gitingest-agent grep "def \\w+_handler"
+        gitingest-agent grep -i -F "TODO" --repo fastapi/fastapi --path "fastapi/*"
+    """
+    ensure_execute_directory()
+
+    try:
+        compiled = compile_pattern(pattern, ignore_case=ignore_case, fixed_strings=fixed_strings)
+        root = get_storage_root(Path(output_dir).resolve() if output_dir else None)
+
+        with ArtifactStore(root) as store:
+            if store.get_layout() == 'sharded':
+                # Sharded stores are too large to scan: the index lists every digest
+                entries = store.entries(kinds=('digest', 'content'), repo=repo)
+                digests = sorted((entry['path'], entry['repo']) for entry in entries
+                                 if entry['path'].is_file() and is_searchable(entry['path']))
+            else:
+                repos = {str(entry['path'].resolve()): entry['repo'] for entry in store.entries() if entry['repo']}
+                digests = [(path, label) for path, label in find_digests(root, repos) if not repo or label == repo]
+
+        found = 0
+        matches = grep_digests(digests, compiled, path_glob=path_glob, workers=workers)
+        try:
+            for match in matches:
+                click.echo(f"{match.repo}:{match.path}:{match.line}: {match.text}")
+                found += 1
+                if max_count is not None and found >= max_count:
+                    break
+        finally:
+            matches.close()
+
+        if not found:
+            click.echo("No matches found.")
+
+    except ValidationError as e:
+        click.echo(f"[ERROR] Invalid input: {e}", err=True)
+        raise click.Abort()
+    except StorageError as e:
+        click.echo(f"[ERROR] Storage error: {e}", err=True)
+        raise click.Abort()
+
+
+@gitingest_agent.command()
+@click.argument('digest', type=click.Path(exists=True, dir_okay=False))
+@click.option('--page', type=int, default=None, help='Print this page (1-based)')
+@click.option('--page-tokens', type=int, default=DEFAULT_PAGE_TOKENS, show_default=True,
+              help='Page size in tokens')
+@click.option('--file', 'file_path', default=None, help='Print this file from the digest')
+@click.option('--lines', default=None, help='Line range of --file to print (e.g. 10-40)')
+@click.option('--list', 'list_files', is_flag=True, default=False, help='List the files in the digest')
+def read(digest: str, page: int, page_tokens: int, file_path: str, lines: str, list_files: bool):
+    """
+    Read a digest page by page or file by file.
+
+    Serves any page or file directly from a persisted offset index and a
+    memory-mapped digest, so agents never have to load the whole digest.
+    Pages break at file boundaries where possible. Without options, prints
+    the page and file counts.
+
+    Args:
+        digest: Path to a digest or content file
+        page: Page number to print
+        page_tokens: Page size in tokens
+        file_path: File to print
+        lines: Line range of the file to print
+        list_files: List files instead of printing content
+
+    Example:
+        gitingest-agent read data/fastapi/digest.txt --page 3
+        gitingest-agent read data/fastapi/digest.txt --file fastapi/routing.py --lines 100-160
+    """
+    try:
+        if lines and not file_path:
+            raise ValidationError("--lines requires --file")
+
+        with DigestReader(Path(digest)) as reader:
+            if list_files:
+                truncations = reader.truncations()
+                for path, size in reader.files():
+                    line = f"{format_size(size):>10}  {path}"
+                    if path in truncations:
+                        tokens, kept, _ = truncations[path]
+                        line += f"  (capped: kept {kept:,} of {tokens:,} tokens)"
+                    click.echo(line)
+            elif file_path:
+                start, end = parse_line_range(lines) if lines else (1, None)
+                click.echo(reader.read_file(file_path, start, end))
+            elif page is not None:
+                total = reader.page_count(page_tokens)
+                click.echo(f"[Page {page}/{total}]", err=True)
+                click.echo(reader.read_page(page, page_tokens), nl=False)
+            else:
+                click.echo(f"Digest: {Path(digest).resolve()}")
+                click.echo(f"Files: {len(reader.files()):,}")
+                click.echo(f"Pages: {reader.page_count(page_tokens):,} "
+                           f"(at {format_token_count(page_tokens)} per page)")
+
+    except ValidationError as e:
+        click.echo(f"[ERROR] Invalid input: {e}", err=True)
+        raise click.Abort()
+    except StorageError as e:
+        click.echo(f"[ERROR] Storage error: {e}", err=True)
+        raise click.Abort()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,248 @@
+"""
+Language-aware code profile synthesized from a repository tree.
+
+The static 'code' content type only matches Python under src/ and lib/, so
+for most repositories it extracts next to nothing. The 'auto-code' type
+instead looks at the file list first and builds filters for it:
+
+1. Source files (languages.SOURCE_LANGUAGES) outside test, example,
+   benchmark, documentation and vendored directories, and not named like
+   tests or generated code, are the core source.
+2. The dominant languages are those with at least DOMINANT_SHARE of the core
+   files (at most MAX_LANGUAGES). Shell scripts only count when nothing else
+   does.
+3. The source roots are the top-level directories (and the root itself)
+   holding ROOT_COVERAGE of the dominant languages' core files, largest
+   first, so stray tooling directories are left out.
+4. Include globs are "root/**/*.ext" for every root and extension seen
+   ("/*.ext" for files in the root), or "*.ext" for a flat layout with more
+   than MAX_ROOTS roots. Exclude globs cover only the non-core directory
+   names, test file names and generated-code names that the include globs
+   reach, which keeps the gitingest command short.
+
+The synthesized filters are compiled with globmatch (see profiles.py), and
+the files they select are counted before anything is extracted.
+
+Example:
+    >>> profile = analyze_paths(["cmd/app/main.go", "cmd/app/main_test.go", "internal/db/db.go",
+    ...                          "internal/db/testdata/gen.go", "scripts/release.sh", "README.md"])
+    >>> profile.include, profile.exclude
+    (['cmd/**/*.go', 'internal/**/*.go'], ['testdata/', '*_test.go'])
+"""
+
+from collections import Counter
+from fnmatch import fnmatchcase
+from pathlib import PurePosixPath
+from typing import Iterable, NamedTuple
+from exceptions import ValidationError
+from languages import SOURCE_LANGUAGES, detect_language
+from prefilter import GENERATED_GLOBS, MINIFIED_GLOBS, VENDOR_DIRS
+from profiles import Profile, build_profile
+
+
+# Content type extracted with a synthesized code profile
+AUTO_CODE_TYPE = 'auto-code'
+
+# Minimum share of the core source files for a language to be included
+DOMINANT_SHARE = 0.1
+
+# Maximum number of languages included
+MAX_LANGUAGES = 3
+
+# Share of the dominant languages' core files the chosen roots must cover
+ROOT_COVERAGE = 0.95
+
+# Above this many roots, include globs match the extensions anywhere
+MAX_ROOTS = 8
+
+# Languages only included when a repository has no other source
+AUXILIARY_LANGUAGES = frozenset({'Shell', 'PowerShell'})
+
+# Directory names (lowercase) whose source isn't core: tests, examples,
+# benchmarks, docs, fixtures and vendored code
+NON_CORE_DIRS = frozenset({
+    'test', 'tests', '__tests__', 'testing', 'testdata', 'test-data', 'test_data',
+    'spec', 'specs', 'e2e', 'integration', 'fixtures', '__fixtures__', '__mocks__', 'mocks',
+    'example', 'examples', 'sample', 'samples', 'demo', 'demos',
+    'bench', 'benches', 'benchmark', 'benchmarks', 'docs', 'doc',
+}) | {name.lower() for name in VENDOR_DIRS}
+
+# Test file name globs by language
+TEST_FILE_GLOBS = {
+    'Python': ('test_*.py', '*_test.py', 'conftest.py'),
+    'JavaScript': ('*.test.*', '*.spec.*'),
+    'TypeScript': ('*.test.*', '*.spec.*'),
+    'Vue': ('*.test.*', '*.spec.*'),
+    'Svelte': ('*.test.*', '*.spec.*'),
+    'Go': ('*_test.go',),
+    'Java': ('*Test.java', '*Tests.java', '*IT.java'),
+    'Kotlin': ('*Test.kt', '*Tests.kt'),
+    'Scala': ('*Test.scala', '*Spec.scala', '*Suite.scala'),
+    'Ruby': ('*_spec.rb', '*_test.rb'),
+    'PHP': ('*Test.php',),
+    'C#': ('*Tests.cs', '*Test.cs'),
+    'C': ('test_*.c', '*_test.c'),
+    'C++': ('*_test.cc', '*_test.cpp', '*_unittest.cc'),
+    'Swift': ('*Tests.swift',),
+    'Dart': ('*_test.dart',),
+    'Elixir': ('*_test.exs',),
+    'Rust': (),
+}
+
+# Generated and minified file name globs (see prefilter.py)
+GENERATED_FILE_GLOBS = GENERATED_GLOBS + MINIFIED_GLOBS
+
+
+class CodeProfile(NamedTuple):
+    """
+    Code filters synthesized from a repository's file list.
+
+    Attributes:
+        languages: Core source files per dominant language, most first
+        roots: Source roots ('' for the repository root), most files first
+        include: Include globs
+        exclude: Exclude globs
+        files: Number of files of the list the filters select
+        profile: The filters as a content type profile (compiled filter)
+    """
+    languages: dict[str, int]
+    roots: list[str]
+    include: list[str]
+    exclude: list[str]
+    files: int
+    profile: Profile
+
+    def summary(self) -> dict:
+        """Return the profile as a JSON-serializable dict (without the compiled filter)."""
+        return {
+            'languages': self.languages,
+            'roots': self.roots,
+            'include': self.include,
+            'exclude': self.exclude,
+            'files': self.files,
+        }
+
+
+def _non_core_dir(parts: tuple[str, ...]) -> str | None:
+    """Return the first directory of a path that marks non-core code, if any."""
+    for part in parts[:-1]:
+        if part.lower() in NON_CORE_DIRS:
+            return part
+    return None
+
+
+def _root(parts: tuple[str, ...]) -> str:
+    """Return the top-level directory of a path ('' for files in the root)."""
+    return parts[0] if len(parts) > 1 else ''
+
+
+def _matching_glob(name: str, globs: Iterable[str]) -> str | None:
+    for glob in globs:
+        if fnmatchcase(name, glob):
+            return glob
+    return None
+
+
+def analyze_paths(paths: Iterable[str]) -> CodeProfile:
+    """
+    Synthesize code filters for a repository from its file paths.
+
+    Args:
+        paths: Repository-relative file paths (e.g. the files of a digest's tree)
+
+    Returns:
+        CodeProfile with the dominant languages, source roots and globs
+
+    Raises:
+        ValidationError: If the paths contain no source code
+    """
+    paths = list(paths)
+    core: list[tuple[tuple[str, ...], str]] = []
+    for path in paths:
+        language = detect_language(path)
+        if language not in SOURCE_LANGUAGES:
+            continue
+        parts = PurePosixPath(path).parts
+        name = parts[-1]
+        # Files known by name alone (Gemfile, ...) have no extension to glob for
+        if not PurePosixPath(name).suffix:
+            continue
+        if (_non_core_dir(parts) or _matching_glob(name, TEST_FILE_GLOBS.get(language, ()))
+                or _matching_glob(name, GENERATED_FILE_GLOBS)):
+            continue
+        core.append((parts, language))
+
+    counts = Counter(language for _, language in core)
+    primary = Counter({lang: n for lang, n in counts.items() if lang not in AUXILIARY_LANGUAGES})
+    counts = primary or counts
+    if not counts:
+        raise ValidationError("No source code found in the repository tree")
+    total = sum(counts.values())
+    ranked = counts.most_common()
+    languages = dict(
+        [ranked[0]] + [(lang, n) for lang, n in ranked[1:MAX_LANGUAGES] if n / total >= DOMINANT_SHARE]
+    )
+
+    # Source roots: top-level directories (or the root) of the dominant languages' files
+    root_counts = Counter(_root(parts) for parts, language in core if language in languages)
+    needed = ROOT_COVERAGE * sum(root_counts.values())
+    roots, covered = [], 0
+    for root, n in root_counts.most_common():
+        if covered >= needed:
+            break
+        roots.append(root)
+        covered += n
+
+    extensions: dict[str, set[str]] = {root: set() for root in roots}
+    for parts, language in core:
+        root = _root(parts)
+        if language in languages and root in extensions:
+            extensions[root].add(PurePosixPath(parts[-1]).suffix)
+    if len(roots) > MAX_ROOTS:
+        # A flat layout: match the extensions anywhere instead of per root
+        every = set().union(*extensions.values())
+        include = [f"*{ext}" for ext in sorted(every)]
+
+        def in_scope(parts: tuple[str, ...]) -> bool:
+            return PurePosixPath(parts[-1]).suffix in every
+    else:
+        include = [
+            (f"{root}/**/*{ext}" if root else f"/*{ext}")
+            for root in sorted(roots) for ext in sorted(extensions[root])
+        ]
+
+        def in_scope(parts: tuple[str, ...]) -> bool:
+            root = _root(parts)
+            return root in extensions and PurePosixPath(parts[-1]).suffix in extensions[root]
+
+    # Excludes for what the includes reach: non-core directories, then test
+    # and generated file names of the dominant languages
+    dirs: dict[str, None] = {}
+    names: dict[str, None] = {}
+    test_globs = [glob for lang in languages for glob in TEST_FILE_GLOBS.get(lang, ())]
+    for path in paths:
+        parts = PurePosixPath(path).parts
+        if not in_scope(parts):
+            continue
+        directory = _non_core_dir(parts)
+        if directory is not None:
+            dirs.setdefault(directory)
+            continue
+        glob = _matching_glob(parts[-1], test_globs) or _matching_glob(parts[-1], GENERATED_FILE_GLOBS)
+        if glob is not None:
+            names.setdefault(glob)
+    exclude = [f"{directory}/" for directory in sorted(dirs)] + list(names)
+
+    profile = build_profile(AUTO_CODE_TYPE, {
+        'description': "Core source of " + ", ".join(languages),
+        'include': include,
+        'exclude': exclude,
+    })
+    return CodeProfile(
+        languages=languages,
+        roots=sorted(roots, key=lambda root: -root_counts[root]),
+        include=include,
+        exclude=exclude,
+        files=len(profile.path_filter.filter(paths)),
+        profile=profile,
+    )
@@ -0,0 +1,411 @@
+"""
+Digest file parsing.
+
+GitIngest digests consist of a directory tree followed by one section per file:
+
+    ================================================
+    FILE: path/to/file.py
+    ================================================
+    <file content>
+
+This module locates those FILE sections by streaming over the digest in binary
+mode, so byte offsets are exact and arbitrarily large digests never have to be
+loaded into memory at once.
+"""
+
+import re
+from pathlib import Path
+from typing import BinaryIO, Iterator, NamedTuple, Optional
+
+
+# Separator written by GitIngest around FILE headers
+SEPARATOR = "=" * 48
+
+# Separator lines are runs of '=' (GitIngest writes 48, older fixtures use 80)
+SEPARATOR_RE = re.compile(rb'^={16,}\r?\n?$')
+
+# Section header line, e.g. "FILE: src/main.py"
+FILE_HEADER_RE = re.compile(rb'^FILE:\s*(.+?)\s*$')
+
+# Longest piece of a line yielded by iter_stream_pieces() (long lines come in pieces)
+PIECE_BYTES = 1024
+
+# File name of a full digest (extract-full); content files are [type]-content.txt
+DIGEST_FILENAME = "digest.txt"
+
+# Content files left out of searches: outlines keep only signatures, so their
+# line numbers aren't the original file's, and relevant content repeats files
+# picked from the other artifacts
+UNSEARCHED_CONTENT = ("outline-content.txt", "relevant-content.txt")
+
+# Tree entry line, e.g. "    │   ├── main.py" (4 characters per nesting level)
+TREE_ENTRY_RE = re.compile(r'^((?:[│ ]   )*)(?:├── |└── )(.+?)\s*$')
+
+
+class TreeEntry(NamedTuple):
+    """
+    One entry of a digest's directory tree.
+
+    Attributes:
+        path: Path relative to the repository root ('' for the root itself);
+            directories end with '/'
+        depth: Nesting level (0 for the repository root)
+        line: Original tree line
+    """
+    path: str
+    depth: int
+    line: str
+
+    @property
+    def is_dir(self) -> bool:
+        return self.path.endswith('/') or self.depth == 0
+
+
+class DigestSection(NamedTuple):
+    """
+    Location of one FILE section inside a digest.
+
+    Attributes:
+        path: Repository-relative file path from the FILE header
+        offset: Byte offset where the file content starts
+        length: Content length in bytes (up to the next section header)
+        line: 1-based digest line number of the first content line
+    """
+    path: str
+    offset: int
+    length: int
+    line: int
+
+
+def _is_separator(line: bytes) -> bool:
+    return bool(SEPARATOR_RE.match(line))
+
+
+def iter_sections(file_path: str | Path) -> Iterator[DigestSection]:
+    """
+    Stream the FILE sections of a digest.
+
+    Args:
+        file_path: Path to a GitIngest digest or content file
+
+    Yields:
+        DigestSection for each FILE section, in digest order
+
+    Raises:
+        FileNotFoundError: If the digest doesn't exist
+
+    Examples:
+        >>> for section in iter_sections("data/fastapi/digest.txt"):
+        ...     print(section.path, section.length)
+        README.md 5120
+    """
+    with open(file_path, 'rb') as f:
+        yield from _scan_sections(f)
+
+
+def _scan_sections(f: BinaryIO) -> Iterator[DigestSection]:
+    """Scan an open binary stream for FILE sections."""
+    pushback: list[tuple[int, bytes]] = []
+    offset = 0
+    lineno = 0
+    current = None  # (path, content_offset, content_line)
+
+    def next_line() -> tuple[int, bytes]:
+        nonlocal offset
+        if pushback:
+            return pushback.pop()
+        start = offset
+        line = f.readline()
+        offset += len(line)
+        return start, line
+
+    while True:
+        start, line = next_line()
+        if not line:
+            break
+        lineno += 1
+
+        if not _is_separator(line):
+            continue
+
+        # Candidate header: separator, "FILE: ...", separator
+        header_start, header = next_line()
+        match = FILE_HEADER_RE.match(header) if header else None
+        if not match:
+            if header:
+                pushback.append((header_start, header))
+            continue
+        closing_start, closing = next_line()
+        if not closing or not _is_separator(closing):
+            if closing:
+                pushback.append((closing_start, closing))
+            pushback.append((header_start, header))
+            continue
+
+        if current is not None:
+            yield DigestSection(current[0], current[1], start - current[1], current[2])
+
+        lineno += 2
+        path = match.group(1).decode('utf-8', errors='replace')
+        current = (path, closing_start + len(closing), lineno + 1)
+
+    if current is not None:
+        yield DigestSection(current[0], current[1], offset - current[1], current[2])
+
+
+class _RecordingReader:
+    """Line reader over a stream that keeps the bytes read since a given offset."""
+
+    def __init__(self, stream: BinaryIO):
+        self.stream = stream
+        self.buffer = bytearray()
+        self.base = 0  # stream offset of buffer[0]
+
+    def readline(self) -> bytes:
+        line = self.stream.readline()
+        self.buffer += line
+        return line
+
+    def take(self, end: int) -> bytes:
+        """Return and drop the buffered bytes up to stream offset end."""
+        data = bytes(self.buffer[:end - self.base])
+        del self.buffer[:end - self.base]
+        self.base = end
+        return data
+
+
+def iter_stream_sections(stream: BinaryIO) -> Iterator[tuple[Optional[str], bytes, bytes]]:
+    """
+    Split a digest arriving on a binary stream into its parts as they complete.
+
+    Unlike iter_sections(), the stream is read only once and never seeked, so
+    this works on a pipe from a running GitIngest process. Each FILE section
+    is yielded as soon as the next header (or the end of the stream) shows it
+    is complete; only the current section is held in memory.
+
+    Args:
+        stream: Binary stream positioned at the start of a digest
+
+    Yields:
+        (None, b'', preamble) first, the preamble being everything before the
+        first FILE header (the directory tree), then (path, header, content)
+        for each section with its raw header lines and content bytes. Joining
+        all header and content bytes reproduces the stream.
+
+    Examples:
+        >>> with open("data/fastapi/digest.txt", 'rb') as f:
+        ...     for path, header, content in iter_stream_sections(f):
+        ...         print(path, len(content))
+        None 4812
+        README.md 5120
+    """
+    reader = _RecordingReader(stream)
+    preamble_sent = False
+    for section in _scan_sections(reader):
+        raw_header = reader.take(section.offset)
+        if not preamble_sent:
+            # The first header's three lines end the preamble
+            start = len(raw_header)
+            for _ in range(3):
+                start = raw_header.rfind(b'\n', 0, start - 1) + 1
+            yield None, b'', raw_header[:start]
+            raw_header = raw_header[start:]
+            preamble_sent = True
+        yield section.path, raw_header, reader.take(section.offset + section.length)
+    if not preamble_sent:
+        yield None, b'', reader.take(reader.base + len(reader.buffer))
+
+
+def _read_piece(stream: BinaryIO, limit: int) -> bytes:
+    """Read up to a line break or limit bytes, without splitting a UTF-8 character."""
+    piece = stream.readline(limit)
+    if piece.endswith(b'\n'):
+        return piece
+    # Complete a multi-byte character cut at the piece boundary
+    for back in range(1, min(4, len(piece)) + 1):
+        byte = piece[-back]
+        if byte & 0xc0 == 0xc0:
+            needed = 2 if byte < 0xe0 else 3 if byte < 0xf0 else 4
+            if needed > back:
+                piece += stream.read(needed - back)
+            break
+        if byte < 0x80:
+            break
+    return piece
+
+
+def iter_stream_pieces(
+    stream: BinaryIO,
+    piece_bytes: int = PIECE_BYTES
+) -> Iterator[tuple[Optional[str], bytes, bool]]:
+    """
+    Split a digest arriving on a binary stream into bounded pieces.
+
+    Like iter_stream_sections(), but memory use is bounded by piece_bytes
+    rather than by the largest file, for stages that filter or truncate
+    content as it streams (see file_caps.py and prefilter.py).
+
+    Args:
+        stream: Binary stream positioned at the start of a digest
+        piece_bytes: Longest piece of a line to yield
+
+    Yields:
+        (path, piece, is_header) tuples. The preamble comes first with path
+        None; each section then yields its three header lines as one piece
+        with is_header True, followed by its content one line (or part of a
+        long line, never splitting a character) at a time. Joining all pieces
+        reproduces the stream.
+    """
+    pushback: list[bytes] = []
+    path = None
+    at_line_start = True
+
+    def next_piece() -> bytes:
+        return pushback.pop() if pushback else _read_piece(stream, piece_bytes)
+
+    while True:
+        piece = next_piece()
+        if not piece:
+            break
+        starts_line, at_line_start = at_line_start, piece.endswith(b'\n')
+
+        # Candidate header: separator, "FILE: ...", separator (whole lines)
+        if starts_line and _is_separator(piece):
+            header = next_piece()
+            match = FILE_HEADER_RE.match(header) if header.endswith(b'\n') else None
+            if match:
+                closing = next_piece()
+                if _is_separator(closing):
+                    path = match.group(1).decode('utf-8', errors='replace')
+                    at_line_start = closing.endswith(b'\n')
+                    yield path, piece + header + closing, True
+                    continue
+                pushback.extend([closing, header])
+            elif header:
+                pushback.append(header)
+
+        yield path, piece, False
+
+
+def read_section(file_path: str | Path | BinaryIO, section: DigestSection) -> str:
+    """
+    Read the content of one section.
+
+    Trailing blank lines that GitIngest places between sections are removed.
+
+    Args:
+        file_path: Path to the digest the section belongs to, or the digest
+            opened in binary mode to read many sections through one handle
+        section: Section located by iter_sections()
+
+    Returns:
+        Decoded file content
+    """
+    if isinstance(file_path, (str, Path)):
+        with open(file_path, 'rb') as f:
+            return read_section(f, section)
+    file_path.seek(section.offset)
+    data = file_path.read(section.length)
+    return data.decode('utf-8', errors='replace').rstrip('\r\n')
+
+
+def format_section(path: str, content: str) -> str:
+    """
+    Format one FILE section in GitIngest's digest layout.
+
+    Args:
+        path: Repository-relative file path
+        content: File content
+
+    Returns:
+        Section text, including the trailing blank line GitIngest emits
+
+    Examples:
+        >>> format_section("README.md", "# Hello")
+        '================================================\\nFILE: README.md\\n...'
+    """
+    return f"{SEPARATOR}\nFILE: {path}\n{SEPARATOR}\n{content}\n\n"
+
+
+def is_searchable(file_path: str | Path) -> bool:
+    """
+    Check whether a digest or content file is one that searches should scan.
+
+    A full digest holds every file of the content files extracted next to it,
+    so those are scanned only in directories without one; scanning both would
+    report each match once per artifact. Outline and relevant content are
+    never scanned (see UNSEARCHED_CONTENT).
+
+    Args:
+        file_path: Path to a digest or content file
+
+    Returns:
+        True if the file should be searched
+
+    Examples:
+        >>> is_searchable("data/fastapi/digest.txt")
+        True
+        >>> is_searchable("data/fastapi/outline-content.txt")
+        False
+    """
+    path = Path(file_path)
+    # Flat stores may also hold {owner}-{repo}-digest.txt files
+    if path.name == DIGEST_FILENAME or path.name.endswith(f"-{DIGEST_FILENAME}"):
+        return True
+    if path.name.endswith(UNSEARCHED_CONTENT) or not path.name.endswith("-content.txt"):
+        return False
+    return not (path.parent / DIGEST_FILENAME).exists()
+
+
+def read_tree(file_path: str | Path) -> str:
+    """
+    Read the directory tree that precedes the first FILE section.
+
+    Args:
+        file_path: Path to a GitIngest digest or tree file
+
+    Returns:
+        Tree text (empty if the digest starts directly with a section)
+    """
+    lines = []
+    with open(file_path, 'rb') as f:
+        for line in f:
+            if _is_separator(line):
+                break
+            lines.append(line.decode('utf-8', errors='replace'))
+    return ''.join(lines).rstrip('\r\n')
+
+
+def parse_tree(tree: str) -> list[TreeEntry]:
+    """
+    Parse a GitIngest directory tree into entries.
+
+    Args:
+        tree: Tree text as returned by read_tree()
+
+    Returns:
+        TreeEntry for each tree line, in tree order. The first entry is the
+        repository root directory (depth 0, path '').
+
+    Examples:
+        >>> [e.path for e in parse_tree("└── repo/\\n    ├── src/\\n    │   └── a.py")]
+        ['', 'src/', 'src/a.py']
+    """
+    entries: list[TreeEntry] = []
+    stack: list[str] = []  # directory names by depth (excluding the root)
+    for line in tree.splitlines():
+        match = TREE_ENTRY_RE.match(line)
+        if not match:
+            continue
+        depth = len(match.group(1)) // 4
+        name = match.group(2)
+        if depth == 0:
+            stack = []
+            entries.append(TreeEntry('', 0, line))
+            continue
+        del stack[depth - 1:]
+        path = ''.join(stack) + name
+        if name.endswith('/'):
+            stack.append(name)
+        entries.append(TreeEntry(path, depth, line))
+    return entries
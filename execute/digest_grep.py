@@ -0,0 +1,274 @@
+"""
+Parallel regular-expression search across stored digests.
+
+Unlike an external grep over digest files, matches are attributed to the file
+they belong to: results are reported as repo:file:line, where line is the
+line number inside the original file rather than inside the digest.
+
+Digests are split into chunks of whole FILE sections (using the persisted
+offset index from reader.py) and scanned by a process pool. Each worker
+compiles the pattern once and memory-maps the digests it scans; results are
+yielded as soon as a chunk finishes, so output streams while large stores are
+still being searched.
+"""
+
+import mmap
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple, Optional
+from digest import DIGEST_FILENAME, DigestSection, is_searchable
+from exceptions import ValidationError
+from reader import DigestReader
+from storage_manager import VERSIONS_DIRNAME
+
+
+# Upper bound on the bytes of digest content handed to a worker at a time
+MAX_CHUNK_BYTES = 8 * 1024 * 1024
+
+# Lower bound, so tiny stores aren't split into per-section tasks
+MIN_CHUNK_BYTES = 256 * 1024
+
+# Digest file names produced by the extract commands
+DIGEST_GLOBS = (DIGEST_FILENAME, '*-content.txt')
+
+
+class GrepMatch(NamedTuple):
+    """
+    One matching line.
+
+    Attributes:
+        repo: Repository label (owner/repo, or the storage directory name)
+        path: Repository-relative file path from the FILE header
+        line: 1-based line number within the file
+        text: Matching line (without the line break)
+    """
+    repo: str
+    path: str
+    line: int
+    text: str
+
+
+class GrepTask(NamedTuple):
+    """A chunk of FILE sections of one digest, scanned by one worker."""
+    digest: str
+    repo: str
+    sections: tuple[DigestSection, ...]
+
+
+def compile_pattern(pattern: str, ignore_case: bool = False, fixed_strings: bool = False) -> re.Pattern:
+    """
+    Compile a search pattern for scanning digest bytes.
+
+    Patterns are compiled as bytes patterns in MULTILINE mode, so '^' and '$'
+    anchor to lines. Case-insensitive matching folds ASCII letters only.
+
+    Args:
+        pattern: Regular expression (or literal text with fixed_strings)
+        ignore_case: Match case-insensitively
+        fixed_strings: Treat the pattern as literal text
+
+    Returns:
+        Compiled bytes pattern
+
+    Raises:
+        ValidationError: If the pattern is empty or not a valid regex
+    """
+    if not pattern:
+        raise ValidationError("Search pattern must not be empty")
+    source = re.escape(pattern) if fixed_strings else pattern
+    flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+    try:
+        return re.compile(source.encode('utf-8'), flags)
+    except re.error as e:
+        raise ValidationError(f"Invalid pattern {pattern!r}: {e}")
+
+
+def find_digests(root: Path, repos: Optional[dict[str, str]] = None) -> list[tuple[Path, str]]:
+    """
+    Find the digest and content files to search under a storage root.
+
+    Each match is reported once: archived versions (versions/<commit>/, see
+    StorageManager.version_path) are left out, and so are content files next
+    to a full digest, which already holds their files. Outline and relevant
+    content are never searched (see digest.is_searchable).
+
+    Args:
+        root: Storage root to scan
+        repos: Optional mapping of resolved file path to repository label
+            (e.g. from the artifact store); the containing directory name is
+            used for files not in the mapping
+
+    Returns:
+        Sorted list of (digest path, repo label)
+    """
+    repos = repos or {}
+    root = Path(root)
+    found = set()
+    for glob in DIGEST_GLOBS:
+        found.update(path.resolve() for path in root.rglob(glob)
+                     if path.is_file() and VERSIONS_DIRNAME not in path.relative_to(root).parts[:-2]
+                     and is_searchable(path))
+    return [(path, repos.get(str(path), path.parent.name)) for path in sorted(found)]
+
+
+def plan_tasks(
+    digests: Iterable[tuple[Path, str]],
+    workers: int,
+    path_glob: Optional[str] = None
+) -> list[GrepTask]:
+    """
+    Split digests into section chunks sized to keep every worker busy.
+
+    A file found in several content files of one directory is scanned in
+    the first only, so its matches aren't reported twice.
+
+    Args:
+        digests: (digest path, repo label) pairs
+        workers: Number of worker processes
+        path_glob: Only scan files whose path matches this glob
+
+    Returns:
+        Tasks, largest first
+    """
+    indexed = []
+    planned = set()
+    for digest_path, repo in digests:
+        directory = Path(digest_path).parent
+        with DigestReader(digest_path) as reader:
+            sections = [s for s in reader.sections()
+                        if (not path_glob or fnmatchcase(s.path, path_glob)) and (directory, s.path) not in planned]
+        planned.update((directory, s.path) for s in sections)
+        indexed.append((str(digest_path), repo, sections))
+
+    total = sum(s.length for _, _, sections in indexed for s in sections)
+    # Aim for several chunks per worker so fast workers pick up the slack
+    chunk_bytes = min(MAX_CHUNK_BYTES, max(MIN_CHUNK_BYTES, total // (workers * 4) or 1))
+
+    tasks = []
+    for digest_path, repo, sections in indexed:
+        chunk, size = [], 0
+        for section in sections:
+            chunk.append(section)
+            size += section.length
+            if size >= chunk_bytes:
+                tasks.append(GrepTask(digest_path, repo, tuple(chunk)))
+                chunk, size = [], 0
+        if chunk:
+            tasks.append(GrepTask(digest_path, repo, tuple(chunk)))
+    tasks.sort(key=lambda task: -sum(s.length for s in task.sections))
+    return tasks
+
+
+# Worker state, set once per process by _init_worker()
+_pattern: Optional[re.Pattern] = None
+_maps: dict[str, mmap.mmap] = {}
+
+
+def _init_worker(pattern: re.Pattern) -> None:
+    global _pattern
+    _pattern = pattern
+    _close_maps()
+
+
+def _close_maps() -> None:
+    for mapped in _maps.values():
+        mapped.close()
+    _maps.clear()
+
+
+def _mapped(digest_path: str) -> mmap.mmap:
+    if digest_path not in _maps:
+        with open(digest_path, 'rb') as f:
+            _maps[digest_path] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return _maps[digest_path]
+
+
+def scan_sections(data, pattern: re.Pattern, repo: str, sections: Iterable[DigestSection]) -> list[GrepMatch]:
+    """
+    Scan FILE sections of a digest buffer for matching lines.
+
+    Args:
+        data: Digest bytes (bytes or a memory map)
+        pattern: Compiled bytes pattern
+        repo: Repository label for the results
+        sections: Sections to scan
+
+    Returns:
+        One GrepMatch per matching line, in digest order
+    """
+    matches = []
+    for section in sections:
+        end = section.offset + section.length
+        # Trailing blank lines between sections belong to the separator
+        while end > section.offset and data[end - 1] in b'\r\n':
+            end -= 1
+        counted_to, line = section.offset, 1
+        pos = section.offset
+        while pos <= end:
+            match = pattern.search(data, pos, end)
+            if match is None:
+                break
+            line_start = max(data.rfind(b'\n', section.offset, match.start()) + 1, section.offset)
+            line_end = data.find(b'\n', match.start(), end)
+            if line_end < 0:
+                line_end = end
+            line += data[counted_to:line_start].count(b'\n')
+            counted_to = line_start
+            text = data[line_start:line_end].decode('utf-8', errors='replace').rstrip('\r')
+            matches.append(GrepMatch(repo, section.path, line, text))
+            pos = line_end + 1
+    return matches
+
+
+def _scan_task(task: GrepTask) -> list[GrepMatch]:
+    """Worker entry point: scan one chunk with the process-wide pattern."""
+    return scan_sections(_mapped(task.digest), _pattern, task.repo, task.sections)
+
+
+def grep_digests(
+    digests: Iterable[tuple[Path, str]],
+    pattern: re.Pattern,
+    path_glob: Optional[str] = None,
+    workers: Optional[int] = None
+) -> Iterator[GrepMatch]:
+    """
+    Search digests in parallel, yielding matches as chunks complete.
+
+    Matches within a chunk are in digest order; chunks complete in any order.
+
+    Args:
+        digests: (digest path, repo label) pairs, e.g. from find_digests()
+        pattern: Pattern from compile_pattern()
+        path_glob: Only scan files whose path matches this glob
+        workers: Worker processes (default: CPU count; 1 scans in-process)
+
+    Yields:
+        GrepMatch for every matching line
+    """
+    workers = workers or os.cpu_count() or 1
+    tasks = plan_tasks(digests, workers, path_glob)
+    if not tasks:
+        return
+
+    if workers == 1 or len(tasks) == 1:
+        _init_worker(pattern)
+        try:
+            for task in tasks:
+                yield from _scan_task(task)
+        finally:
+            _close_maps()
+        return
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks)),
+                             initializer=_init_worker, initargs=(pattern,)) as pool:
+        futures = [pool.submit(_scan_task, task) for task in tasks]
+        try:
+            for future in as_completed(futures):
+                yield from future.result()
+        finally:
+            # Stop queued chunks when the caller stops early (e.g. --max-count)
+            for future in futures:
+                future.cancel()
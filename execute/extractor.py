@@ -3,14 +3,41 @@ GitIngest CLI wrapper functions.
 
 This module wraps GitIngest CLI with subprocess calls, handling full and selective
 repository extraction with comprehensive error handling and timeout protection.
+Given a local git mirror (see git_mirror.py), the same digests are built from
+git's object database instead, without a clone or checkout (see git_ingest.py).
 """
 
+import hashlib
+import json
+import os
 import re
+import shutil
 import subprocess
-from pathlib import Path
-from exceptions import GitIngestError, StorageError
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path, PurePosixPath
+from typing import BinaryIO, Callable, Iterator, Optional
+from exceptions import GitIngestError, StorageError, ValidationError
 from storage import ensure_data_directory
-from workflow import get_filters_for_type
+from storage_manager import StorageManager
+from workflow import get_filters_for_type, ingest_url, parse_repo_spec, repository_url
+from profiles import load_profiles
+from code_profile import AUTO_CODE_TYPE, analyze_paths
+from git_mirror import GitMirror, clone_strategy, remote_commit
+from git_ingest import MAX_FILE_SIZE, ingest_filter, iter_digest, open_digest, select_files
+from globmatch import PathFilter
+from manifests import format_summary, manifest_parser, summarize_manifests
+from artifact_store import ArtifactStore
+from search_index import SearchIndex
+from digest import format_section, iter_stream_pieces, iter_stream_sections, parse_tree, read_tree
+from file_caps import FileCaps, Truncation, cap_digest, cap_pieces, cap_section
+from prefilter import Prefilter
+from reader import DigestReader
+from token_backends import TokenizerBackend, get_backend
+import layers
+import outline
+import relevance
 
 
 def _check_encoding_errors(file_path: Path) -> list[str]:
@@ -70,6 +97,222 @@ def _check_encoding_errors(file_path: Path) -> list[str]:
     return encoding_errors
 
 
+def _storage_root(data_dir: Path, output_dir: Path = None) -> Path:
+    """
+    Determine the artifact store root for an extraction directory.
+
+    With a custom Phase 1.5 output directory, artifacts are written directly
+    into that directory, which is then the root. Otherwise every repository
+    gets its own subdirectory under the root: <shard>/<owner>/<repo>/ in a
+    sharded store (see StorageManager.shard_dir).
+    """
+    data_dir = Path(data_dir)
+    if output_dir is not None and data_dir.resolve() == Path(output_dir).resolve():
+        return data_dir
+    return StorageManager.sharded_root(data_dir) or data_dir.parent
+
+
+def _repo_label(url: str) -> str:
+    """Return the owner/repo label used for index facets (whatever ref or subpath the URL pins)."""
+    try:
+        spec = parse_repo_spec(url)
+        return f"{spec.owner}/{spec.repo}"
+    except ValidationError:
+        pass
+    parts = url.rstrip('/').split('/')
+    repo = parts[-1][:-4] if parts[-1].endswith('.git') else parts[-1]
+    return f"{parts[-2]}/{repo}" if len(parts) >= 2 else repo
+
+
+def _record_artifact(
+    output_file: Path,
+    kind: str,
+    url: str,
+    data_dir: Path,
+    output_dir: Path = None,
+    commit: Optional[str] = None,
+    settings: str = ''
+) -> None:
+    """
+    Register a freshly written artifact and enforce the store quota.
+
+    Least-recently-used digests, trees and content files are evicted when the
+    new artifact pushes the store over its quota. The new artifact itself and
+    pinned analyses are never evicted. Digests and content files are also
+    (re-)indexed for full-text search, and evicted artifacts are dropped from
+    the search index.
+
+    With the commit the artifact was extracted from, the artifact is also
+    archived as that commit's version (a hard link in versions/<commit>/,
+    see StorageManager.version_path) and cataloged as the latest. Without
+    one, the artifact no longer holds a known version.
+
+    Args:
+        output_file: Artifact that was just written
+        kind: Artifact kind (digest, tree, content, layer)
+        url: Repository URL the artifact was extracted from
+        data_dir: Extraction directory the artifact lives in
+        output_dir: Optional custom output directory
+        commit: Commit id the artifact was extracted from, if known
+        settings: Key of the extraction settings (see _settings_key)
+    """
+    if not output_file.exists():
+        return
+
+    root = _storage_root(data_dir, output_dir)
+    repo = _repo_label(url)
+    protect = [output_file]
+    with ArtifactStore(root) as store:
+        store.record(output_file, kind, repo=repo)
+        if commit is not None:
+            version = StorageManager.version_path(output_file, commit)
+            _link(output_file, version)
+            store.record_version(output_file, version, commit, settings, repo=repo)
+            protect.append(version)
+        else:
+            store.clear_latest(output_file)
+        evicted = store.enforce_quota(protect=protect)
+
+    with SearchIndex.for_root(root) as index:
+        for entry in evicted:
+            index.remove_digest(entry['path'])
+        if kind in ('digest', 'content'):
+            index.index_digest(output_file, repo)
+
+
+def _link(source: Path, target: Path) -> None:
+    """Replace target with a hard link to source (a copy where links aren't supported)."""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    temp = target.with_name(target.name + ".tmp")
+    temp.unlink(missing_ok=True)
+    try:
+        os.link(source, temp)
+    except OSError:
+        shutil.copyfile(source, temp)
+    os.replace(temp, target)
+
+
+def _detach(output_file: Path) -> None:
+    """
+    Unlink an artifact about to be rewritten if it is also an archived version.
+
+    Writing through the hard link (see _record_artifact) would change the
+    archived version too.
+    """
+    try:
+        if output_file.stat().st_nlink > 1:
+            output_file.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def _settings_key(**settings) -> str:
+    """
+    Return a short key of the settings an extraction was made with.
+
+    Two extractions of one commit hold the same content only if their keys
+    match (the same ref, subpath, filters, caps, budget, tokenizer and prefilter).
+
+    Examples:
+        >>> _settings_key(include=['*.md'], budget=None) == _settings_key(budget=None, include=['*.md'])
+        True
+    """
+    normalized = {
+        name: [value.default, value.rules] if isinstance(value, FileCaps)
+        else [list(value.rules), value.backend.spec] if isinstance(value, Prefilter)
+        else value.spec if isinstance(value, TokenizerBackend)
+        else value
+        for name, value in settings.items()
+    }
+    return hashlib.sha256(json.dumps(normalized, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def _cached_version(output_file: Path, commit: str, settings: str, data_dir: Path, output_dir: Path = None) -> bool:
+    """
+    Return whether an artifact already holds the extraction of a commit with the same settings.
+
+    Such a re-extraction is a no-op: the artifact is only marked as accessed.
+    """
+    if not output_file.exists():
+        return False
+    with ArtifactStore(_storage_root(data_dir, output_dir)) as store:
+        latest = store.latest_version(output_file)
+        if latest is None or latest['commit'] != commit or latest['settings'] != settings:
+            return False
+        store.touch(output_file)
+    return True
+
+
+def _current_version(
+    url: str,
+    output_file: Path,
+    settings: str,
+    data_dir: Path,
+    output_dir: Path = None,
+    mirror: Optional[GitMirror] = None,
+    strategy: str = 'full',
+    skip_unchanged: bool = False
+) -> tuple[Optional[str], bool]:
+    """
+    Resolve the commit an extraction reads, and whether the artifact already holds it.
+
+    With skip_unchanged, the ref is first resolved on the remote (`git
+    ls-remote` against the mirror's origin, or the repository URL): when the
+    artifact already holds that commit with the same settings, nothing is
+    cloned or fetched. A mirror is then created or refreshed and pins the
+    ref, fetching again if it is behind the commit just resolved. Without a
+    mirror, the resolved commit is the one gitingest is about to clone.
+
+    Args:
+        url: Repository URL (with its ref, see _ref_and_subpath)
+        output_file: Artifact the extraction writes
+        settings: Key of the extraction settings (see _settings_key)
+        data_dir: Extraction directory the artifact lives in
+        output_dir: Optional custom output directory
+        mirror: Optional local mirror of the repository
+        strategy: Clone strategy if the mirror has to be created
+        skip_unchanged: Resolve the commit on the remote first
+
+    Returns:
+        Tuple of (commit, cached): the commit id (None if unknown) and
+        whether output_file already holds it
+    """
+    ref = _ref_and_subpath(url)[0]
+    remote = None
+    if skip_unchanged:
+        try:
+            remote = remote_commit(mirror.url if mirror is not None else repository_url(url), ref)
+        except (GitIngestError, TimeoutError):
+            # The extraction itself reports an unreachable remote or missing ref
+            pass
+        if remote is not None and _cached_version(output_file, remote, settings, data_dir, output_dir):
+            return remote, True
+    if mirror is None:
+        return remote, False
+    mirror.ensure(strategy)
+    commit = mirror.pin(ref)
+    if remote is not None and commit != remote:
+        mirror.fetch()
+        commit = mirror.pin(ref)
+    # The remote's commit was checked against the catalog above
+    return commit, commit != remote and _cached_version(output_file, commit, settings, data_dir, output_dir)
+
+
+def _count_artifact_tokens(path: Path, backend: TokenizerBackend, data_dir: Path, output_dir: Path = None) -> int:
+    """
+    Count an artifact's tokens, reusing the count cached in the artifact index.
+
+    Counts are cached per tokenizer spec and invalidated when the file
+    changes, so e.g. an unchanged digest is tokenized once per tokenizer.
+    """
+    with ArtifactStore(_storage_root(data_dir, output_dir)) as store:
+        tokens = store.get_token_count(path, backend.spec)
+        if tokens is None:
+            tokens = backend.count_file(path)
+            store.record_token_count(path, backend.spec, tokens)
+    return tokens
+
+
 def _run_gitingest(args: list[str], timeout: int = 300) -> subprocess.CompletedProcess:
     """
     Execute gitingest with standard error handling.
@@ -102,29 +345,521 @@ def _run_gitingest(args: list[str], timeout: int = 300) -> subprocess.CompletedP
     except subprocess.TimeoutExpired:
         raise TimeoutError(f"GitIngest timed out after {timeout}s")
     except subprocess.CalledProcessError as e:
-        # Parse GitIngest error messages for user-friendly output
-        stderr = e.stderr.lower() if e.stderr else ""
-
-        if "not found" in stderr or "404" in stderr:
-            # Extract URL from args if present
-            url = args[0] if args else "repository"
-            raise GitIngestError(f"Repository not found: {url}")
-        elif "bad credentials" in stderr or "authentication" in stderr or "permission denied" in stderr:
-            raise GitIngestError("Authentication failed (private repository?)")
-        elif "could not resolve host" in stderr:
-            raise GitIngestError("Network error: Unable to reach GitHub")
-        else:
-            raise GitIngestError(f"GitIngest error: {e.stderr}")
+        raise _gitingest_error(e.stderr, args)
+
+
+def _gitingest_error(stderr: str, args: list[str]) -> GitIngestError:
+    """Translate GitIngest's stderr into a user-friendly GitIngestError."""
+    message = stderr.lower() if stderr else ""
+
+    if "not found" in message or "404" in message:
+        # Extract URL from args if present
+        url = args[0] if args else "repository"
+        return GitIngestError(f"Repository not found: {url}")
+    elif "bad credentials" in message or "authentication" in message or "permission denied" in message:
+        return GitIngestError("Authentication failed (private repository?)")
+    elif "could not resolve host" in message:
+        return GitIngestError("Network error: Unable to reach GitHub")
+    else:
+        return GitIngestError(f"GitIngest error: {stderr}")
+
+
+def skipped_manifest_path(output_file: Path) -> Path:
+    """Return the skipped-files manifest written next to a budget-capped extraction."""
+    return output_file.with_name(f"{output_file.stem}.skipped.json")
+
+
+def code_profile_path(output_file: Path) -> Path:
+    """Return the synthesized profile written next to an auto-code extraction."""
+    return output_file.with_name(f"{output_file.stem}.profile.json")
+
+
+def installation_summary_path(output_file: Path) -> Path:
+    """Return the manifest summary written next to an installation extraction read from a mirror."""
+    return output_file.with_name(f"{output_file.stem}.summary.json")
+
+
+@contextmanager
+def _gitingest_stream(args: list[str], timeout: int = 300) -> Iterator[tuple[BinaryIO, Callable[[], None]]]:
+    """
+    Run gitingest with the digest written to a pipe.
+
+    Yields the read end of the pipe and a stop() callable; a reader that ends
+    the ingest early calls stop(), which kills gitingest and ignores its exit
+    status. Otherwise gitingest's exit status is checked when the block ends.
+
+    Args:
+        args: gitingest arguments without an output option
+        timeout: Maximum execution time in seconds
+
+    Raises:
+        GitIngestError: If gitingest fails
+        TimeoutError: If the ingest exceeds the timeout
+    """
+    cmd = ['gitingest'] + args + ['-o', '-']
+    with tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr)
+        timed_out = threading.Event()
+        stopped = threading.Event()
+
+        def expire() -> None:
+            timed_out.set()
+            process.kill()
+
+        def stop() -> None:
+            stopped.set()
+            process.kill()
+
+        timer = threading.Timer(timeout, expire)
+        timer.start()
+        try:
+            yield process.stdout, stop
+        finally:
+            process.stdout.close()
+            returncode = process.wait()
+            timer.cancel()
+
+        if stopped.is_set():
+            return
+        if timed_out.is_set():
+            raise TimeoutError(f"GitIngest timed out after {timeout}s")
+        if returncode != 0:
+            stderr.seek(0)
+            raise _gitingest_error(stderr.read().decode('utf-8', errors='replace'), args)
+
+
+def _ref_and_subpath(url: str) -> tuple[str, str]:
+    """
+    Return the ref and subpath a URL pins (see workflow.parse_repo_spec).
+
+    Examples:
+        >>> _ref_and_subpath("https://github.com/vercel/turbo/tree/v2.0/packages/turbo-codemod")
+        ('v2.0', 'packages/turbo-codemod')
+        >>> _ref_and_subpath("https://github.com/user/repo")
+        ('HEAD', '')
+    """
+    try:
+        spec = parse_repo_spec(url)
+    except ValidationError:
+        return 'HEAD', ''
+    return spec.ref or 'HEAD', spec.subpath
+
+
+def _root_name(url: str) -> str:
+    """Return the top-level directory name gitingest gives a tree (owner-repo, or the subpath's name)."""
+    _, subpath = _ref_and_subpath(url)
+    if subpath:
+        return PurePosixPath(subpath).name
+    return _repo_label(url).replace('/', '-')
+
+
+def _mirror_ingest(args: list[str]) -> dict:
+    """
+    Translate gitingest arguments into git_ingest.iter_digest() options.
+
+    Args:
+        args: gitingest arguments: the URL, then -i/-e patterns and -s
+
+    Returns:
+        Dict with path_filter, root_name, ref, max_file_size and subpath
+
+    Examples:
+        >>> _mirror_ingest(['https://github.com/user/repo', '-i', '*.md', '-s', '1024'])['max_file_size']
+        1024
+    """
+    include, exclude, max_file_size = [], [], MAX_FILE_SIZE
+    options = iter(args[1:])
+    for option in options:
+        value = next(options, None)
+        if option == '-i':
+            include.append(value)
+        elif option == '-e':
+            exclude.append(value)
+        elif option == '-s':
+            max_file_size = int(value)
+    ref, subpath = _ref_and_subpath(args[0])
+    return {
+        'path_filter': ingest_filter(include, exclude),
+        'root_name': _root_name(args[0]),
+        'ref': ref,
+        'max_file_size': max_file_size,
+        'subpath': subpath,
+    }
+
+
+@contextmanager
+def _digest_stream(
+    args: list[str],
+    timeout: int = 300,
+    mirror: Optional[GitMirror] = None
+) -> Iterator[tuple[BinaryIO, Callable[[], None]]]:
+    """
+    Open the digest of an ingest as a stream: gitingest's stdout, or read from a mirror.
+
+    Same contract as _gitingest_stream(). With a mirror, the arguments are
+    translated (see _mirror_ingest) and the digest is streamed from the
+    mirror's object database (see git_ingest.py); stop() closes the stream,
+    which stops reading blobs.
+
+    Args:
+        args: gitingest arguments without an output option
+        timeout: Maximum execution time of gitingest in seconds
+        mirror: Optional existing mirror of the repository
+
+    Raises:
+        GitIngestError: If gitingest or git fails
+        TimeoutError: If gitingest exceeds the timeout
+    """
+    if mirror is None:
+        with _gitingest_stream(args, timeout) as streams:
+            yield streams
+        return
+    options = _mirror_ingest(args)
+    options['ref'] = mirror.pin(options['ref'])
+    with open_digest(mirror, **options) as stream:
+        yield stream, stream.close
+
+
+def _repository_paths(url: str, data_dir: Path, timeout: int = 300, mirror: Optional[GitMirror] = None) -> list[str]:
+    """
+    List a repository's files from its directory tree.
+
+    With a mirror, the files gitingest would see are listed from its object
+    database. Otherwise the tree of a stored full digest is used if there is
+    one, or gitingest runs unfiltered and is stopped once the tree at the
+    start of its output has been read.
+
+    Args:
+        url: GitHub repository URL
+        data_dir: Repository data directory (holding digest.txt, if extracted)
+        timeout: Maximum execution time in seconds
+        mirror: Optional existing mirror of the repository
+
+    Returns:
+        Repository-relative file paths in tree order (git's path order from
+        a mirror), under the URL's subpath if it has one
+    """
+    ref, subpath = _ref_and_subpath(url)
+    if mirror is not None:
+        # Names only: no blob is read or downloaded
+        files = select_files(mirror, ingest_filter(), mirror.pin(ref), max_file_size=None, subpath=subpath)
+        return [item.path for item in files]
+    digest_file = data_dir / "digest.txt"
+    tree = ''
+    if digest_file.exists():
+        tree = read_tree(digest_file)
+    else:
+        with _gitingest_stream([url], timeout) as (stdout, stop):
+            for path, _, content in iter_stream_sections(stdout):
+                if path is None:
+                    tree = content.decode('utf-8', errors='replace')
+                stop()
+                break
+    # The tree of a subpath is rooted at it: patterns match from the repository root
+    base = f"{subpath}/" if subpath else ''
+    return [base + entry.path for entry in parse_tree(tree) if not entry.is_dir]
+
+
+def _ingest_filtered(
+    args: list[str],
+    output_file: Path,
+    prefilter: Optional[Prefilter] = None,
+    caps: Optional[FileCaps] = None,
+    tokenizer: "str | TokenizerBackend | None" = None,
+    timeout: int = 300,
+    mirror: Optional[GitMirror] = None
+) -> list[Truncation]:
+    """
+    Run gitingest to stdout and filter the digest as it streams.
+
+    The digest is read in bounded pieces (see digest.iter_stream_pieces),
+    passed through the prefilter and then the per-file caps, and written.
+    Without either, the stream is copied as it is.
+
+    Args:
+        args: gitingest arguments without an output option
+        output_file: Where to write the digest
+        prefilter: Optional prefilter dropping or stubbing files
+        caps: Optional per-file token caps
+        tokenizer: Tokenizer backend or spec measuring the caps
+        timeout: Maximum execution time in seconds
+        mirror: Optional existing mirror to read the digest from instead of
+            running gitingest (see _digest_stream)
 
+    Returns:
+        Truncation for each capped file
+
+    Raises:
+        GitIngestError: If gitingest fails
+        TimeoutError: If the ingest exceeds the timeout
+    """
+    truncations: list[Truncation] = []
+    with open(output_file, 'wb') as out, _digest_stream(args, timeout, mirror) as (stdout, _):
+        if prefilter is None and not caps:
+            shutil.copyfileobj(stdout, out, 1 << 20)
+            return truncations
+        pieces = iter_stream_pieces(stdout)
+        if prefilter is not None:
+            pieces = prefilter.filter_pieces(pieces)
+        if caps:
+            pieces = cap_pieces(pieces, caps, tokenizer, truncations)
+        for _, piece, _ in pieces:
+            out.write(piece)
+    return truncations
+
+
+def _ingest_with_budget(
+    args: list[str],
+    output_file: Path,
+    budget: int,
+    backend: TokenizerBackend,
+    transform: Optional[Callable[[str, str], Optional[str]]] = None,
+    prefilter: Optional[Prefilter] = None,
+    caps: Optional[FileCaps] = None,
+    truncations: Optional[list[Truncation]] = None,
+    timeout: int = 300,
+    mirror: Optional[GitMirror] = None
+) -> dict:
+    """
+    Run gitingest to stdout and stop once the token budget is reached.
+
+    The digest is read from the pipe section by section (see
+    digest.iter_stream_sections). Each complete section is counted and
+    written; the first section that would push the running total over the
+    budget ends the ingest: gitingest is killed and that section and every
+    file after it are listed as skipped. The result is a valid digest (the
+    directory tree plus the sections that fit), so wall time for an
+    over-budget extraction follows the budget rather than the repository.
+
+    Args:
+        args: gitingest arguments without an output option
+        output_file: Where to write the digest
+        budget: Token budget for the written digest
+        backend: Tokenizer backend sizing sections against the budget
+        transform: Optional (path, content) -> text applied to each section
+            before it is counted and written; sections mapped to None are
+            dropped (and the directory tree is not written)
+        prefilter: Optional prefilter applied to each section first; stubbed
+            sections skip the transform
+        caps: Optional per-file caps applied to each section last, before
+            it is counted
+        truncations: Optional list that receives a Truncation per capped file
+        timeout: Maximum execution time in seconds
+        mirror: Optional existing mirror to read the digest from instead of
+            running gitingest (see _digest_stream)
+
+    Returns:
+        Manifest dict with the budget, tokenizer, tokens and files written,
+        whether the ingest completed, and the skipped file paths
+
+    Raises:
+        GitIngestError: If gitingest fails before the budget is reached
+        TimeoutError: If the ingest exceeds the timeout
+    """
+    tokens = 0
+    tree = ''
+    written: set[str] = set()
+    dropped: set[str] = set()
+    over_budget = None  # (path, tokens) of the section that didn't fit
+
+    with open(output_file, 'wb') as out, _digest_stream(args, timeout, mirror) as (stdout, stop):
+        for path, header, content in iter_stream_sections(stdout):
+            if path is None:
+                tree = content.decode('utf-8', errors='replace')
+                if transform is None:
+                    out.write(content)
+                    tokens += backend.count(tree)
+                continue
+            text = content.decode('utf-8', errors='replace').rstrip('\r\n')
+            stubbed = False
+            if prefilter is not None:
+                filtered = prefilter.apply(path, text)
+                if filtered is None:
+                    dropped.add(path)
+                    continue
+                stubbed, text = filtered is not text, filtered
+            if transform is not None and not stubbed:
+                text = transform(path, text)
+                if text is None:
+                    dropped.add(path)
+                    continue
+            if stubbed or transform is not None:
+                header, content = b'', format_section(path, text).encode('utf-8')
+            capped: list[Truncation] = []
+            if caps and caps.cap_for(path) is not None:
+                header, content = b'', cap_section(header + content, caps, backend, capped)
+                text = content.decode('utf-8', errors='replace')
+            section_tokens = backend.count(header.decode('utf-8', errors='replace') + text, path)
+            if tokens + section_tokens > budget:
+                over_budget = (path, section_tokens)
+                stop()
+                break
+            out.write(header + content)
+            tokens += section_tokens
+            written.add(path)
+            if truncations is not None:
+                truncations.extend(capped)
+
+    skipped = []
+    if over_budget is not None:
+        skipped.append(over_budget[0])
+        seen = written | dropped | {over_budget[0]}
+        skipped += [
+            entry.path for entry in parse_tree(tree)
+            if not entry.is_dir and entry.path not in seen
+        ]
+    return {
+        'budget': budget,
+        'tokenizer': backend.spec,
+        'tokens': tokens,
+        'files': len(written),
+        'complete': over_budget is None,
+        'skipped': skipped,
+    }
+
+
+def _installation_from_mirror(
+    mirror: GitMirror,
+    output_file: Path,
+    path_filter: PathFilter,
+    backend: TokenizerBackend,
+    budget: Optional[int] = None,
+    prefilter: Optional[Prefilter] = None,
+    caps: Optional[FileCaps] = None,
+    truncations: Optional[list[Truncation]] = None,
+    ref: str = 'HEAD',
+    subpath: str = ''
+) -> Optional[dict]:
+    """
+    Write installation content read straight from a mirror's object database.
+
+    The files of the commit (or of its subpath) are listed with
+    `git ls-tree`, and the ones path_filter selects, plus the manifests at
+    the top of the listing, are read with one `git cat-file --batch` run
+    (a partial mirror downloads just these blobs first): no clone, checkout
+    or ingest. The content starts with the normalized manifest summary (see
+    manifests.py), followed by a section per selected file; the summary is
+    also written as JSON (see installation_summary_path).
+
+    Args:
+        mirror: Existing mirror of the repository
+        output_file: Where to write the content
+        path_filter: Filter selecting the files (the installation profile's)
+        backend: Tokenizer backend sizing sections against the budget
+        budget: Optional token budget; files that don't fit are skipped
+        prefilter: Optional prefilter applied to each file
+        caps: Optional per-file caps
+        truncations: Optional list that receives a Truncation per capped file
+        ref: Commit, branch or tag to read
+        subpath: Directory (a monorepo package) to read instead of the whole tree
+
+    Returns:
+        Budget manifest (as written by _ingest_with_budget), or None without a budget
+
+    Raises:
+        GitIngestError: If git fails, or subpath holds no files
+    """
+    commit = mirror.pin(ref)
+    base = PurePosixPath(subpath or '.')
+    items = select_files(mirror, PathFilter(), commit, max_file_size=None, subpath=subpath)
+    selected = set(path_filter.filter([item.path for item in items]))
+    manifests = {
+        item.path for item in items
+        if PurePosixPath(item.path).parent == base and manifest_parser(item.path) is not None
+    }
+    wanted = [item for item in items if item.path in selected or item.path in manifests]
+    mirror.prefetch([item.oid for item in wanted], commit)
+    texts = {
+        item.path: content.decode('utf-8', errors='replace')
+        for item, content in zip(wanted, mirror.read_blobs(item.oid for item in wanted))
+        if content is not None
+    }
+
+    summary = summarize_manifests({path: text for path, text in texts.items() if path in manifests})
+    installation_summary_path(output_file).write_text(json.dumps(summary, indent=2), encoding='utf-8')
+    preamble = format_summary(summary) + "\n\n"
+
+    tokens = backend.count(preamble) if budget is not None else 0
+    written, skipped = 0, []
+    with open(output_file, 'w', encoding='utf-8', newline='') as out:
+        out.write(preamble)
+        for path, text in texts.items():
+            if path not in selected:
+                continue
+            text = text.rstrip('\r\n')
+            if prefilter is not None:
+                text = prefilter.apply(path, text)
+                if text is None:
+                    continue
+            section = format_section(path, text)
+            capped: list[Truncation] = []
+            if caps and caps.cap_for(path) is not None:
+                section = cap_section(section.encode('utf-8'), caps, backend, capped).decode('utf-8')
+            if budget is not None:
+                section_tokens = backend.count(section, path)
+                if skipped or tokens + section_tokens > budget:
+                    skipped.append(path)
+                    continue
+                tokens += section_tokens
+            out.write(section)
+            written += 1
+            if truncations is not None:
+                truncations.extend(capped)
+
+    if budget is None:
+        return None
+    return {
+        'budget': budget,
+        'tokenizer': backend.spec,
+        'tokens': tokens,
+        'files': written,
+        'complete': not skipped,
+        'skipped': skipped,
+    }
 
-def extract_full(url: str, repo_name: str, output_dir: Path = None) -> tuple[str, list[str]]:
+
+def extract_full(
+    url: str,
+    repo_name: str,
+    output_dir: Path = None,
+    caps: Optional[FileCaps] = None,
+    tokenizer: "str | TokenizerBackend | None" = None,
+    prefilter: Optional[Prefilter] = None,
+    mirror: Optional[GitMirror] = None,
+    skip_unchanged: bool = False
+) -> tuple[str, list[str]]:
     """
     Extract entire repository.
 
+    A URL pinned to a ref or narrowed to a subpath (/tree/<ref>/<subpath>,
+    or the owner/repo@ref:path shorthand) extracts that commit and
+    directory only.
+
+    With caps, files over their cap keep only their first and last K tokens
+    (see file_caps.py). The digest is capped as gitingest streams it, and
+    each truncation is recorded in the digest's section index
+    (DigestReader.truncations).
+
     Args:
         url: GitHub repository URL
         repo_name: Repository name for storage
         output_dir: Optional custom output directory (default: auto-detect)
+        caps: Optional per-file token caps
+        tokenizer: Tokenizer backend or spec measuring the caps
+        prefilter: Optional prefilter dropping or stubbing generated,
+            vendored and binary-like files as the digest streams; its report
+            accumulates the tokens saved
+        mirror: Optional local mirror of the repository (created or
+            refreshed as needed); the digest is then read from its object
+            database instead of a gitingest clone (see git_ingest.py). The
+            digest is also kept as the version of the commit it was read
+            from (versions/<commit>/digest.txt), and extracting the same
+            commit with the same settings again returns it as is
+        skip_unchanged: Resolve the ref's commit on the remote first (`git
+            ls-remote`) and return the stored digest, without cloning or
+            fetching, if it already holds that commit with the same
+            settings. Without a mirror, the digest is then versioned by
+            that commit too
 
     Returns:
         Tuple of (absolute_path, encoding_errors):
@@ -143,19 +878,38 @@ def extract_full(url: str, repo_name: str, output_dir: Path = None) -> tuple[str
         >>> if errors:
         ...     print(f"Encoding errors in: {', '.join(errors)}")
     """
+    url = ingest_url(url)
+
     # Ensure directory exists (uses storage module)
     try:
-        data_dir = ensure_data_directory(repo_name, output_dir=output_dir)
+        data_dir = ensure_data_directory(repo_name, output_dir=output_dir, repo_url=url)
     except Exception as e:
         raise StorageError(f"Failed to create directory: {e}")
 
     output_file = data_dir / "digest.txt"
 
-    # Build GitIngest command
-    args = [url, '-o', str(output_file)]
+    ref, subpath = _ref_and_subpath(url)
+    # The mirror builds its own digest (see git_ingest.py): it only matches another mirror's byte for byte
+    settings = _settings_key(ref=ref, subpath=subpath, source='mirror' if mirror is not None else 'gitingest',
+                             caps=caps, tokenizer=get_backend(tokenizer) if caps else None, prefilter=prefilter)
+    commit, cached = _current_version(url, output_file, settings, data_dir, output_dir, mirror, clone_strategy(),
+                                      skip_unchanged)
+    if cached:
+        return str(output_file.resolve()), []
+    _detach(output_file)
+    if caps or prefilter is not None:
+        truncations = _ingest_filtered([url], output_file, prefilter, caps, get_backend(tokenizer), mirror=mirror)
+        with DigestReader(output_file) as reader:
+            reader.record_truncations(truncations)
+    elif mirror is not None:
+        _ingest_filtered([url], output_file, mirror=mirror)
+    else:
+        # Build GitIngest command
+        args = [url, '-o', str(output_file)]
 
-    # Execute extraction
-    _run_gitingest(args, timeout=300)
+        # Execute extraction
+        _run_gitingest(args, timeout=300)
+    _record_artifact(output_file, 'digest', url, data_dir, output_dir, commit, settings)
 
     # Check for encoding errors (Windows cp1252 issues)
     encoding_errors = _check_encoding_errors(output_file)
@@ -164,14 +918,29 @@ def extract_full(url: str, repo_name: str, output_dir: Path = None) -> tuple[str
     return str(output_file.resolve()), encoding_errors
 
 
-def extract_tree(url: str, repo_name: str, output_dir: Path = None) -> tuple[str, str, list[str]]:
+def extract_tree(
+    url: str,
+    repo_name: str,
+    output_dir: Path = None,
+    mirror: Optional[GitMirror] = None,
+    skip_unchanged: bool = False
+) -> tuple[str, str, list[str]]:
     """
     Extract minimal tree structure.
 
+    A URL pinned to a ref or narrowed to a subpath gets the tree of that
+    commit and directory (see extract_full).
+
     Args:
         url: GitHub repository URL
         repo_name: Repository name for storage
         output_dir: Optional custom output directory (default: auto-detect)
+        mirror: Optional local mirror of the repository (created or
+            refreshed as needed); the whole tree is then listed from its
+            object database, without file contents, and versioned by commit
+            like extract_full's digest
+        skip_unchanged: Return the stored tree if it already holds the
+            remote's commit (see extract_full)
 
     Returns:
         Tuple of (absolute_path, tree_content, encoding_errors):
@@ -192,26 +961,45 @@ def extract_tree(url: str, repo_name: str, output_dir: Path = None) -> tuple[str
           main.py
           utils.py
     """
+    url = ingest_url(url)
+
     # Ensure directory exists
     try:
-        data_dir = ensure_data_directory(repo_name, output_dir=output_dir)
+        data_dir = ensure_data_directory(repo_name, output_dir=output_dir, repo_url=url)
     except Exception as e:
         raise StorageError(f"Failed to create directory: {e}")
 
     output_file = data_dir / "tree.txt"
 
-    # Strategy: Extract with severe filtering to get structure only
-    # -i README.md: Include at least one file (GitIngest requires content)
-    # -s 1024: Maximum 1KB per file (forces truncation, shows structure)
-    args = [
-        url,
-        '-i', 'README.md',
-        '-s', '1024',
-        '-o', str(output_file)
-    ]
+    # gitingest's tree output also holds the README: the two kinds aren't interchangeable
+    ref, subpath = _ref_and_subpath(url)
+    settings = _settings_key(ref=ref, subpath=subpath, source='mirror' if mirror is not None else 'gitingest')
+    # The tree comes straight from git: no file needs to be read, or sized
+    commit, cached = _current_version(url, output_file, settings, data_dir, output_dir, mirror,
+                                      clone_strategy(tree_only=True), skip_unchanged)
+    if cached:
+        return str(output_file.resolve()), output_file.read_text(encoding='utf-8'), []
+    _detach(output_file)
+    if mirror is not None:
+        chunks = iter_digest(mirror, ingest_filter(), _root_name(url), commit, max_file_size=None,
+                             contents=False, subpath=subpath)
+        with open(output_file, 'wb') as out:
+            for chunk in chunks:
+                out.write(chunk)
+    else:
+        # Strategy: Extract with severe filtering to get structure only
+        # -i README.md: Include at least one file (GitIngest requires content)
+        # -s 1024: Maximum 1KB per file (forces truncation, shows structure)
+        args = [
+            url,
+            '-i', 'README.md',
+            '-s', '1024',
+            '-o', str(output_file)
+        ]
 
-    # Tree extraction is faster than full, use shorter timeout
-    _run_gitingest(args, timeout=120)
+        # Tree extraction is faster than full, use shorter timeout
+        _run_gitingest(args, timeout=120)
+    _record_artifact(output_file, 'tree', url, data_dir, output_dir, commit, settings)
 
     # Read tree content
     tree_content = output_file.read_text(encoding='utf-8')
@@ -222,15 +1010,51 @@ def extract_tree(url: str, repo_name: str, output_dir: Path = None) -> tuple[str
     return str(output_file.resolve()), tree_content, encoding_errors
 
 
-def extract_specific(url: str, repo_name: str, content_type: str, output_dir: Path = None) -> tuple[str, list[str]]:
+def extract_specific(
+    url: str,
+    repo_name: str,
+    content_type: str,
+    output_dir: Path = None,
+    budget: Optional[int] = None,
+    tokenizer: "str | TokenizerBackend | None" = None,
+    prefilter: Optional[Prefilter] = None,
+    mirror: Optional[GitMirror] = None,
+    skip_unchanged: bool = False
+) -> tuple[str, list[str]]:
     """
     Extract targeted content with filtering.
 
+    A URL pinned to a ref or narrowed to a subpath extracts from that commit
+    and directory only (see extract_full).
+
     Args:
         url: GitHub repository URL
         repo_name: Repository name for storage
-        content_type: Type of content (docs, installation, code, auto)
+        content_type: Type of content (docs, installation, code, auto, outline,
+            auto-code, or a profile from a config file, see profiles.py).
+            'outline' extracts source files and reduces them to signatures
+            and docstrings. 'auto-code' synthesizes its filters from the
+            repository tree (see code_profile.py) and writes them to
+            [type]-content.profile.json (see code_profile_path). The
+            profile's per-file caps apply to the content written, and are
+            recorded in its section index.
         output_dir: Optional custom output directory (default: auto-detect)
+        budget: Optional token budget (default: the profile's). The ingest
+            stops once the content reaches it, and a
+            [type]-content.skipped.json manifest lists the files left out
+            (see skipped_manifest_path)
+        tokenizer: Tokenizer backend or spec sizing content against the budget
+        prefilter: Optional prefilter dropping or stubbing generated,
+            vendored and binary-like files before they are written
+        mirror: Optional local mirror of the repository (created or
+            refreshed as needed). Content is then read from its object
+            database instead of a gitingest clone (see git_ingest.py).
+            'installation' content is read from the manifests and install
+            docs alone, headed by a normalized summary of the manifests (see
+            manifests.py and installation_summary_path). The content is
+            versioned by commit like extract_full's digest
+        skip_unchanged: Return the stored content if it already holds the
+            remote's commit with the same settings (see extract_full)
 
     Returns:
         Tuple of (absolute_path, encoding_errors):
@@ -240,24 +1064,74 @@ def extract_specific(url: str, repo_name: str, content_type: str, output_dir: Pa
     Raises:
         GitIngestError: If extraction fails
         StorageError: If directory creation fails
-        ValidationError: If content_type is invalid
+        ValidationError: If content_type or the budget is invalid, or an
+            auto-code tree has no source code
         TimeoutError: If extraction exceeds timeout
 
     Examples:
         >>> path, errors = extract_specific("https://github.com/user/repo", "repo", "docs")
         >>> print(path)
         '/path/to/data/repo/docs-content.txt'
+        >>> path, errors = extract_specific("https://github.com/user/repo", "repo", "code", budget=150_000)
     """
+    url = ingest_url(url)
     # Get filter patterns for content type (raises ValidationError if invalid)
     filters = get_filters_for_type(content_type)
+    profile = load_profiles().get(content_type)
+    caps = profile.caps if profile is not None else None
+    if budget is None and profile is not None:
+        budget = profile.budget
+    if budget is not None and budget <= 0:
+        raise ValidationError(f"Token budget must be positive: {budget}")
 
     # Ensure directory exists
     try:
-        data_dir = ensure_data_directory(repo_name, output_dir=output_dir)
+        data_dir = ensure_data_directory(repo_name, output_dir=output_dir, repo_url=url)
     except Exception as e:
         raise StorageError(f"Failed to create directory: {e}")
 
     output_file = data_dir / f"{content_type}-content.txt"
+    manifest_file = skipped_manifest_path(output_file)
+    # Outlines are built from a temporary full-source extraction
+    ingest_file = data_dir / "outline-source.txt" if content_type == 'outline' else output_file
+
+    ref, subpath = _ref_and_subpath(url)
+    settings = _settings_key(ref=ref, subpath=subpath, content_type=content_type, filters=filters, caps=caps,
+                             budget=budget, tokenizer=get_backend(tokenizer) if caps or budget is not None else None,
+                             prefilter=prefilter)
+    # auto-code's include patterns come from the tree: only code files are read
+    strategy = 'partial' if content_type == AUTO_CODE_TYPE else clone_strategy(filters['include'])
+    commit, cached = _current_version(url, output_file, settings, data_dir, output_dir, mirror, strategy,
+                                      skip_unchanged)
+    if cached:
+        return str(output_file.resolve()), []
+    _detach(output_file)
+    if mirror is not None and content_type == 'installation':
+        # Fast path: the manifests and install docs are read from git objects
+        truncations = []
+        manifest = _installation_from_mirror(
+            mirror, output_file, PathFilter(filters['include'], filters['exclude']),
+            get_backend(tokenizer), budget=budget, prefilter=prefilter, caps=caps, truncations=truncations,
+            ref=ref, subpath=subpath
+        )
+        if manifest is not None:
+            manifest = {'url': url, 'content_type': content_type, **manifest}
+            manifest_file.write_text(json.dumps(manifest, indent=2), encoding='utf-8')
+        else:
+            manifest_file.unlink(missing_ok=True)
+        if caps:
+            with DigestReader(output_file) as reader:
+                reader.record_truncations(truncations)
+        _record_artifact(output_file, 'content', url, data_dir, output_dir, commit, settings)
+        return str(output_file.resolve()), []
+
+    if content_type == AUTO_CODE_TYPE and profile is not None and profile.source is None:
+        # Synthesize the filters from the tree (raises ValidationError without source code)
+        code = analyze_paths(_repository_paths(url, data_dir, mirror=mirror))
+        filters = {'include': code.include, 'exclude': code.exclude}
+        code_profile_path(output_file).write_text(
+            json.dumps({'url': url, **code.summary()}, indent=2), encoding='utf-8'
+        )
 
     # Build GitIngest command with include/exclude patterns
     args = [url]
@@ -270,14 +1144,265 @@ def extract_specific(url: str, repo_name: str, content_type: str, output_dir: Pa
     for pattern in filters['exclude']:
         args.extend(['-e', pattern])
 
-    # Add output file
-    args.extend(['-o', str(output_file)])
+    if budget is not None:
+        # Stream the ingest and stop at the budget; outlines are built
+        # section by section, so the budget applies to the outline itself
+        transform = outline.outline_file if content_type == 'outline' else None
+        truncations: list[Truncation] = []
+        manifest = _ingest_with_budget(args, output_file, budget, get_backend(tokenizer),
+                                       transform=transform, prefilter=prefilter,
+                                       caps=caps, truncations=truncations, mirror=mirror)
+        manifest = {'url': url, 'content_type': content_type, **manifest}
+        manifest_file.write_text(json.dumps(manifest, indent=2), encoding='utf-8')
+        if caps:
+            with DigestReader(output_file) as reader:
+                reader.record_truncations(truncations)
+        encoding_errors = _check_encoding_errors(output_file)
+        _record_artifact(output_file, 'content', url, data_dir, output_dir, commit, settings)
+        return str(output_file.resolve()), encoding_errors
 
-    # Execute extraction (use full timeout since filtering can take time)
-    _run_gitingest(args, timeout=300)
+    # A manifest from an earlier budget-capped run no longer applies
+    manifest_file.unlink(missing_ok=True)
+
+    # Outlines are capped once built, so caps apply to what is written
+    source_caps = caps if content_type != 'outline' else None
+    truncations = []
+    if prefilter is not None or source_caps or mirror is not None:
+        truncations = _ingest_filtered(args, ingest_file, prefilter, source_caps, get_backend(tokenizer),
+                                       timeout=300, mirror=mirror)
+    else:
+        # Add output file
+        args.extend(['-o', str(ingest_file)])
+
+        # Execute extraction (use full timeout since filtering can take time)
+        _run_gitingest(args, timeout=300)
 
     # Check for encoding errors (Windows cp1252 issues)
-    encoding_errors = _check_encoding_errors(output_file)
+    encoding_errors = _check_encoding_errors(ingest_file)
+
+    if content_type == 'outline':
+        try:
+            outline.outline_digest(ingest_file, output_file)
+        finally:
+            ingest_file.unlink(missing_ok=True)
+        if caps:
+            truncations = cap_digest(output_file, ingest_file, caps, get_backend(tokenizer))
+            ingest_file.replace(output_file)
+
+    if caps:
+        with DigestReader(output_file) as reader:
+            reader.record_truncations(truncations)
+    _record_artifact(output_file, 'content', url, data_dir, output_dir, commit, settings)
 
     # Return absolute path and any encoding errors
-    return str(output_file.resolve()), encoding_errors
\ No newline at end of file
+    return str(output_file.resolve()), encoding_errors
+
+
+def get_or_extract_digest(
+    url: str,
+    repo_name: str,
+    output_dir: Path = None,
+    refresh: bool = False,
+    prefilter: Optional[Prefilter] = None,
+    mirror: Optional[GitMirror] = None
+) -> Path:
+    """
+    Return the stored full digest of a repository, extracting it if missing.
+
+    Args:
+        url: GitHub repository URL
+        repo_name: Repository name for storage
+        output_dir: Optional custom output directory (default: auto-detect)
+        refresh: Re-extract even if a digest is already stored
+        prefilter: Optional prefilter for a new extraction (a stored digest
+            is returned as it is)
+        mirror: Optional local mirror a new extraction reads from
+
+    Returns:
+        Path to digest.txt
+
+    Raises:
+        GitIngestError: If an extraction is needed and fails
+        StorageError: If directory creation fails
+        TimeoutError: If extraction exceeds timeout
+    """
+    try:
+        data_dir = ensure_data_directory(repo_name, output_dir=output_dir, repo_url=url)
+    except Exception as e:
+        raise StorageError(f"Failed to create directory: {e}")
+
+    digest_file = data_dir / "digest.txt"
+    if refresh or not digest_file.exists():
+        extract_full(url, repo_name, output_dir=output_dir, prefilter=prefilter, mirror=mirror)
+    return digest_file
+
+
+def extract_relevant(
+    url: str,
+    repo_name: str,
+    query: str,
+    budget: int,
+    source: Path = None,
+    output_dir: Path = None,
+    tokenizer: str | TokenizerBackend | None = None,
+    prefilter: Optional[Prefilter] = None,
+    mirror: Optional[GitMirror] = None
+) -> tuple[str, str, int]:
+    """
+    Extract the files most relevant to a question, up to a token budget.
+
+    Files are ranked locally with BM25 over paths and bodies. The ranking
+    source is, in order of preference: an explicit local checkout or digest,
+    the repository's existing digest, or a fresh full extraction.
+
+    Args:
+        url: GitHub repository URL
+        repo_name: Repository name for storage
+        query: Natural language question (e.g. "how is auth configured")
+        budget: Maximum tokens of selected content
+        source: Optional local checkout directory or digest file to rank
+        output_dir: Optional custom output directory (default: auto-detect)
+        tokenizer: Tokenizer backend or spec sizing the files against the
+            budget (default: GITINGEST_AGENT_TOKENIZER, else heuristic)
+        prefilter: Optional prefilter; files it matches are left out of the
+            ranking (stubs would only compete for the budget)
+        mirror: Optional local mirror a fresh full extraction reads from
+
+    Returns:
+        Tuple of (content_path, manifest_path, token_count):
+        - content_path: Path to relevant-content.txt with the selected files
+        - manifest_path: Path to relevant-manifest.json with scores
+        - token_count: Tokens of the selected content
+
+    Raises:
+        GitIngestError: If a full extraction is needed and fails
+        StorageError: If directory creation fails
+        ValidationError: If the query is empty, budget invalid, source missing
+            or tokenizer invalid
+
+    Examples:
+        >>> path, manifest, tokens = extract_relevant(
+        ...     "https://github.com/user/repo", "repo", "how is auth configured", 20000)
+        >>> print(manifest)
+        '/path/to/data/repo/relevant-manifest.json'
+    """
+    if budget <= 0:
+        raise ValidationError(f"Token budget must be positive: {budget}")
+    backend = get_backend(tokenizer)
+
+    try:
+        data_dir = ensure_data_directory(repo_name, output_dir=output_dir, repo_url=url)
+    except Exception as e:
+        raise StorageError(f"Failed to create directory: {e}")
+
+    if source is None:
+        source = get_or_extract_digest(url, repo_name, output_dir=output_dir, prefilter=prefilter, mirror=mirror)
+
+    documents = relevance.load_documents(source)
+    if prefilter is not None:
+        documents = (doc for doc in documents if prefilter.apply(doc.path, doc.text, stub=False) is not None)
+    ranked = relevance.rank_documents(documents, query, tokenizer=backend)
+    selected, skipped = relevance.select_within_budget(ranked, budget)
+
+    output_file = data_dir / "relevant-content.txt"
+    manifest_file = data_dir / "relevant-manifest.json"
+
+    token_count = sum(doc.tokens for doc in selected)
+    try:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            for doc in selected:
+                f.write(format_section(doc.path, doc.read_text()))
+
+        manifest = {
+            'url': url,
+            'query': query,
+            'budget': budget,
+            'tokenizer': backend.spec,
+            'source': str(source),
+            'tokens': token_count,
+            'files': [
+                {'path': doc.path, 'score': round(doc.score, 4), 'tokens': doc.tokens}
+                for doc in selected
+            ],
+            'skipped': [
+                {'path': doc.path, 'score': round(doc.score, 4), 'tokens': doc.tokens}
+                for doc in skipped
+            ],
+        }
+        manifest_file.write_text(json.dumps(manifest, indent=2), encoding='utf-8')
+    except OSError as e:
+        raise StorageError(f"Failed to write relevant content: {e}")
+
+    _record_artifact(output_file, 'content', url, data_dir, output_dir)
+
+    return str(output_file.resolve()), str(manifest_file.resolve()), token_count
+
+
+def extract_layers(
+    url: str,
+    repo_name: str,
+    output_dir: Path = None,
+    refresh: bool = False,
+    tokenizer: str | TokenizerBackend | None = None,
+    prefilter: Optional[Prefilter] = None,
+    mirror: Optional[GitMirror] = None
+) -> tuple[str, list]:
+    """
+    Build all progressive-disclosure layers from one full ingest.
+
+    Writes L0 (tree with sizes), L1 (README and manifests), L2 (docs) and
+    L3 (code outline) next to the full digest (L4), plus a layers.json
+    manifest with the token count of every layer.
+
+    Args:
+        url: GitHub repository URL
+        repo_name: Repository name for storage
+        output_dir: Optional custom output directory (default: auto-detect)
+        refresh: Re-extract the digest even if one is already stored
+        tokenizer: Tokenizer backend or spec for the layer token counts
+            (default: GITINGEST_AGENT_TOKENIZER, else heuristic); counts are
+            cached in the artifact index per tokenizer
+        prefilter: Optional prefilter applied to a new full extraction and
+            to the overview and docs layers
+        mirror: Optional local mirror a new full extraction reads from
+
+    Returns:
+        Tuple of (manifest_path, layers):
+        - manifest_path: Path to layers.json
+        - layers: layers.Layer for L0 through L4
+
+    Raises:
+        GitIngestError: If the full extraction fails
+        StorageError: If directory creation or writing fails
+        TimeoutError: If extraction exceeds timeout
+        ValidationError: If the tokenizer is invalid
+
+    Examples:
+        >>> manifest, built = extract_layers("https://github.com/user/repo", "repo")
+        >>> [(layer.name, layer.tokens) for layer in built]
+        [('tree', 850), ('overview', 2100), ('docs', 14000), ('outline', 9000), ('full', 120000)]
+    """
+    backend = get_backend(tokenizer)
+    try:
+        data_dir = ensure_data_directory(repo_name, output_dir=output_dir, repo_url=url)
+    except Exception as e:
+        raise StorageError(f"Failed to create directory: {e}")
+
+    digest_file = get_or_extract_digest(url, repo_name, output_dir=output_dir, refresh=refresh, prefilter=prefilter,
+                                        mirror=mirror)
+
+    manifest_file = data_dir / layers.LAYERS_MANIFEST
+    try:
+        built = layers.build_layers(
+            digest_file, data_dir,
+            count_file=lambda path: _count_artifact_tokens(path, backend, data_dir, output_dir),
+            transform=prefilter.apply if prefilter is not None else None
+        )
+        layers.write_manifest(built, manifest_file, url, tokenizer=backend.spec)
+    except OSError as e:
+        raise StorageError(f"Failed to write layers: {e}")
+
+    for layer in built[:-1]:
+        _record_artifact(layer.path, 'layer', url, data_dir, output_dir)
+
+    return str(manifest_file.resolve()), built
@@ -0,0 +1,261 @@
+"""
+Per-file token caps with head/tail retention.
+
+One generated file or data fixture can be larger than everything else in a
+repository together. A cap keeps only the first and last K tokens of such a
+file and replaces the middle with an elision marker:
+
+    <first K tokens>
+    [... 91,250 tokens omitted: file capped to its first and last 2,000 tokens ...]
+    <last K tokens>
+
+Caps are configured with specs: "K" sets the default cap for every file,
+"GLOB=K" the cap of files matching GLOB (first match wins; 0 leaves matching
+files uncapped). The digest is capped while it streams: content arrives in
+pieces of at most digest.PIECE_BYTES, the head is written as it arrives and
+only the last K tokens are buffered, so a huge file is never held in memory.
+"""
+
+import io
+from collections import deque
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, NamedTuple, Optional
+from digest import iter_stream_pieces
+from exceptions import ValidationError
+from token_backends import TokenizerBackend, get_backend
+
+
+# Marker replacing the elided middle of a capped file
+ELISION_MARKER = "[... {elided:,} tokens omitted: file capped to its first and last {keep:,} tokens ...]"
+
+
+class Truncation(NamedTuple):
+    """
+    Record of one capped file.
+
+    Attributes:
+        path: File path from the FILE header
+        tokens: Tokens of the original content
+        kept: Tokens kept (head and tail)
+        elided: Tokens replaced by the elision marker
+    """
+    path: str
+    tokens: int
+    kept: int
+    elided: int
+
+
+class FileCaps:
+    """
+    Per-file token caps: a default plus glob overrides.
+
+    Examples:
+        >>> caps = FileCaps.from_specs(["2000", "*.json=500", "README.md=0"])
+        >>> caps.cap_for("src/data/fixture.json"), caps.cap_for("README.md"), caps.cap_for("main.py")
+        (500, None, 2000)
+    """
+
+    def __init__(self, default: Optional[int] = None, rules: Iterable[tuple[str, int]] = ()):
+        self.default = default or None
+        self.rules = list(rules)
+
+    @classmethod
+    def from_specs(cls, specs: Iterable[str]) -> "FileCaps":
+        """
+        Build caps from "K" and "GLOB=K" specs.
+
+        Raises:
+            ValidationError: If a spec isn't of either form
+        """
+        default = None
+        rules = []
+        for spec in specs:
+            glob, _, value = spec.rpartition('=')
+            try:
+                tokens = int(value)
+            except ValueError:
+                tokens = -1
+            if tokens < 0 or (not glob and '=' in spec):
+                raise ValidationError(f"Invalid file cap: {spec}. Use TOKENS or GLOB=TOKENS")
+            if glob:
+                rules.append((glob, tokens))
+            else:
+                default = tokens
+        return cls(default, rules)
+
+    def __bool__(self) -> bool:
+        return self.default is not None or any(tokens for _, tokens in self.rules)
+
+    def cap_for(self, path: str) -> Optional[int]:
+        """
+        Return the tokens kept at each end of a file, or None if it's uncapped.
+
+        Globs without a '/' also match the file name alone.
+        """
+        name = path.rsplit('/', 1)[-1]
+        for glob, tokens in self.rules:
+            if fnmatchcase(path, glob) or ('/' not in glob and fnmatchcase(name, glob)):
+                return tokens or None
+        return self.default
+
+
+class _CappedSection:
+    """Streaming head/tail retention for the content of one FILE section."""
+
+    def __init__(self, path: str, keep: Optional[int], backend: TokenizerBackend):
+        self.path = path
+        self.keep = keep
+        self.backend = backend
+        self.tokens = 0
+        self.head = 0
+        self.tail: deque[tuple[bytes, int]] = deque()
+        self.tail_tokens = 0
+        self.elided = 0
+        self.ends_line = True
+
+    def add(self, piece: bytes) -> bytes:
+        """Take the next content piece; return what can be written right away."""
+        tokens = self.backend.count(piece.decode('utf-8', errors='replace'), self.path)
+        self.tokens += tokens
+        if self.keep is None or (not self.tail and self.head + tokens <= self.keep):
+            self.head += tokens
+            self.ends_line = piece.endswith(b'\n')
+            return piece
+        self.tail.append((piece, tokens))
+        self.tail_tokens += tokens
+        while self.tail_tokens > self.keep:
+            _, dropped = self.tail.popleft()
+            self.tail_tokens -= dropped
+            self.elided += dropped
+        return b''
+
+    def close(self) -> bytes:
+        """Return the buffered tail (after the marker, if anything was elided)."""
+        marker = b''
+        if self.elided:
+            marker = ELISION_MARKER.format(elided=self.elided, keep=self.keep).encode('utf-8') + b'\n'
+            if not self.ends_line:
+                marker = b'\n' + marker
+        return marker + b''.join(piece for piece, _ in self.tail)
+
+    def truncation(self) -> Optional[Truncation]:
+        if not self.elided:
+            return None
+        return Truncation(self.path, self.tokens, self.head + self.tail_tokens, self.elided)
+
+
+def cap_pieces(
+    pieces: Iterable[tuple[Optional[str], bytes, bool]],
+    caps: FileCaps,
+    tokenizer: "str | TokenizerBackend | None" = None,
+    truncations: Optional[list[Truncation]] = None
+) -> Iterator[tuple[Optional[str], bytes, bool]]:
+    """
+    Cap the sections of a digest streamed as pieces (see digest.iter_stream_pieces).
+
+    The preamble and section headers pass through unchanged; each section's
+    content goes through head/tail retention with its file's cap.
+
+    Args:
+        pieces: (path, piece, is_header) tuples of a digest
+        caps: Per-file caps
+        tokenizer: Tokenizer backend or spec measuring the caps
+        truncations: Optional list that receives a Truncation per capped file
+
+    Yields:
+        (path, piece, is_header) tuples of the capped digest
+    """
+    backend = get_backend(tokenizer)
+    section: Optional[_CappedSection] = None
+
+    def finish() -> Iterator[tuple[Optional[str], bytes, bool]]:
+        tail = section.close()
+        if tail:
+            yield section.path, tail, False
+        truncation = section.truncation()
+        if truncation and truncations is not None:
+            truncations.append(truncation)
+
+    for path, piece, is_header in pieces:
+        if is_header:
+            if section is not None:
+                yield from finish()
+            section = _CappedSection(path, caps.cap_for(path), backend)
+            yield path, piece, True
+        elif section is None:
+            yield path, piece, False
+        else:
+            kept = section.add(piece)
+            if kept:
+                yield path, kept, False
+    if section is not None:
+        yield from finish()
+
+
+def cap_section(
+    section: bytes,
+    caps: FileCaps,
+    tokenizer: "str | TokenizerBackend | None" = None,
+    truncations: Optional[list[Truncation]] = None
+) -> bytes:
+    """
+    Cap one complete FILE section (header and content) held in memory.
+
+    Args:
+        section: Section as formatted in a digest
+        caps: Per-file caps
+        tokenizer: Tokenizer backend or spec measuring the caps
+        truncations: Optional list that receives a Truncation if the file is capped
+
+    Returns:
+        The capped section
+    """
+    pieces = cap_pieces(iter_stream_pieces(io.BytesIO(section)), caps, tokenizer, truncations)
+    return b''.join(piece for _, piece, _ in pieces)
+
+
+def cap_stream(
+    stream: BinaryIO,
+    out: BinaryIO,
+    caps: FileCaps,
+    tokenizer: "str | TokenizerBackend | None" = None
+) -> list[Truncation]:
+    """
+    Copy a digest from stream to out, capping oversized FILE sections.
+
+    Args:
+        stream: Binary stream of a digest (e.g. a pipe from gitingest)
+        out: Binary stream to write the capped digest to
+        caps: Per-file caps
+        tokenizer: Tokenizer backend or spec measuring the caps
+
+    Returns:
+        Truncation for each capped file, in digest order
+    """
+    truncations: list[Truncation] = []
+    for _, piece, _ in cap_pieces(iter_stream_pieces(stream), caps, tokenizer, truncations):
+        out.write(piece)
+    return truncations
+
+
+def cap_digest(
+    source: str | Path,
+    output: str | Path,
+    caps: FileCaps,
+    tokenizer: "str | TokenizerBackend | None" = None
+) -> list[Truncation]:
+    """
+    Write a capped copy of a digest file (see cap_stream).
+
+    Args:
+        source: Digest to cap
+        output: Where to write the capped digest (must differ from source)
+        caps: Per-file caps
+        tokenizer: Tokenizer backend or spec measuring the caps
+
+    Returns:
+        Truncation for each capped file
+    """
+    with open(source, 'rb') as stream, open(output, 'wb') as out:
+        return cap_stream(stream, out, caps, tokenizer)
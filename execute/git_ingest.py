@@ -0,0 +1,373 @@
+"""
+Checkout-free ingest of a git mirror into a gitingest-style digest.
+
+gitingest clones a working tree and walks it. With a bare mirror (see
+git_mirror.py) the same digest is built from git's object database instead:
+
+1. `git ls-tree -r` lists the files of the commit, or of one of its
+   directories (a monorepo subpath, as gitingest's /tree/<ref>/<subpath>).
+2. The files are filtered the way gitingest filters a checkout: the -i/-e
+   patterns plus gitingest's built-in ignore list (DEFAULT_IGNORE_PATTERNS),
+   and files over the maximum size are left out. A partial mirror (see
+   git_mirror.clone_strategy) downloads the blobs of the kept files here.
+3. The directory tree is rendered in gitingest's layout and order (README
+   first, then files, dotfiles, directories and dot-directories, each
+   alphabetically).
+4. The blobs are streamed in that order through the mirror's long-lived
+   `git cat-file --batch` process and written as FILE sections, with
+   gitingest's "[Empty file]" and "[Binary file]" placeholders.
+
+No working tree is written, and the digest is produced as a stream, so the
+budget and filtering stages of extractor.py read it exactly like gitingest's
+stdout. Differences from gitingest: .gitignore files aren't applied (the
+files are tracked), there is no limit on the number of files, a UTF-8
+character cut at the binary check boundary doesn't make a file binary, and
+notebooks are kept as JSON.
+
+Example:
+    >>> with GitMirror("https://github.com/user/tool").ensure() as mirror:
+    ...     for chunk in iter_digest(mirror, ingest_filter(include=['*.md']), "user-tool"):
+    ...         out.write(chunk)
+"""
+
+import codecs
+import io
+from pathlib import PurePosixPath
+from typing import BinaryIO, Iterable, Iterator, Optional
+from digest import SEPARATOR
+from exceptions import GitIngestError
+from git_mirror import GitMirror, TreeItem
+from globmatch import PathFilter
+
+
+# gitingest's built-in ignore list (gitingest.utils.ignore_patterns),
+# applied on top of the exclude patterns of every ingest
+DEFAULT_IGNORE_PATTERNS = (
+    # Python
+    "*.pyc", "*.pyo", "*.pyd", "__pycache__", ".pytest_cache", ".coverage", ".tox", ".nox", ".mypy_cache",
+    ".ruff_cache", ".hypothesis", "poetry.lock", "Pipfile.lock",
+    # JavaScript
+    "node_modules", "bower_components", "package-lock.json", "yarn.lock", ".npm", ".yarn", ".pnpm-store",
+    "bun.lock", "bun.lockb",
+    # Java
+    "*.class", "*.jar", "*.war", "*.ear", "*.nar", ".gradle/", "build/", ".settings/", ".classpath",
+    "gradle-app.setting", "*.gradle", ".project",
+    # C/C++
+    "*.o", "*.obj", "*.dll", "*.dylib", "*.exe", "*.lib", "*.out", "*.a", "*.pdb", "*.bin",
+    # Swift/Xcode
+    ".build/", "*.xcodeproj/", "*.xcworkspace/", "*.pbxuser", "*.mode1v3", "*.mode2v3", "*.perspectivev3",
+    "*.xcuserstate", "xcuserdata/", ".swiftpm/",
+    # Ruby
+    "*.gem", ".bundle/", "vendor/bundle", "Gemfile.lock", ".ruby-version", ".ruby-gemset", ".rvmrc",
+    # Rust, Java, Go, .NET
+    "Cargo.lock", "**/*.rs.bk", "target/", "pkg/", "obj/", "*.suo", "*.user", "*.userosscache",
+    "*.sln.docstates", "*.nupkg", "bin/",
+    # Version control
+    ".git", ".svn", ".hg", ".gitignore", ".gitattributes", ".gitmodules",
+    # Images and media
+    "*.svg", "*.png", "*.jpg", "*.jpeg", "*.gif", "*.ico", "*.pdf", "*.mov", "*.mp4", "*.mp3", "*.wav",
+    # Virtual environments
+    "venv", ".venv", "env", ".env", "virtualenv",
+    # IDEs and editors
+    ".idea", ".vscode", ".vs", "*.swo", "*.swn", "*.sublime-*",
+    # Temporary and cache files
+    "*.log", "*.bak", "*.swp", "*.tmp", "*.temp", ".cache", ".sass-cache", ".eslintcache", ".DS_Store",
+    "Thumbs.db", "desktop.ini",
+    # Build directories and artifacts
+    "build", "dist", "target", "out", "*.egg-info", "*.egg", "*.whl", "*.so",
+    # Documentation and frameworks
+    "site-packages", ".docusaurus", ".next", ".nuxt",
+    # Databases
+    "*.db", "*.sqlite", "*.sqlite3",
+    # Minified files, source maps, Terraform state, vendored dependencies
+    "*.min.js", "*.min.css", "*.map", "*.tfstate*", "vendor/",
+    # gitingest output
+    "digest.txt",
+)
+
+# Files larger than this many bytes are left out (gitingest's default -s)
+MAX_FILE_SIZE = 10 * 1024 * 1024
+
+# Leading bytes that must decode as UTF-8 for a file to count as text
+TEXT_CHECK_BYTES = 1024
+
+# git file mode of symbolic links
+SYMLINK_MODE = '120000'
+
+# Bytes read from the chunk iterator per read of a DigestStream
+STREAM_BUFFER = 1 << 16
+
+
+def ingest_filter(include: Iterable[str] = (), exclude: Iterable[str] = ()) -> PathFilter:
+    """
+    Return the filter gitingest applies for -i/-e patterns.
+
+    The exclude patterns are extended with DEFAULT_IGNORE_PATTERNS; as in
+    gitingest, patterns that are also include patterns aren't excluded.
+
+    Examples:
+        >>> ingest_filter().filter(["README.md", "yarn.lock", "node_modules/x/index.js", "src/app.js"])
+        ['README.md', 'src/app.js']
+        >>> ingest_filter(include=["yarn.lock"]).filter(["README.md", "yarn.lock"])
+        ['yarn.lock']
+    """
+    return PathFilter(include, [*DEFAULT_IGNORE_PATTERNS, *exclude])
+
+
+def select_files(
+    mirror: GitMirror,
+    path_filter: PathFilter,
+    ref: str = 'HEAD',
+    max_file_size: Optional[int] = MAX_FILE_SIZE,
+    subpath: str = ''
+) -> list[TreeItem]:
+    """
+    List the files of a commit that an ingest with path_filter keeps.
+
+    The sizes are read once the selected blobs are local: a partial mirror
+    downloads them (and only them) in one batch (see GitMirror.prefetch).
+
+    Args:
+        mirror: Existing mirror of the repository
+        path_filter: Filter selecting the files (see ingest_filter)
+        ref: Commit, branch or tag
+        max_file_size: Files over this many bytes are left out (symlinks are
+            kept whatever their target's length, as in gitingest). None
+            keeps every size and downloads nothing
+        subpath: Directory to list instead of the whole tree; paths stay
+            relative to the repository root, as patterns are matched
+
+    Returns:
+        TreeItem per file and symlink, in git's (path) order, with its size
+        unless max_file_size is None; submodules are left out, as gitingest
+        sees them as empty directories
+
+    Raises:
+        GitIngestError: If git fails, or subpath holds no files
+    """
+    items = [item for item in mirror.ls_tree(ref, paths=[subpath] if subpath else []) if item.type == 'blob']
+    if subpath and not items:
+        raise GitIngestError(f"Path not found in {ref}: {subpath}")
+    kept = set(path_filter.filter([item.path for item in items]))
+    selected = [item for item in items if item.path in kept]
+    if max_file_size is None:
+        return selected
+    mirror.prefetch([item.oid for item in selected], ref)
+    sizes = mirror.sizes(item.oid for item in selected)
+    return [
+        item._replace(size=sizes.get(item.oid, 0)) for item in selected
+        if item.mode == SYMLINK_MODE or sizes.get(item.oid, 0) <= max_file_size
+    ]
+
+
+def _sort_key(name: str, is_dir: bool) -> tuple[int, str]:
+    """gitingest's order of a directory's children: README, files, dotfiles, directories, dot-directories."""
+    lower = name.lower()
+    if is_dir:
+        return (4 if lower.startswith('.') else 3, lower)
+    if lower == 'readme' or lower.startswith('readme.'):
+        return (0, lower)
+    return (2 if lower.startswith('.') else 1, lower)
+
+
+def format_tree(
+    files: Iterable[TreeItem],
+    root_name: str,
+    targets: Optional[dict[str, str]] = None,
+    base: str = ''
+) -> tuple[str, list[TreeItem]]:
+    """
+    Render files as gitingest's directory tree.
+
+    Args:
+        files: Files to show (directories are implied by their paths)
+        root_name: Name of the top-level directory (gitingest's slug, e.g. "user-repo")
+        targets: Symlink target names by path, shown as "name -> target"
+        base: Directory the files are under (a subpath), shown as root_name
+
+    Returns:
+        Tuple of (tree, ordered): the tree lines under "└── root_name/"
+        (without the "Directory structure:" title), and the files in tree
+        order, which is the order of gitingest's FILE sections
+
+    Examples:
+        >>> tree, ordered = format_tree([TreeItem('100644', 'blob', 'a1', 'src/app.py'),
+        ...                              TreeItem('100644', 'blob', 'b2', 'README.md')], "user-repo")
+        >>> print(tree, end='')
+        └── user-repo/
+            ├── README.md
+            └── src/
+                └── app.py
+        >>> print(format_tree([TreeItem('100644', 'blob', 'a1', 'packages/cli/main.py')], "cli",
+        ...                   base="packages/cli")[0], end='')
+        └── cli/
+            └── main.py
+    """
+    targets = targets or {}
+    prefix = base.strip('/') + '/' if base.strip('/') else ''
+    root: dict = {}
+    for item in files:
+        *directories, name = item.path.removeprefix(prefix).split('/')
+        node = root
+        for directory in directories:
+            node = node.setdefault(directory, {})
+        node[name] = item
+
+    lines = [f"└── {root_name}/"]
+    ordered: list[TreeItem] = []
+
+    def render(node: dict, prefix: str) -> None:
+        children = sorted(node.items(), key=lambda child: _sort_key(child[0], isinstance(child[1], dict)))
+        for index, (name, child) in enumerate(children):
+            last = index == len(children) - 1
+            branch = "└── " if last else "├── "
+            if isinstance(child, dict):
+                lines.append(f"{prefix}{branch}{name}/")
+                render(child, prefix + ("    " if last else "│   "))
+            else:
+                target = targets.get(child.path)
+                lines.append(f"{prefix}{branch}{name}" + (f" -> {target}" if target is not None else ""))
+                ordered.append(child)
+
+    render(root, "    ")
+    return "\n".join(lines) + "\n", ordered
+
+
+def blob_text(data: bytes) -> str:
+    """
+    Return a file's digest content, with gitingest's placeholders for empty and binary files.
+
+    Examples:
+        >>> blob_text(b"print('hi')\\n"), blob_text(b""), blob_text(b"\\x89PNG\\r\\n\\x1a\\n\\xff")
+        ("print('hi')\\n", '[Empty file]', '[Binary file]')
+    """
+    if not data:
+        return "[Empty file]"
+    try:
+        return data.decode('utf-8')
+    except UnicodeDecodeError:
+        pass
+    try:
+        # Incremental: a character cut at the check boundary still counts as text
+        codecs.getincrementaldecoder('utf-8')().decode(data[:TEXT_CHECK_BYTES])
+    except UnicodeDecodeError:
+        return "[Binary file]"
+    return data.decode('utf-8', errors='replace')
+
+
+def iter_digest(
+    mirror: GitMirror,
+    path_filter: PathFilter,
+    root_name: str,
+    ref: str = 'HEAD',
+    max_file_size: int = MAX_FILE_SIZE,
+    contents: bool = True,
+    subpath: str = ''
+) -> Iterator[bytes]:
+    """
+    Stream the digest of a commit as gitingest would write it.
+
+    Args:
+        mirror: Existing mirror of the repository
+        path_filter: Filter selecting the files (see ingest_filter)
+        root_name: Name of the tree's top-level directory
+        ref: Commit, branch or tag
+        max_file_size: Files over this many bytes are left out (None: no limit)
+        contents: Write the FILE sections after the tree (False: tree only)
+        subpath: Ingest this directory only; root_name stands for it in the
+            tree, and FILE headers keep repository-relative paths
+
+    Yields:
+        The "Directory structure:" tree, then one chunk per section in tree
+        order; the blobs are read as the chunks are consumed
+
+    Raises:
+        GitIngestError: If git fails, or subpath holds no files
+    """
+    commit = mirror.resolve(ref)
+    files = select_files(mirror, path_filter, commit, max_file_size, subpath)
+    if max_file_size is None:
+        # Nothing was downloaded to check sizes: fetch what is read below
+        mirror.prefetch([item.oid for item in files if contents or item.mode == SYMLINK_MODE], commit)
+    reader = mirror.blobs()
+
+    links = [item for item in files if item.mode == SYMLINK_MODE]
+    targets = {
+        item.path: PurePosixPath((data or b'').decode('utf-8', errors='surrogateescape')).name
+        for item, (_, data) in zip(links, reader.iter_blobs(item.oid for item in links))
+    }
+    tree, ordered = format_tree(files, root_name, targets, subpath)
+    yield f"Directory structure:\n{tree}".encode('utf-8', errors='surrogateescape')
+    if not contents:
+        return
+    if not ordered:
+        yield b"\n"
+        return
+
+    blobs = reader.iter_blobs(item.oid for item in ordered if item.mode != SYMLINK_MODE)
+    try:
+        for item in ordered:
+            if item.mode == SYMLINK_MODE:
+                header, text = f"SYMLINK: {item.path} -> {targets[item.path]}", ""
+            else:
+                _, data = next(blobs)
+                header, text = f"FILE: {item.path}", blob_text(data) if data is not None else "Error reading file"
+            # gitingest puts a newline after the tree and between sections
+            yield f"\n{SEPARATOR}\n{header}\n{SEPARATOR}\n{text}\n\n".encode('utf-8', errors='surrogateescape')
+    finally:
+        blobs.close()
+
+
+class DigestStream(io.RawIOBase):
+    """
+    Read-only binary stream over the chunks of iter_digest().
+
+    Lets the digest readers (digest.iter_stream_sections and
+    iter_stream_pieces) consume a mirror ingest like gitingest's stdout.
+    Closing the stream closes the chunk iterator, which stops the blob
+    stream.
+    """
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self._chunks = chunks
+        self._chunk = memoryview(b'')
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._chunk:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._chunk = memoryview(chunk)
+        size = min(len(buffer), len(self._chunk))
+        buffer[:size] = self._chunk[:size]
+        self._chunk = self._chunk[size:]
+        return size
+
+    def close(self) -> None:
+        if not self.closed:
+            close = getattr(self._chunks, 'close', None)
+            if close is not None:
+                close()
+        super().close()
+
+
+def open_digest(
+    mirror: GitMirror,
+    path_filter: PathFilter,
+    root_name: str,
+    ref: str = 'HEAD',
+    max_file_size: int = MAX_FILE_SIZE,
+    subpath: str = ''
+) -> BinaryIO:
+    """
+    Open the digest of a commit as a buffered binary stream (see iter_digest).
+
+    Raises:
+        GitIngestError: If git fails, or subpath holds no files
+    """
+    return io.BufferedReader(
+        DigestStream(iter_digest(mirror, path_filter, root_name, ref, max_file_size, subpath=subpath)), STREAM_BUFFER
+    )
\ No newline at end of file
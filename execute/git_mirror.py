@@ -0,0 +1,736 @@
+"""
+Local bare mirrors of remote repositories.
+
+gitingest clones a repository (with a working tree) for every extraction.
+A bare mirror kept on disk lets the repository be read straight from git's
+object database instead: `ls-tree` lists the files of a commit and
+`cat-file --batch` returns their contents, without a checkout and without
+network access once the mirror exists. Each mirror keeps one long-lived
+`cat-file --batch` process (BlobReader) that every read goes through.
+
+Mirrors live under MIRROR_ROOT_ENV_VAR ($GITINGEST_AGENT_MIRRORS), by default
+$XDG_CACHE_HOME/gitingest-agent/mirrors (~/.cache by default), one directory
+per remote: github.com/fastapi/fastapi.git. A mirror is created with
+`git clone --mirror` on first use and fetched again once it is older than
+its max_age.
+
+How much is cloned depends on the extraction (see clone_strategy()):
+
+- 'partial': blobless (`--filter=blob:none`) and shallow. Commits and trees
+  only; the blobs of the files an extraction selects are fetched in one
+  batch before they are read (prefetch()), which is a sparse checkout
+  without the checkout. Used when filters select part of the tree.
+- 'shallow': `--depth 1`, every blob of the tip commits. Used when every
+  file is read (full digests).
+- 'full': complete history, for callers that need it.
+
+A mirror keeps the layout it was created with; its later fetches stay
+shallow and blobless. A shallow clone holds the default branch only: a
+tag, branch or commit it lacks is fetched on its own when an extraction
+pins it (pin()), into refs/pins/, until the next fetch brings every ref.
+remote_commit() resolves a ref on the remote without fetching, to tell
+whether a mirror (or an extraction) is still current. Every clone, fetch
+and prefetch is recorded (see Transfer) with the pack bytes it received
+and the time to the remote's first response, in the mirror's
+transfers.jsonl.
+"""
+
+import json
+import os
+import re
+import shutil
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import IO, Iterable, Iterator, NamedTuple, Optional
+from urllib.parse import urlparse
+from exceptions import GitIngestError, ValidationError
+
+
+# Environment variable naming the directory mirrors are kept in
+MIRROR_ROOT_ENV_VAR = "GITINGEST_AGENT_MIRRORS"
+
+# Mirror directory relative to $XDG_CACHE_HOME (default ~/.cache)
+DEFAULT_MIRROR_PATH = Path("gitingest-agent") / "mirrors"
+
+# Seconds after which an existing mirror is fetched again before use
+MIRROR_MAX_AGE = 3600
+
+# Characters kept in mirror directory names
+_UNSAFE_RE = re.compile(r'[^A-Za-z0-9._-]+')
+
+# Object names written to cat-file per pipe write
+_REQUEST_BATCH = 256
+
+# Clone strategies, from the least to the most downloaded
+CLONE_STRATEGIES = ('partial', 'shallow', 'full')
+
+# Transfer log kept in each mirror directory
+TRANSFER_LOG = "transfers.jsonl"
+
+# Arguments adding each strategy's limits to `git clone --mirror`
+_STRATEGY_ARGS = {
+    'partial': ['--depth', '1', '--filter=blob:none'],
+    'shallow': ['--depth', '1'],
+    'full': [],
+}
+
+# git progress lines showing data arriving from the remote
+_REMOTE_PROGRESS = (b'remote:', b'Receiving objects')
+
+# Full commit ids (SHA-1 and SHA-256), which ls-remote can't look up
+_COMMIT_ID_RE = re.compile(r'[0-9a-f]{40}|[0-9a-f]{64}')
+
+
+class TreeItem(NamedTuple):
+    """
+    One `git ls-tree` entry.
+
+    Attributes:
+        mode: File mode ('100644', '100755', '120000' for symlinks, '160000' for submodules)
+        type: Object type ('blob', 'tree' or 'commit')
+        oid: Object id
+        path: Repository-relative path
+        size: Blob size in bytes (listings with long=True), else None
+    """
+    mode: str
+    type: str
+    oid: str
+    path: str
+    size: Optional[int] = None
+
+
+class Transfer(NamedTuple):
+    """
+    One download into a mirror.
+
+    Attributes:
+        operation: 'clone', 'fetch', 'pin' (one ref, see GitMirror.pin) or
+            'prefetch' (blobs of a partial mirror)
+        strategy: Clone strategy of the mirror (see CLONE_STRATEGIES)
+        bytes: Pack bytes received
+        seconds: Duration of the git command
+        first_byte: Seconds until the remote's first response, None if it
+            sent nothing (e.g. a fetch with nothing new)
+    """
+    operation: str
+    strategy: str
+    bytes: int
+    seconds: float
+    first_byte: Optional[float]
+
+
+def clone_strategy(include: Iterable[str] = (), tree_only: bool = False) -> str:
+    """
+    Choose the clone strategy that downloads the least for an extraction.
+
+    Args:
+        include: Include patterns of the extraction (none: every file is read)
+        tree_only: Whether only the file names are needed
+
+    Examples:
+        >>> clone_strategy(['*.md', 'docs/'])
+        'partial'
+        >>> clone_strategy()
+        'shallow'
+    """
+    # No extraction reads history: depth 1 always suffices
+    return 'partial' if tree_only or any(include) else 'shallow'
+
+
+def mirror_root() -> Path:
+    """Return the directory mirrors are kept in."""
+    explicit = os.environ.get(MIRROR_ROOT_ENV_VAR)
+    if explicit:
+        return Path(explicit)
+    cache_home = os.environ.get('XDG_CACHE_HOME') or Path.home() / ".cache"
+    return Path(cache_home) / DEFAULT_MIRROR_PATH
+
+
+def mirror_path(url: str, root: Optional[Path] = None) -> Path:
+    """
+    Return the mirror directory of a remote URL.
+
+    Examples:
+        >>> mirror_path("https://github.com/fastapi/fastapi", Path("/m"))
+        PosixPath('/m/github.com/fastapi/fastapi.git')
+        >>> mirror_path("file:///srv/git/tool.git", Path("/m"))
+        PosixPath('/m/local/srv/git/tool.git')
+    """
+    parsed = urlparse(url)
+    host = parsed.hostname if parsed.scheme not in ('', 'file') else None
+    path = parsed.path if parsed.scheme else url
+    parts = [_UNSAFE_RE.sub('_', part) for part in path.split('/') if part and part not in ('.', '..')]
+    if not parts:
+        raise GitIngestError(f"Cannot mirror URL: {url}")
+    name = parts[-1] if parts[-1].endswith('.git') else f"{parts[-1]}.git"
+    return (root or mirror_root()) / (host or 'local') / Path(*parts[:-1], name)
+
+
+def run_git(args: list[str], git_dir: Optional[Path] = None, input: Optional[bytes] = None,
+            timeout: int = 300) -> bytes:
+    """
+    Run a git command and return its stdout.
+
+    Args:
+        args: git arguments
+        git_dir: Repository to run in (--git-dir), if any
+        input: Bytes passed on stdin
+        timeout: Maximum execution time in seconds
+
+    Raises:
+        GitIngestError: If git fails
+        TimeoutError: If git exceeds the timeout
+    """
+    cmd = ['git'] + (['--git-dir', str(git_dir)] if git_dir is not None else []) + args
+    try:
+        result = subprocess.run(cmd, input=input, capture_output=True, timeout=timeout, check=True)
+    except subprocess.TimeoutExpired:
+        raise TimeoutError(f"git {args[0]} timed out after {timeout}s")
+    except subprocess.CalledProcessError as e:
+        stderr = e.stderr.decode('utf-8', errors='replace').strip()
+        raise GitIngestError(f"git {args[0]} failed: {stderr}")
+    except FileNotFoundError:
+        raise GitIngestError("git is not installed")
+    return result.stdout
+
+
+def run_transfer(args: list[str], git_dir: Optional[Path] = None, input: Optional[bytes] = None,
+                 timeout: int = 300, config: Iterable[str] = ()) -> Optional[float]:
+    """
+    Run a git command that downloads objects, timing the remote's first response.
+
+    The command is run with --progress; the first "remote:" or "Receiving
+    objects" line marks the first byte from the remote.
+
+    Args:
+        args: git arguments (clone or fetch)
+        git_dir: Repository to run in (--git-dir), if any
+        input: Bytes passed on stdin
+        timeout: Maximum execution time in seconds
+        config: "key=value" settings for this command only (git -c)
+
+    Returns:
+        Seconds from the start of the command to the first byte from the
+        remote, or None if the remote sent nothing
+
+    Raises:
+        GitIngestError: If git fails
+        TimeoutError: If git exceeds the timeout
+    """
+    options = [option for setting in config for option in ('-c', setting)]
+    if git_dir is not None:
+        options += ['--git-dir', str(git_dir)]
+    cmd = ['git', *options, *args, '--progress']
+    start = time.monotonic()
+    try:
+        process = subprocess.Popen(cmd, stdin=subprocess.PIPE if input is not None else subprocess.DEVNULL,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    except FileNotFoundError:
+        raise GitIngestError("git is not installed")
+    expired = threading.Event()
+
+    def expire() -> None:
+        expired.set()
+        process.kill()
+
+    timer = threading.Timer(timeout, expire)
+    timer.start()
+
+    def feed() -> None:
+        try:
+            process.stdin.write(input)
+            process.stdin.close()
+        except BrokenPipeError:
+            pass
+
+    writer = threading.Thread(target=feed, daemon=True) if input is not None else None
+    if writer is not None:
+        writer.start()
+    first_byte = None
+    stderr = bytearray()
+    try:
+        while chunk := process.stderr.read1(1 << 16):
+            if first_byte is None and any(marker in chunk for marker in _REMOTE_PROGRESS):
+                first_byte = time.monotonic() - start
+            stderr += chunk
+        process.wait()
+    finally:
+        timer.cancel()
+        if writer is not None:
+            writer.join()
+    if expired.is_set():
+        raise TimeoutError(f"git {args[0]} timed out after {timeout}s")
+    if process.returncode != 0:
+        lines = [line.strip() for line in stderr.decode('utf-8', errors='replace').replace('\r', '\n').splitlines()]
+        raise GitIngestError(f"git {args[0]} failed: {next((line for line in reversed(lines) if line), '')}")
+    return first_byte
+
+
+def remote_commit(url: str, ref: str = 'HEAD', timeout: int = 60) -> str:
+    """
+    Return the commit a ref points to on a remote, without fetching anything.
+
+    One `git ls-remote` round trip: much cheaper than a fetch or clone, so a
+    caller can tell whether a stored extraction is still current. Names are
+    resolved in git's order (exact ref, tag, branch); annotated tags are
+    peeled to their commit. A full commit id is returned as is.
+
+    Args:
+        url: Remote URL (anything `git ls-remote` accepts, local paths included)
+        ref: Branch, tag, full ref name or commit id
+        timeout: Maximum execution time in seconds
+
+    Raises:
+        GitIngestError: If the remote can't be reached or lacks the ref
+        TimeoutError: If git exceeds the timeout
+    """
+    if _COMMIT_ID_RE.fullmatch(ref):
+        return ref
+    listing = run_git(['ls-remote', url, ref, f"{ref}^{{}}"], timeout=timeout).decode('utf-8', errors='replace')
+    refs = {}
+    for line in listing.splitlines():
+        oid, _, name = line.partition('\t')
+        refs[name] = oid
+    for name in ((ref,) if ref == 'HEAD' else (ref, f"refs/tags/{ref}", f"refs/heads/{ref}")):
+        oid = refs.get(f"{name}^{{}}") or refs.get(name)
+        if oid:
+            return oid
+    raise GitIngestError(f"Ref not found on {url}: {ref}")
+
+
+class BlobReader:
+    """
+    A long-lived `git cat-file --batch` process over one repository.
+
+    The process is started on first use and serves every read until close().
+    iter_blobs() pipelines its requests: a writer thread feeds object names
+    while contents are read back, so a stream of blobs costs one process and
+    no round trip per object. A reader abandoned mid-stream kills the process
+    (its pending output can't be skipped cheaply); the next read starts a new
+    one.
+
+    Args:
+        git_dir: Repository (bare mirror) to read from
+
+    Example:
+        >>> with BlobReader(mirror.path) as reader:
+        ...     reader.read("HEAD:README.md")[:7]
+        b'# Tool\n'
+    """
+
+    def __init__(self, git_dir: Path):
+        self.git_dir = git_dir
+        self._process: Optional[subprocess.Popen] = None
+
+    def __enter__(self) -> "BlobReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _start(self) -> subprocess.Popen:
+        if self._process is None or self._process.poll() is not None:
+            try:
+                self._process = subprocess.Popen(
+                    ['git', '--git-dir', str(self.git_dir), 'cat-file', '--batch'],
+                    stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, bufsize=1 << 16
+                )
+            except FileNotFoundError:
+                raise GitIngestError("git is not installed")
+        return self._process
+
+    @staticmethod
+    def _read_object(stdout: IO[bytes]) -> Optional[bytes]:
+        """Read one response: the blob's contents, or None for a missing or non-blob object."""
+        header = stdout.readline()
+        if not header.endswith(b'\n'):
+            raise GitIngestError("git cat-file exited unexpectedly")
+        fields = header.rsplit(b' ', 2)
+        if len(fields) < 3 or not fields[2].strip().isdigit():
+            # "<name> missing" / "<name> ambiguous"
+            return None
+        size = int(fields[2])
+        data = stdout.read(size + 1)
+        if len(data) != size + 1:
+            raise GitIngestError("git cat-file exited unexpectedly")
+        return data[:-1] if fields[1] == b'blob' else None
+
+    def read(self, name: str) -> Optional[bytes]:
+        """
+        Read one object.
+
+        Args:
+            name: Blob id or "<commit>:<path>"
+
+        Returns:
+            The blob's contents, or None if name doesn't resolve to a blob
+
+        Raises:
+            GitIngestError: If the cat-file process fails
+        """
+        process = self._start()
+        try:
+            process.stdin.write(name.encode('utf-8', errors='surrogateescape') + b'\n')
+            process.stdin.flush()
+        except BrokenPipeError:
+            self.close()
+            raise GitIngestError("git cat-file exited unexpectedly")
+        return self._read_object(process.stdout)
+
+    def iter_blobs(self, names: Iterable[str]) -> Iterator[tuple[str, Optional[bytes]]]:
+        """
+        Stream objects in the order of names.
+
+        Args:
+            names: Blob ids or "<commit>:<path>" names
+
+        Yields:
+            (name, contents) per name; contents is None for names that don't
+            resolve to a blob (missing paths, submodules, directories)
+
+        Raises:
+            GitIngestError: If the cat-file process fails
+        """
+        names = list(names)
+        if not names:
+            return
+        process = self._start()
+
+        def feed() -> None:
+            try:
+                for start in range(0, len(names), _REQUEST_BATCH):
+                    batch = names[start:start + _REQUEST_BATCH]
+                    process.stdin.write(''.join(f"{name}\n" for name in batch).encode('utf-8', errors='surrogateescape'))
+                    process.stdin.flush()
+            except (BrokenPipeError, ValueError):
+                # The process was killed by close()
+                pass
+
+        writer = threading.Thread(target=feed, daemon=True)
+        writer.start()
+        done = False
+        try:
+            for name in names:
+                yield name, self._read_object(process.stdout)
+            done = True
+        finally:
+            if not done:
+                self.close()
+            writer.join()
+
+    def close(self) -> None:
+        """Stop the cat-file process, if running."""
+        process, self._process = self._process, None
+        if process is None:
+            return
+        if process.poll() is None:
+            process.kill()
+        for stream in (process.stdin, process.stdout):
+            try:
+                stream.close()
+            except (BrokenPipeError, ValueError):
+                pass
+        process.wait()
+
+
+class GitMirror:
+    """
+    A bare mirror of one remote repository.
+
+    Blobs are read through the mirror's BlobReader (see blobs()), which
+    keeps running until close(); a mirror can be used as a context manager.
+
+    Attributes:
+        url: Remote URL (anything `git clone` accepts)
+        path: Mirror directory
+        max_age: Seconds after which ensure() fetches an existing mirror again
+        transfers: Transfer per clone, fetch or prefetch made through this object
+
+    Example:
+        >>> with GitMirror("https://github.com/fastapi/fastapi").ensure() as mirror:
+        ...     [item.path for item in mirror.ls_tree() if item.path.endswith('.toml')]
+        ['pyproject.toml']
+    """
+
+    def __init__(self, url: str, root: Optional[Path] = None, max_age: int = MIRROR_MAX_AGE):
+        self.url = url
+        self.path = mirror_path(url, root)
+        self.max_age = max_age
+        self.transfers: list[Transfer] = []
+        self._reader: Optional[BlobReader] = None
+
+    def __repr__(self) -> str:
+        return f"GitMirror({self.url!r}, path={str(self.path)!r})"
+
+    def __enter__(self) -> "GitMirror":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def blobs(self) -> BlobReader:
+        """Return the mirror's BlobReader (its cat-file process starts on first read)."""
+        if self._reader is None:
+            self._reader = BlobReader(self.path)
+        return self._reader
+
+    def close(self) -> None:
+        """Stop the mirror's cat-file process, if running."""
+        if self._reader is not None:
+            self._reader.close()
+
+    def exists(self) -> bool:
+        """Return whether the mirror has been created."""
+        return (self.path / "HEAD").is_file()
+
+    def git(self, *args: str, input: Optional[bytes] = None, timeout: int = 300) -> bytes:
+        """Run a git command in the mirror and return its stdout."""
+        return run_git(list(args), self.path, input=input, timeout=timeout)
+
+    def age(self) -> Optional[float]:
+        """Return seconds since the mirror was created or last fetched, or None if it doesn't exist."""
+        if not self.exists():
+            return None
+        stamp = self.path / "FETCH_HEAD"
+        if not stamp.exists():
+            stamp = self.path / "HEAD"
+        return time.time() - stamp.stat().st_mtime
+
+    def ensure(self, strategy: str = 'full') -> "GitMirror":
+        """
+        Create the mirror if it is missing, or fetch it if it is older than max_age.
+
+        Args:
+            strategy: Clone strategy if the mirror has to be created (see
+                clone_strategy); an existing mirror keeps its own
+
+        Returns:
+            The mirror itself
+
+        Raises:
+            GitIngestError: If cloning or fetching fails
+        """
+        age = self.age()
+        if age is None:
+            self.clone(strategy)
+        elif age > self.max_age:
+            self.fetch()
+        return self
+
+    def clone(self, strategy: str = 'full') -> None:
+        """
+        Create the mirror with `git clone --mirror` (replacing a partial one).
+
+        Args:
+            strategy: 'partial', 'shallow' or 'full' (see CLONE_STRATEGIES)
+
+        Raises:
+            GitIngestError: If cloning fails
+            ValidationError: If strategy is unknown
+        """
+        if strategy not in CLONE_STRATEGIES:
+            raise ValidationError(f"Unknown clone strategy: {strategy} (choose from {', '.join(CLONE_STRATEGIES)})")
+        url = self.url
+        if strategy != 'full' and not urlparse(url).scheme and Path(url).exists():
+            # Local paths are copied, not fetched: depth and filters need file://
+            url = Path(url).resolve().as_uri()
+        if self.path.exists():
+            shutil.rmtree(self.path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        partial = self.path.with_name(self.path.name + ".partial")
+        shutil.rmtree(partial, ignore_errors=True)
+        start = time.monotonic()
+        try:
+            # Fetched objects are kept as packs, so each transfer's size can be measured
+            first_byte = run_transfer(['clone', '--mirror', '--config', 'fetch.unpackLimit=1',
+                                       *_STRATEGY_ARGS[strategy], url, str(partial)])
+            partial.rename(self.path)
+        finally:
+            shutil.rmtree(partial, ignore_errors=True)
+        self._record('clone', strategy, sum(self._packs().values()), time.monotonic() - start, first_byte)
+
+    def fetch(self) -> None:
+        """Update every ref of the mirror from its remote (shallow mirrors stay at depth 1)."""
+        strategy = self.strategy()
+        depth = ['--depth', '1'] if strategy != 'full' else []
+        before = self._packs()
+        start = time.monotonic()
+        first_byte = run_transfer(['fetch', '--prune', *depth, 'origin'], self.path)
+        (self.path / "FETCH_HEAD").touch()
+        self._record('fetch', strategy, self._received(before), time.monotonic() - start, first_byte)
+
+    def strategy(self) -> str:
+        """Return the clone strategy the mirror was created with."""
+        try:
+            self.git('config', '--get', 'remote.origin.partialclonefilter')
+            return 'partial'
+        except GitIngestError:
+            return 'shallow' if (self.path / "shallow").exists() else 'full'
+
+    def missing(self, ref: str = 'HEAD') -> set[str]:
+        """Return the ids of the objects in a commit's tree that a partial mirror hasn't downloaded."""
+        listing = self.git('rev-list', '--objects', '--no-walk', '--missing=print', ref)
+        return {line[1:].decode('ascii') for line in listing.split(b'\n') if line.startswith(b'?')}
+
+    def prefetch(self, oids: Iterable[str], ref: str = 'HEAD') -> int:
+        """
+        Download the blobs among oids that a partial mirror is missing, in one fetch.
+
+        Reading a missing blob would fetch it on its own (a round trip per
+        file); mirrors that aren't partial have every blob already.
+
+        Args:
+            oids: Blob ids about to be read
+            ref: Commit whose tree holds the blobs
+
+        Returns:
+            Number of blobs fetched
+
+        Raises:
+            GitIngestError: If the fetch fails
+        """
+        oids = set(oids)
+        if not oids or self.strategy() != 'partial':
+            return 0
+        wanted = self.missing(ref) & oids
+        if not wanted:
+            return 0
+        before = self._packs()
+        start = time.monotonic()
+        first_byte = run_transfer(
+            ['fetch', '--no-tags', '--no-write-fetch-head', '--recurse-submodules=no', '--filter=blob:none',
+             '--stdin', 'origin'],
+            self.path, input=''.join(f"{oid}\n" for oid in sorted(wanted)).encode('ascii'),
+            # As git's own lazy fetches: the wanted blobs share no history to negotiate
+            config=['fetch.negotiationAlgorithm=noop']
+        )
+        self._record('prefetch', 'partial', self._received(before), time.monotonic() - start, first_byte)
+        return len(wanted)
+
+    def sizes(self, oids: Iterable[str]) -> dict[str, int]:
+        """
+        Return the size of each object, by id.
+
+        Sizes are read from the mirror's objects (`cat-file --batch-check`):
+        prefetch() the blobs of a partial mirror first. Missing objects are
+        left out.
+        """
+        names = list(dict.fromkeys(oids))
+        if not names:
+            return {}
+        listing = self.git('cat-file', '--batch-check=%(objectname) %(objectsize)',
+                           input=''.join(f"{name}\n" for name in names).encode('ascii'))
+        sizes = {}
+        for line in listing.decode('ascii').splitlines():
+            oid, _, size = line.partition(' ')
+            if size.isdigit():
+                sizes[oid] = int(size)
+        return sizes
+
+    def _packs(self) -> dict[str, int]:
+        """Return the size of each pack file of the mirror."""
+        return {pack.name: pack.stat().st_size for pack in (self.path / "objects" / "pack").glob("*.pack")}
+
+    def _received(self, before: dict[str, int]) -> int:
+        """Return the bytes of the packs added since before."""
+        return sum(size for name, size in self._packs().items() if name not in before)
+
+    def _record(self, operation: str, strategy: str, received: int, seconds: float,
+                first_byte: Optional[float]) -> None:
+        """Keep a transfer in transfers and append it to the mirror's transfer log."""
+        transfer = Transfer(operation, strategy, received, round(seconds, 3),
+                            round(first_byte, 3) if first_byte is not None else None)
+        self.transfers.append(transfer)
+        with open(self.path / TRANSFER_LOG, 'a', encoding='utf-8') as log:
+            log.write(json.dumps({'time': round(time.time()), **transfer._asdict()}) + "\n")
+
+    def resolve(self, ref: str = 'HEAD') -> str:
+        """
+        Return the commit id a ref points to.
+
+        Raises:
+            GitIngestError: If the ref doesn't exist
+        """
+        return self.git('rev-parse', '--verify', '--quiet', f"{ref}^{{commit}}").decode('ascii').strip()
+
+    def pin(self, ref: str = 'HEAD') -> str:
+        """
+        Return the commit a ref points to, fetching the ref if the mirror lacks it.
+
+        The ref (a branch, tag or commit id) is fetched on its own, shallow
+        and blobless like the mirror, into refs/pins/<ref>; the mirror's
+        next fetch prunes it.
+
+        Raises:
+            GitIngestError: If the ref doesn't exist on the remote either
+        """
+        for name in (ref, f"refs/pins/{ref}"):
+            try:
+                return self.resolve(name)
+            except GitIngestError:
+                if ref == 'HEAD':
+                    raise
+        strategy = self.strategy()
+        args = ['fetch', '--no-tags', '--no-write-fetch-head', '--recurse-submodules=no']
+        if strategy != 'full':
+            args += ['--depth', '1']
+        if strategy == 'partial':
+            args.append('--filter=blob:none')
+        before = self._packs()
+        start = time.monotonic()
+        first_byte = run_transfer([*args, 'origin', f"+{ref}:refs/pins/{ref}"], self.path)
+        self._record('pin', strategy, self._received(before), time.monotonic() - start, first_byte)
+        return self.resolve(f"refs/pins/{ref}")
+
+    def ls_tree(self, ref: str = 'HEAD', paths: Iterable[str] = (), recursive: bool = True,
+                long: bool = False) -> list[TreeItem]:
+        """
+        List the entries of a commit's tree.
+
+        Args:
+            ref: Commit, branch or tag
+            paths: Restrict the listing to these paths (directories or files)
+            recursive: List files below subdirectories instead of the subdirectories
+            long: Also list blob sizes (TreeItem.size); a partial mirror
+                downloads every missing blob of the listing for this, one at
+                a time (prefetch() and sizes() don't)
+
+        Returns:
+            TreeItem per entry, in git's (path) order
+        """
+        args = ['ls-tree', '-z', '--full-tree'] + (['-r'] if recursive else []) + (['-l'] if long else [])
+        items = []
+        for record in self.git(*args, ref, '--', *paths).split(b'\0'):
+            if not record:
+                continue
+            meta, _, path = record.partition(b'\t')
+            fields = meta.decode('ascii').split()
+            size = int(fields[3]) if long and fields[3] != '-' else None
+            items.append(TreeItem(fields[0], fields[1], fields[2], path.decode('utf-8', errors='surrogateescape'), size))
+        return items
+
+    def ls_files(self, ref: str = 'HEAD') -> list[str]:
+        """
+        List the paths of every file in a commit's tree.
+
+        Cheaper than ls_tree() for large trees: only names are returned.
+        """
+        paths = self.git('ls-tree', '-z', '--full-tree', '-r', '--name-only', ref).decode(
+            'utf-8', errors='surrogateescape').split('\0')
+        paths.pop()
+        return paths
+
+    def read_blobs(self, names: Iterable[str]) -> list[Optional[bytes]]:
+        """
+        Read blob contents through the mirror's BlobReader.
+
+        Args:
+            names: Object names: blob ids or "<commit>:<path>"
+
+        Returns:
+            Contents in the order of names; None for names that don't
+            resolve to a blob (missing paths, submodules, directories)
+        """
+        return [contents for _, contents in self.blobs().iter_blobs(names)]
@@ -0,0 +1,101 @@
+"""
+File language detection.
+
+This module maps repository file paths to language names used for search
+facets, statistics and per-language heuristics. Detection is purely based on
+file names and extensions so it can run on paths alone (tree listings, digest
+FILE headers) without reading content.
+"""
+
+from pathlib import PurePosixPath
+
+
+# Extension (lowercase, with dot) to language name
+EXTENSION_LANGUAGES = {
+    '.py': 'Python', '.pyi': 'Python', '.pyx': 'Python',
+    '.js': 'JavaScript', '.mjs': 'JavaScript', '.cjs': 'JavaScript', '.jsx': 'JavaScript',
+    '.ts': 'TypeScript', '.tsx': 'TypeScript', '.mts': 'TypeScript', '.cts': 'TypeScript',
+    '.go': 'Go',
+    '.rs': 'Rust',
+    '.java': 'Java',
+    '.kt': 'Kotlin', '.kts': 'Kotlin',
+    '.scala': 'Scala',
+    '.rb': 'Ruby',
+    '.php': 'PHP',
+    '.cs': 'C#',
+    '.c': 'C', '.h': 'C',
+    '.cc': 'C++', '.cpp': 'C++', '.cxx': 'C++', '.hpp': 'C++', '.hh': 'C++',
+    '.swift': 'Swift',
+    '.m': 'Objective-C', '.mm': 'Objective-C',
+    '.dart': 'Dart',
+    '.ex': 'Elixir', '.exs': 'Elixir',
+    '.erl': 'Erlang',
+    '.hs': 'Haskell',
+    '.lua': 'Lua',
+    '.r': 'R',
+    '.jl': 'Julia',
+    '.sh': 'Shell', '.bash': 'Shell', '.zsh': 'Shell',
+    '.ps1': 'PowerShell',
+    '.sql': 'SQL',
+    '.html': 'HTML', '.htm': 'HTML',
+    '.css': 'CSS', '.scss': 'CSS', '.sass': 'CSS', '.less': 'CSS',
+    '.vue': 'Vue',
+    '.svelte': 'Svelte',
+    '.md': 'Markdown', '.mdx': 'Markdown', '.markdown': 'Markdown',
+    '.rst': 'reStructuredText',
+    '.txt': 'Text',
+    '.json': 'JSON',
+    '.yaml': 'YAML', '.yml': 'YAML',
+    '.toml': 'TOML',
+    '.ini': 'INI', '.cfg': 'INI',
+    '.xml': 'XML',
+    '.svg': 'SVG',
+    '.ipynb': 'Jupyter',
+    '.proto': 'Protobuf',
+    '.tf': 'Terraform',
+}
+
+# Exact file names (lowercase) that identify a language without an extension
+FILENAME_LANGUAGES = {
+    'dockerfile': 'Dockerfile',
+    'makefile': 'Makefile',
+    'gnumakefile': 'Makefile',
+    'cmakelists.txt': 'CMake',
+    'gemfile': 'Ruby',
+    'rakefile': 'Ruby',
+    'jenkinsfile': 'Groovy',
+}
+
+# Languages that represent program source (as opposed to docs, data, config)
+SOURCE_LANGUAGES = frozenset({
+    'Python', 'JavaScript', 'TypeScript', 'Go', 'Rust', 'Java', 'Kotlin', 'Scala',
+    'Ruby', 'PHP', 'C#', 'C', 'C++', 'Swift', 'Objective-C', 'Dart', 'Elixir',
+    'Erlang', 'Haskell', 'Lua', 'R', 'Julia', 'Shell', 'PowerShell', 'Vue', 'Svelte',
+})
+
+
+def detect_language(path: str) -> str:
+    """
+    Detect the language of a file from its path.
+
+    Args:
+        path: Repository-relative file path (POSIX or Windows separators)
+
+    Returns:
+        Language name, or 'Other' if unknown
+
+    Examples:
+        >>> detect_language("src/app/main.py")
+        'Python'
+        >>> detect_language("docker/Dockerfile")
+        'Dockerfile'
+        >>> detect_language("LICENSE")
+        'Other'
+    """
+    name = PurePosixPath(path.replace('\\', '/')).name.lower()
+    if name in FILENAME_LANGUAGES:
+        return FILENAME_LANGUAGES[name]
+    if name.startswith('dockerfile'):
+        return 'Dockerfile'
+    suffix = PurePosixPath(name).suffix
+    return EXTENSION_LANGUAGES.get(suffix, 'Other')
@@ -0,0 +1,221 @@
+"""
+Layered (progressive-disclosure) artifacts.
+
+Agents typically explore a repository in steps: the tree, then the README and
+package manifests, then the docs, then a code outline and finally the full
+source. This module derives all of those layers from a single full digest so
+that moving up a level is a local file read instead of a new extraction:
+
+    L0 tree      Directory tree annotated with file and directory sizes
+    L1 overview  README files and package manifests
+    L2 docs      Remaining documentation (Markdown, reStructuredText, docs/)
+    L3 outline   Code skeleton (signatures and docstrings, see outline.py)
+    L4 full      The full digest itself
+
+Every layer's token count is recorded in a JSON manifest.
+"""
+
+import json
+from collections import defaultdict
+from pathlib import Path, PurePosixPath
+from typing import Callable, NamedTuple, Optional
+from artifact_store import format_size
+from digest import format_section, iter_sections, parse_tree, read_section, read_tree
+from languages import detect_language
+from token_backends import get_backend
+import outline
+
+
+# Manifest file written next to the layer files
+LAYERS_MANIFEST = "layers.json"
+
+# (level, name, file name) for each layer; L4 is the digest itself
+LAYER_FILES = (
+    (0, 'tree', "layer-0-tree.txt"),
+    (1, 'overview', "layer-1-overview.txt"),
+    (2, 'docs', "layer-2-docs.txt"),
+    (3, 'outline', "layer-3-outline.txt"),
+)
+
+# Package manifests and build files that describe a project (lowercase)
+MANIFEST_NAMES = frozenset({
+    'pyproject.toml', 'setup.py', 'setup.cfg', 'requirements.txt', 'pipfile',
+    'package.json', 'cargo.toml', 'go.mod', 'gemfile', 'composer.json',
+    'pom.xml', 'build.gradle', 'build.gradle.kts', 'mix.exs', 'pubspec.yaml',
+    'cmakelists.txt', 'makefile', 'dockerfile',
+})
+
+# Languages treated as documentation for L2
+DOC_LANGUAGES = frozenset({'Markdown', 'reStructuredText', 'Text'})
+
+
+class Layer(NamedTuple):
+    """
+    One generated layer.
+
+    Attributes:
+        level: Layer level (0-4)
+        name: Layer name (tree, overview, docs, outline, full)
+        path: File holding the layer
+        files: Number of FILE sections in the layer (tree entries for L0)
+        tokens: Estimated token count of the layer file
+    """
+    level: int
+    name: str
+    path: Path
+    files: int
+    tokens: int
+
+
+def classify_path(path: str) -> Optional[int]:
+    """
+    Pick the content layer (1 or 2) a file belongs to.
+
+    Args:
+        path: Repository-relative file path
+
+    Returns:
+        1 for root READMEs and package manifests, 2 for documentation,
+        None for everything else (source code is covered by L3/L4)
+
+    Examples:
+        >>> classify_path("README.md")
+        1
+        >>> classify_path("docs/guide/install.md")
+        2
+        >>> classify_path("src/main.py") is None
+        True
+    """
+    pure = PurePosixPath(path)
+    name = pure.name.lower()
+    if name in MANIFEST_NAMES or (len(pure.parts) == 1 and name.startswith('readme')):
+        return 1
+    if detect_language(path) in DOC_LANGUAGES or pure.parts[0].lower() in ('docs', 'doc'):
+        return 2
+    return None
+
+
+def annotate_tree(tree: str, sizes: dict[str, int]) -> tuple[str, int]:
+    """
+    Append sizes to the entries of a digest's directory tree.
+
+    Directory sizes are the sum of the files below them. Files whose content
+    isn't in the digest (binary, too large) are left unannotated.
+
+    Args:
+        tree: Tree text as returned by digest.read_tree()
+        sizes: Content size in bytes per repository-relative file path
+
+    Returns:
+        Tuple of (annotated tree text, number of tree entries)
+    """
+    dir_sizes: dict[str, int] = defaultdict(int)
+    for path, size in sizes.items():
+        parts = path.split('/')[:-1]
+        dir_sizes[''] += size
+        for i in range(1, len(parts) + 1):
+            dir_sizes['/'.join(parts[:i]) + '/'] += size
+
+    entries = parse_tree(tree)
+    pending = iter(entries)
+    entry = next(pending, None)
+    lines = []
+    for line in tree.splitlines():
+        # parse_tree() keeps tree order, so entries line up with their lines
+        if entry is not None and line == entry.line:
+            size = dir_sizes.get(entry.path) if entry.is_dir else sizes.get(entry.path)
+            if size is not None:
+                line = f"{line} ({format_size(size)})"
+            entry = next(pending, None)
+        lines.append(line)
+    return '\n'.join(lines), len(entries)
+
+
+def build_layers(
+    digest_path: Path,
+    output_dir: Path,
+    workers: Optional[int] = None,
+    count_file: Optional[Callable[[Path], int]] = None,
+    transform: Optional[Callable[[str, str], Optional[str]]] = None
+) -> list[Layer]:
+    """
+    Write layers L0-L3 next to a full digest and describe all five layers.
+
+    Args:
+        digest_path: Full GitIngest digest (becomes L4)
+        output_dir: Directory for the layer files and manifest
+        workers: Worker processes for the L3 outline (default: CPU count)
+        count_file: Token counter for a layer file (default: the default
+            tokenizer backend, see token_backends.get_backend())
+        transform: Optional (path, content) -> text applied to L1 and L2
+            files before they are written; files mapped to None are left out
+
+    Returns:
+        Layers in level order, L0 through L4
+    """
+    digest_path = Path(digest_path)
+    output_dir = Path(output_dir)
+    paths = {level: output_dir / file_name for level, _, file_name in LAYER_FILES}
+    counts = {1: 0, 2: 0}
+    sizes: dict[str, int] = {}
+
+    # L1 and L2 in one streaming pass over the digest
+    with open(paths[1], 'w', encoding='utf-8') as overview, \
+            open(paths[2], 'w', encoding='utf-8') as docs:
+        targets = {1: overview, 2: docs}
+        for section in iter_sections(digest_path):
+            content = read_section(digest_path, section)
+            sizes[section.path] = len(content.encode('utf-8'))
+            level = classify_path(section.path)
+            if level is not None and transform is not None:
+                content = transform(section.path, content)
+                level = level if content is not None else None
+            if level is not None:
+                targets[level].write(format_section(section.path, content))
+                counts[level] += 1
+
+    tree, entries = annotate_tree(read_tree(digest_path), sizes)
+    paths[0].write_text(tree + '\n', encoding='utf-8')
+    stats = outline.outline_digest(digest_path, paths[3], workers=workers)
+
+    count_file = count_file or get_backend().count_file
+    counts.update({0: entries, 3: stats.files})
+    layers = [
+        Layer(level, name, paths[level], counts[level], count_file(paths[level]))
+        for level, name, _ in LAYER_FILES
+    ]
+    layers.append(Layer(4, 'full', digest_path, len(sizes), count_file(digest_path)))
+    return layers
+
+
+def write_manifest(layers: list[Layer], manifest_path: Path, url: str, tokenizer: Optional[str] = None) -> None:
+    """
+    Write the layer manifest as JSON.
+
+    Args:
+        layers: Layers returned by build_layers()
+        manifest_path: Where to write the manifest
+        url: Repository URL the layers were built from
+        tokenizer: Spec of the tokenizer that produced the token counts
+            (default: the resolved default tokenizer)
+    """
+    manifest = {
+        'url': url,
+        'tokenizer': tokenizer or get_backend().spec,
+        'layers': [
+            {
+                'level': layer.level,
+                'name': layer.name,
+                'file': str(layer.path),
+                'files': layer.files,
+                'tokens': layer.tokens,
+            }
+            for layer in layers
+        ],
+    }
+    Path(manifest_path).write_text(json.dumps(manifest, indent=2), encoding='utf-8')
+
+
+def load_manifest(manifest_path: Path) -> dict:
+    """Read a layer manifest written by write_manifest()."""
+    return json.loads(Path(manifest_path).read_text(encoding='utf-8'))
@@ -0,0 +1,373 @@
+"""
+Dependency manifest parsing into a normalized installation summary.
+
+The installation content of a repository mostly comes down to a few package
+manifests. This module parses the common ones into one compact summary:
+
+    {
+      "name": "fastapi",
+      "version": "0.110.0",
+      "manifests": ["pyproject.toml", "package.json"],
+      "runtimes": {"python": ">=3.8", "node": ">=18"},
+      "dependencies": {"python": ["starlette>=0.36.3,<0.37.0", ...], "node": [...]},
+      "dev_dependencies": {"python": ["pytest>=7.1.3"], "node": [...]},
+      "scripts": {"test": "vitest run"},
+      "entry_points": {"fastapi": "fastapi.cli:main"}
+    }
+
+Supported manifests (by file name): pyproject.toml (PEP 621 and Poetry),
+setup.py (literal setup() arguments, read with ast and never executed),
+setup.cfg, requirements*.txt, package.json, Cargo.toml and go.mod. A file
+that doesn't parse is listed under "errors" instead of failing the summary.
+"""
+
+import ast
+import configparser
+import json
+import re
+import tomllib
+from pathlib import PurePosixPath
+from typing import Callable
+
+
+# requirements*.txt lines that aren't requirements (options, includes)
+_REQUIREMENT_SKIP_RE = re.compile(r'^\s*(?:#|-|$)')
+
+# Leading package name of a PEP 508 requirement
+_REQUIREMENT_NAME_RE = re.compile(r'[A-Za-z0-9][A-Za-z0-9._-]*')
+
+# Optional-dependency groups (extras) holding development tools
+DEV_EXTRAS = frozenset({'dev', 'test', 'tests', 'testing', 'lint', 'docs', 'doc'})
+
+# go.mod require lines: "module version" (inside or outside a require block)
+_GO_REQUIRE_RE = re.compile(r'^\s*(?:require\s+)?([^\s()]+)\s+(v[^\s]+)(\s*//\s*indirect)?\s*$')
+
+
+def _empty_summary() -> dict:
+    return {
+        'name': None,
+        'version': None,
+        'manifests': [],
+        'runtimes': {},
+        'dependencies': {},
+        'dev_dependencies': {},
+        'scripts': {},
+        'entry_points': {},
+    }
+
+
+def _requirement_name(item: str) -> str:
+    """
+    Return the package name of a normalized requirement.
+
+    Examples:
+        >>> _requirement_name("click>=8.1"), _requirement_name("@types/node@^20"), _requirement_name("serde@1.0")
+        ('click', '@types/node', 'serde')
+    """
+    at = item.find('@', 1)
+    if at > 0:
+        return item[:at].strip().lower()
+    match = _REQUIREMENT_NAME_RE.match(item)
+    return (match.group(0) if match else item).lower()
+
+
+def _add(summary: dict, key: str, ecosystem: str, items) -> None:
+    """Append requirements to summary[key][ecosystem], keeping the first entry per package."""
+    items = [item.strip() for item in items if isinstance(item, str) and item.strip()]
+    if not items:
+        return
+    existing = summary[key].setdefault(ecosystem, [])
+    names = {_requirement_name(item) for item in existing}
+    for item in items:
+        name = _requirement_name(item)
+        if name not in names:
+            names.add(name)
+            existing.append(item)
+
+
+def _poetry_requirements(dependencies: dict) -> list[str]:
+    """Format Poetry-style {name: constraint} dependencies as requirement strings."""
+    items = []
+    for name, spec in dependencies.items():
+        if name == 'python':
+            continue
+        if isinstance(spec, dict):
+            spec = spec.get('version', '')
+        spec = str(spec or '').strip()
+        if not spec or spec == '*':
+            items.append(name)
+        elif spec[0] in '<>=!~':
+            items.append(f"{name}{spec}")
+        else:
+            items.append(f"{name} {spec}")
+    return items
+
+
+def parse_pyproject(text: str, summary: dict) -> None:
+    """Add a pyproject.toml (PEP 621 [project], Poetry, dependency groups) to a summary."""
+    data = tomllib.loads(text)
+    project = data.get('project', {})
+    poetry = data.get('tool', {}).get('poetry', {})
+    summary['name'] = summary['name'] or project.get('name') or poetry.get('name')
+    summary['version'] = summary['version'] or project.get('version') or poetry.get('version')
+
+    runtime = project.get('requires-python') or poetry.get('dependencies', {}).get('python')
+    if runtime:
+        summary['runtimes'].setdefault('python', runtime)
+    _add(summary, 'dependencies', 'python', project.get('dependencies', []))
+    _add(summary, 'dependencies', 'python', _poetry_requirements(poetry.get('dependencies', {})))
+    for extra, requirements in project.get('optional-dependencies', {}).items():
+        if extra in DEV_EXTRAS:
+            _add(summary, 'dev_dependencies', 'python', requirements)
+    for group in data.get('dependency-groups', {}).values():
+        _add(summary, 'dev_dependencies', 'python', [item for item in group if isinstance(item, str)])
+    _add(summary, 'dev_dependencies', 'python',
+         _poetry_requirements(poetry.get('group', {}).get('dev', {}).get('dependencies', {})))
+    _add(summary, 'dev_dependencies', 'python', _poetry_requirements(poetry.get('dev-dependencies', {})))
+
+    for table in (project.get('scripts', {}), project.get('gui-scripts', {}), poetry.get('scripts', {})):
+        for name, target in table.items():
+            summary['entry_points'].setdefault(name, target if isinstance(target, str) else str(target))
+
+
+def _setup_keywords(text: str) -> dict:
+    """Return the literal keyword arguments of the setup() call in a setup.py."""
+    for node in ast.walk(ast.parse(text)):
+        if not isinstance(node, ast.Call):
+            continue
+        func = node.func
+        name = func.id if isinstance(func, ast.Name) else func.attr if isinstance(func, ast.Attribute) else None
+        if name != 'setup':
+            continue
+        keywords = {}
+        for keyword in node.keywords:
+            if keyword.arg is None:
+                continue
+            try:
+                keywords[keyword.arg] = ast.literal_eval(keyword.value)
+            except ValueError:
+                pass
+        return keywords
+    return {}
+
+
+def _console_scripts(entry_points) -> dict[str, str]:
+    """Map console script names to targets from setuptools entry_points (dict or INI text)."""
+    if isinstance(entry_points, str):
+        parser = configparser.ConfigParser()
+        parser.read_string(entry_points)
+        entry_points = {section: parser.items(section) for section in parser.sections()}
+    scripts = {}
+    for group in ('console_scripts', 'gui_scripts'):
+        specs = entry_points.get(group, []) if isinstance(entry_points, dict) else []
+        if isinstance(specs, str):
+            specs = specs.strip().splitlines()
+        for spec in specs:
+            name, _, target = spec.partition('=') if isinstance(spec, str) else spec
+            if target:
+                scripts[name.strip()] = target.strip()
+    return scripts
+
+
+def parse_setup_py(text: str, summary: dict) -> None:
+    """Add the literal setup() arguments of a setup.py to a summary."""
+    keywords = _setup_keywords(text)
+    summary['name'] = summary['name'] or keywords.get('name')
+    summary['version'] = summary['version'] or keywords.get('version')
+    if keywords.get('python_requires'):
+        summary['runtimes'].setdefault('python', keywords['python_requires'])
+    _add(summary, 'dependencies', 'python', keywords.get('install_requires', []))
+    _add(summary, 'dev_dependencies', 'python', keywords.get('tests_require', []))
+    for name, target in _console_scripts(keywords.get('entry_points', {})).items():
+        summary['entry_points'].setdefault(name, target)
+
+
+def parse_setup_cfg(text: str, summary: dict) -> None:
+    """Add the [metadata] and [options] of a setup.cfg to a summary."""
+    parser = configparser.ConfigParser(interpolation=None)
+    parser.read_string(text)
+    summary['name'] = summary['name'] or parser.get('metadata', 'name', fallback=None)
+    summary['version'] = summary['version'] or parser.get('metadata', 'version', fallback=None)
+    runtime = parser.get('options', 'python_requires', fallback=None)
+    if runtime:
+        summary['runtimes'].setdefault('python', runtime.strip())
+    requires = parser.get('options', 'install_requires', fallback='')
+    _add(summary, 'dependencies', 'python', [line.strip() for line in requires.splitlines()])
+    if parser.has_section('options.entry_points'):
+        groups = {key: value.strip().splitlines() for key, value in parser.items('options.entry_points')}
+        for name, target in _console_scripts(groups).items():
+            summary['entry_points'].setdefault(name, target)
+
+
+def parse_requirements(text: str, summary: dict, dev: bool = False) -> None:
+    """Add the requirements of a requirements*.txt to a summary (dev ones if dev)."""
+    requirements = [
+        line.split(' #')[0].strip() for line in text.splitlines() if not _REQUIREMENT_SKIP_RE.match(line)
+    ]
+    _add(summary, 'dev_dependencies' if dev else 'dependencies', 'python', requirements)
+
+
+def parse_package_json(text: str, summary: dict) -> None:
+    """Add a package.json (engines, dependencies, scripts, bin) to a summary."""
+    data = json.loads(text)
+    summary['name'] = summary['name'] or data.get('name')
+    summary['version'] = summary['version'] or data.get('version')
+    node = data.get('engines', {}).get('node')
+    if node:
+        summary['runtimes'].setdefault('node', node)
+    _add(summary, 'dependencies', 'node', [f"{name}@{spec}" for name, spec in data.get('dependencies', {}).items()])
+    _add(summary, 'dev_dependencies', 'node',
+         [f"{name}@{spec}" for name, spec in data.get('devDependencies', {}).items()])
+    for name, command in data.get('scripts', {}).items():
+        summary['scripts'].setdefault(name, command)
+    binaries = data.get('bin', {})
+    if isinstance(binaries, str):
+        binaries = {data.get('name', 'bin').split('/')[-1]: binaries}
+    for name, target in binaries.items():
+        summary['entry_points'].setdefault(name, target)
+
+
+def parse_cargo_toml(text: str, summary: dict) -> None:
+    """Add a Cargo.toml ([package], dependencies, [[bin]]) to a summary."""
+    data = tomllib.loads(text)
+    package = data.get('package', {})
+    summary['name'] = summary['name'] or package.get('name')
+    version = package.get('version')
+    summary['version'] = summary['version'] or (version if isinstance(version, str) else None)
+    if package.get('rust-version'):
+        summary['runtimes'].setdefault('rust', f">={package['rust-version']}")
+    elif package.get('edition'):
+        summary['runtimes'].setdefault('rust', f"edition {package['edition']}")
+
+    def specs(table: dict) -> list[str]:
+        return [
+            f"{name}@{spec if isinstance(spec, str) else spec.get('version', '*')}"
+            for name, spec in table.items()
+        ]
+    _add(summary, 'dependencies', 'rust', specs(data.get('dependencies', {})))
+    _add(summary, 'dev_dependencies', 'rust', specs(data.get('dev-dependencies', {})))
+    for binary in data.get('bin', []):
+        if 'name' in binary:
+            summary['entry_points'].setdefault(binary['name'], binary.get('path', f"src/bin/{binary['name']}.rs"))
+
+
+def parse_go_mod(text: str, summary: dict) -> None:
+    """Add a go.mod to a summary; indirect requirements count as dev dependencies."""
+    in_require = False
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped.startswith('module '):
+            summary['name'] = summary['name'] or stripped.split()[1]
+        elif stripped.startswith('go '):
+            summary['runtimes'].setdefault('go', f">={stripped.split()[1]}")
+        elif stripped.startswith('require ('):
+            in_require = True
+        elif in_require and stripped == ')':
+            in_require = False
+        elif in_require or stripped.startswith('require '):
+            match = _GO_REQUIRE_RE.match(stripped)
+            if match:
+                key = 'dev_dependencies' if match.group(3) else 'dependencies'
+                _add(summary, key, 'go', [f"{match.group(1)}@{match.group(2)}"])
+
+
+# Manifest file name (lowercase) to parser
+MANIFEST_PARSERS: dict[str, Callable[[str, dict], None]] = {
+    'pyproject.toml': parse_pyproject,
+    'setup.py': parse_setup_py,
+    'setup.cfg': parse_setup_cfg,
+    'package.json': parse_package_json,
+    'cargo.toml': parse_cargo_toml,
+    'go.mod': parse_go_mod,
+}
+
+
+def manifest_parser(path: str) -> Callable[[str, dict], None] | None:
+    """
+    Return the parser of a manifest path, or None if it isn't a supported manifest.
+
+    Examples:
+        >>> manifest_parser("pyproject.toml").__name__
+        'parse_pyproject'
+        >>> manifest_parser("requirements-dev.txt") is not None
+        True
+        >>> manifest_parser("README.md") is None
+        True
+    """
+    name = PurePosixPath(path).name.lower()
+    if name in MANIFEST_PARSERS:
+        return MANIFEST_PARSERS[name]
+    if name.startswith('requirements') and name.endswith('.txt'):
+        dev = any(marker in name for marker in ('dev', 'test', 'lint', 'doc'))
+        return lambda text, summary: parse_requirements(text, summary, dev=dev)
+    return None
+
+
+def summarize_manifests(files: dict[str, str]) -> dict:
+    """
+    Parse manifests into one normalized summary.
+
+    Manifests are applied in MANIFEST_PARSERS order (pyproject.toml first),
+    then requirements files; the name, version, runtimes and entry points of
+    earlier manifests win. Other files are ignored.
+
+    Args:
+        files: File contents by repository-relative path
+
+    Returns:
+        Summary dict (see the module docstring); unparseable files are
+        listed under 'errors' with the reason
+    """
+    order = list(MANIFEST_PARSERS)
+
+    def rank(path: str) -> tuple[int, str]:
+        name = PurePosixPath(path).name.lower()
+        return (order.index(name) if name in order else len(order), path)
+
+    summary = _empty_summary()
+    errors = {}
+    for path in sorted(files, key=rank):
+        parser = manifest_parser(path)
+        if parser is None:
+            continue
+        text = files[path]
+        try:
+            parser(text, summary)
+        except (ValueError, SyntaxError, TypeError, AttributeError, KeyError, configparser.Error) as e:
+            errors[path] = f"{type(e).__name__}: {e}"
+            continue
+        summary['manifests'].append(path)
+    if errors:
+        summary['errors'] = errors
+    return summary
+
+
+def format_summary(summary: dict) -> str:
+    """
+    Format a summary as a compact plain-text block.
+
+    Examples:
+        >>> print(format_summary({'name': 'tool', 'version': '1.0', 'manifests': ['pyproject.toml'],
+        ...                       'runtimes': {'python': '>=3.10'}, 'dependencies': {'python': ['click>=8']},
+        ...                       'dev_dependencies': {}, 'scripts': {}, 'entry_points': {'tool': 'tool.cli:main'}}))
+        Installation summary: tool 1.0 (pyproject.toml)
+          runtime: python >=3.10
+          dependencies (python): click>=8
+          entry points: tool = tool.cli:main
+    """
+    title = ' '.join(str(part) for part in (summary['name'], summary['version']) if part)
+    lines = [f"Installation summary: {title or '(unnamed)'} ({', '.join(summary['manifests']) or 'no manifests'})"]
+    if summary['runtimes']:
+        lines.append("  runtime: " + ', '.join(f"{name} {spec}" for name, spec in summary['runtimes'].items()))
+    for key, label in (('dependencies', 'dependencies'), ('dev_dependencies', 'dev dependencies')):
+        for ecosystem, items in summary[key].items():
+            lines.append(f"  {label} ({ecosystem}): {', '.join(items)}")
+    if summary['scripts']:
+        lines.append("  scripts: " + ', '.join(f"{name} = {command}" for name, command in summary['scripts'].items()))
+    if summary['entry_points']:
+        lines.append("  entry points: " + ', '.join(
+            f"{name} = {target}" for name, target in summary['entry_points'].items()
+        ))
+    for path, error in summary.get('errors', {}).items():
+        lines.append(f"  unparsed: {path} ({error})")
+    return '\n'.join(lines)
@@ -0,0 +1,399 @@
+"""
+Code skeleton (outline) extraction.
+
+This module reduces source files to their API surface: module docstrings,
+class and function signatures with their docstrings, and declared fields.
+Function bodies are dropped. Python is parsed with the standard library ast
+module; other languages use lightweight line-based parsers registered in
+OUTLINE_PARSERS, so new languages can be plugged in with register_parser().
+
+Outlining a digest parses its FILE sections in parallel across a process pool.
+"""
+
+import ast
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional
+from digest import format_section, iter_sections, read_section
+from languages import detect_language
+from token_counter import estimate_tokens
+
+
+# Number of files handed to a worker process at a time
+CHUNK_SIZE = 32
+
+# Chunks submitted ahead per worker process: enough to keep every worker busy,
+# while the source text held in memory stays bounded however large the digest
+PENDING_CHUNKS_PER_WORKER = 2
+
+
+# Python (ast-based)
+
+def _docstring_lines(doc: str, indent: str) -> list[str]:
+    """Render a docstring as a triple-quoted literal at the given indent."""
+    doc_lines = doc.strip().splitlines() or ['']
+    if len(doc_lines) == 1:
+        return [f'{indent}"""{doc_lines[0]}"""']
+    rendered = [f'{indent}"""{doc_lines[0]}']
+    rendered.extend(f"{indent}{line}" if line.strip() else '' for line in doc_lines[1:])
+    rendered.append(f'{indent}"""')
+    return rendered
+
+
+def _short_unparse(node: ast.AST, limit: int = 80) -> str:
+    """Unparse a node, collapsing long values to '...'."""
+    text = ast.unparse(node)
+    return text if len(text) <= limit else '...'
+
+
+def _outline_python_node(node: ast.AST, indent: str, out: list[str]) -> None:
+    """Append the outline of one statement to out."""
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+        for decorator in node.decorator_list:
+            out.append(f"{indent}@{ast.unparse(decorator)}")
+        prefix = 'async def' if isinstance(node, ast.AsyncFunctionDef) else 'def'
+        returns = f" -> {ast.unparse(node.returns)}" if node.returns else ''
+        out.append(f"{indent}{prefix} {node.name}({ast.unparse(node.args)}){returns}:")
+        doc = ast.get_docstring(node)
+        if doc:
+            out.extend(_docstring_lines(doc, indent + '    '))
+        out.append(f"{indent}    ...")
+
+    elif isinstance(node, ast.ClassDef):
+        for decorator in node.decorator_list:
+            out.append(f"{indent}@{ast.unparse(decorator)}")
+        bases = [ast.unparse(base) for base in node.bases]
+        bases += [f"{kw.arg}={ast.unparse(kw.value)}" if kw.arg else f"**{ast.unparse(kw.value)}"
+                  for kw in node.keywords]
+        out.append(f"{indent}class {node.name}({', '.join(bases)}):" if bases
+                   else f"{indent}class {node.name}:")
+        start = len(out)
+        doc = ast.get_docstring(node)
+        if doc:
+            out.extend(_docstring_lines(doc, indent + '    '))
+        for child in node.body:
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                _outline_python_node(child, indent + '    ', out)
+            elif isinstance(child, ast.AnnAssign):
+                value = f" = {_short_unparse(child.value)}" if child.value else ''
+                out.append(f"{indent}    {ast.unparse(child.target)}: {ast.unparse(child.annotation)}{value}")
+        if len(out) == start:
+            out.append(f"{indent}    ...")
+
+    elif isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name):
+        value = f" = {_short_unparse(node.value)}" if node.value else ''
+        out.append(f"{indent}{node.target.id}: {ast.unparse(node.annotation)}{value}")
+
+    elif isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+        # Module constants and __all__ are part of the API surface
+        name = node.targets[0].id
+        if name == '__all__' or name.isupper():
+            out.append(f"{indent}{name} = {_short_unparse(node.value)}")
+
+
+def outline_python(source: str) -> str:
+    """
+    Outline Python source with the ast module.
+
+    Args:
+        source: Python source code
+
+    Returns:
+        Outline with docstrings, signatures and class fields; bodies become '...'
+
+    Raises:
+        SyntaxError: If the source cannot be parsed
+
+    Examples:
+        >>> print(outline_python("def add(a, b):\\n    return a + b\\n"))
+        def add(a, b):
+            ...
+    """
+    tree = ast.parse(source)
+    out: list[str] = []
+    doc = ast.get_docstring(tree)
+    if doc:
+        out.extend(_docstring_lines(doc, ''))
+    for node in tree.body:
+        before = len(out)
+        _outline_python_node(node, '', out)
+        # Blank line between top-level definitions for readability
+        if len(out) > before and isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            out.append('')
+    return '\n'.join(out).rstrip('\n')
+
+
+# Brace-delimited languages (line-based)
+
+class BraceLanguage(NamedTuple):
+    """
+    Declaration patterns for a brace-delimited language.
+
+    Attributes:
+        declaration: Matches lines that start a declaration worth keeping
+        container: Matches declarations whose members should be scanned (class, impl)
+        keep_body: Matches declarations whose body is API surface (struct, interface)
+        comment: Matches doc comment lines preceding a declaration
+    """
+    declaration: re.Pattern
+    container: re.Pattern
+    keep_body: re.Pattern
+    comment: re.Pattern
+
+
+# Maximum body lines kept for struct/interface-like declarations
+MAX_BODY_LINES = 60
+
+_CONTROL_WORDS = r'(?!(?:if|for|while|switch|catch|return|else|do|try|new|throw)\b)'
+
+JAVASCRIPT = BraceLanguage(
+    declaration=re.compile(
+        r'^\s*(?:export\s+)?(?:default\s+)?(?:declare\s+)?(?:abstract\s+)?'
+        r'(?:(?:async\s+)?function\b|class\b|interface\b|type\s+\w+|enum\b|namespace\b'
+        r'|(?:const|let|var)\s+\w+\s*(?::[^=]+)?=\s*(?:async\s*)?(?:\([^)]*\)|\w+)\s*(?::[^=]+)?=>'
+        r'|(?:public\s+|private\s+|protected\s+|static\s+|readonly\s+|async\s+|get\s+|set\s+)*'
+        + _CONTROL_WORDS + r'[A-Za-z_$][\w$]*\s*(?:<[^>]*>)?\([^;]*$)'
+    ),
+    container=re.compile(r'^\s*(?:export\s+)?(?:default\s+)?(?:declare\s+)?(?:abstract\s+)?(?:class|namespace)\b'),
+    keep_body=re.compile(r'^\s*(?:export\s+)?(?:declare\s+)?(?:interface|type|enum)\b'),
+    comment=re.compile(r'^\s*(?:/\*\*|\*|\*/|//)'),
+)
+
+GO = BraceLanguage(
+    declaration=re.compile(r'^(?:func|type|var|const)\b'),
+    container=re.compile(r'(?!)'),
+    keep_body=re.compile(r'^type\s+\w+.*\b(?:struct|interface)\s*\{'),
+    comment=re.compile(r'^//'),
+)
+
+RUST = BraceLanguage(
+    declaration=re.compile(
+        r'^\s*(?:pub(?:\([\w:]+\))?\s+)?(?:async\s+)?(?:const\s+)?(?:unsafe\s+)?(?:extern\s+"\w+"\s+)?'
+        r'(?:fn|struct|enum|trait|impl|mod|type|const|static|macro_rules!)\b'
+    ),
+    container=re.compile(r'^\s*(?:pub(?:\([\w:]+\))?\s+)?(?:unsafe\s+)?(?:impl|trait|mod)\b'),
+    keep_body=re.compile(r'^\s*(?:pub(?:\([\w:]+\))?\s+)?(?:struct|enum)\b'),
+    comment=re.compile(r'^\s*(?://[/!]|#\[)'),
+)
+
+
+def _brace_delta(line: str) -> int:
+    return line.count('{') - line.count('}')
+
+
+def outline_braced(source: str, language: BraceLanguage) -> str:
+    """
+    Outline a brace-delimited source file with declaration patterns.
+
+    Declarations are kept with their preceding doc comments. Function bodies
+    are replaced by '{ ... }', struct-like bodies are kept (up to
+    MAX_BODY_LINES) and container bodies (classes, impl blocks) are scanned
+    for member declarations.
+
+    Args:
+        source: Source code
+        language: Declaration patterns for the language
+
+    Returns:
+        Outline text
+    """
+    lines = source.splitlines()
+    out: list[str] = []
+    comments: list[str] = []
+    depth = 0
+    containers: list[int] = []  # depth inside each open container
+    i = 0
+
+    while i < len(lines):
+        line = lines[i]
+
+        if language.comment.match(line):
+            comments.append(line)
+            i += 1
+            continue
+
+        if not language.declaration.match(line):
+            comments = []
+            depth += _brace_delta(line)
+            while containers and depth < containers[-1]:
+                containers.pop()
+                out.append(line[:len(line) - len(line.lstrip())] + '}')
+            i += 1
+            continue
+
+        # Collect a (possibly multi-line) signature up to '{' or ';'
+        signature = [line]
+        while '{' not in signature[-1] and ';' not in signature[-1] \
+                and not signature[-1].rstrip().endswith('=>') and i + 1 < len(lines) and len(signature) < 10:
+            i += 1
+            signature.append(lines[i])
+        i += 1
+
+        out.extend(comments)
+        comments = []
+        delta = sum(_brace_delta(part) for part in signature)
+
+        if '{' not in signature[-1] or delta <= 0:
+            # Declaration without a body (or a one-liner)
+            out.extend(signature)
+            continue
+
+        if language.container.match(line):
+            out.extend(signature)
+            depth += delta
+            containers.append(depth)
+            continue
+
+        keep = language.keep_body.match(line)
+        if not keep:
+            last = signature[-1]
+            signature[-1] = last[:last.rfind('{')].rstrip() + ' { ... }'
+        out.extend(signature)
+
+        # Consume the body until its braces balance
+        body_depth = delta
+        kept = 0
+        while i < len(lines) and body_depth > 0:
+            body_depth += _brace_delta(lines[i])
+            if keep:
+                if kept < MAX_BODY_LINES or body_depth <= 0:
+                    out.append(lines[i])
+                elif kept == MAX_BODY_LINES:
+                    out.append(line[:len(line) - len(line.lstrip())] + '    ...')
+                kept += 1
+            i += 1
+
+    return '\n'.join(out).rstrip('\n')
+
+
+# Parser registry
+
+OUTLINE_PARSERS: dict[str, Callable[[str], str]] = {
+    'Python': outline_python,
+    'JavaScript': partial(outline_braced, language=JAVASCRIPT),
+    'TypeScript': partial(outline_braced, language=JAVASCRIPT),
+    'Go': partial(outline_braced, language=GO),
+    'Rust': partial(outline_braced, language=RUST),
+}
+
+
+def register_parser(language: str, parser: Callable[[str], str]) -> None:
+    """
+    Register (or replace) the outline parser for a language.
+
+    Worker processes inherit registrations made before outlining starts on
+    platforms that fork; where workers are spawned, register parsers at
+    import time of a module the workers also import.
+
+    Args:
+        language: Language name as returned by languages.detect_language()
+        parser: Callable taking source text and returning its outline
+    """
+    OUTLINE_PARSERS[language] = parser
+
+
+def outline_file(path: str, source: str) -> Optional[str]:
+    """
+    Outline one source file.
+
+    Args:
+        path: Repository-relative path (selects the parser by language)
+        source: File content
+
+    Returns:
+        Outline text, or None if no parser is registered for the language.
+        Python files that fail to parse are reduced to their def and class
+        lines and top-level decorators, so a partial outline is still
+        produced; files of other languages that fail to parse return None.
+    """
+    language = detect_language(path)
+    parser = OUTLINE_PARSERS.get(language)
+    if parser is None:
+        return None
+    try:
+        return parser(source)
+    except (SyntaxError, ValueError, RecursionError):
+        if language == 'Python':
+            kept = [line for line in source.splitlines()
+                    if re.match(r'\s*(?:async\s+def|def|class)\s', line) or line.startswith('@')]
+            return '\n'.join(kept)
+        return None
+
+
+def _outline_item(item: tuple[str, str]) -> tuple[str, Optional[str], int]:
+    """Worker entry point: outline one (path, source) pair."""
+    path, source = item
+    return path, outline_file(path, source), estimate_tokens(source)
+
+
+class OutlineStats(NamedTuple):
+    """Summary of an outline run."""
+    files: int
+    skipped: int
+    source_tokens: int
+    outline_tokens: int
+
+
+def _iter_items(digest_path: Path) -> Iterator[tuple[str, str]]:
+    with open(digest_path, 'rb') as digest:
+        for section in iter_sections(digest_path):
+            yield section.path, read_section(digest, section)
+
+
+def _outline_chunk(items: list[tuple[str, str]]) -> list[tuple[str, Optional[str], int]]:
+    return [_outline_item(item) for item in items]
+
+
+def _map_outline(items: Iterable[tuple[str, str]], workers: Optional[int]) -> Iterator[tuple[str, Optional[str], int]]:
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        yield from map(_outline_item, items)
+        return
+    items = iter(items)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Unlike pool.map(), which reads every item up front, only a few chunks
+        # per worker are read ahead; results come back in submission order, so
+        # the outline keeps the digest's file order
+        pending = deque()
+        while True:
+            while len(pending) < workers * PENDING_CHUNKS_PER_WORKER:
+                chunk = list(islice(items, CHUNK_SIZE))
+                if not chunk:
+                    break
+                pending.append(pool.submit(_outline_chunk, chunk))
+            if not pending:
+                return
+            yield from pending.popleft().result()
+
+
+def outline_digest(source_digest: Path, output_file: Path, workers: Optional[int] = None) -> OutlineStats:
+    """
+    Write an outline digest for every parseable FILE section of a digest.
+
+    Sections are parsed in parallel across a process pool and written in the
+    original order. Files without a registered parser are left out.
+
+    Args:
+        source_digest: Digest containing full source files
+        output_file: Where to write the outline digest
+        workers: Worker processes (default: CPU count; 1 parses in-process)
+
+    Returns:
+        OutlineStats with file counts and token totals before/after
+    """
+    files = skipped = source_tokens = outline_tokens = 0
+    with open(output_file, 'w', encoding='utf-8') as f:
+        for path, outline, tokens in _map_outline(_iter_items(Path(source_digest)), workers):
+            if outline is None:
+                skipped += 1
+                continue
+            files += 1
+            source_tokens += tokens
+            outline_tokens += estimate_tokens(outline)
+            f.write(format_section(path, outline))
+    return OutlineStats(files, skipped, source_tokens, outline_tokens)
@@ -0,0 +1,364 @@
+"""
+Prefilter for generated, vendored and binary-like content.
+
+Lockfiles, minified bundles, vendored dependencies, SVGs and snapshot
+fixtures often make up most of a repository's tokens while telling an agent
+little about it. The prefilter classifies every file before its content is
+written and drops it or replaces it with a one-line stub:
+
+    [... 48,210 tokens omitted: dependency lockfile ...]
+
+Each file is classified by its path first (lockfile names, vendor
+directories, generated-code suffixes) and then by cheap statistics of its
+first SNIFF_CHARS characters: average line length, character entropy and the
+ratio of non-printable characters. The prefilter keeps a report of the files
+and tokens each rule removed.
+
+It works on whole sections (Prefilter.apply, for modes that already hold a
+file's text) and on digests streamed in pieces (Prefilter.filter_pieces, which
+buffers at most SNIFF_CHARS per file).
+"""
+
+import math
+import re
+from collections import Counter
+from fnmatch import fnmatchcase
+from typing import BinaryIO, Iterable, Iterator, NamedTuple, Optional
+from digest import iter_stream_pieces
+from exceptions import ValidationError
+from token_backends import TokenizerBackend, get_backend
+from token_estimator import MINIFIED_LINE_LENGTH
+
+
+class Rule(NamedTuple):
+    """
+    Prefilter rule.
+
+    Attributes:
+        name: Rule name used in reports
+        action: 'drop' (remove the file) or 'stub' (replace its content)
+        description: What the rule matches, shown in stubs
+    """
+    name: str
+    action: str
+    description: str
+
+
+# Rules in evaluation order (the first match wins)
+RULES = (
+    Rule('vendored', 'drop', 'vendored dependency'),
+    Rule('lockfile', 'stub', 'dependency lockfile'),
+    Rule('generated', 'stub', 'generated code'),
+    Rule('snapshot', 'stub', 'test snapshot'),
+    Rule('svg', 'stub', 'SVG image'),
+    Rule('binary', 'drop', 'binary-like content'),
+    Rule('minified', 'stub', 'minified bundle'),
+    Rule('encoded', 'stub', 'encoded data'),
+)
+
+RULE_NAMES = tuple(rule.name for rule in RULES)
+
+# Directories whose content is third-party code
+VENDOR_DIRS = frozenset({
+    'vendor', 'vendors', 'node_modules', 'bower_components', 'third_party',
+    'third-party', 'thirdparty', 'external', 'Pods', 'site-packages', '.yarn',
+})
+
+LOCKFILE_NAMES = frozenset({
+    'package-lock.json', 'npm-shrinkwrap.json', 'yarn.lock', 'pnpm-lock.yaml',
+    'bun.lockb', 'poetry.lock', 'Pipfile.lock', 'uv.lock', 'pdm.lock',
+    'Cargo.lock', 'Gemfile.lock', 'composer.lock', 'go.sum', 'mix.lock',
+    'pubspec.lock', 'Podfile.lock', 'flake.lock', 'packages.lock.json',
+})
+
+GENERATED_GLOBS = (
+    '*_pb2.py', '*_pb2_grpc.py', '*.pb.go', '*.pb.cc', '*.pb.h', '*.g.dart',
+    '*.generated.*', '*.gen.go', '*.designer.cs',
+)
+
+MINIFIED_GLOBS = ('*.min.js', '*.min.css', '*.min.mjs', '*.bundle.js', '*.map')
+
+# Markers of generated code, looked for near the top of a file
+GENERATED_MARKER_RE = re.compile(
+    r'@generated|DO NOT EDIT|auto-?generated|Code generated by',
+    re.IGNORECASE
+)
+GENERATED_HEADER_CHARS = 1000
+
+# Characters of a file the content statistics are computed on
+SNIFF_CHARS = 64 * 1024
+
+# Content rules only apply to files with at least this many characters
+MIN_STATS_CHARS = 1024
+
+# Share of non-printable characters above which content counts as binary
+NONPRINTABLE_RATIO = 0.05
+
+# Character entropy (bits) above which content counts as encoded data
+# (base64 is close to 6 bits; source code stays below 5.5, Makefiles just above)
+ENCODED_ENTROPY = 5.8
+
+# Replacement for the content of a stubbed file
+STUB = "[... {tokens:,} tokens omitted: {description} ...]"
+
+
+class ContentStats(NamedTuple):
+    """
+    Cheap statistics of a piece of text.
+
+    Attributes:
+        chars: Characters
+        lines: Lines
+        mean_line_length: Average characters per line
+        entropy: Shannon entropy of the character distribution, in bits
+        nonprintable: Share of control and replacement characters
+    """
+    chars: int
+    lines: int
+    mean_line_length: float
+    entropy: float
+    nonprintable: float
+
+
+def content_stats(text: str) -> ContentStats:
+    """
+    Compute the content statistics of a text.
+
+    Examples:
+        >>> stats = content_stats("abab\\n")
+        >>> stats.lines, stats.entropy
+        (1, 1.5219280948873621)
+    """
+    chars = len(text)
+    if not chars:
+        return ContentStats(0, 0, 0.0, 0.0, 0.0)
+    lines = text.count('\n') + (not text.endswith('\n'))
+    counts = Counter(text)
+    entropy = -sum(n / chars * math.log2(n / chars) for n in counts.values())
+    nonprintable = sum(
+        n for char, n in counts.items()
+        if (char < ' ' and char not in '\t\n\r\f') or char in '\x7f\ufffd'
+    )
+    return ContentStats(chars, lines, chars / lines, entropy, nonprintable / chars)
+
+
+def _matches(name: str, globs: Iterable[str]) -> bool:
+    return any(fnmatchcase(name, glob) for glob in globs)
+
+
+def classify(path: str, text: str = '', rules: Iterable[str] = RULE_NAMES) -> Optional[Rule]:
+    """
+    Return the first rule a file matches, or None to keep it.
+
+    Args:
+        path: Repository-relative path
+        text: Content (only the first SNIFF_CHARS characters are looked at)
+        rules: Names of the rules to apply (default: all)
+
+    Examples:
+        >>> classify("web/package-lock.json").name
+        'lockfile'
+        >>> classify("src/main.py", "def main():\\n    pass\\n") is None
+        True
+    """
+    enabled = set(rules)
+    parts = path.split('/')
+    name = parts[-1]
+    directories = parts[:-1]
+    sniff = text[:SNIFF_CHARS]
+    stats = content_stats(sniff) if len(sniff) >= MIN_STATS_CHARS else None
+
+    checks = {
+        'vendored': lambda: any(part in VENDOR_DIRS for part in directories),
+        'lockfile': lambda: name in LOCKFILE_NAMES,
+        'generated': lambda: _matches(name, GENERATED_GLOBS)
+            or bool(GENERATED_MARKER_RE.search(sniff[:GENERATED_HEADER_CHARS])),
+        'snapshot': lambda: '__snapshots__' in directories or name.endswith('.snap'),
+        'svg': lambda: name.lower().endswith('.svg'),
+        'minified': lambda: _matches(name, MINIFIED_GLOBS)
+            or (stats is not None and stats.mean_line_length > MINIFIED_LINE_LENGTH),
+        'binary': lambda: stats is not None and stats.nonprintable > NONPRINTABLE_RATIO,
+        'encoded': lambda: stats is not None and stats.entropy > ENCODED_ENTROPY,
+    }
+    for rule in RULES:
+        if rule.name in enabled and checks[rule.name]():
+            return rule
+    return None
+
+
+class Prefilter:
+    """
+    Drops or stubs files matched by the prefilter rules and reports the savings.
+
+    Examples:
+        >>> prefilter = Prefilter(tokenizer='heuristic')
+        >>> prefilter.apply("yarn.lock", "lodash@4.17.21:\\n" * 1000)
+        '[... 4,000 tokens omitted: dependency lockfile ...]'
+        >>> prefilter.report()['tokens']
+        3988
+    """
+
+    def __init__(self, tokenizer: "str | TokenizerBackend | None" = None, rules: Optional[Iterable[str]] = None):
+        """
+        Args:
+            tokenizer: Tokenizer backend or spec measuring the savings
+            rules: Names of the rules to apply (default: all)
+
+        Raises:
+            ValidationError: If a rule name is unknown
+        """
+        self.backend = get_backend(tokenizer)
+        self.rules = tuple(rules) if rules is not None else RULE_NAMES
+        unknown = [name for name in self.rules if name not in RULE_NAMES]
+        if unknown:
+            raise ValidationError(
+                f"Unknown prefilter rule: {', '.join(unknown)}. Valid rules: {', '.join(RULE_NAMES)}"
+            )
+        self.savings: dict[str, list[int]] = {}  # rule name -> [files, tokens saved]
+
+    def classify(self, path: str, text: str = '') -> Optional[Rule]:
+        """Return the enabled rule a file matches, or None to keep it."""
+        return classify(path, text, self.rules)
+
+    def _record(self, rule: Rule, saved: int) -> None:
+        entry = self.savings.setdefault(rule.name, [0, 0])
+        entry[0] += 1
+        entry[1] += saved
+
+    def _stub(self, rule: Rule, tokens: int) -> str:
+        return STUB.format(tokens=tokens, description=rule.description)
+
+    def apply(self, path: str, text: str, stub: bool = True) -> Optional[str]:
+        """
+        Filter one file.
+
+        Args:
+            path: Repository-relative path
+            text: File content
+            stub: Replace stubbed files with a stub (False drops them too)
+
+        Returns:
+            The text unchanged, a stub, or None if the file is dropped
+        """
+        rule = self.classify(path, text)
+        if rule is None:
+            return text
+        tokens = self.backend.count(text, path)
+        if rule.action == 'drop' or not stub:
+            self._record(rule, tokens)
+            return None
+        replacement = self._stub(rule, tokens)
+        self._record(rule, tokens - self.backend.count(replacement, path))
+        return replacement
+
+    def filter_pieces(
+        self,
+        pieces: Iterable[tuple[Optional[str], bytes, bool]]
+    ) -> Iterator[tuple[Optional[str], bytes, bool]]:
+        """
+        Filter a digest streamed as pieces (see digest.iter_stream_pieces).
+
+        Each section is held back until SNIFF_CHARS characters (or its end)
+        have arrived and it can be classified; kept sections then stream
+        through, filtered ones are only counted.
+
+        Args:
+            pieces: (path, piece, is_header) tuples of a digest
+
+        Yields:
+            (path, piece, is_header) tuples of the filtered digest
+        """
+        path = None
+        held: list[bytes] = []  # header and content pieces awaiting classification
+        held_chars = 0
+        rule: Optional[Rule] = None
+        decided = True  # preamble passes through
+        tokens = 0  # content tokens of a filtered section
+
+        def decide() -> Iterator[tuple[Optional[str], bytes, bool]]:
+            nonlocal decided, rule, tokens
+            decided = True
+            text = b''.join(held[1:]).decode('utf-8', errors='replace')
+            rule = self.classify(path, text)
+            if rule is None:
+                yield path, held[0], True
+                for piece in held[1:]:
+                    yield path, piece, False
+            else:
+                tokens = self.backend.count(text, path)
+            held.clear()
+
+        def finish() -> Iterator[tuple[Optional[str], bytes, bool]]:
+            if not decided:
+                yield from decide()
+            if rule is None:
+                return
+            if rule.action == 'drop':
+                self._record(rule, tokens)
+                return
+            stub = self._stub(rule, tokens)
+            self._record(rule, tokens - self.backend.count(stub, path))
+            yield path, header, True
+            yield path, stub.encode('utf-8') + b'\n\n\n', False
+
+        header = b''
+        for piece_path, piece, is_header in pieces:
+            if is_header:
+                if path is not None:
+                    yield from finish()
+                path, header, rule = piece_path, piece, None
+                held, held_chars, decided, tokens = [piece], 0, False, 0
+            elif decided:
+                if rule is None:
+                    yield piece_path, piece, False
+                else:
+                    tokens += self.backend.count(piece.decode('utf-8', errors='replace'), path)
+            else:
+                held.append(piece)
+                held_chars += len(piece)
+                if held_chars >= SNIFF_CHARS:
+                    yield from decide()
+        if path is not None:
+            yield from finish()
+
+    def filter_stream(self, stream: BinaryIO, out: BinaryIO) -> None:
+        """Copy a digest from stream to out, filtering its sections."""
+        for _, piece, _ in self.filter_pieces(iter_stream_pieces(stream)):
+            out.write(piece)
+
+    def report(self) -> dict:
+        """
+        Return the savings so far.
+
+        Returns:
+            Dict with 'files' and 'tokens' removed in total and 'rules',
+            mapping each rule that matched to its 'files' and 'tokens'
+        """
+        return {
+            'files': sum(files for files, _ in self.savings.values()),
+            'tokens': sum(tokens for _, tokens in self.savings.values()),
+            'rules': {
+                rule.name: {'action': rule.action, 'files': self.savings[rule.name][0],
+                            'tokens': self.savings[rule.name][1]}
+                for rule in RULES if rule.name in self.savings
+            },
+        }
+
+
+def format_report(report: dict) -> str:
+    """
+    Format a prefilter report for display.
+
+    Examples:
+        >>> print(format_report({'files': 3, 'tokens': 52000, 'rules': {
+        ...     'lockfile': {'action': 'stub', 'files': 2, 'tokens': 50000},
+        ...     'svg': {'action': 'stub', 'files': 1, 'tokens': 2000}}}))
+        Prefilter: 3 file(s) filtered, 52,000 tokens saved
+          lockfile   stub    2 file(s)  50,000 tokens
+          svg        stub    1 file(s)   2,000 tokens
+    """
+    lines = [f"Prefilter: {report['files']:,} file(s) filtered, {report['tokens']:,} tokens saved"]
+    width = max((len(f"{rule['tokens']:,}") for rule in report['rules'].values()), default=0)
+    for name, rule in report['rules'].items():
+        lines.append(f"  {name:<10} {rule['action']:<5} {rule['files']:>3} file(s)  {rule['tokens']:>{width},} tokens")
+    return '\n'.join(lines)
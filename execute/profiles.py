@@ -0,0 +1,246 @@
+"""
+Content type profiles: built-in and user-defined extraction filters.
+
+A profile is what extract-specific --type NAME extracts: the include and
+exclude globs passed to gitingest, plus optional per-file caps (see
+file_caps.py) and a token budget. The built-in profiles are
+workflow.FILTER_PATTERNS. More profiles, or replacements for built-in ones,
+are defined in TOML config files:
+
+    [profiles.go]
+    description = "Go sources without tests"
+    include = ["*.go", "go.mod"]
+    exclude = ["*_test.go", "vendor/", "testdata/"]
+    file_caps = ["4000", "*.pb.go=500"]
+    budget = 150000
+
+Config files are read in this order, later definitions replacing earlier ones
+of the same name:
+
+- user: $XDG_CONFIG_HOME/gitingest-agent/config.toml (~/.config by default)
+- project: the nearest .gitingest-agent.toml in the current directory or a
+  parent, or the file named by GITINGEST_AGENT_CONFIG
+
+Profiles are validated and their globs compiled (see globmatch.py) when a
+file is loaded. Loaded files are cached by modification time and size, so
+repeated lookups cost a stat() per file and edits are picked up on the
+next lookup.
+"""
+
+import os
+import re
+import tomllib
+from functools import cache
+from pathlib import Path
+from typing import NamedTuple, Optional
+from exceptions import ValidationError
+from file_caps import FileCaps
+from globmatch import PathFilter
+from workflow import FILTER_PATTERNS
+
+
+# Environment variable naming the project config file (instead of searching for one)
+CONFIG_ENV_VAR = "GITINGEST_AGENT_CONFIG"
+
+# Project config file, searched for from the current directory upwards
+PROJECT_CONFIG_NAME = ".gitingest-agent.toml"
+
+# User config file, relative to $XDG_CONFIG_HOME (default ~/.config)
+USER_CONFIG_PATH = Path("gitingest-agent") / "config.toml"
+
+# Profile names become file names ([type]-content.txt)
+PROFILE_NAME_RE = re.compile(r'[a-z0-9][a-z0-9_-]*')
+
+PROFILE_KEYS = {'description', 'include', 'exclude', 'file_caps', 'budget'}
+
+
+class Profile(NamedTuple):
+    """
+    A validated content type profile.
+
+    Attributes:
+        name: Content type name (the --type value)
+        filters: {'include': [...], 'exclude': [...]} globs passed to gitingest
+            (no include globs: the whole repository); shared, don't modify
+        caps: Per-file token caps (empty: uncapped)
+        budget: Default token budget, or None
+        description: One-line description
+        source: Config file defining the profile, or None if built-in
+        path_filter: Compiled include/exclude filter
+    """
+    name: str
+    filters: dict[str, list[str]]
+    caps: FileCaps
+    budget: Optional[int]
+    description: str
+    source: Optional[Path]
+    path_filter: PathFilter
+
+    @property
+    def include(self) -> list[str]:
+        return self.filters['include']
+
+    @property
+    def exclude(self) -> list[str]:
+        return self.filters['exclude']
+
+
+def _string_list(table: dict, key: str, where: str) -> list[str]:
+    value = table.get(key, [])
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        raise ValidationError(f"Invalid {where}: {key} must be a list of strings")
+    return list(value)
+
+
+def build_profile(name: str, table: dict, source: Optional[Path] = None) -> Profile:
+    """
+    Validate a profile definition and compile its filter.
+
+    Args:
+        name: Profile name
+        table: Definition (keys: description, include, exclude, file_caps, budget)
+        source: Config file the definition comes from
+
+    Raises:
+        ValidationError: If the name, a key or a value is invalid
+
+    Examples:
+        >>> profile = build_profile("go", {"include": ["*.go"], "exclude": ["*_test.go"], "budget": 150000})
+        >>> profile.path_filter.matches("cmd/main.go"), profile.budget
+        (True, 150000)
+    """
+    where = f"profile '{name}'" + (f" in {source}" if source else "")
+    if not PROFILE_NAME_RE.fullmatch(name):
+        raise ValidationError(f"Invalid {where}: use lowercase letters, digits, '-' and '_'")
+    if not isinstance(table, dict):
+        raise ValidationError(f"Invalid {where}: expected a table")
+    unknown = sorted(set(table) - PROFILE_KEYS)
+    if unknown:
+        raise ValidationError(f"Invalid {where}: unknown key(s) {', '.join(unknown)}")
+
+    include = _string_list(table, 'include', where)
+    exclude = _string_list(table, 'exclude', where)
+    description = table.get('description', '')
+    if not isinstance(description, str):
+        raise ValidationError(f"Invalid {where}: description must be a string")
+    budget = table.get('budget')
+    if budget is not None and (isinstance(budget, bool) or not isinstance(budget, int) or budget <= 0):
+        raise ValidationError(f"Invalid {where}: budget must be a positive number of tokens")
+    try:
+        caps = FileCaps.from_specs(_string_list(table, 'file_caps', where))
+        path_filter = PathFilter(include, exclude)
+    except ValidationError as e:
+        raise ValidationError(f"Invalid {where}: {e}")
+    return Profile(name, {'include': include, 'exclude': exclude}, caps, budget, description, source, path_filter)
+
+
+def parse_profiles(text: str, source: Optional[Path] = None) -> dict[str, Profile]:
+    """
+    Parse the [profiles] tables of a TOML config.
+
+    Raises:
+        ValidationError: If the TOML or a profile is invalid
+    """
+    try:
+        data = tomllib.loads(text)
+    except tomllib.TOMLDecodeError as e:
+        raise ValidationError(f"Invalid config file {source or '<string>'}: {e}")
+    tables = data.get('profiles', {})
+    if not isinstance(tables, dict):
+        raise ValidationError(f"Invalid config file {source or '<string>'}: 'profiles' must be a table")
+    return {name: build_profile(name, table, source) for name, table in tables.items()}
+
+
+@cache
+def builtin_profiles() -> dict[str, Profile]:
+    """Return the built-in profiles (workflow.FILTER_PATTERNS)."""
+    return {
+        name: build_profile(name, patterns)._replace(filters=patterns)
+        for name, patterns in FILTER_PATTERNS.items()
+    }
+
+
+# Loaded config files: path -> ((mtime_ns, size), profiles)
+_loaded: dict[Path, tuple[tuple[int, int], dict[str, Profile]]] = {}
+
+
+def load_config_file(path: Path) -> dict[str, Profile]:
+    """
+    Return the profiles of a config file, parsing it only if it changed.
+
+    A missing file defines no profiles.
+
+    Raises:
+        ValidationError: If the file is invalid
+    """
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        _loaded.pop(path, None)
+        return {}
+    version = (stat.st_mtime_ns, stat.st_size)
+    cached = _loaded.get(path)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    profiles = parse_profiles(path.read_text(encoding='utf-8'), path)
+    _loaded[path] = (version, profiles)
+    return profiles
+
+
+def config_paths(start: Optional[Path] = None) -> list[Path]:
+    """
+    Return the config files to read, in order (user, then project).
+
+    Args:
+        start: Directory the project config is searched from (default: cwd)
+    """
+    config_home = os.environ.get('XDG_CONFIG_HOME') or Path.home() / ".config"
+    paths = [Path(config_home) / USER_CONFIG_PATH]
+
+    explicit = os.environ.get(CONFIG_ENV_VAR)
+    if explicit:
+        paths.append(Path(explicit))
+        return paths
+    directory = (start or Path.cwd()).resolve()
+    for candidate in (directory, *directory.parents):
+        if (candidate / PROJECT_CONFIG_NAME).is_file():
+            paths.append(candidate / PROJECT_CONFIG_NAME)
+            break
+    return paths
+
+
+def load_profiles(start: Optional[Path] = None) -> dict[str, Profile]:
+    """
+    Return every content type profile by name: built-in ones, then config files.
+
+    Args:
+        start: Directory the project config is searched from (default: cwd)
+
+    Raises:
+        ValidationError: If a config file is invalid
+    """
+    profiles = dict(builtin_profiles())
+    for path in config_paths(start):
+        profiles.update(load_config_file(path))
+    return profiles
+
+
+def content_types(start: Optional[Path] = None) -> list[str]:
+    """Return the names of every content type profile."""
+    return list(load_profiles(start))
+
+
+def get_profile(content_type: str) -> Profile:
+    """
+    Return the profile of a content type.
+
+    Raises:
+        ValidationError: If no profile has that name, or a config file is invalid
+    """
+    profiles = load_profiles()
+    if content_type not in profiles:
+        raise ValidationError(
+            f"Invalid content type: {content_type}. "
+            f"Valid types: {', '.join(profiles)}"
+        )
+    return profiles[content_type]
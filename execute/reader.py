@@ -0,0 +1,350 @@
+"""
+Paginated random-access reading of digests.
+
+Agents rarely need a whole digest at once. This module serves a digest as
+fixed-size token pages, or one file (optionally a line range of it), without
+reading the rest of the digest:
+
+- A persisted offset index (a SQLite sidecar next to the digest) records where
+  every FILE section and every page starts. It is built once per digest and
+  rebuilt automatically when the digest changes.
+- The digest is memory-mapped, so serving a page or file is a slice of the
+  mapping whose cost depends on the size of the result, not of the digest.
+
+Pages break at FILE section boundaries where possible; only a section larger
+than a page is split, at line boundaries.
+"""
+
+import mmap
+import sqlite3
+from pathlib import Path
+from typing import Optional
+from digest import DigestSection, iter_sections
+from exceptions import StorageError, ValidationError
+
+
+# Sidecar suffix appended to the digest file name (digest.txt -> digest.txt.idx)
+INDEX_SUFFIX = ".idx"
+
+# Default page size in tokens
+DEFAULT_PAGE_TOKENS = 4000
+
+# Bytes per token used to size pages (matches token_counter.estimate_tokens)
+BYTES_PER_TOKEN = 4
+
+INDEX_VERSION = 1
+
+
+def index_path_for(digest_path: Path) -> Path:
+    """Return the offset index sidecar path for a digest."""
+    digest_path = Path(digest_path)
+    return digest_path.with_name(digest_path.name + INDEX_SUFFIX)
+
+
+def remove_index(digest_path: Path) -> None:
+    """Delete a digest's offset index sidecar, if any."""
+    index_path_for(digest_path).unlink(missing_ok=True)
+
+
+def parse_line_range(spec: str) -> tuple[int, Optional[int]]:
+    """
+    Parse a 1-based inclusive line range.
+
+    Args:
+        spec: "START-END", "START-" (to end of file) or "LINE"
+
+    Returns:
+        Tuple of (start, end); end is None for an open range
+
+    Raises:
+        ValidationError: If the range is malformed
+
+    Examples:
+        >>> parse_line_range("10-40")
+        (10, 40)
+        >>> parse_line_range("100-")
+        (100, None)
+    """
+    start_text, sep, end_text = spec.partition('-')
+    try:
+        start = int(start_text)
+        end = int(end_text) if end_text else (None if sep else start)
+    except ValueError:
+        raise ValidationError(f"Invalid line range: {spec} (expected START-END)")
+    if start < 1 or (end is not None and end < start):
+        raise ValidationError(f"Invalid line range: {spec}")
+    return start, end
+
+
+class DigestReader:
+    """
+    Random-access reader over a digest.
+
+    Attributes:
+        digest_path: Digest being read
+        index_path: Offset index sidecar
+
+    Examples:
+        >>> with DigestReader("data/fastapi/digest.txt") as reader:
+        ...     print(reader.page_count())
+        ...     text = reader.read_page(3)
+        ...     handler = reader.read_file("fastapi/routing.py", 100, 160)
+        20
+    """
+
+    def __init__(self, digest_path: Path):
+        """
+        Open a digest, building or refreshing its offset index as needed.
+
+        Args:
+            digest_path: Path to a GitIngest digest or content file
+
+        Raises:
+            ValidationError: If the digest doesn't exist
+            StorageError: If the index cannot be opened or built
+        """
+        self.digest_path = Path(digest_path)
+        if not self.digest_path.is_file():
+            raise ValidationError(f"Digest not found: {self.digest_path}")
+        self.index_path = index_path_for(self.digest_path)
+
+        self._file = open(self.digest_path, 'rb')
+        stat = self.digest_path.stat()
+        self._size = stat.st_size
+        # mmap cannot map empty files
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self._size else b''
+
+        try:
+            self._conn = sqlite3.connect(self.index_path)
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+                CREATE TABLE IF NOT EXISTS sections (
+                    path TEXT PRIMARY KEY,
+                    header INTEGER NOT NULL,
+                    offset INTEGER NOT NULL,
+                    length INTEGER NOT NULL,
+                    line INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS pages (
+                    page_tokens INTEGER NOT NULL,
+                    number INTEGER NOT NULL,
+                    start INTEGER NOT NULL,
+                    end INTEGER NOT NULL,
+                    PRIMARY KEY (page_tokens, number)
+                );
+                CREATE TABLE IF NOT EXISTS truncations (
+                    path TEXT PRIMARY KEY,
+                    tokens INTEGER NOT NULL,
+                    kept INTEGER NOT NULL,
+                    elided INTEGER NOT NULL
+                );
+            """)
+            signature = f"{INDEX_VERSION}:{stat.st_size}:{stat.st_mtime_ns}"
+            if self._meta('signature') != signature:
+                self._build_sections(signature)
+        except sqlite3.Error as e:
+            self.close()
+            raise StorageError(f"Cannot open digest index {self.index_path}: {e}")
+
+    def close(self) -> None:
+        """Release the memory mapping and index connection."""
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+        self._file.close()
+        if hasattr(self, '_conn'):
+            self._conn.close()
+
+    def __enter__(self) -> "DigestReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    # Index construction
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _header_start(self, content_offset: int) -> int:
+        """Find where a section's three header lines start."""
+        pos = content_offset
+        for _ in range(3):
+            pos = self._mm.rfind(b'\n', 0, pos - 1) + 1
+        return pos
+
+    def _build_sections(self, signature: str) -> None:
+        rows = []
+        previous_end = None
+        for section in iter_sections(self.digest_path):
+            header = previous_end if previous_end is not None else self._header_start(section.offset)
+            rows.append((section.path, header, section.offset, section.length, section.line))
+            previous_end = section.offset + section.length
+        with self._conn:
+            self._conn.execute("DELETE FROM sections")
+            self._conn.execute("DELETE FROM pages")
+            self._conn.execute("DELETE FROM truncations")
+            # Duplicate paths (rare) keep the first section
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO sections (path, header, offset, length, line) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('signature', ?)", (signature,))
+
+    def _build_pages(self, page_tokens: int) -> None:
+        """Split the digest into pages of about page_tokens tokens."""
+        limit = page_tokens * BYTES_PER_TOKEN
+        # Section headers are the preferred break points
+        boundaries = [start for (start,) in self._conn.execute("SELECT header FROM sections ORDER BY header")]
+        boundaries.append(self._size)
+
+        pages = []
+        start = last_fit = 0
+        for boundary in boundaries:
+            if boundary - start <= limit:
+                last_fit = boundary
+                continue
+            if last_fit > start:
+                pages.append((start, last_fit))
+                start = last_fit
+            # A single section larger than a page is split at line breaks;
+            # its tail gets a page of its own so the next file starts a page
+            while boundary - start > limit:
+                end = self._line_break(start, start + limit)
+                pages.append((start, end))
+                start = end
+            if last_fit < start < boundary:
+                pages.append((start, boundary))
+                start = boundary
+            last_fit = boundary
+        if start < self._size:
+            pages.append((start, self._size))
+
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO pages (page_tokens, number, start, end) VALUES (?, ?, ?, ?)",
+                [(page_tokens, number, s, e) for number, (s, e) in enumerate(pages, 1)]
+            )
+
+    def _line_break(self, start: int, limit: int) -> int:
+        """Last line break in (start, limit], or limit if a line is longer than a page."""
+        newline = self._mm.rfind(b'\n', start, limit)
+        return newline + 1 if newline >= start else limit
+
+    def _pages(self, page_tokens: int) -> None:
+        if page_tokens <= 0:
+            raise ValidationError(f"Page size must be positive: {page_tokens}")
+        row = self._conn.execute(
+            "SELECT 1 FROM pages WHERE page_tokens = ? LIMIT 1", (page_tokens,)
+        ).fetchone()
+        if row is None and self._size:
+            self._build_pages(page_tokens)
+
+    # Reading
+
+    def _decode(self, start: int, end: int) -> str:
+        return self._mm[start:end].decode('utf-8', errors='replace')
+
+    def page_count(self, page_tokens: int = DEFAULT_PAGE_TOKENS) -> int:
+        """Return the number of pages at the given page size."""
+        self._pages(page_tokens)
+        return self._conn.execute(
+            "SELECT COUNT(*) FROM pages WHERE page_tokens = ?", (page_tokens,)
+        ).fetchone()[0]
+
+    def read_page(self, number: int, page_tokens: int = DEFAULT_PAGE_TOKENS) -> str:
+        """
+        Read one page.
+
+        Args:
+            number: 1-based page number
+            page_tokens: Page size in tokens
+
+        Returns:
+            Page text
+
+        Raises:
+            ValidationError: If the page doesn't exist
+        """
+        self._pages(page_tokens)
+        row = self._conn.execute(
+            "SELECT start, end FROM pages WHERE page_tokens = ? AND number = ?", (page_tokens, number)
+        ).fetchone()
+        if row is None:
+            raise ValidationError(f"Page {number} out of range (1-{self.page_count(page_tokens)})")
+        return self._decode(*row)
+
+    def files(self) -> list[tuple[str, int]]:
+        """Return (path, size in bytes) for every file section, in digest order."""
+        return self._conn.execute("SELECT path, length FROM sections ORDER BY offset").fetchall()
+
+    def sections(self) -> list[DigestSection]:
+        """Return the indexed FILE sections, in digest order."""
+        return [
+            DigestSection(*row) for row in
+            self._conn.execute("SELECT path, offset, length, line FROM sections ORDER BY offset")
+        ]
+
+    def record_truncations(self, truncations: list[tuple[str, int, int, int]]) -> None:
+        """
+        Record files whose content was capped (see file_caps.py).
+
+        Records are kept until the digest changes and its index is rebuilt.
+
+        Args:
+            truncations: (path, original tokens, kept tokens, elided tokens) per capped file
+        """
+        with self._conn:
+            self._conn.execute("DELETE FROM truncations")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO truncations (path, tokens, kept, elided) VALUES (?, ?, ?, ?)",
+                truncations
+            )
+
+    def truncations(self) -> dict[str, tuple[int, int, int]]:
+        """Return {path: (original tokens, kept tokens, elided tokens)} for capped files."""
+        return {
+            path: (tokens, kept, elided) for path, tokens, kept, elided in
+            self._conn.execute("SELECT path, tokens, kept, elided FROM truncations")
+        }
+
+    def read_file(self, path: str, start_line: int = 1, end_line: Optional[int] = None) -> str:
+        """
+        Read one file, or a line range of it.
+
+        Args:
+            path: Repository-relative path from the FILE header
+            start_line: First line to return (1-based)
+            end_line: Last line to return, inclusive (default: end of file)
+
+        Returns:
+            File content (the requested lines)
+
+        Raises:
+            ValidationError: If the file isn't in the digest
+        """
+        row = self._conn.execute(
+            "SELECT offset, length FROM sections WHERE path = ?", (path,)
+        ).fetchone()
+        if row is None:
+            raise ValidationError(f"File not in digest: {path}")
+        offset, length = row
+        end = offset + length
+
+        # Walk line breaks inside the section only
+        start = offset
+        for _ in range(start_line - 1):
+            newline = self._mm.find(b'\n', start, end)
+            if newline < 0:
+                return ''
+            start = newline + 1
+        stop = end
+        if end_line is not None:
+            stop = start
+            for _ in range(end_line - start_line + 1):
+                newline = self._mm.find(b'\n', stop, end)
+                if newline < 0:
+                    stop = end
+                    break
+                stop = newline + 1
+        return self._decode(start, stop).rstrip('\r\n')
@@ -0,0 +1,272 @@
+"""
+Query-driven relevance ranking with BM25.
+
+This module ranks the files of a digest or local checkout against a natural
+language question ("how is auth configured") using Okapi BM25 over file paths
+and bodies, then selects the best files that fit a token budget. Everything
+runs locally; no embedding service is involved.
+"""
+
+import math
+import os
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple, Optional
+from digest import DigestSection, iter_sections, read_section
+from exceptions import ValidationError
+from token_backends import TokenizerBackend, get_backend
+
+
+# BM25 parameters (standard Okapi defaults)
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Path terms are strong relevance signals ("auth/config.py" for an auth question)
+PATH_WEIGHT = 3
+
+# Words that carry no signal in questions about a codebase
+STOPWORDS = frozenset("""
+a an and are as at be by can do does for from how i in is it of on or the this
+to use used uses using what when where which who why with
+""".split())
+
+# Directories never worth ranking in a local checkout
+SKIP_DIRS = frozenset({'.git', 'node_modules', '__pycache__', '.venv', 'venv', 'dist', 'build'})
+
+_WORD_RE = re.compile(r'[A-Za-z0-9]+')
+_CAMEL_RE = re.compile(r'[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|[0-9]+')
+_SUFFIXES = ('ations', 'ation', 'ings', 'ing', 'ies', 'ed', 'es', 's')
+
+
+class Document(NamedTuple):
+    """
+    A rankable file: repository-relative path and text content.
+
+    Attributes:
+        path: Repository-relative file path
+        text: File content
+        source: Digest or checkout file the content can be read again from
+        section: The file's section, when source is a digest
+    """
+    path: str
+    text: str
+    source: Optional[Path] = None
+    section: Optional[DigestSection] = None
+
+
+class RankedDocument(NamedTuple):
+    """
+    A document with its BM25 score and estimated token count.
+
+    The text of a document loaded from a digest or checkout isn't kept:
+    read_text() reads it again from its source.
+
+    Attributes:
+        path: Repository-relative file path
+        score: BM25 score
+        tokens: Estimated token count
+        source: Digest or checkout file the text is read from
+        section: The file's section, when source is a digest
+        text: Text of a document without a source
+    """
+    path: str
+    score: float
+    tokens: int
+    source: Optional[Path] = None
+    section: Optional[DigestSection] = None
+    text: Optional[str] = None
+
+    def read_text(self) -> str:
+        """Return the document's text, reading it from its source if it has one."""
+        if self.section is not None:
+            return read_section(self.source, self.section)
+        if self.source is not None:
+            return Path(self.source).read_bytes().decode('utf-8')
+        return self.text
+
+
+def _stem(word: str) -> str:
+    """Strip common English suffixes so 'configured' matches 'configure'."""
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    return word
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Split text into normalized search terms.
+
+    Identifiers are split on camelCase and snake_case boundaries so that
+    "APIRouter" and "api_router" both yield "api" and "router". Terms are
+    lowercased, stemmed and stopwords are dropped.
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        List of terms (with repetitions)
+
+    Examples:
+        >>> tokenize("How is AuthConfig configured?")
+        ['auth', 'config', 'configur']
+    """
+    terms = []
+    for word in _WORD_RE.findall(text):
+        parts = _CAMEL_RE.findall(word) if not word.islower() else [word]
+        for part in parts:
+            lowered = part.lower()
+            if len(lowered) > 1 and lowered not in STOPWORDS:
+                terms.append(_stem(lowered))
+    return terms
+
+
+def documents_from_digest(digest_path: str | Path) -> Iterator[Document]:
+    """Yield the FILE sections of a digest as documents."""
+    for section in iter_sections(digest_path):
+        yield Document(section.path, read_section(digest_path, section), Path(digest_path), section)
+
+
+def documents_from_directory(root: str | Path, max_file_size: int = 10 * 1024 * 1024) -> Iterator[Document]:
+    """
+    Yield text files of a local checkout as documents, in path order.
+
+    Binary files (containing NUL bytes or invalid UTF-8), files over
+    max_file_size and VCS/dependency directories are skipped.
+    """
+    root = Path(root)
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+        for name in sorted(filenames):
+            path = Path(dirpath) / name
+            try:
+                if path.stat().st_size > max_file_size:
+                    continue
+                data = path.read_bytes()
+            except OSError:
+                continue
+            if b'\x00' in data:
+                continue
+            try:
+                text = data.decode('utf-8')
+            except UnicodeDecodeError:
+                continue
+            yield Document(path.relative_to(root).as_posix(), text, path)
+
+
+def load_documents(source: str | Path) -> Iterator[Document]:
+    """
+    Load documents from a digest file or a local checkout directory.
+
+    Raises:
+        ValidationError: If source doesn't exist
+    """
+    source = Path(source)
+    if source.is_dir():
+        return documents_from_directory(source)
+    if source.is_file():
+        return documents_from_digest(source)
+    raise ValidationError(f"Source not found: {source}")
+
+
+def rank_documents(
+    documents: Iterable[Document],
+    query: str,
+    tokenizer: str | TokenizerBackend | None = None
+) -> list[RankedDocument]:
+    """
+    Rank documents against a query with BM25.
+
+    Only statistics for query terms are collected, so ranking is a single
+    streaming pass over the documents with memory proportional to the number
+    of matching files rather than the vocabulary. Matching documents are
+    sized during the pass and keep only their path, source location and term
+    statistics; the text of one loaded from a digest or checkout is read
+    again by RankedDocument.read_text() once it is selected.
+
+    Args:
+        documents: Documents to rank
+        query: Natural language question or keywords
+        tokenizer: Tokenizer backend or spec used to size the ranked
+            documents (default: GITINGEST_AGENT_TOKENIZER, else heuristic)
+
+    Returns:
+        Documents with a positive score, best first
+
+    Raises:
+        ValidationError: If the query has no searchable terms or the
+            tokenizer is invalid
+    """
+    backend = get_backend(tokenizer)
+    query_terms = set(tokenize(query))
+    if not query_terms:
+        raise ValidationError(f"Query has no searchable terms: {query!r}")
+
+    # Every query term has a positive IDF: only documents holding one can score
+    stats = []  # (unscored document, term frequencies, document length)
+    doc_freq = Counter()
+    total_length = 0
+    n_docs = 0
+
+    for document in documents:
+        terms = tokenize(document.text)
+        path_terms = tokenize(document.path)
+        frequencies = Counter(t for t in terms if t in query_terms)
+        for term in path_terms:
+            if term in query_terms:
+                frequencies[term] += PATH_WEIGHT
+        length = len(terms) + PATH_WEIGHT * len(path_terms)
+        doc_freq.update(frequencies.keys())
+        total_length += length
+        n_docs += 1
+        if frequencies:
+            unscored = RankedDocument(document.path, 0.0, backend.count(document.text, document.path),
+                                      document.source, document.section,
+                                      document.text if document.source is None else None)
+            stats.append((unscored, frequencies, length))
+
+    if not stats:
+        return []
+
+    avg_length = total_length / n_docs or 1
+    idf = {
+        term: math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+        for term, df in doc_freq.items()
+    }
+
+    ranked = []
+    for document, frequencies, length in stats:
+        score = 0.0
+        for term, tf in frequencies.items():
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length)
+            score += idf[term] * tf * (BM25_K1 + 1) / (tf + norm)
+        ranked.append(document._replace(score=score))
+
+    ranked.sort(key=lambda doc: (-doc.score, doc.path))
+    return ranked
+
+
+def select_within_budget(ranked: Iterable[RankedDocument], budget: int) -> tuple[list[RankedDocument], list[RankedDocument]]:
+    """
+    Greedily pick the best-ranked documents that fit a token budget.
+
+    A document that doesn't fit is skipped (not truncated) and smaller,
+    lower-ranked documents may still be selected after it.
+
+    Args:
+        ranked: Documents, best first
+        budget: Maximum total tokens
+
+    Returns:
+        Tuple of (selected, skipped) documents, both in rank order
+    """
+    selected, skipped = [], []
+    used = 0
+    for document in ranked:
+        if used + document.tokens <= budget:
+            selected.append(document)
+            used += document.tokens
+        else:
+            skipped.append(document)
+    return selected, skipped
@@ -0,0 +1,379 @@
+"""
+Full-text search across extracted digests.
+
+This module maintains an incremental SQLite FTS5 index over the FILE sections
+of the digests in the artifact store: each repository directory's full digest,
+or its content files where no full digest was extracted (see
+digest.is_searchable), so every file is found once. Each section is stored
+with repository, path and language facets so searches can be narrowed without
+touching the digests themselves.
+"""
+
+import os
+import re
+import sqlite3
+from pathlib import Path
+from typing import Iterable, Optional
+from digest import DIGEST_FILENAME, is_searchable, iter_sections, read_section
+from exceptions import StorageError, ValidationError
+from languages import detect_language
+
+
+# Index file name, created at the root of the artifact store
+SEARCH_INDEX_FILENAME = ".search-index.sqlite"
+
+# Facet columns that results can be filtered and counted by
+FACETS = ('repo', 'language', 'path')
+
+
+def build_fts_query(query: str) -> str:
+    """
+    Convert a free-text query into a safe FTS5 MATCH expression.
+
+    Each whitespace-separated term is quoted so punctuation in identifiers
+    (e.g. "app.get", "os.path") cannot break the FTS5 query syntax. A trailing
+    '*' keeps prefix matching. All terms must match.
+
+    Args:
+        query: Free-text search query
+
+    Returns:
+        FTS5 MATCH expression
+
+    Raises:
+        ValidationError: If the query contains no searchable terms
+
+    Examples:
+        >>> build_fts_query('app.get router')
+        '"app.get" "router"'
+        >>> build_fts_query('Depend*')
+        '"Depend"*'
+    """
+    terms = []
+    for raw in query.split():
+        prefix = raw.endswith('*')
+        term = raw.rstrip('*').replace('"', '""')
+        if not term:
+            continue
+        terms.append(f'"{term}"*' if prefix else f'"{term}"')
+    if not terms:
+        raise ValidationError("Search query must contain at least one term")
+    return ' '.join(terms)
+
+
+def _query_words(query: str) -> list[str]:
+    """Split a query into lowercase words for locating matching lines."""
+    return [w.lower() for w in re.findall(r'\w+', query)]
+
+
+class SearchIndex:
+    """
+    Incremental full-text index over digest FILE sections.
+
+    Digests are re-indexed only when their size or modification time changed
+    since the last run, so refreshing the index after an extraction costs time
+    proportional to the new content only.
+
+    Attributes:
+        db_path: Path to the SQLite index file
+    """
+
+    def __init__(self, db_path: Path):
+        """
+        Open (or create) a search index.
+
+        Args:
+            db_path: Path to the SQLite index file
+
+        Raises:
+            StorageError: If the index cannot be opened
+        """
+        self.db_path = Path(db_path)
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path)
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS digests (
+                    id INTEGER PRIMARY KEY,
+                    path TEXT UNIQUE NOT NULL,
+                    repo TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS sections (
+                    id INTEGER PRIMARY KEY,
+                    digest_id INTEGER NOT NULL,
+                    repo TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    language TEXT NOT NULL,
+                    line INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS sections_digest ON sections (digest_id);
+                CREATE VIRTUAL TABLE IF NOT EXISTS section_text USING fts5(
+                    body, tokenize = "unicode61 tokenchars '_'"
+                );
+            """)
+        except (sqlite3.Error, OSError) as e:
+            raise StorageError(f"Cannot open search index {self.db_path}: {e}")
+
+    @classmethod
+    def for_root(cls, root: Path) -> "SearchIndex":
+        """Open the search index stored at an artifact store root."""
+        return cls(Path(root) / SEARCH_INDEX_FILENAME)
+
+    def close(self) -> None:
+        """Close the underlying index connection."""
+        self._conn.close()
+
+    def __enter__(self) -> "SearchIndex":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    # Indexing
+
+    def index_digest(self, digest_path: Path, repo: str) -> int:
+        """
+        Index (or re-index) the FILE sections of one digest.
+
+        Files that aren't searched (see digest.is_searchable) are left out,
+        and dropped if indexed before; indexing a full digest drops the
+        content files next to it, whose files it already holds.
+
+        Args:
+            digest_path: Digest or content file to index
+            repo: Repository identifier used as the repo facet (owner/repo)
+
+        Returns:
+            Number of sections indexed (0 if the digest was unchanged or left out)
+        """
+        digest_path = Path(digest_path).resolve()
+        if not is_searchable(digest_path):
+            self.remove_digest(digest_path)
+            return 0
+        if digest_path.name == DIGEST_FILENAME:
+            for indexed in self.indexed_digests():
+                if Path(indexed).parent == digest_path.parent and Path(indexed).name != DIGEST_FILENAME:
+                    self.remove_digest(Path(indexed))
+        stat = digest_path.stat()
+        key = str(digest_path)
+
+        try:
+            with self._conn:
+                row = self._conn.execute(
+                    "SELECT id, size, mtime FROM digests WHERE path = ?", (key,)
+                ).fetchone()
+                if row and row[1] == stat.st_size and row[2] == stat.st_mtime:
+                    return 0
+                if row:
+                    self._delete_sections(row[0])
+                    self._conn.execute(
+                        "UPDATE digests SET repo = ?, size = ?, mtime = ? WHERE id = ?",
+                        (repo, stat.st_size, stat.st_mtime, row[0])
+                    )
+                    digest_id = row[0]
+                else:
+                    digest_id = self._conn.execute(
+                        "INSERT INTO digests (path, repo, size, mtime) VALUES (?, ?, ?, ?)",
+                        (key, repo, stat.st_size, stat.st_mtime)
+                    ).lastrowid
+
+                count = 0
+                with open(digest_path, 'rb') as digest:
+                    for section in iter_sections(digest_path):
+                        section_id = self._conn.execute(
+                            "INSERT INTO sections (digest_id, repo, path, language, line) "
+                            "VALUES (?, ?, ?, ?, ?)",
+                            (digest_id, repo, section.path, detect_language(section.path), section.line)
+                        ).lastrowid
+                        self._conn.execute(
+                            "INSERT INTO section_text (rowid, body) VALUES (?, ?)",
+                            (section_id, read_section(digest, section))
+                        )
+                        count += 1
+                return count
+        except sqlite3.Error as e:
+            raise StorageError(f"Search index error: {e}")
+
+    def _delete_sections(self, digest_id: int) -> None:
+        self._conn.execute(
+            "DELETE FROM section_text WHERE rowid IN "
+            "(SELECT id FROM sections WHERE digest_id = ?)", (digest_id,)
+        )
+        self._conn.execute("DELETE FROM sections WHERE digest_id = ?", (digest_id,))
+
+    def remove_digest(self, digest_path: Path) -> None:
+        """Drop a digest (e.g. after eviction) from the index."""
+        key = str(Path(digest_path).resolve())
+        try:
+            with self._conn:
+                row = self._conn.execute(
+                    "SELECT id FROM digests WHERE path = ?", (key,)
+                ).fetchone()
+                if row:
+                    self._delete_sections(row[0])
+                    self._conn.execute("DELETE FROM digests WHERE id = ?", (row[0],))
+        except sqlite3.Error as e:
+            raise StorageError(f"Search index error: {e}")
+
+    def move(self, source: Path, target: Path) -> None:
+        """Re-key a moved digest, or every digest in a moved directory, without re-indexing."""
+        old, new = str(Path(source).resolve()), str(Path(target).resolve())
+        try:
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE digests SET path = ? || substr(path, ?) WHERE path = ? OR substr(path, 1, ?) = ?",
+                    (new, len(old) + 1, old, len(old) + 1, old + os.sep)
+                )
+        except sqlite3.Error as e:
+            raise StorageError(f"Search index error: {e}")
+
+    def prune(self) -> int:
+        """
+        Drop digests that no longer exist on disk.
+
+        Returns:
+            Number of digests removed from the index
+        """
+        missing = [
+            path for (path,) in self._conn.execute("SELECT path FROM digests").fetchall()
+            if not Path(path).exists()
+        ]
+        for path in missing:
+            self.remove_digest(Path(path))
+        return len(missing)
+
+    # Querying
+
+    def _filter_clause(
+        self,
+        repo: Optional[str],
+        language: Optional[str],
+        path_glob: Optional[str]
+    ) -> tuple[str, list]:
+        clauses, params = [], []
+        if repo:
+            clauses.append("s.repo = ?")
+            params.append(repo)
+        if language:
+            clauses.append("LOWER(s.language) = LOWER(?)")
+            params.append(language)
+        if path_glob:
+            clauses.append("s.path GLOB ?")
+            params.append(path_glob)
+        return ''.join(f" AND {clause}" for clause in clauses), params
+
+    def search(
+        self,
+        query: str,
+        repo: Optional[str] = None,
+        language: Optional[str] = None,
+        path_glob: Optional[str] = None,
+        limit: int = 20
+    ) -> list[dict]:
+        """
+        Search indexed sections, best matches first.
+
+        Args:
+            query: Free-text query (all terms must match)
+            repo: Only return matches from this repository (owner/repo)
+            language: Only return matches in this language
+            path_glob: Only return files whose path matches this glob
+            limit: Maximum number of results
+
+        Returns:
+            List of dicts with repo, path, language, digest, line and snippet.
+            'line' is the 1-based digest line of the first matching line.
+
+        Raises:
+            ValidationError: If the query is empty
+            StorageError: If the index cannot be queried
+        """
+        match = build_fts_query(query)
+        where, params = self._filter_clause(repo, language, path_glob)
+        try:
+            rows = self._conn.execute(
+                "SELECT s.repo, s.path, s.language, d.path, s.line, t.body "
+                "FROM section_text t "
+                "JOIN sections s ON s.id = t.rowid "
+                "JOIN digests d ON d.id = s.digest_id "
+                f"WHERE section_text MATCH ?{where} "
+                "ORDER BY t.rank LIMIT ?",
+                [match, *params, limit]
+            ).fetchall()
+        except sqlite3.Error as e:
+            raise StorageError(f"Search index error: {e}")
+
+        words = _query_words(query)
+        results = []
+        for repo_name, path, lang, digest_path, line, body in rows:
+            offset, snippet = _locate_match(body, words)
+            results.append({
+                'repo': repo_name,
+                'path': path,
+                'language': lang,
+                'digest': digest_path,
+                'line': line + offset,
+                'file_line': offset + 1,
+                'snippet': snippet,
+            })
+        return results
+
+    def facet_counts(
+        self,
+        query: str,
+        facet: str,
+        repo: Optional[str] = None,
+        language: Optional[str] = None,
+        path_glob: Optional[str] = None
+    ) -> dict[str, int]:
+        """
+        Count matching sections per facet value.
+
+        Args:
+            query: Free-text query
+            facet: One of FACETS ('repo', 'language', 'path')
+
+        Returns:
+            Mapping of facet value to number of matching sections
+
+        Raises:
+            ValidationError: If the query is empty or the facet is unknown
+            StorageError: If the index cannot be queried
+        """
+        if facet not in FACETS:
+            raise ValidationError(f"Invalid facet: {facet}. Valid facets: {', '.join(FACETS)}")
+        match = build_fts_query(query)
+        where, params = self._filter_clause(repo, language, path_glob)
+        try:
+            rows = self._conn.execute(
+                f"SELECT s.{facet}, COUNT(*) FROM section_text t "
+                "JOIN sections s ON s.id = t.rowid "
+                f"WHERE section_text MATCH ?{where} "
+                f"GROUP BY s.{facet} ORDER BY COUNT(*) DESC",
+                [match, *params]
+            ).fetchall()
+        except sqlite3.Error as e:
+            raise StorageError(f"Search index error: {e}")
+        return dict(rows)
+
+    def indexed_digests(self) -> list[str]:
+        """Return the paths of all indexed digests."""
+        return [path for (path,) in self._conn.execute("SELECT path FROM digests ORDER BY path")]
+
+
+def _locate_match(body: str, words: Iterable[str]) -> tuple[int, str]:
+    """
+    Find the first line of a section containing a query word.
+
+    Returns:
+        Tuple of (zero-based line offset within the section, stripped line text)
+    """
+    words = list(words)
+    lines = body.splitlines()
+    for i, text in enumerate(lines):
+        lowered = text.lower()
+        if any(word in lowered for word in words):
+            return i, text.strip()[:200]
+    return 0, (lines[0].strip()[:200] if lines else '')
@@ -0,0 +1,192 @@
+"""
+Token breakdown statistics.
+
+This module explains where a repository's tokens are: it groups estimated
+token counts by top-level directory, file extension or language, and keeps
+the N largest files. A digest or local checkout is scanned once, streaming,
+so the report can be used to write narrow filters that fit the token budget
+on the first try.
+"""
+
+import heapq
+from collections import defaultdict
+from pathlib import Path, PurePosixPath
+from typing import Iterable, Iterator, NamedTuple, Optional
+from digest import iter_sections, read_section
+from exceptions import ValidationError
+from languages import detect_language
+from relevance import documents_from_directory
+from token_backends import TokenizerBackend, get_backend
+
+
+# Supported groupings for the histogram
+GROUP_BY = ('directory', 'extension', 'language')
+
+# Width of the histogram bar in table output
+BAR_WIDTH = 30
+
+
+class FileStat(NamedTuple):
+    """Size of one file: repository-relative path, bytes and estimated tokens."""
+    path: str
+    size: int
+    tokens: int
+
+
+def iter_file_stats(
+    source: str | Path,
+    tokenizer: str | TokenizerBackend | None = None,
+    workers: Optional[int] = None
+) -> Iterator[FileStat]:
+    """
+    Stream per-file sizes from a digest file or a local checkout.
+
+    Args:
+        source: Digest/content file or checkout directory
+        tokenizer: Tokenizer backend or spec (default: GITINGEST_AGENT_TOKENIZER,
+            else heuristic)
+        workers: Worker processes for the bpe backend
+
+    Yields:
+        FileStat for each file
+
+    Raises:
+        ValidationError: If source doesn't exist or the tokenizer is invalid
+    """
+    source = Path(source)
+    backend = get_backend(tokenizer)
+    if source.is_dir():
+        for document in documents_from_directory(source):
+            yield FileStat(document.path, len(document.text.encode('utf-8')),
+                           backend.count(document.text, document.path))
+    elif source.is_file():
+        sections = list(iter_sections(source))
+        for section, tokens in zip(sections, backend.count_sections(source, sections, workers)):
+            content = read_section(source, section)
+            yield FileStat(section.path, len(content.encode('utf-8')), tokens)
+    else:
+        raise ValidationError(f"Source not found: {source}")
+
+
+def group_key(path: str, by: str) -> str:
+    """
+    Return the histogram bucket of a file.
+
+    Args:
+        path: Repository-relative file path
+        by: One of GROUP_BY
+
+    Returns:
+        Top-level directory ('name/', or '(root)' for top-level files),
+        lowercase extension ('(none)' if absent) or language name
+
+    Examples:
+        >>> group_key("src/app/main.py", "directory")
+        'src/'
+        >>> group_key("Makefile", "extension")
+        '(none)'
+    """
+    pure = PurePosixPath(path)
+    if by == 'directory':
+        return f"{pure.parts[0]}/" if len(pure.parts) > 1 else '(root)'
+    if by == 'extension':
+        return pure.suffix.lower() or '(none)'
+    if by == 'language':
+        return detect_language(path)
+    raise ValidationError(f"Invalid grouping: {by}. Valid groupings: {', '.join(GROUP_BY)}")
+
+
+def compute_stats(
+    files: Iterable[FileStat],
+    by: str = 'directory',
+    top: int = 10,
+    tokenizer: Optional[str] = None
+) -> dict:
+    """
+    Build a token histogram and the list of largest files in one pass.
+
+    Args:
+        files: Per-file stats, e.g. from iter_file_stats()
+        by: Grouping, one of GROUP_BY
+        top: Number of largest files to keep
+        tokenizer: Spec of the tokenizer that produced the counts, recorded
+            in the report
+
+    Returns:
+        Report dict with total_tokens, total_files, group_by, tokenizer,
+        groups (name, files, tokens, percent; largest first) and largest
+        (path, tokens)
+    """
+    if by not in GROUP_BY:
+        raise ValidationError(f"Invalid grouping: {by}. Valid groupings: {', '.join(GROUP_BY)}")
+
+    group_tokens: dict[str, int] = defaultdict(int)
+    group_files: dict[str, int] = defaultdict(int)
+    largest: list[tuple[int, str]] = []  # min-heap of the top N (tokens, path)
+    total_tokens = total_files = 0
+
+    for stat in files:
+        key = group_key(stat.path, by)
+        group_tokens[key] += stat.tokens
+        group_files[key] += 1
+        total_tokens += stat.tokens
+        total_files += 1
+        if top > 0:
+            if len(largest) < top:
+                heapq.heappush(largest, (stat.tokens, stat.path))
+            elif stat.tokens > largest[0][0]:
+                heapq.heapreplace(largest, (stat.tokens, stat.path))
+
+    groups = sorted(group_tokens, key=lambda key: (-group_tokens[key], key))
+    return {
+        'total_tokens': total_tokens,
+        'total_files': total_files,
+        'group_by': by,
+        'tokenizer': tokenizer,
+        'groups': [
+            {
+                'name': key,
+                'files': group_files[key],
+                'tokens': group_tokens[key],
+                'percent': round(100 * group_tokens[key] / total_tokens, 1) if total_tokens else 0.0,
+            }
+            for key in groups
+        ],
+        'largest': [
+            {'path': path, 'tokens': tokens}
+            for tokens, path in sorted(largest, key=lambda item: (-item[0], item[1]))
+        ],
+    }
+
+
+def format_table(report: dict) -> str:
+    """
+    Render a report from compute_stats() as a text table with a histogram bar.
+
+    Examples:
+        >>> print(format_table(report))
+        By directory                 Files        Tokens      %
+        src/                            42       120,400   60.2  ##################
+        ...
+    """
+    groups = report['groups']
+    name_width = max([len(group['name']) for group in groups] + [len(f"By {report['group_by']}")])
+    peak = max([group['tokens'] for group in groups] + [1])
+
+    lines = [f"{'By ' + report['group_by']:<{name_width}}  {'Files':>7}  {'Tokens':>12}  {'%':>5}"]
+    for group in groups:
+        bar = '#' * round(BAR_WIDTH * group['tokens'] / peak)
+        lines.append(
+            f"{group['name']:<{name_width}}  {group['files']:>7,}  {group['tokens']:>12,}  "
+            f"{group['percent']:>5.1f}  {bar}"
+        )
+    lines.append(f"{'Total':<{name_width}}  {report['total_files']:>7,}  {report['total_tokens']:>12,}")
+    if report.get('tokenizer'):
+        lines.append(f"Tokenizer: {report['tokenizer']}")
+
+    if report['largest']:
+        lines.append('')
+        lines.append(f"Largest {len(report['largest'])} files:")
+        for item in report['largest']:
+            lines.append(f"  {item['tokens']:>12,}  {item['path']}")
+    return '\n'.join(lines)
@@ -11,12 +11,20 @@ import re
 from pathlib import Path
 from typing import Optional
 from exceptions import ValidationError, StorageError
-from storage_manager import StorageManager
+from storage_manager import VERSIONS_DIRNAME, StorageManager
+from artifact_store import INDEX_FILENAME, ArtifactStore
+from search_index import SEARCH_INDEX_FILENAME, SearchIndex
+from reader import index_path_for
+from workflow import parse_repo_spec
 
 
 # Module-level storage manager instance (can be overridden)
 _storage_manager: Optional[StorageManager] = None
 
+# Files written next to an artifact and named after its stem (see
+# extractor.skipped_manifest_path, code_profile_path and installation_summary_path)
+SIDECAR_SUFFIXES = ('.skipped.json', '.profile.json', '.summary.json')
+
 
 def get_storage_manager(output_dir: Optional[Path] = None) -> StorageManager:
     """
@@ -38,6 +46,10 @@ def parse_repo_name(url: str) -> str:
     """
     Extract repository name from GitHub URL.
 
+    URLs pinned to a ref or narrowed to a subpath (/tree/<ref>/<subpath>,
+    owner/repo@ref:path) get names of their own (see RepoSpec.name), so
+    their artifacts don't overwrite the whole repository's.
+
     Args:
         url: GitHub URL (e.g., https://github.com/owner/repo or https://github.com/owner/repo.git)
 
@@ -54,10 +66,20 @@ def parse_repo_name(url: str) -> str:
         'fastapi'
         >>> parse_repo_name("https://github.com/tiangolo/fastapi/")
         'fastapi'
+        >>> parse_repo_name("tiangolo/fastapi@0.110.0:docs")
+        'fastapi@0.110.0+docs'
+        >>> parse_repo_name("tiangolo/fastapi@0.110.0:docs/en")
+        'fastapi@0.110.0+docs-en~1f3605a0'
     """
     if not url or not isinstance(url, str):
         raise ValidationError("URL must be a non-empty string")
 
+    try:
+        return parse_repo_spec(url).name
+    except ValidationError:
+        # Not a GitHub spec (e.g. GitHub Enterprise): use the last path component
+        pass
+
     # Extract last path component
     parts = url.rstrip('/').split('/')
     if len(parts) < 2:
@@ -78,17 +100,19 @@ def parse_repo_name(url: str) -> str:
     return safe_name
 
 
-def ensure_data_directory(repo_name: str, output_dir: Optional[Path] = None) -> Path:
+def ensure_data_directory(repo_name: str, output_dir: Optional[Path] = None, repo_url: Optional[str] = None) -> Path:
     """
     Ensure data directory exists for repository.
 
     Phase 1.5 Update: Uses StorageManager for dynamic path resolution.
     - Phase 1.0 (gitingest-agent-project): Creates data/[repo-name]/
     - Phase 1.5 (other directories): Uses context/related-repos/
+    - Sharded Phase 1.5 stores: <shard>/<owner>/<repo>/ of the repository URL
 
     Args:
         repo_name: Repository name (sanitized)
         output_dir: Optional custom output directory
+        repo_url: Repository URL, locating the directory in a sharded store
 
     Returns:
         Absolute Path to data directory
@@ -118,11 +142,15 @@ def ensure_data_directory(repo_name: str, output_dir: Optional[Path] = None) ->
             else:
                 # Phase 1.5: context/related-repos/[repo]/ (universal convention)
                 data_dir = cwd / "context" / "related-repos" / repo_name
+                if repo_url and (data_dir.parent / INDEX_FILENAME).exists():
+                    manager = StorageManager(output_dir=data_dir.parent)
+                    if manager.layout == 'sharded':
+                        data_dir = manager.get_extraction_path(repo_url, "digest").parent
         else:
             # Custom output_dir provided - use StorageManager
             manager = StorageManager(output_dir=output_dir)
             dummy_url = f"https://github.com/owner/{repo_name}"
-            extraction_path = manager.get_extraction_path(dummy_url, "digest")
+            extraction_path = manager.get_extraction_path(repo_url or dummy_url, "digest")
             data_dir = extraction_path.parent
 
         data_dir.mkdir(parents=True, exist_ok=True)
@@ -133,6 +161,39 @@ def ensure_data_directory(repo_name: str, output_dir: Optional[Path] = None) ->
         raise StorageError(f"Failed to create directory {data_dir}: {e}")
 
 
+def get_storage_root(output_dir: Optional[Path] = None) -> Path:
+    """
+    Get the artifact store root that holds every repository's extractions.
+
+    Mirrors the location rules of ensure_data_directory() without the
+    per-repository component:
+    - Phase 1.0 (gitingest-agent-project): data/
+    - Phase 1.5 (other directories): context/related-repos/
+    - Custom output_dir: resolved through StorageManager
+
+    Args:
+        output_dir: Optional custom output directory
+
+    Returns:
+        Absolute Path to the storage root (may not exist yet)
+
+    Examples:
+        >>> get_storage_root(Path("./my-analyses"))
+        PosixPath('/abs/path/my-analyses')
+    """
+    if output_dir is not None:
+        return StorageManager(output_dir=Path(output_dir)).get_storage_root().resolve()
+
+    cwd = Path.cwd()
+    is_project_root = (cwd / "execute" / "cli.py").exists() and (cwd / "execute" / "main.py").exists()
+    is_execute_dir = (cwd / "cli.py").exists() and (cwd / "main.py").exists() and cwd.name == "execute"
+
+    if is_project_root or is_execute_dir:
+        base = cwd if is_project_root else cwd.parent
+        return (base / "data").resolve()
+    return (cwd / "context" / "related-repos").resolve()
+
+
 def ensure_analyze_directory(analysis_type: str, output_dir: Optional[Path] = None) -> Path:
     """
     Ensure analyze directory exists for analysis type.
@@ -261,10 +322,106 @@ def save_analysis(
     # Combine metadata + content
     full_content = metadata + content
 
-    # Write to file
+    # Write to file (a sharded store's repository directory may not exist yet)
     try:
+        output_file.parent.mkdir(parents=True, exist_ok=True)
         output_file.write_text(full_content, encoding='utf-8')
     except Exception as e:
         raise StorageError(f"Failed to write analysis file: {e}")
 
+    # Analyses stored alongside extractions count towards the artifact quota
+    # but are pinned so LRU eviction never removes them
+    if output_dir is not None or is_url:
+        root = manager.get_storage_root().resolve()
+        if root in output_file.resolve().parents:
+            with ArtifactStore(root) as store:
+                store.record(output_file, 'analysis', repo=repo_display, pinned=True)
+
     return str(output_file.resolve())
+
+
+def migrate_layout(output_dir: Optional[Path] = None, dry_run: bool = False) -> list[tuple[Path, Path]]:
+    """
+    Move a Phase 1.5 store's artifacts into the sharded layout, in bulk.
+
+    Artifacts are found through the artifact index rather than by listing
+    directories, and each is filed under the owner/repo of its index entry:
+
+    - A repository directory (context/related-repos/[repo]/, see
+      ensure_data_directory) is renamed as a whole to <shard>/<owner>/<repo>/,
+      with its versions, offset indexes and manifests.
+    - A file in the store root ({owner}-{repo}-{type}.txt, or an extraction
+      written straight into an output directory) moves to
+      <shard>/<owner>/<repo>/{type}.txt with its sidecar files; versions in
+      the root's versions/ move the same way.
+
+    Entries without a repository, and moves whose target already exists,
+    are left in place. The artifact and search indexes are re-keyed rather
+    than rebuilt, and the sharded layout is recorded so later extractions
+    and analyses use it.
+
+    Args:
+        output_dir: Optional custom output directory
+        dry_run: Only plan the moves
+
+    Returns:
+        List of (source, target) per move, in the order made
+
+    Raises:
+        ValidationError: If the store is a Phase 1.0 store (data/[repo]/)
+        StorageError: If a move or an index update fails
+
+    Examples:
+        >>> migrate_layout(Path("./my-analyses"))
+        [(PosixPath('/abs/my-analyses/fastapi-fastapi-digest.txt'),
+          PosixPath('/abs/my-analyses/a2/fastapi/fastapi/digest.txt'))]
+    """
+    manager = StorageManager(output_dir=Path(output_dir) if output_dir is not None else None)
+    if manager._is_phase_1_0_mode():
+        raise ValidationError("Only Phase 1.5 stores can be sharded (Phase 1.0 stores keep data/[repo]/)")
+    root = manager.get_storage_root().resolve()
+
+    with ArtifactStore(root) as store:
+        moves = _plan_layout_moves(root, store.entries())
+        if dry_run:
+            return moves
+        search = SearchIndex.for_root(root) if (root / SEARCH_INDEX_FILENAME).exists() else None
+        try:
+            for source, target in moves:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                source.rename(target)
+                store.move(source, target)
+                if search is not None:
+                    search.move(source, target)
+        except OSError as e:
+            raise StorageError(f"Failed to move {source} to {target}: {e}")
+        finally:
+            if search is not None:
+                search.close()
+        store.set_layout('sharded')
+    return moves
+
+
+def _plan_layout_moves(root: Path, entries: list[dict]) -> list[tuple[Path, Path]]:
+    """Plan the moves of migrate_layout() from artifact index entries."""
+    planned: dict[Path, Path] = {}
+    for entry in entries:
+        try:
+            spec = parse_repo_spec(entry['repo'])
+        except ValidationError:
+            continue
+        parts = entry['path'].relative_to(root).parts
+        if len(parts) > 3 and StorageManager.shard_dir(parts[1], parts[2]) == Path(*parts[:3]):
+            continue
+        if len(parts) > 1 and parts[0] != VERSIONS_DIRNAME:
+            # A repository directory, named after the repository (see parse_repo_name)
+            planned.setdefault(root / parts[0], root / StorageManager.shard_dir(spec.owner, parts[0]))
+            continue
+        source = entry['path']
+        name = parts[-1].removeprefix(f"{spec.owner}-{spec.name}-")
+        target = root / StorageManager.shard_dir(spec.owner, spec.name) / Path(*parts[:-1]) / name
+        planned.setdefault(source, target)
+        planned.setdefault(index_path_for(source), index_path_for(target))
+        for suffix in SIDECAR_SUFFIXES:
+            planned.setdefault(source.with_name(source.stem + suffix), target.with_name(target.stem + suffix))
+    return [(source, target) for source, target in planned.items() if source.exists() and not target.exists()]
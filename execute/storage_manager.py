@@ -4,10 +4,35 @@ Storage location detection and path management.
 This module provides the StorageManager class which abstracts storage location
 detection, supporting both Phase 1.0 (gitingest-agent-project) and Phase 1.5
 (universal context/related-repos/) behaviors.
+
+Phase 1.5 stores are flat by default: every artifact sits in one directory as
+{owner}-{repo}-{type}.txt. Large stores can use the sharded layout instead,
+<shard>/<owner>/<repo>/{type}.txt, where the shard is a hash prefix of
+owner/repo: directories stay small however many repositories are stored, and
+names containing dashes can't collide. The layout is recorded in the store's
+artifact index (see storage.migrate_layout).
 """
 
+import hashlib
+import re
 from pathlib import Path
 from typing import Optional, Tuple
+from artifact_store import INDEX_FILENAME, ArtifactStore
+from exceptions import ValidationError
+from workflow import parse_repo_spec
+
+
+# Directory next to an artifact that holds its versions, one subdirectory per commit
+VERSIONS_DIRNAME = "versions"
+
+# Abbreviated or full commit ids (SHA-1 or SHA-256)
+COMMIT_RE = re.compile(r'[0-9a-f]{7,64}')
+
+# Artifact layouts of Phase 1.5 stores
+LAYOUTS = ('flat', 'sharded')
+
+# Hex digits of the owner/repo hash naming a shard directory (256 shards)
+SHARD_WIDTH = 2
 
 
 class StorageManager:
@@ -18,21 +43,31 @@ class StorageManager:
     working directory and project context. Supports two modes:
 
     - Phase 1.0: When in gitingest-agent-project, uses data/ and analyze/ folders
-    - Phase 1.5: When in any other directory, uses context/related-repos/ folder
+    - Phase 1.5: When in any other directory, uses context/related-repos/ folder,
+      flat or sharded (see LAYOUTS)
 
     Attributes:
         output_dir: The base directory for all storage operations
+        layout: Artifact layout of a Phase 1.5 store ('flat' or 'sharded')
     """
 
-    def __init__(self, output_dir: Optional[Path] = None):
+    def __init__(self, output_dir: Optional[Path] = None, layout: Optional[str] = None):
         """
         Initialize StorageManager with automatic or manual location detection.
 
         Args:
             output_dir: Optional custom output directory. If None, auto-detects
                        based on current working directory.
+            layout: Optional artifact layout (default: the one recorded in
+                    the store's artifact index, else 'flat')
+
+        Raises:
+            ValidationError: If layout is unknown
         """
         self.output_dir = output_dir or self._detect_output_location()
+        self.layout = layout or self._recorded_layout()
+        if self.layout not in LAYOUTS:
+            raise ValidationError(f"Unknown layout: {self.layout} (choose from {', '.join(LAYOUTS)})")
 
     def _detect_output_location(self) -> Path:
         """
@@ -65,25 +100,108 @@ class StorageManager:
 
         return context_dir
 
-    def get_extraction_path(self, repo_url: str, content_type: str) -> Path:
+    def _recorded_layout(self) -> str:
+        """Return the layout recorded in the store's artifact index ('flat' if none is)."""
+        root = self.get_storage_root()
+        if self._is_phase_1_0_mode() or not (root / INDEX_FILENAME).exists():
+            return 'flat'
+        with ArtifactStore(root) as store:
+            return store.get_layout() or 'flat'
+
+    def get_extraction_path(self, repo_url: str, content_type: str, commit: Optional[str] = None) -> Path:
         """
         Get path for extraction file based on location and naming convention.
 
         Args:
             repo_url: GitHub repository URL
             content_type: Type of content (digest, tree, installation, etc.)
+            commit: Optional commit id: the path of the version extracted
+                from that commit (see version_path) instead of the latest
 
         Returns:
             Path object for where extraction should be saved
+
+        Raises:
+            ValidationError: If commit isn't a commit id
         """
         owner, repo = self._parse_repo_full_name(repo_url)
 
         if self._is_phase_1_0_mode():
             # Phase 1.0: data/{repo}/{content_type}.txt
-            return self.output_dir / "data" / repo / f"{content_type}.txt"
+            path = self.output_dir / "data" / repo / f"{content_type}.txt"
+        elif self.layout == 'sharded':
+            # Phase 1.5 sharded: context/related-repos/{shard}/{owner}/{repo}/{content_type}.txt
+            path = self.output_dir / self.shard_dir(owner, repo) / f"{content_type}.txt"
         else:
             # Phase 1.5: context/related-repos/{owner}-{repo}-{content_type}.txt
-            return self.output_dir / f"{owner}-{repo}-{content_type}.txt"
+            path = self.output_dir / f"{owner}-{repo}-{content_type}.txt"
+        return self.version_path(path, commit) if commit is not None else path
+
+    @staticmethod
+    def version_path(path: Path, commit: str) -> Path:
+        """
+        Get the path of an artifact's version extracted from a commit.
+
+        The artifact path itself always holds the latest extraction; each
+        version is kept in versions/<commit>/ next to it under the same name,
+        so versions of one artifact can be diffed.
+
+        Args:
+            path: Artifact path (e.g. data/fastapi/digest.txt)
+            commit: Commit id the version was extracted from
+
+        Returns:
+            Path of the version (e.g. data/fastapi/versions/<commit>/digest.txt)
+
+        Raises:
+            ValidationError: If commit isn't a commit id
+
+        Examples:
+            >>> StorageManager.version_path(Path("data/fastapi/digest.txt"), "3f2a9c1").as_posix()
+            'data/fastapi/versions/3f2a9c1/digest.txt'
+        """
+        if not COMMIT_RE.fullmatch(commit):
+            raise ValidationError(f"Invalid commit id: {commit}")
+        return Path(path).parent / VERSIONS_DIRNAME / commit / Path(path).name
+
+    @staticmethod
+    def shard_dir(owner: str, repo: str) -> Path:
+        """
+        Get the directory of a repository's artifacts in the sharded layout, relative to the store.
+
+        Owner and repository are path components of their own, so no two
+        repositories share a directory; the shard is the first SHARD_WIDTH
+        hex digits of the SHA-256 of owner/repo.
+
+        Examples:
+            >>> StorageManager.shard_dir("facebook", "react").as_posix()
+            '8c/facebook/react'
+        """
+        shard = hashlib.sha256(f"{owner}/{repo}".encode('utf-8')).hexdigest()[:SHARD_WIDTH]
+        return Path(shard, owner, repo)
+
+    @staticmethod
+    def sharded_root(data_dir: Path) -> Optional[Path]:
+        """
+        Get the store root of a repository directory in the sharded layout.
+
+        Returns:
+            The directory three levels up if data_dir is <shard>/<owner>/<repo>
+            of that store, else None
+
+        Examples:
+            >>> StorageManager.sharded_root(Path("/ctx/8c/facebook/react")).as_posix()
+            '/ctx'
+            >>> StorageManager.sharded_root(Path("/ctx/react")) is None
+            True
+        """
+        data_dir = Path(data_dir)
+        if len(data_dir.parts) < 4:
+            return None
+        expected = StorageManager.shard_dir(data_dir.parent.name, data_dir.name)
+        if Path(*data_dir.parts[-3:]) != expected:
+            return None
+        return data_dir.parents[2]
 
     def get_analysis_path(self, repo_url: str, analysis_type: str) -> Path:
         """
@@ -101,10 +219,26 @@ class StorageManager:
         if self._is_phase_1_0_mode():
             # Phase 1.0: analyze/{type}/{repo}.md
             return self.output_dir / "analyze" / analysis_type / f"{repo}.md"
+        elif self.layout == 'sharded':
+            # Phase 1.5 sharded: context/related-repos/{shard}/{owner}/{repo}/{type}.md
+            return self.output_dir / self.shard_dir(owner, repo) / f"{analysis_type}.md"
         else:
             # Phase 1.5: context/related-repos/{owner}-{repo}-{type}.md
             return self.output_dir / f"{owner}-{repo}-{analysis_type}.md"
 
+    def get_storage_root(self) -> Path:
+        """
+        Get the directory that holds extraction artifacts for all repositories.
+
+        Returns:
+            Path to the artifact store root:
+            - Phase 1.0: data/
+            - Phase 1.5: context/related-repos/ (the output directory itself)
+        """
+        if self._is_phase_1_0_mode():
+            return self.output_dir / "data"
+        return self.output_dir
+
     def _is_phase_1_0_mode(self) -> bool:
         """
         Check if we're operating in Phase 1.0 mode (gitingest-agent-project).
@@ -118,6 +252,9 @@ class StorageManager:
         """
         Extract (owner, repo) from GitHub URL.
 
+        A URL pinned to a ref or narrowed to a subpath gets the storage name
+        of its spec as repo (see RepoSpec.name).
+
         Args:
             url: GitHub URL (e.g., https://github.com/owner/repo)
 
@@ -129,7 +266,14 @@ class StorageManager:
             ('facebook', 'react')
             >>> _parse_repo_full_name("https://github.com/vercel/next.js.git")
             ('vercel', 'next.js')
+            >>> _parse_repo_full_name("https://github.com/vercel/turbo/tree/main/docs")
+            ('vercel', 'turbo@main+docs')
         """
+        try:
+            spec = parse_repo_spec(url)
+            return (spec.owner, spec.name)
+        except ValidationError:
+            pass
         parts = url.rstrip('/').split('/')
         owner = parts[-2]
         repo = parts[-1].replace('.git', '')
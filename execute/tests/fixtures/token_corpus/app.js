@@ -0,0 +1,84 @@
+/**
+ * Small task queue with retry and exponential backoff.
+ */
+const DEFAULT_RETRIES = 3;
+const BASE_DELAY_MS = 250;
+
+function sleep(ms) {
+  return new Promise((resolve) => setTimeout(resolve, ms));
+}
+
+class TaskQueue {
+  constructor({ concurrency = 4, retries = DEFAULT_RETRIES } = {}) {
+    this.concurrency = concurrency;
+    this.retries = retries;
+    this.pending = [];
+    this.running = 0;
+    this.results = new Map();
+  }
+
+  push(id, task) {
+    return new Promise((resolve, reject) => {
+      this.pending.push({ id, task, resolve, reject, attempt: 0 });
+      this._drain();
+    });
+  }
+
+  async _run(job) {
+    try {
+      const value = await job.task();
+      this.results.set(job.id, { ok: true, value });
+      job.resolve(value);
+    } catch (error) {
+      if (job.attempt < this.retries) {
+        job.attempt += 1;
+        await sleep(BASE_DELAY_MS * 2 ** job.attempt);
+        this.pending.unshift(job);
+      } else {
+        this.results.set(job.id, { ok: false, error: String(error) });
+        job.reject(error);
+      }
+    } finally {
+      this.running -= 1;
+      this._drain();
+    }
+  }
+
+  _drain() {
+    while (this.running < this.concurrency && this.pending.length > 0) {
+      const job = this.pending.shift();
+      this.running += 1;
+      this._run(job);
+    }
+  }
+
+  summary() {
+    let ok = 0;
+    let failed = 0;
+    for (const result of this.results.values()) {
+      if (result.ok) {
+        ok += 1;
+      } else {
+        failed += 1;
+      }
+    }
+    return { ok, failed, pending: this.pending.length, running: this.running };
+  }
+}
+
+async function fetchAll(urls, options = {}) {
+  const queue = new TaskQueue(options);
+  const jobs = urls.map((url, index) =>
+    queue.push(index, async () => {
+      const response = await fetch(url);
+      if (!response.ok) {
+        throw new Error(`HTTP ${response.status} for ${url}`);
+      }
+      return response.json();
+    })
+  );
+  const settled = await Promise.allSettled(jobs);
+  return { settled, summary: queue.summary() };
+}
+
+module.exports = { TaskQueue, fetchAll, sleep };
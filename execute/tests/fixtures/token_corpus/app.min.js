@@ -0,0 +1 @@
+const R=3;const D=250;function sleep(ms){return new Promise((resolve)=>setTimeout(resolve,ms));}class TaskQueue{constructor({c=4,retries=R}={}){this.c=c;this.retries=retries;this.p=[];this.n=0;this.r=new Map();}push(id,task){return new Promise((resolve,reject)=>{this.p.push({id,task,resolve,reject,attempt:0});this._drain();});}async _run(job){try{const value=await job.task();this.r.set(job.id,{ok:true,value});job.resolve(value);}catch(error){if(job.attempt<this.retries){job.attempt+=1;await sleep(D*2**job.attempt);this.p.unshift(job);}else{this.r.set(job.id,{ok:false,error:String(error)});job.reject(error);}}finally{this.n-=1;this._drain();}}_drain(){while(this.n<this.c && this.p.length>0){const job=this.p.shift();this.n+=1;this._run(job);}}summary(){let ok=0;let failed=0;for(const result of this.r.values()){if(result.ok){ok+=1;}else{failed+=1;}}return{ok,failed,p:this.p.length,n:this.n};}}async function fetchAll(urls,options={}){const queue=new TaskQueue(options);const jobs=urls.map((url,index)=>queue.push(index,async()=>{const response=await fetch(url);if(!response.ok){throw new Error(`HTTP ${response.status}for ${url}`);}return response.json();}));const settled=await Promise.allSettled(jobs);return{settled,summary:queue.summary()};}module.exports={TaskQueue,fetchAll,sleep};
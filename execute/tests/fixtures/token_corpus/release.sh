@@ -0,0 +1,34 @@
+#!/usr/bin/env bash
+# Tag and publish a release.
+set -euo pipefail
+
+VERSION="${1:?usage: release.sh VERSION}"
+BRANCH="$(git rev-parse --abbrev-ref HEAD)"
+
+if [[ "$BRANCH" != "main" ]]; then
+  echo "error: releases are cut from main (on $BRANCH)" >&2
+  exit 1
+fi
+
+if ! git diff --quiet || ! git diff --cached --quiet; then
+  echo "error: working tree is dirty" >&2
+  exit 1
+fi
+
+echo "==> Running tests"
+python -m pytest -q
+
+echo "==> Updating version to $VERSION"
+sed -i.bak -E "s/^version = \".*\"/version = \"$VERSION\"/" pyproject.toml
+rm -f pyproject.toml.bak
+
+git add pyproject.toml
+git commit -m "Release $VERSION"
+git tag -a "v$VERSION" -m "Release $VERSION"
+
+for remote in $(git remote); do
+  echo "==> Pushing to $remote"
+  git push "$remote" main "v$VERSION"
+done
+
+echo "Done: v$VERSION"
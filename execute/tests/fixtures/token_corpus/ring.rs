@@ -0,0 +1,82 @@
+//! A fixed-capacity ring buffer.
+
+use std::fmt;
+
+#[derive(Debug)]
+pub struct Ring<T> {
+    buf: Vec<Option<T>>,
+    head: usize,
+    len: usize,
+}
+
+#[derive(Debug, PartialEq, Eq)]
+pub enum RingError {
+    Full,
+    ZeroCapacity,
+}
+
+impl fmt::Display for RingError {
+    fn fmt(&self, f: &mut fmt::Formatter<'_>) -> fmt::Result {
+        match self {
+            RingError::Full => write!(f, "ring buffer is full"),
+            RingError::ZeroCapacity => write!(f, "capacity must be non-zero"),
+        }
+    }
+}
+
+impl<T> Ring<T> {
+    pub fn with_capacity(capacity: usize) -> Result<Self, RingError> {
+        if capacity == 0 {
+            return Err(RingError::ZeroCapacity);
+        }
+        let mut buf = Vec::with_capacity(capacity);
+        buf.resize_with(capacity, || None);
+        Ok(Ring { buf, head: 0, len: 0 })
+    }
+
+    pub fn push(&mut self, value: T) -> Result<(), RingError> {
+        if self.len == self.buf.len() {
+            return Err(RingError::Full);
+        }
+        let tail = (self.head + self.len) % self.buf.len();
+        self.buf[tail] = Some(value);
+        self.len += 1;
+        Ok(())
+    }
+
+    pub fn pop(&mut self) -> Option<T> {
+        if self.len == 0 {
+            return None;
+        }
+        let value = self.buf[self.head].take();
+        self.head = (self.head + 1) % self.buf.len();
+        self.len -= 1;
+        value
+    }
+
+    pub fn len(&self) -> usize {
+        self.len
+    }
+
+    pub fn is_empty(&self) -> bool {
+        self.len == 0
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn push_pop_wraps() {
+        let mut ring = Ring::with_capacity(2).unwrap();
+        ring.push(1).unwrap();
+        ring.push(2).unwrap();
+        assert_eq!(ring.push(3), Err(RingError::Full));
+        assert_eq!(ring.pop(), Some(1));
+        ring.push(3).unwrap();
+        assert_eq!(ring.pop(), Some(2));
+        assert_eq!(ring.pop(), Some(3));
+        assert!(ring.is_empty());
+    }
+}
@@ -0,0 +1,91 @@
+package main
+
+import (
+	"context"
+	"encoding/json"
+	"errors"
+	"log"
+	"net/http"
+	"os"
+	"os/signal"
+	"sync"
+	"time"
+)
+
+type Item struct {
+	ID    string    `json:"id"`
+	Name  string    `json:"name"`
+	Added time.Time `json:"added"`
+}
+
+type Store struct {
+	mu    sync.RWMutex
+	items map[string]Item
+}
+
+func NewStore() *Store {
+	return &Store{items: make(map[string]Item)}
+}
+
+func (s *Store) Get(id string) (Item, bool) {
+	s.mu.RLock()
+	defer s.mu.RUnlock()
+	item, ok := s.items[id]
+	return item, ok
+}
+
+func (s *Store) Put(item Item) {
+	s.mu.Lock()
+	defer s.mu.Unlock()
+	s.items[item.ID] = item
+}
+
+func (s *Store) handleItem(w http.ResponseWriter, r *http.Request) {
+	id := r.URL.Query().Get("id")
+	switch r.Method {
+	case http.MethodGet:
+		item, ok := s.Get(id)
+		if !ok {
+			http.Error(w, "not found", http.StatusNotFound)
+			return
+		}
+		w.Header().Set("Content-Type", "application/json")
+		if err := json.NewEncoder(w).Encode(item); err != nil {
+			log.Printf("encode: %v", err)
+		}
+	case http.MethodPost:
+		var item Item
+		if err := json.NewDecoder(r.Body).Decode(&item); err != nil {
+			http.Error(w, err.Error(), http.StatusBadRequest)
+			return
+		}
+		item.Added = time.Now().UTC()
+		s.Put(item)
+		w.WriteHeader(http.StatusCreated)
+	default:
+		http.Error(w, "method not allowed", http.StatusMethodNotAllowed)
+	}
+}
+
+func main() {
+	store := NewStore()
+	mux := http.NewServeMux()
+	mux.HandleFunc("/item", store.handleItem)
+
+	srv := &http.Server{Addr: ":8080", Handler: mux, ReadTimeout: 5 * time.Second}
+	go func() {
+		if err := srv.ListenAndServe(); err != nil && !errors.Is(err, http.ErrServerClosed) {
+			log.Fatalf("listen: %v", err)
+		}
+	}()
+
+	stop := make(chan os.Signal, 1)
+	signal.Notify(stop, os.Interrupt)
+	<-stop
+
+	ctx, cancel := context.WithTimeout(context.Background(), 10*time.Second)
+	defer cancel()
+	if err := srv.Shutdown(ctx); err != nil {
+		log.Printf("shutdown: %v", err)
+	}
+}
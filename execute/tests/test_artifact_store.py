@@ -0,0 +1,394 @@
+"""
+Unit tests for artifact_store module.
+
+Tests cover:
+- Size parsing and formatting
+- Recording artifacts and access tracking
+- Quota configuration (persisted and environment)
+- LRU eviction planning with pinned and protected artifacts
+- Stale index entry detection
+- Version catalog and latest pointers
+"""
+
+import os
+import time
+import pytest
+from pathlib import Path
+from exceptions import StorageError, ValidationError
+from artifact_store import (
+    ArtifactStore,
+    parse_size,
+    format_size,
+    INDEX_FILENAME,
+    QUOTA_ENV_VAR,
+)
+
+
+def _write(path: Path, size: int) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    return path
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.delenv(QUOTA_ENV_VAR, raising=False)
+    with ArtifactStore(tmp_path) as artifact_store:
+        yield artifact_store
+
+
+class TestSizeHelpers:
+    """Tests for parse_size() and format_size()."""
+
+    def test_parse_size_units(self):
+        """Test binary unit suffixes."""
+        assert parse_size("512") == 512
+        assert parse_size("2K") == 2048
+        assert parse_size("1.5M") == int(1.5 * 1024 ** 2)
+        assert parse_size("5G") == 5 * 1024 ** 3
+        assert parse_size("1gb") == 1024 ** 3
+
+    def test_parse_size_invalid(self):
+        """Test invalid sizes raise ValidationError."""
+        with pytest.raises(ValidationError):
+            parse_size("lots")
+
+    def test_format_size(self):
+        """Test human-readable formatting."""
+        assert format_size(12) == "12 B"
+        assert format_size(1536) == "1.5 KB"
+        assert format_size(3 * 1024 ** 3) == "3.0 GB"
+
+
+class TestRecording:
+    """Tests for recording and tracking artifacts."""
+
+    def test_index_created_at_root(self, store, tmp_path):
+        """Test the index file lives at the store root."""
+        assert (tmp_path / INDEX_FILENAME).exists()
+
+    def test_record_tracks_size(self, store, tmp_path):
+        """Test recorded artifacts contribute their size."""
+        _write(tmp_path / "repo" / "digest.txt", 100)
+        _write(tmp_path / "repo" / "tree.txt", 50)
+
+        store.record(tmp_path / "repo" / "digest.txt", 'digest', repo='user/repo')
+        store.record(tmp_path / "repo" / "tree.txt", 'tree', repo='user/repo')
+
+        assert store.total_size() == 150
+        assert store.get_size(tmp_path / "repo" / "digest.txt") == 100
+
+    def test_record_refreshes_existing_entry(self, store, tmp_path):
+        """Test re-recording an overwritten artifact updates its size."""
+        path = _write(tmp_path / "repo" / "digest.txt", 100)
+        store.record(path, 'digest')
+        _write(path, 40)
+        store.record(path, 'digest')
+
+        assert store.total_size() == 40
+        assert len(store.entries()) == 1
+
+    def test_record_outside_root_rejected(self, store, tmp_path):
+        """Test artifacts outside the root cannot be indexed."""
+        outside = _write(tmp_path.parent / f"{tmp_path.name}-outside.txt", 10)
+        with pytest.raises(StorageError):
+            store.record(outside, 'digest')
+
+    def test_touch_updates_lru_order(self, store, tmp_path):
+        """Test touching an artifact moves it to the back of the LRU order."""
+        first = _write(tmp_path / "a" / "digest.txt", 10)
+        second = _write(tmp_path / "b" / "digest.txt", 10)
+        store.record(first, 'digest')
+        time.sleep(0.01)
+        store.record(second, 'digest')
+        time.sleep(0.01)
+        store.touch(first)
+
+        assert [e['path'] for e in store.entries()] == [second.resolve(), first.resolve()]
+
+
+class TestQuota:
+    """Tests for quota configuration."""
+
+    def test_no_quota_by_default(self, store):
+        """Test no quota is configured by default."""
+        assert store.get_quota() is None
+
+    def test_set_quota_persists(self, store, tmp_path):
+        """Test persisted quota survives reopening the index."""
+        store.set_quota(1024)
+        with ArtifactStore(tmp_path) as reopened:
+            assert reopened.get_quota() == 1024
+
+    def test_env_quota_takes_precedence(self, store, monkeypatch):
+        """Test environment variable overrides the persisted quota."""
+        store.set_quota(1024)
+        monkeypatch.setenv(QUOTA_ENV_VAR, "2K")
+        assert store.get_quota() == 2048
+
+    def test_clear_quota(self, store):
+        """Test setting None removes the quota."""
+        store.set_quota(1024)
+        store.set_quota(None)
+        assert store.get_quota() is None
+
+
+class TestEviction:
+    """Tests for LRU eviction."""
+
+    def _populate(self, store, tmp_path):
+        paths = []
+        for name in ("old", "mid", "new"):
+            path = _write(tmp_path / name / "digest.txt", 100)
+            store.record(path, 'digest', repo=name)
+            paths.append(path)
+            time.sleep(0.01)
+        return paths
+
+    def test_within_quota_evicts_nothing(self, store, tmp_path):
+        """Test nothing is planned while under quota."""
+        self._populate(store, tmp_path)
+        assert store.plan_eviction(quota=1000) == []
+
+    def test_no_quota_evicts_nothing(self, store, tmp_path):
+        """Test nothing is planned without a quota."""
+        self._populate(store, tmp_path)
+        assert store.plan_eviction(incoming_bytes=10_000) == []
+
+    def test_evicts_least_recently_used_first(self, store, tmp_path):
+        """Test LRU artifacts are evicted until the store fits."""
+        old, mid, new = self._populate(store, tmp_path)
+        store.set_quota(150)
+
+        evicted = store.enforce_quota()
+
+        assert [e['path'] for e in evicted] == [old.resolve(), mid.resolve()]
+        assert not old.exists()
+        assert not mid.exists()
+        assert new.exists()
+        assert store.total_size() == 100
+
+    def test_eviction_removes_reader_index(self, store, tmp_path):
+        """Test a digest's offset index sidecar is deleted with it."""
+        from reader import index_path_for
+        old, mid, new = self._populate(store, tmp_path)
+        sidecar = index_path_for(old)
+        sidecar.write_bytes(b"index")
+        store.set_quota(250)
+
+        store.enforce_quota()
+
+        assert not old.exists()
+        assert not sidecar.exists()
+
+    def test_incoming_bytes_reserve_space(self, store, tmp_path):
+        """Test incoming bytes are accounted for when planning."""
+        old, mid, new = self._populate(store, tmp_path)
+        plan = store.plan_eviction(incoming_bytes=50, quota=300)
+        assert [e['path'] for e in plan] == [old.resolve()]
+
+    def test_pinned_analyses_never_evicted(self, store, tmp_path):
+        """Test pinned analyses count towards quota but are never evicted."""
+        analysis = _write(tmp_path / "user-repo-installation.md", 100)
+        store.record(analysis, 'analysis', pinned=True)
+        time.sleep(0.01)
+        old, mid, new = self._populate(store, tmp_path)
+
+        store.set_quota(150)
+        evicted = store.enforce_quota(protect=[new])
+
+        assert analysis.exists()
+        assert new.exists()
+        assert {e['path'] for e in evicted} == {old.resolve(), mid.resolve()}
+
+    def test_protected_artifact_not_evicted(self, store, tmp_path):
+        """Test the artifact being written is protected."""
+        old, mid, new = self._populate(store, tmp_path)
+        plan = store.plan_eviction(quota=250, protect=[old])
+        assert [e['path'] for e in plan] == [mid.resolve()]
+
+    def test_unpinned_artifact_becomes_evictable(self, store, tmp_path):
+        """Test pin() and unpin toggle eviction eligibility."""
+        path = _write(tmp_path / "repo" / "digest.txt", 100)
+        store.record(path, 'digest')
+        store.pin(path)
+        assert store.plan_eviction(quota=0) == []
+        store.pin(path, pinned=False)
+        assert len(store.plan_eviction(quota=0)) == 1
+
+
+class TestStaleEntries:
+    """Tests for index entries whose files were removed."""
+
+    def test_find_and_forget_stale(self, store, tmp_path):
+        """Test stale entries are detected and dropped from the index."""
+        path = _write(tmp_path / "repo" / "digest.txt", 100)
+        store.record(path, 'digest')
+        os.remove(path)
+
+        stale = store.find_stale()
+        assert len(stale) == 1
+
+        store.forget(stale)
+        assert store.entries() == []
+        assert store.total_size() == 0
+
+
+class TestTokenCountCache:
+    """Tests for cached token counts."""
+
+    def test_record_and_get(self, store, tmp_path):
+        """Test counts are cached per tokenizer."""
+        path = _write(tmp_path / "repo" / "digest.txt", 100)
+        store.record_token_count(path, 'heuristic', 25)
+
+        assert store.get_token_count(path, 'heuristic') == 25
+        assert store.get_token_count(path, 'calibrated') is None
+
+    def test_invalidated_when_file_changes(self, store, tmp_path):
+        """Test a changed file is never served a stale count."""
+        path = _write(tmp_path / "repo" / "digest.txt", 100)
+        store.record_token_count(path, 'heuristic', 25)
+        _write(path, 200)
+
+        assert store.get_token_count(path, 'heuristic') is None
+
+    def test_dropped_on_eviction(self, store, tmp_path):
+        """Test evicted artifacts lose their cached counts."""
+        path = _write(tmp_path / "repo" / "digest.txt", 100)
+        store.record(path, 'digest')
+        store.record_token_count(path, 'heuristic', 25)
+        store.evict(store.entries())
+        _write(path, 100)
+
+        assert store.get_token_count(path, 'heuristic') is None
+
+
+class TestVersionCatalog:
+    """Tests for cataloged artifact versions and the latest pointer."""
+
+    def test_record_version(self, store, tmp_path):
+        """Test each recorded version becomes the latest, and older ones stay listed."""
+        path = _write(tmp_path / "repo" / "digest.txt", 100)
+        first = _write(tmp_path / "repo" / "versions" / "aaaaaaa" / "digest.txt", 100)
+        second = _write(tmp_path / "repo" / "versions" / "bbbbbbb" / "digest.txt", 120)
+        store.record_version(path, first, "aaaaaaa", settings="s1", repo="user/repo")
+        store.record_version(path, second, "bbbbbbb", settings="s1", repo="user/repo")
+
+        latest = store.latest_version(path)
+        assert (latest['commit'], latest['path'], latest['settings']) == ("bbbbbbb", second, "s1")
+        assert [(v['commit'], v['latest']) for v in store.versions(path)] == [("bbbbbbb", True), ("aaaaaaa", False)]
+        assert store.get_size(first) == 100
+
+    def test_clear_latest(self, store, tmp_path):
+        """Test an artifact rewritten from an unknown commit has no latest version."""
+        path = _write(tmp_path / "repo" / "digest.txt", 100)
+        version = _write(tmp_path / "repo" / "versions" / "aaaaaaa" / "digest.txt", 100)
+        store.record_version(path, version, "aaaaaaa")
+        store.clear_latest(path)
+
+        assert store.latest_version(path) is None
+        assert [v['latest'] for v in store.versions(path)] == [False]
+
+    def test_evicted_version_leaves_catalog(self, store, tmp_path):
+        """Test evicting a version drops its catalog entry, and evicting the artifact its latest pointer."""
+        path = _write(tmp_path / "repo" / "digest.txt", 100)
+        version = _write(tmp_path / "repo" / "versions" / "aaaaaaa" / "digest.txt", 100)
+        store.record(path, 'digest')
+        store.record_version(path, version, "aaaaaaa")
+
+        store.evict([entry for entry in store.entries() if entry['kind'] == 'digest'])
+        assert store.latest_version(path) is None
+        assert len(store.versions(path)) == 1
+
+        store.evict(store.entries())
+        assert store.versions(path) == []
+        assert not version.exists()
+
+
+class TestLayoutAndMoves:
+    """Tests for the recorded layout, re-keying moved artifacts and filtered entries."""
+
+    def test_layout_persists(self, store, tmp_path):
+        """Test the layout is unset until recorded, and survives reopening the index."""
+        assert store.get_layout() is None
+        store.set_layout('sharded')
+        with ArtifactStore(tmp_path) as reopened:
+            assert reopened.get_layout() == 'sharded'
+
+    def test_move_file(self, store, tmp_path):
+        """Test a moved artifact keeps its size, pin and cached token count."""
+        source = _write(tmp_path / "user-repo-digest.txt", 100)
+        store.record(source, 'digest', repo="user/repo", pinned=True)
+        store.record_token_count(source, 'heuristic', 25)
+        target = tmp_path / "ab" / "user" / "repo" / "digest.txt"
+        target.parent.mkdir(parents=True)
+        source.rename(target)
+
+        store.move(source, target)
+
+        assert [(e['path'], e['size'], e['pinned']) for e in store.entries()] == [(target, 100, True)]
+        assert store.get_token_count(target, 'heuristic') == 25
+
+    def test_move_directory(self, store, tmp_path):
+        """Test moving a directory re-keys its artifacts and versions, but not similarly named siblings."""
+        path = _write(tmp_path / "repo" / "digest.txt", 100)
+        version = _write(tmp_path / "repo" / "versions" / "aaaaaaa" / "digest.txt", 100)
+        sibling = _write(tmp_path / "repo2" / "digest.txt", 50)
+        store.record(path, 'digest')
+        store.record(sibling, 'digest')
+        store.record_version(path, version, "aaaaaaa")
+
+        store.move(tmp_path / "repo", tmp_path / "ab" / "user" / "repo")
+
+        moved = tmp_path / "ab" / "user" / "repo"
+        assert sorted(e['path'] for e in store.entries()) == sorted(
+            [moved / "digest.txt", moved / "versions" / "aaaaaaa" / "digest.txt", sibling]
+        )
+        assert store.latest_version(moved / "digest.txt")['path'] == moved / "versions" / "aaaaaaa" / "digest.txt"
+        assert store.versions(path) == []
+
+    def test_entries_filters(self, store, tmp_path):
+        """Test entries can be filtered by kind and repository."""
+        store.record(_write(tmp_path / "a" / "digest.txt", 10), 'digest', repo="user/a")
+        store.record(_write(tmp_path / "a" / "tree.txt", 10), 'tree', repo="user/a")
+        store.record(_write(tmp_path / "b" / "digest.txt", 10), 'digest', repo="user/b")
+
+        assert [e['path'] for e in store.entries(kinds=['digest'], repo="user/a")] == [tmp_path / "a" / "digest.txt"]
+        assert len(store.entries(kinds=['digest', 'tree'])) == 3
+        assert len(store.entries(repo="user/b")) == 1
+
+
+class TestHardLinks:
+    """Tests for artifacts and versions sharing one file."""
+
+    def _linked(self, store, tmp_path):
+        path = _write(tmp_path / "repo" / "digest.txt", 100)
+        version = tmp_path / "repo" / "versions" / "aaaaaaa" / "digest.txt"
+        version.parent.mkdir(parents=True)
+        os.link(path, version)
+        store.record(path, 'digest')
+        time.sleep(0.01)
+        store.record_version(path, version, "aaaaaaa")
+        time.sleep(0.01)
+        return path, version
+
+    def test_counted_once(self, store, tmp_path):
+        """Test a version linked to its artifact adds nothing to the total size."""
+        self._linked(store, tmp_path)
+
+        assert store.total_size() == 100
+
+    def test_planned_until_last_link(self, store, tmp_path):
+        """Test a linked file only counts as freed once all of its links are planned."""
+        path, version = self._linked(store, tmp_path)
+        store.record(_write(tmp_path / "other" / "digest.txt", 100), 'digest')
+
+        assert [entry['path'] for entry in store.plan_eviction(quota=150)] == [path, version]
+
+    def test_freed_with_last_link(self, store, tmp_path):
+        """Test evicting one link frees nothing, and the last one the file's size."""
+        path, version = self._linked(store, tmp_path)
+
+        assert store.evict([e for e in store.entries() if e['path'] == version]) == 0
+        assert store.evict([e for e in store.entries() if e['path'] == path]) == 100
\ No newline at end of file
@@ -0,0 +1,151 @@
+"""
+Unit tests for byte_estimator module.
+
+Tests cover:
+- Byte class and run counting, including runs across chunk boundaries
+- Text and streaming estimates
+- Fitting coefficients to a reference counter
+- Accuracy on the fixture corpus versus the len // 4 heuristic
+- Benchmark report
+"""
+
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from byte_estimator import (
+    COEFFICIENTS,
+    DIGIT,
+    ESTIMATORS,
+    FEATURES,
+    LEAD2,
+    LEAD3,
+    LETTER,
+    NEWLINE,
+    PUNCT,
+    SPACE,
+    benchmark,
+    byte_class_counts,
+    estimate_bytes_tokens,
+    estimate_stream_tokens,
+    fit_coefficients,
+    predict,
+    text_features,
+)
+from token_estimator import accuracy_report, load_corpus
+
+
+CORPUS = Path(__file__).parent / "fixtures" / "token_corpus"
+
+
+class TestByteClassCounts:
+    """Tests for byte_class_counts() and text_features() functions."""
+
+    def test_classes(self):
+        counts, runs, last = byte_class_counts("foo(bar, 42)\n  é漢".encode('utf-8'))
+
+        assert counts[LETTER] == 6 and runs[LETTER] == 2
+        assert counts[DIGIT] == 2 and runs[DIGIT] == 1
+        assert counts[PUNCT] == 3 and runs[PUNCT] == 3
+        assert runs[SPACE] == 2 and runs[NEWLINE] == 1
+        assert counts[LEAD2] == 1 and counts[LEAD3] == 1
+        assert last != LETTER
+
+    def test_empty(self):
+        counts, runs, last = byte_class_counts(b"", previous=LETTER)
+
+        assert counts.sum() == 0 and runs.sum() == 0
+        assert last == LETTER
+
+    def test_runs_across_chunks(self):
+        data = b"hello world 12345 ====\n" * 7
+        whole = text_features(data)
+        counts = np.zeros_like(byte_class_counts(b"x")[0])
+        runs = np.zeros_like(counts)
+        previous = -1
+        for start in range(0, len(data), 5):
+            chunk_counts, chunk_runs, previous = byte_class_counts(data[start:start + 5], previous)
+            counts += chunk_counts
+            runs += chunk_runs
+
+        assert runs[LETTER] == whole['letter_runs'] == 14
+        assert counts[LETTER] == whole['letter']
+
+
+class TestEstimates:
+    """Tests for estimate_bytes_tokens() and estimate_stream_tokens() functions."""
+
+    def test_empty(self):
+        assert estimate_bytes_tokens("") == 0
+
+    def test_text_and_bytes_agree(self):
+        text = "def main():\n    return 42\n"
+
+        assert estimate_bytes_tokens(text) == estimate_bytes_tokens(text.encode('utf-8'))
+        assert estimate_bytes_tokens(text) > 0
+
+    def test_cjk_costs_more_than_ascii(self):
+        assert estimate_bytes_tokens("漢字" * 100) > estimate_bytes_tokens("ab" * 100)
+
+    def test_stream_matches_text(self, tmp_path):
+        text = "import os\nprint(os.getcwd())  # 漢字\n" * 500
+        path = tmp_path / "digest.txt"
+        path.write_text(text, encoding='utf-8')
+
+        assert estimate_stream_tokens(path, chunk_bytes=97) == estimate_bytes_tokens(text)
+        assert estimate_stream_tokens(path) == estimate_bytes_tokens(text)
+
+
+class TestFitCoefficients:
+    """Tests for fit_coefficients() function."""
+
+    def test_recovers_linear_counter(self):
+        truth = {name: 0.5 + i / 10 for i, name in enumerate(FEATURES)}
+        samples = [
+            (f"s{i}", "word " * i + "42, " * (i % 7) + "x = [1]\n" * (i % 5) + "é漢😀" * (i % 3))
+            for i in range(1, 40)
+        ]
+
+        def reference(text):
+            return sum(truth[name] * value for name, value in text_features(text).items())
+
+        fitted = fit_coefficients(samples, reference)
+
+        assert set(fitted) == set(FEATURES)
+        for _, text in samples:
+            assert predict(text_features(text), fitted) == pytest.approx(reference(text), rel=0.01, abs=1)
+
+    def test_no_samples(self):
+        assert fit_coefficients([], len) == {name: 0.0 for name in FEATURES}
+
+
+class TestAccuracy:
+    """Tests for accuracy on the fixture corpus."""
+
+    def test_beats_heuristic(self):
+        report = accuracy_report(load_corpus(CORPUS), ESTIMATORS)
+
+        assert report['methods'] == ['heuristic', 'calibrated', 'bytes']
+        assert report['bytes']['mean_abs_error'] < report['heuristic']['mean_abs_error']
+        assert report['bytes']['mean_abs_error'] < 0.10
+        assert abs(report['bytes']['total_error']) < 0.10
+
+    def test_coefficients_cover_features(self):
+        assert set(COEFFICIENTS) == set(FEATURES)
+
+
+class TestBenchmark:
+    """Tests for benchmark() function."""
+
+    def test_report(self, tmp_path):
+        path = tmp_path / "digest.txt"
+        path.write_text("hello world\n" * 1000, encoding='utf-8')
+
+        report = benchmark(path)
+
+        assert report['bytes_size'] == 12000
+        assert report['heuristic']['tokens'] == 3000
+        assert report['bytes']['tokens'] == estimate_bytes_tokens("hello world\n" * 1000)
+        assert report['bytes']['seconds'] >= 0
\ No newline at end of file
@@ -3,9 +3,15 @@
 import pytest
 from click.testing import CliRunner
 from unittest.mock import patch
+from pathlib import Path
 
-from cli import gitingest_agent, check_size, extract_full, extract_tree, extract_specific
+from cli import (
+    gitingest_agent, check_size, extract_full, extract_tree, extract_specific, gc, search, grep, versions,
+    migrate_layout_command,
+)
 from exceptions import GitIngestError, ValidationError, StorageError
+from reader import DigestReader
+from token_sampling import TokenEstimate
 
 
 class TestCheckSizeCommand:
@@ -570,4 +576,946 @@ class TestTokenOverflowPrevention:
                         )
 
                         assert result.exit_code == 0
-                        assert "Content exceeds token limit" in result.output
\ No newline at end of file
+                        assert "Content exceeds token limit" in result.output
+
+
+class TestVersionsCommand:
+    """Test the versions command and the commit reported by extractions."""
+
+    def _populate(self, root):
+        from artifact_store import ArtifactStore
+        digest = root / "digest.txt"
+        digest.write_text("v2", encoding='utf-8')
+        with ArtifactStore(root) as store:
+            for commit, text in (("a" * 40, "v1"), ("b" * 40, "v2")):
+                version = root / "versions" / commit / "digest.txt"
+                version.parent.mkdir(parents=True)
+                version.write_text(text, encoding='utf-8')
+                store.record_version(digest, version, commit)
+        return digest
+
+    def test_versions_listed_newest_first(self, tmp_path):
+        """Test every version is listed, the latest marked and evicted ones flagged."""
+        self._populate(tmp_path)
+        (tmp_path / "versions" / ("a" * 40) / "digest.txt").unlink()
+
+        result = CliRunner().invoke(versions, ['https://github.com/user/repo', '--output-dir', str(tmp_path)])
+
+        assert result.exit_code == 0
+        lines = result.output.splitlines()
+        assert lines[0] == f"Versions of {tmp_path / 'digest.txt'}:"
+        assert lines[1].startswith("* bbbbbbbbbbbb  ")
+        assert lines[2].startswith("  aaaaaaaaaaaa  ") and lines[2].endswith("(evicted)")
+
+    def test_no_versions(self, tmp_path):
+        """Test an artifact without versions says how to get them."""
+        result = CliRunner().invoke(versions, ['https://github.com/user/repo', '--type', 'docs',
+                                               '--output-dir', str(tmp_path)])
+
+        assert result.exit_code == 0
+        assert "No versions of" in result.output
+        assert "docs-content.txt" in result.output
+
+    def test_extraction_reports_commit(self, tmp_path):
+        """Test an extraction holding a cataloged version reports its commit, unchanged if extracted before."""
+        digest = self._populate(tmp_path)
+        with patch('cli.extractor.extract_full', return_value=(str(digest), [])):
+            result = CliRunner().invoke(extract_full, ['https://github.com/user/repo', '--output-dir', str(tmp_path)])
+
+        assert result.exit_code == 0
+        assert "Commit: bbbbbbbbbbbb (unchanged, extracted " in result.output
+
+    def test_skip_unchanged_reuses_token_count(self, tmp_path):
+        """Test --skip-unchanged reaches the extractor, and the cached token count is reported."""
+        from artifact_store import ArtifactStore
+        from token_backends import get_backend
+        digest = self._populate(tmp_path)
+        with ArtifactStore(tmp_path) as store:
+            store.record_token_count(digest, get_backend('heuristic').spec, 1234)
+
+        with patch('cli.extractor.extract_full', return_value=(str(digest), [])) as mock_extract, \
+                patch('cli.count_tokens_from_file') as mock_count:
+            result = CliRunner().invoke(extract_full, ['https://github.com/user/repo', '--skip-unchanged',
+                                                       '--tokenizer', 'heuristic', '--output-dir', str(tmp_path)])
+
+        assert result.exit_code == 0
+        assert mock_extract.call_args.kwargs['skip_unchanged'] is True
+        mock_count.assert_not_called()
+        assert "Token count: 1,234 tokens" in result.output
+
+
+class TestGcCommand:
+    """Test gc command."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.runner = CliRunner()
+
+    def _populate(self, root):
+        from artifact_store import ArtifactStore
+        import time
+        paths = []
+        with ArtifactStore(root) as store:
+            for name in ("old", "new"):
+                path = root / f"{name}-digest.txt"
+                path.write_bytes(b"x" * 1024)
+                store.record(path, 'digest')
+                paths.append(path)
+                time.sleep(0.01)
+        return paths
+
+    def test_gc_dry_run_reports_without_deleting(self, tmp_path, monkeypatch):
+        """Test dry run lists LRU evictions but keeps files."""
+        monkeypatch.delenv('GITINGEST_AGENT_QUOTA', raising=False)
+        old, new = self._populate(tmp_path)
+
+        result = self.runner.invoke(gc, ['--output-dir', str(tmp_path), '--quota', '1K', '--dry-run'])
+
+        assert result.exit_code == 0
+        assert "Would evict 1 artifact(s)" in result.output
+        assert "old-digest.txt" in result.output
+        assert old.exists()
+        assert new.exists()
+
+    def test_gc_evicts_lru(self, tmp_path, monkeypatch):
+        """Test gc deletes least recently used artifacts."""
+        monkeypatch.delenv('GITINGEST_AGENT_QUOTA', raising=False)
+        old, new = self._populate(tmp_path)
+
+        result = self.runner.invoke(gc, ['--output-dir', str(tmp_path), '--quota', '1K'])
+
+        assert result.exit_code == 0
+        assert "[OK] Freed 1.0 KB" in result.output
+        assert not old.exists()
+        assert new.exists()
+
+    def test_gc_set_quota(self, tmp_path, monkeypatch):
+        """Test persisting a quota."""
+        monkeypatch.delenv('GITINGEST_AGENT_QUOTA', raising=False)
+        self._populate(tmp_path)
+
+        result = self.runner.invoke(gc, ['--output-dir', str(tmp_path), '--set-quota', '4K'])
+
+        assert result.exit_code == 0
+        assert "[OK] Quota set to: 4.0 KB" in result.output
+        assert "nothing to evict" in result.output
+
+    def test_gc_without_quota(self, tmp_path, monkeypatch):
+        """Test gc without any quota configured."""
+        monkeypatch.delenv('GITINGEST_AGENT_QUOTA', raising=False)
+        self._populate(tmp_path)
+
+        result = self.runner.invoke(gc, ['--output-dir', str(tmp_path)])
+
+        assert result.exit_code == 0
+        assert "No quota configured" in result.output
+
+    def test_gc_invalid_quota(self, tmp_path):
+        """Test invalid quota value."""
+        result = self.runner.invoke(gc, ['--output-dir', str(tmp_path), '--quota', 'huge'])
+
+        assert result.exit_code == 1
+        assert "[ERROR] Invalid input:" in result.output
+
+
+class TestMigrateLayoutCommand:
+    """Test migrate-layout command."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.runner = CliRunner()
+
+    def _populate(self, root):
+        from artifact_store import ArtifactStore
+        path = root / "user-repo-digest.txt"
+        path.write_text("x", encoding='utf-8')
+        with ArtifactStore(root) as store:
+            store.record(path, 'digest', repo='user/repo')
+        return path
+
+    def test_dry_run_lists_moves(self, tmp_path):
+        """Test dry run lists the moves and keeps the flat layout."""
+        path = self._populate(tmp_path)
+
+        result = self.runner.invoke(migrate_layout_command, ['--output-dir', str(tmp_path), '--dry-run'])
+
+        assert result.exit_code == 0
+        assert "user-repo-digest.txt -> " in result.output
+        assert "Would move 1 path(s)" in result.output
+        assert path.exists()
+
+    def test_migrate(self, tmp_path):
+        """Test artifacts move under their shard directory."""
+        from storage_manager import StorageManager
+        self._populate(tmp_path)
+
+        result = self.runner.invoke(migrate_layout_command, ['--output-dir', str(tmp_path)])
+
+        assert result.exit_code == 0
+        assert "[OK] Moved 1 path(s)" in result.output
+        assert (tmp_path / StorageManager.shard_dir("user", "repo") / "digest.txt").exists()
+
+    def test_without_index(self, tmp_path):
+        """Test a directory without an artifact index is reported."""
+        result = self.runner.invoke(migrate_layout_command, ['--output-dir', str(tmp_path)])
+
+        assert result.exit_code == 1
+        assert "[ERROR] No artifact index" in result.output
+
+
+class TestSearchCommand:
+    """Test search command."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.runner = CliRunner()
+
+    def _store_digest(self, root):
+        from artifact_store import ArtifactStore
+        sep = "=" * 48
+        digest = root / "repo" / "digest.txt"
+        digest.parent.mkdir(parents=True)
+        digest.write_text(f"{sep}\nFILE: src/app.py\n{sep}\nimport os\n\ndef create_app():\n    pass\n",
+                          encoding='utf-8')
+        with ArtifactStore(root) as store:
+            store.record(digest, 'digest', repo='user/repo')
+        return digest
+
+    def test_search_reindex_and_match(self, tmp_path):
+        """Test reindexing stored digests and printing repo:file:line matches."""
+        self._store_digest(tmp_path)
+
+        result = self.runner.invoke(search, ['create_app', '--reindex', '--output-dir', str(tmp_path)])
+
+        assert result.exit_code == 0
+        assert "[OK] Indexed 1 new sections" in result.output
+        assert "user/repo:src/app.py:3: def create_app():" in result.output
+
+    def test_search_no_matches(self, tmp_path):
+        """Test message when nothing matches."""
+        result = self.runner.invoke(search, ['nothing_here', '--output-dir', str(tmp_path)])
+
+        assert result.exit_code == 0
+        assert "No matches found." in result.output
+
+    def test_search_facet(self, tmp_path):
+        """Test facet counts output."""
+        self._store_digest(tmp_path)
+
+        result = self.runner.invoke(search, ['create_app', '--reindex', '--facet', 'language',
+                                             '--output-dir', str(tmp_path)])
+
+        assert result.exit_code == 0
+        assert "Python" in result.output
+
+
+class TestExtractRelevantCommand:
+    """Test extract-relevant command."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.runner = CliRunner()
+
+    def test_extract_relevant_success(self):
+        """Test successful relevance extraction output."""
+        with patch('cli.parse_repo_name', return_value='repo'):
+            with patch('cli.extractor.extract_relevant',
+                       return_value=('/p/relevant-content.txt', '/p/relevant-manifest.json', 1234)) as mock_extract:
+                result = self.runner.invoke(
+                    gitingest_agent,
+                    ['extract-relevant', 'https://github.com/user/repo', '--query', 'auth', '--budget', '5000']
+                )
+
+                assert result.exit_code == 0
+                assert "[OK] Saved to: /p/relevant-content.txt" in result.output
+                assert "[OK] Manifest: /p/relevant-manifest.json" in result.output
+                assert "1,234 tokens (budget: 5,000 tokens)" in result.output
+                assert mock_extract.call_args[0][2:] == ('auth', 5000)
+
+    def test_extract_relevant_requires_query(self):
+        """Test --query is required."""
+        result = self.runner.invoke(gitingest_agent, ['extract-relevant', 'https://github.com/user/repo'])
+
+        assert result.exit_code == 2
+        assert "--query" in result.output
+
+    def test_extract_relevant_validation_error(self):
+        """Test validation errors are reported."""
+        with patch('cli.parse_repo_name', return_value='repo'):
+            with patch('cli.extractor.extract_relevant', side_effect=ValidationError("Query has no searchable terms")):
+                result = self.runner.invoke(
+                    gitingest_agent,
+                    ['extract-relevant', 'https://github.com/user/repo', '--query', 'the']
+                )
+
+                assert result.exit_code == 1
+                assert "[ERROR] Invalid input:" in result.output
+
+
+class TestExtractLayersCommand:
+    """Test extract-layers command."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.runner = CliRunner()
+
+    def test_extract_layers_success(self):
+        """Test each layer is listed with its token count."""
+        from layers import Layer
+        built = [
+            Layer(0, 'tree', Path('/p/layer-0-tree.txt'), 12, 300),
+            Layer(4, 'full', Path('/p/digest.txt'), 10, 45000),
+        ]
+        with patch('cli.parse_repo_name', return_value='repo'):
+            with patch('cli.extractor.extract_layers', return_value=('/p/layers.json', built)) as mock_extract:
+                result = self.runner.invoke(gitingest_agent, ['extract-layers', 'https://github.com/user/repo'])
+
+                assert result.exit_code == 0
+                assert "L0 tree" in result.output
+                assert "45,000 tokens" in result.output
+                assert "[OK] Manifest: /p/layers.json" in result.output
+                assert mock_extract.call_args[1]['refresh'] is False
+
+    def test_extract_layers_extraction_error(self):
+        """Test extraction failures are reported."""
+        with patch('cli.parse_repo_name', return_value='repo'):
+            with patch('cli.extractor.extract_layers', side_effect=GitIngestError("Repository not found")):
+                result = self.runner.invoke(gitingest_agent, ['extract-layers', 'https://github.com/user/repo'])
+
+                assert result.exit_code == 1
+                assert "[ERROR] Extraction failed:" in result.output
+
+
+class TestReadCommand:
+    """Test read command."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.runner = CliRunner()
+
+    def _digest(self, tmp_path):
+        sep = "=" * 48
+        path = tmp_path / "digest.txt"
+        path.write_text(f"{sep}\nFILE: a.py\n{sep}\none\ntwo\nthree\n\n", encoding='utf-8')
+        return path
+
+    def test_read_summary(self, tmp_path):
+        """Test page and file counts are shown without options."""
+        result = self.runner.invoke(gitingest_agent, ['read', str(self._digest(tmp_path))])
+
+        assert result.exit_code == 0
+        assert "Files: 1" in result.output
+        assert "Pages: 1" in result.output
+
+    def test_read_page(self, tmp_path):
+        """Test a page is printed."""
+        result = self.runner.invoke(gitingest_agent, ['read', str(self._digest(tmp_path)), '--page', '1'])
+
+        assert result.exit_code == 0
+        assert "FILE: a.py" in result.output
+
+    def test_read_file_lines(self, tmp_path):
+        """Test a line range of one file is printed."""
+        result = self.runner.invoke(
+            gitingest_agent, ['read', str(self._digest(tmp_path)), '--file', 'a.py', '--lines', '2-3']
+        )
+
+        assert result.exit_code == 0
+        assert result.output == "two\nthree\n"
+
+    def test_read_lines_requires_file(self, tmp_path):
+        """Test --lines without --file is rejected."""
+        result = self.runner.invoke(gitingest_agent, ['read', str(self._digest(tmp_path)), '--lines', '2-3'])
+
+        assert result.exit_code == 1
+        assert "[ERROR] Invalid input:" in result.output
+
+
+class TestGrepCommand:
+    """Test grep command."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.runner = CliRunner()
+
+    def _store_digest(self, root):
+        from artifact_store import ArtifactStore
+        sep = "=" * 48
+        digest = root / "repo" / "digest.txt"
+        digest.parent.mkdir(parents=True)
+        digest.write_text(f"{sep}\nFILE: src/app.py\n{sep}\nimport os\n\ndef create_app():\n    pass\n",
+                          encoding='utf-8')
+        with ArtifactStore(root) as store:
+            store.record(digest, 'digest', repo='user/repo')
+        return digest
+
+    def test_grep_match(self, tmp_path):
+        """Test matches are printed as repo:file:line."""
+        self._store_digest(tmp_path)
+
+        result = self.runner.invoke(grep, [r'def \w+', '--workers', '1', '--output-dir', str(tmp_path)])
+
+        assert result.exit_code == 0
+        assert result.output == "user/repo:src/app.py:3: def create_app():\n"
+
+    def test_grep_repo_filter(self, tmp_path):
+        """Test --repo excludes other repositories."""
+        self._store_digest(tmp_path)
+
+        result = self.runner.invoke(grep, ['import', '--repo', 'other/repo', '--output-dir', str(tmp_path)])
+
+        assert result.exit_code == 0
+        assert "No matches found." in result.output
+
+    def test_grep_max_count(self, tmp_path):
+        """Test --max-count stops after N lines."""
+        self._store_digest(tmp_path)
+
+        result = self.runner.invoke(grep, ['.', '--max-count', '2', '--workers', '1',
+                                           '--output-dir', str(tmp_path)])
+
+        assert result.exit_code == 0
+        assert len(result.output.splitlines()) == 2
+
+    def test_grep_sharded_store(self, tmp_path):
+        """Test a sharded store's digests are found through the artifact index."""
+        from storage import migrate_layout
+        self._store_digest(tmp_path)
+        migrate_layout(tmp_path)
+
+        result = self.runner.invoke(grep, [r'def \w+', '--repo', 'user/repo', '--workers', '1',
+                                           '--output-dir', str(tmp_path)])
+
+        assert result.exit_code == 0
+        assert result.output == "user/repo:src/app.py:3: def create_app():\n"
+
+    def test_grep_invalid_pattern(self, tmp_path):
+        """Test invalid regexes are reported."""
+        result = self.runner.invoke(grep, ['(unclosed', '--output-dir', str(tmp_path)])
+
+        assert result.exit_code == 1
+        assert "[ERROR] Invalid input:" in result.output
+
+
+class TestStatsCommand:
+    """Test stats command."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.runner = CliRunner()
+
+    def _digest(self, tmp_path):
+        sep = "=" * 48
+        path = tmp_path / "digest.txt"
+        path.write_text(f"{sep}\nFILE: src/app.py\n{sep}\n{'x' * 400}\n\n{sep}\nFILE: README.md\n{sep}\n# Hi\n",
+                        encoding='utf-8')
+        return path
+
+    def test_stats_table(self, tmp_path):
+        """Test the table output for a digest file."""
+        result = self.runner.invoke(gitingest_agent, ['stats', str(self._digest(tmp_path)), '--by', 'language'])
+
+        assert result.exit_code == 0
+        assert "By language" in result.output
+        assert "Python" in result.output
+        assert "src/app.py" in result.output
+
+    def test_stats_json(self, tmp_path):
+        """Test --json output."""
+        import json
+        result = self.runner.invoke(gitingest_agent, ['stats', str(self._digest(tmp_path)), '--json'])
+
+        assert result.exit_code == 0
+        report = json.loads(result.output)
+        assert report['group_by'] == 'directory'
+        assert report['groups'][0]['name'] == 'src/'
+
+    def test_stats_url_uses_stored_digest(self, tmp_path):
+        """Test a URL is resolved to the stored digest."""
+        digest = self._digest(tmp_path)
+        with patch('cli.parse_repo_name', return_value='repo'):
+            with patch('cli.extractor.get_or_extract_digest', return_value=digest) as mock_digest:
+                result = self.runner.invoke(gitingest_agent, ['stats', 'https://github.com/user/repo'])
+
+                assert result.exit_code == 0
+                assert "src/" in result.output
+                mock_digest.assert_called_once()
+
+    def test_stats_invalid_source(self):
+        """Test a source that is neither a path nor a URL is rejected."""
+        result = self.runner.invoke(gitingest_agent, ['stats', 'not-a-url-or-path'])
+
+        assert result.exit_code == 1
+        assert "[ERROR] Invalid input:" in result.output
+
+
+    def test_stats_tokenizer(self, tmp_path):
+        """Test --tokenizer selects the backend and is recorded in the report."""
+        import json
+        result = self.runner.invoke(
+            gitingest_agent, ['stats', str(self._digest(tmp_path)), '--json', '--tokenizer', 'calibrated']
+        )
+
+        assert result.exit_code == 0
+        report = json.loads(result.output)
+        assert report['tokenizer'] == 'calibrated'
+
+    def test_stats_invalid_tokenizer(self, tmp_path):
+        """Test an unknown tokenizer is rejected."""
+        result = self.runner.invoke(
+            gitingest_agent, ['stats', str(self._digest(tmp_path)), '--tokenizer', 'exact']
+        )
+
+        assert result.exit_code == 1
+        assert "[ERROR] Invalid input: Invalid tokenizer: exact" in result.output
+
+
+class TestTokenizerOption:
+    """Test --tokenizer on the routing and extraction commands."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.runner = CliRunner()
+
+    def test_extract_full_defaults_to_calibrated(self, monkeypatch):
+        """Test the routing re-check uses the calibrated backend by default."""
+        monkeypatch.delenv('GITINGEST_AGENT_TOKENIZER', raising=False)
+        with patch('cli.parse_repo_name', return_value='repo'):
+            with patch('cli.extractor.extract_full', return_value=('/p/digest.txt', [])):
+                with patch('cli.count_tokens_from_file', return_value=1_000) as mock_count:
+                    result = self.runner.invoke(extract_full, ['https://github.com/user/repo'])
+
+                    assert result.exit_code == 0
+                    assert mock_count.call_args[1]['tokenizer'].spec == 'calibrated'
+                    assert "(calibrated)" in result.output
+
+    def test_extract_specific_tokenizer(self):
+        """Test --tokenizer is passed to the token re-check."""
+        with patch('cli.parse_repo_name', return_value='repo'):
+            with patch('cli.extractor.extract_specific', return_value=('/p/docs-content.txt', [])):
+                with patch('cli.count_tokens_from_file', return_value=1_000) as mock_count:
+                    result = self.runner.invoke(
+                        extract_specific,
+                        ['https://github.com/user/repo', '--type', 'docs', '--tokenizer', 'heuristic']
+                    )
+
+                    assert result.exit_code == 0
+                    assert mock_count.call_args[1]['tokenizer'].spec == 'heuristic'
+
+    def test_check_size_tokenizer(self, monkeypatch):
+        """Test check-size routes on the calibrated count by default, and on --tokenizer when given."""
+        monkeypatch.delenv('GITINGEST_AGENT_TOKENIZER', raising=False)
+        with patch('cli.count_tokens', return_value=1_000) as mock_count:
+            result = self.runner.invoke(check_size, ['https://github.com/user/repo'])
+            assert result.exit_code == 0
+            assert mock_count.call_args[1]['tokenizer'].spec == 'calibrated'
+            assert "(calibrated)" in result.output
+
+            result = self.runner.invoke(check_size, ['https://github.com/user/repo', '--tokenizer', 'heuristic'])
+            assert result.exit_code == 0
+            assert mock_count.call_args[1]['tokenizer'].spec == 'heuristic'
+
+    def test_missing_vocabulary(self):
+        """Test a bpe tokenizer without a vocabulary file is rejected."""
+        result = self.runner.invoke(
+            extract_full, ['https://github.com/user/repo', '--tokenizer', 'bpe:/no/such/vocab.tiktoken']
+        )
+
+        assert result.exit_code == 1
+        assert "Tokenizer vocabulary not found" in result.output
+
+
+class TestSampleOption:
+    """Test --sample on the extraction commands."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.runner = CliRunner()
+
+    def test_extract_full_reports_interval(self):
+        """Test a sampled estimate is shown with its confidence interval."""
+        estimate = TokenEstimate(250_000, 240_000, 260_000, 0.95, 4 * 1024 * 1024, 2 * 1024 ** 3, False)
+        with patch('cli.parse_repo_name', return_value='repo'):
+            with patch('cli.extractor.extract_full', return_value=('/p/digest.txt', [])):
+                with patch('cli.count_tokens_sampled', return_value=estimate) as mock_sample:
+                    with patch('cli.count_tokens_from_file') as mock_count:
+                        result = self.runner.invoke(extract_full, ['https://github.com/user/repo', '--sample'])
+
+                        assert result.exit_code == 0
+                        mock_sample.assert_called_once()
+                        mock_count.assert_not_called()
+                        assert "Token count: 250,000 tokens" in result.output
+                        assert "Sampled 4.0 MB of 2.0 GB: 95% interval 240,000-260,000 tokens" in result.output
+
+    def test_extract_specific_escalated_count(self):
+        """Test an escalated (exact) count is shown without an interval."""
+        estimate = TokenEstimate(150_000, 150_000, 150_000, 0.95, 8_000_000, 8_000_000, True)
+        with patch('cli.parse_repo_name', return_value='repo'):
+            with patch('cli.extractor.extract_specific', return_value=('/p/docs-content.txt', [])):
+                with patch('cli.count_tokens_sampled', return_value=estimate):
+                    result = self.runner.invoke(
+                        extract_specific, ['https://github.com/user/repo', '--type', 'docs', '--sample']
+                    )
+
+                    assert result.exit_code == 0
+                    assert "Token count: 150,000 tokens" in result.output
+                    assert "Sampled" not in result.output
+
+
+class TestBudgetOption:
+    """Test --budget on extract-specific."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.runner = CliRunner()
+
+    def test_budget_passed_and_skipped_files_reported(self, tmp_path):
+        """Test the budget reaches the extractor and skipped files are reported."""
+        content = tmp_path / "code-content.txt"
+        content.write_text("x", encoding='utf-8')
+        (tmp_path / "code-content.skipped.json").write_text(
+            '{"budget": 1000, "complete": false, "skipped": ["a.py", "b.py"]}', encoding='utf-8')
+        with patch('cli.parse_repo_name', return_value='repo'):
+            with patch('cli.extractor.extract_specific', return_value=(str(content), [])) as mock_extract:
+                with patch('cli.count_tokens_from_file', return_value=900):
+                    result = self.runner.invoke(
+                        extract_specific, ['https://github.com/user/repo', '--type', 'code', '--budget', '1000']
+                    )
+
+                    assert result.exit_code == 0
+                    assert mock_extract.call_args[1]['budget'] == 1000
+                    assert "Token budget reached (1,000 tokens): 2 file(s) skipped" in result.output
+                    assert "  - a.py" in result.output
+
+    def test_invalid_budget(self):
+        """Test a non-positive budget is rejected by option validation."""
+        result = self.runner.invoke(
+            extract_specific, ['https://github.com/user/repo', '--type', 'code', '--budget', '0']
+        )
+
+        assert result.exit_code == 2
+
+
+class TestFileCapOption:
+    """Test --file-cap on extract-full."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.runner = CliRunner()
+
+    def test_caps_passed_and_truncations_reported(self, tmp_path):
+        """Test caps reach the extractor and capped files are reported."""
+        sep = "=" * 48
+        digest = tmp_path / "digest.txt"
+        digest.write_text(f"{sep}\nFILE: data.json\n{sep}\n[1]\n\n", encoding='utf-8')
+        with DigestReader(digest) as reader:
+            reader.record_truncations([("data.json", 90_000, 4_000, 86_000)])
+
+        with patch('cli.parse_repo_name', return_value='repo'):
+            with patch('cli.extractor.extract_full', return_value=(str(digest), [])) as mock_extract:
+                with patch('cli.count_tokens_from_file', return_value=5_000):
+                    result = self.runner.invoke(
+                        extract_full, ['https://github.com/user/repo', '--file-cap', '2000',
+                                       '--file-cap', '*.md=0']
+                    )
+
+                    assert result.exit_code == 0
+                    caps = mock_extract.call_args[1]['caps']
+                    assert caps.cap_for("src/main.py") == 2000
+                    assert caps.cap_for("README.md") is None
+                    assert "Capped 1 file(s), 86,000 tokens omitted" in result.output
+                    assert "data.json (kept 4,000 of 90,000 tokens)" in result.output
+
+        listing = self.runner.invoke(gitingest_agent, ['read', str(digest), '--list'])
+        assert "data.json  (capped: kept 4,000 of 90,000 tokens)" in listing.output
+
+    def test_no_caps(self, tmp_path):
+        """Test extraction without --file-cap passes no caps."""
+        content = tmp_path / "digest.txt"
+        content.write_text("x", encoding='utf-8')
+        with patch('cli.parse_repo_name', return_value='repo'):
+            with patch('cli.extractor.extract_full', return_value=(str(content), [])) as mock_extract:
+                with patch('cli.count_tokens_from_file', return_value=1):
+                    result = self.runner.invoke(extract_full, ['https://github.com/user/repo'])
+
+                    assert result.exit_code == 0
+                    assert mock_extract.call_args[1]['caps'] is None
+                    assert "Capped" not in result.output
+
+    def test_invalid_cap(self):
+        """Test a malformed cap is rejected."""
+        result = self.runner.invoke(extract_full, ['https://github.com/user/repo', '--file-cap', 'big'])
+
+        assert result.exit_code != 0
+        assert "Invalid file cap" in result.output
+
+
+class TestPrefilterOption:
+    """Test --prefilter on check-size and the extraction commands."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.runner = CliRunner()
+
+    def test_extract_full_prefilter(self, tmp_path):
+        """Test a prefilter reaches the extractor and its report is shown."""
+        content = tmp_path / "digest.txt"
+        content.write_text("x", encoding='utf-8')
+
+        def fake_extract(url, repo_name, output_dir=None, caps=None, tokenizer=None, prefilter=None, mirror=None,
+                         skip_unchanged=False):
+            prefilter.apply("yarn.lock", "x" * 4000)
+            return str(content), []
+
+        with patch('cli.parse_repo_name', return_value='repo'):
+            with patch('cli.extractor.extract_full', side_effect=fake_extract):
+                with patch('cli.count_tokens_from_file', return_value=1):
+                    result = self.runner.invoke(
+                        extract_full, ['https://github.com/user/repo', '--prefilter', '--tokenizer', 'heuristic']
+                    )
+
+                    assert result.exit_code == 0
+                    assert "Prefilter: 1 file(s) filtered, 988 tokens saved" in result.output
+                    assert "lockfile" in result.output
+
+    def test_extract_specific_without_prefilter(self, tmp_path):
+        """Test no prefilter is passed without the flag."""
+        content = tmp_path / "code-content.txt"
+        content.write_text("x", encoding='utf-8')
+        with patch('cli.parse_repo_name', return_value='repo'):
+            with patch('cli.extractor.extract_specific', return_value=(str(content), [])) as mock_extract:
+                with patch('cli.count_tokens_from_file', return_value=1):
+                    result = self.runner.invoke(extract_specific, ['https://github.com/user/repo', '--type', 'code'])
+
+                    assert result.exit_code == 0
+                    assert mock_extract.call_args[1]['prefilter'] is None
+                    assert "Prefilter" not in result.output
+
+    def test_check_size_prefilter(self):
+        """Test check-size counts with a prefilter."""
+        with patch('cli.count_tokens', return_value=1000) as mock_count:
+            result = self.runner.invoke(check_size, ['https://github.com/user/repo', '--prefilter'])
+
+            assert result.exit_code == 0
+            assert mock_count.call_args[1]['prefilter'] is not None
+            assert "Prefilter: 0 file(s) filtered" in result.output
+
+
+class TestContentTypeProfiles:
+    """Test configured profiles on extract-specific --type and the profiles command."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.runner = CliRunner()
+
+    @pytest.fixture
+    def config(self, tmp_path, monkeypatch):
+        """Point config lookup at a project config in tmp_path."""
+        monkeypatch.setenv('XDG_CONFIG_HOME', str(tmp_path / "user"))
+        project = tmp_path / "project.toml"
+        monkeypatch.setenv('GITINGEST_AGENT_CONFIG', str(project))
+        project.write_text(
+            '[profiles.go]\ndescription = "Go sources"\ninclude = ["*.go"]\n'
+            'exclude = ["*_test.go"]\nfile_caps = ["*.pb.go=500"]\nbudget = 150000\n',
+            encoding='utf-8'
+        )
+        return project
+
+    def test_configured_type_accepted(self, config, tmp_path):
+        """Test --type accepts a profile defined in a config file."""
+        content = tmp_path / "go-content.txt"
+        content.write_text("x", encoding='utf-8')
+        with patch('cli.parse_repo_name', return_value='repo'):
+            with patch('cli.extractor.extract_specific', return_value=(str(content), [])) as mock_extract:
+                with patch('cli.count_tokens_from_file', return_value=1):
+                    result = self.runner.invoke(extract_specific, ['https://github.com/user/repo', '--type', 'go'])
+
+                    assert result.exit_code == 0
+                    assert mock_extract.call_args[0][2] == 'go'
+
+    def test_unknown_type_rejected(self, config):
+        """Test --type still rejects names no profile defines."""
+        result = self.runner.invoke(extract_specific, ['https://github.com/user/repo', '--type', 'rust'])
+
+        assert result.exit_code == 2
+        assert "'go'" in result.output
+
+    def test_invalid_config_rejected(self, config):
+        """Test an invalid config file is reported as a usage error."""
+        config.write_text('[profiles.go]\nbudget = "lots"\n', encoding='utf-8')
+
+        result = self.runner.invoke(extract_specific, ['https://github.com/user/repo', '--type', 'docs'])
+
+        assert result.exit_code == 2
+        assert "budget must be a positive number" in result.output
+
+    def test_profiles_command(self, config):
+        """Test the profiles command lists built-in and configured profiles."""
+        result = self.runner.invoke(gitingest_agent, ['profiles'])
+
+        assert result.exit_code == 0
+        assert "docs (built-in)" in result.output
+        assert f"go ({config}): Go sources" in result.output
+        assert "  include: *.go" in result.output
+        assert "  exclude: *_test.go" in result.output
+        assert "  file caps: *.pb.go=500" in result.output
+        assert "  budget: 150,000" in result.output
+
+
+class TestAutoCodeReport:
+    """Test the synthesized profile report of extract-specific --type auto-code."""
+
+    def test_profile_reported(self, tmp_path):
+        """Test the detected languages, roots and globs are shown."""
+        content = tmp_path / "auto-code-content.txt"
+        content.write_text("x", encoding='utf-8')
+        (tmp_path / "auto-code-content.profile.json").write_text(
+            '{"languages": {"Go": 120, "Rust": 30}, "roots": ["internal", ""], '
+            '"include": ["internal/**/*.go", "/*.go", "internal/**/*.rs"], "exclude": ["*_test.go"], "files": 140}',
+            encoding='utf-8'
+        )
+        runner = CliRunner()
+        with patch('cli.parse_repo_name', return_value='repo'):
+            with patch('cli.extractor.extract_specific', return_value=(str(content), [])):
+                with patch('cli.count_tokens_from_file', return_value=1):
+                    result = runner.invoke(extract_specific, ['https://github.com/user/repo', '--type', 'auto-code'])
+
+                    assert result.exit_code == 0
+                    assert "Detected: Go (120 files), Rust (30 files)" in result.output
+                    assert "Source roots: internal/, (root)" in result.output
+                    assert "  exclude: *_test.go" in result.output
+                    assert "Selected 140 file(s)" in result.output
+
+
+class TestMirrorOption:
+    """Test the --mirror option of extract-specific."""
+
+    def test_mirror_passed(self, tmp_path):
+        """Test a mirror of the URL is passed to the extractor and its summary reported."""
+        content = tmp_path / "installation-content.txt"
+        content.write_text("x", encoding='utf-8')
+        (tmp_path / "installation-content.summary.json").write_text(
+            '{"name": "tool", "version": "1.0", "manifests": ["pyproject.toml", "package.json"], '
+            '"runtimes": {"python": ">=3.10"}, "dependencies": {"python": ["click", "httpx"], "node": ["react@18"]}, '
+            '"dev_dependencies": {}, "scripts": {}, "entry_points": {}, '
+            '"errors": {"setup.py": "SyntaxError: invalid syntax"}}',
+            encoding='utf-8'
+        )
+        runner = CliRunner()
+        with patch('cli.parse_repo_name', return_value='repo'):
+            with patch('cli.extractor.extract_specific', return_value=(str(content), [])) as mock_extract:
+                with patch('cli.count_tokens_from_file', return_value=1):
+                    result = runner.invoke(extract_specific, ['https://github.com/user/repo', '--type', 'installation',
+                                                              '--mirror'])
+
+                    assert result.exit_code == 0
+                    mirror = mock_extract.call_args[1]['mirror']
+                    assert mirror.url == 'https://github.com/user/repo'
+                    assert mirror.path.parts[-3:] == ('github.com', 'user', 'repo.git')
+                    assert "Manifests: pyproject.toml, package.json (tool 1.0)" in result.output
+                    assert "  runtime: python >=3.10" in result.output
+                    assert "  dependencies: 2 python, 1 node" in result.output
+                    assert "Could not parse setup.py: SyntaxError" in result.output
+
+    def test_no_mirror_by_default(self, tmp_path):
+        """Test no mirror is used without the option."""
+        content = tmp_path / "installation-content.txt"
+        content.write_text("x", encoding='utf-8')
+        runner = CliRunner()
+        with patch('cli.parse_repo_name', return_value='repo'):
+            with patch('cli.extractor.extract_specific', return_value=(str(content), [])) as mock_extract:
+                with patch('cli.count_tokens_from_file', return_value=1):
+                    result = runner.invoke(extract_specific, ['https://github.com/user/repo', '--type', 'installation'])
+
+                    assert result.exit_code == 0
+                    assert mock_extract.call_args[1]['mirror'] is None
+                    assert "Manifests:" not in result.output
+
+
+class TestMirrorOptionOtherCommands:
+    """Test the --mirror option of the other extraction commands."""
+
+    @pytest.mark.parametrize("command, args", [
+        ('extract-full', []),
+        ('extract-tree', []),
+        ('extract-layers', []),
+        ('extract-relevant', ['--query', 'auth']),
+    ])
+    def test_mirror_passed_and_closed(self, command, args):
+        """Test each command passes the mirror to the extractor and closes it, even when extraction fails."""
+        function = 'cli.extractor.' + command.replace('-', '_')
+        runner = CliRunner()
+        with patch('cli.parse_repo_name', return_value='repo'):
+            with patch('cli.GitMirror') as mock_mirror:
+                with patch(function, side_effect=GitIngestError("clone failed")) as mock_extract:
+                    result = runner.invoke(gitingest_agent,
+                                           [command, 'https://github.com/user/repo', *args, '--mirror'])
+
+                    assert result.exit_code == 1
+                    assert "clone failed" in result.output
+                    mock_mirror.assert_called_once_with('https://github.com/user/repo')
+                    assert mock_extract.call_args[1]['mirror'] is mock_mirror.return_value
+                    mock_mirror.return_value.close.assert_called_once()
+
+    def test_extract_tree_mirror(self):
+        """Test extract-tree reports a tree read from the mirror."""
+        runner = CliRunner()
+        with patch('cli.parse_repo_name', return_value='repo'):
+            with patch('cli.GitMirror'):
+                with patch('cli.extractor.extract_tree',
+                           return_value=('/p/tree.txt', "Directory structure:\n└── user-repo/\n", [])):
+                    result = runner.invoke(extract_tree, ['https://github.com/user/repo', '--mirror'])
+
+                    assert result.exit_code == 0
+                    assert "[OK] Saved to: /p/tree.txt" in result.output
+    def test_extract_specific_narrowing_keeps_mirror(self, tmp_path):
+        """Test re-extracting a narrower selection still reads from the mirror, and skips an unchanged commit."""
+        runner = CliRunner()
+        with patch('cli.parse_repo_name', return_value='repo'):
+            with patch('cli.GitMirror') as mock_mirror:
+                mock_mirror.return_value.transfers = []
+                with patch('cli.extractor.extract_specific', side_effect=[
+                    (str(tmp_path / "docs-content.txt"), []), (str(tmp_path / "installation-content.txt"), [])
+                ]) as mock_extract:
+                    with patch('cli.recount_tokens', side_effect=[(250_000, None), (10_000, None)]):
+                        result = runner.invoke(extract_specific,
+                                               ['https://github.com/user/repo', '--type', 'docs', '--mirror',
+                                                '--skip-unchanged'],
+                                               input='1\ninstallation\n')
+
+                    assert result.exit_code == 0
+                    assert mock_extract.call_count == 2
+                    assert mock_extract.call_args[1]['mirror'] is mock_mirror.return_value
+                    assert mock_extract.call_args[1]['skip_unchanged'] is True
+
+    def test_mirror_of_repository(self):
+        """Test a URL pinned to a ref and subpath mirrors the whole repository, and names its own storage."""
+        runner = CliRunner()
+        with patch('cli.GitMirror') as mock_mirror:
+            with patch('cli.extractor.extract_tree', return_value=('/p/tree.txt', "", [])) as mock_extract:
+                result = runner.invoke(extract_tree, ['user/repo@v1.0:packages/web', '--mirror'])
+
+                assert result.exit_code == 0
+                mock_mirror.assert_called_once_with('https://github.com/user/repo')
+                assert mock_extract.call_args[0][:2] == ('user/repo@v1.0:packages/web', 'repo@v1.0+packages-web~9ee61a71')
+
+
+class TestMirrorTransfers:
+    """Test the report of the downloads into a mirror."""
+
+    def test_transfers_reported(self):
+        """Test each clone, fetch or prefetch is shown with its bytes and timings."""
+        from git_mirror import Transfer
+        runner = CliRunner()
+        with patch('cli.parse_repo_name', return_value='repo'):
+            with patch('cli.GitMirror') as mock_mirror:
+                mock_mirror.return_value.transfers = [
+                    Transfer('clone', 'partial', 2048, 0.5, 0.125),
+                    Transfer('prefetch', 'partial', 100, 0.25, None),
+                ]
+                with patch('cli.extractor.extract_tree', return_value=('/p/tree.txt', "tree", [])):
+                    result = runner.invoke(extract_tree, ['https://github.com/user/repo', '--mirror'])
+
+                    assert result.exit_code == 0
+                    assert "Mirror clone (partial): 2.0 KB in 0.50s, first byte after 0.12s" in result.output
+                    assert "Mirror prefetch (partial): 100 B in 0.25s\n" in result.output
\ No newline at end of file
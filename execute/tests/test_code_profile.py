@@ -0,0 +1,111 @@
+"""
+Unit tests for code_profile module.
+
+Tests cover:
+- Dominant language detection (auxiliary languages, minimum share)
+- Source root selection and include glob synthesis
+- Exclude globs for tests, examples, vendored and generated code
+- Flat layouts and repositories without source code
+"""
+
+import pytest
+
+from code_profile import MAX_ROOTS, analyze_paths
+from exceptions import ValidationError
+
+
+GO_REPO = [
+    "README.md", "go.mod", "go.sum", "Makefile",
+    "cmd/server/main.go", "cmd/server/main_test.go", "cmd/cli/main.go",
+    "internal/db/db.go", "internal/db/db_test.go", "internal/db/testdata/schema.go",
+    "internal/api/api.pb.go", "internal/api/handlers.go", "internal/api/routes.go",
+    "pkg/client/client.go", "pkg/client/options.go",
+    "examples/basic/main.go", "vendor/github.com/x/y/y.go",
+    "scripts/release.sh", "scripts/lint.sh", "hack/tools.go",
+    "docs/guide.md", "web/static/app.js",
+] + [f"pkg/client/gen{i}.go" for i in range(20)]
+
+
+class TestAnalyzePaths:
+    """Tests for analyze_paths()."""
+
+    def test_go_repository(self):
+        """Test the core Go source is selected without tests, examples, vendored or generated code."""
+        profile = analyze_paths(GO_REPO)
+
+        assert list(profile.languages) == ["Go"]
+        assert profile.roots == ["pkg", "internal", "cmd"]
+        assert profile.include == ["cmd/**/*.go", "internal/**/*.go", "pkg/**/*.go"]
+        assert profile.exclude == ["testdata/", "*_test.go", "*.pb.go"]
+        selected = profile.profile.path_filter.filter(GO_REPO)
+        assert "hack/tools.go" not in selected
+        assert "internal/api/api.pb.go" not in selected
+        assert "cmd/server/main.go" in selected
+        assert profile.files == len(selected) == 27
+
+    def test_minority_language_dropped(self):
+        """Test languages under the minimum share and shell scripts are left out."""
+        paths = ([f"src/app/m{i}.ts" for i in range(30)] + ["src/app/view.tsx", "src/legacy.js"]
+                 + [f"bin/run{i}.sh" for i in range(10)])
+
+        profile = analyze_paths(paths)
+
+        assert profile.languages == {"TypeScript": 31}
+        assert profile.include == ["src/**/*.ts", "src/**/*.tsx"]
+
+    def test_multiple_languages(self):
+        """Test every language over the minimum share is included."""
+        paths = [f"backend/api/v{i}.py" for i in range(10)] + [f"frontend/src/c{i}.ts" for i in range(6)]
+
+        profile = analyze_paths(paths)
+
+        assert profile.languages == {"Python": 10, "TypeScript": 6}
+        assert profile.include == ["backend/**/*.py", "frontend/**/*.ts"]
+
+    def test_root_files(self):
+        """Test source files in the repository root get an anchored glob."""
+        paths = ["setup.py", "mylib.py", "mylib_utils.py", "test_mylib.py", "tests/conftest.py"]
+
+        profile = analyze_paths(paths)
+
+        assert profile.roots == [""]
+        assert profile.include == ["/*.py"]
+        assert profile.exclude == ["test_*.py"]
+        assert profile.profile.path_filter.filter(paths) == ["setup.py", "mylib.py", "mylib_utils.py"]
+
+    def test_tail_roots_left_out(self):
+        """Test directories with a small share of the source aren't roots."""
+        paths = [f"lib/m{i}.rb" for i in range(40)] + ["tools/gen.rb"]
+
+        profile = analyze_paths(paths)
+
+        assert profile.roots == ["lib"]
+
+    def test_flat_layout(self):
+        """Test many roots collapse into unanchored extension globs."""
+        paths = [f"pkg{i}/mod.py" for i in range(MAX_ROOTS + 1)] + ["pkg0/tests/test_mod.py"]
+
+        profile = analyze_paths(paths)
+
+        assert len(profile.roots) == MAX_ROOTS + 1
+        assert profile.include == ["*.py"]
+        assert profile.exclude == ["tests/"]
+        assert profile.files == MAX_ROOTS + 1
+
+    def test_shell_only(self):
+        """Test shell scripts are the source when there is nothing else."""
+        profile = analyze_paths(["install.sh", "lib/common.sh", "README.md"])
+
+        assert profile.languages == {"Shell": 2}
+
+    def test_no_source(self):
+        """Test a tree without source code raises ValidationError."""
+        with pytest.raises(ValidationError, match="No source code"):
+            analyze_paths(["README.md", "docs/index.md", "tests/test_a.py", "Gemfile"])
+
+    def test_summary(self):
+        """Test the summary holds everything but the compiled profile."""
+        summary = analyze_paths(GO_REPO).summary()
+
+        assert set(summary) == {'languages', 'roots', 'include', 'exclude', 'files'}
+        assert summary['files'] == 27
\ No newline at end of file
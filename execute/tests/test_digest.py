@@ -0,0 +1,260 @@
+"""
+Unit tests for digest module.
+
+Tests cover:
+- Locating FILE sections with exact byte offsets and line numbers
+- GitIngest (48) and legacy (80) separator widths
+- Content that looks like separators
+- Reading section content
+- Splitting a digest stream into sections as they complete
+- Reading and parsing the directory tree
+"""
+
+import io
+
+import pytest
+from digest import iter_sections, iter_stream_pieces, iter_stream_sections, read_section, read_tree, parse_tree, DigestSection
+
+
+SEP = "=" * 48
+
+DIGEST = f"""Directory structure:
+└── user-repo/
+    ├── README.md
+    └── src/
+        └── main.py
+
+{SEP}
+FILE: README.md
+{SEP}
+# Hello World
+This is a test repository.
+
+
+{SEP}
+FILE: src/main.py
+{SEP}
+def main():
+    print("Hello")
+
+
+"""
+
+
+class TestIterSections:
+    """Tests for iter_sections() function."""
+
+    def test_finds_all_sections(self, tmp_path):
+        """Test every FILE section is located in order."""
+        digest = tmp_path / "digest.txt"
+        digest.write_text(DIGEST, encoding='utf-8')
+
+        sections = list(iter_sections(digest))
+
+        assert [s.path for s in sections] == ["README.md", "src/main.py"]
+
+    def test_offsets_point_at_content(self, tmp_path):
+        """Test byte offsets and lengths cover the file content."""
+        digest = tmp_path / "digest.txt"
+        digest.write_text(DIGEST, encoding='utf-8')
+        data = digest.read_bytes()
+
+        readme, main = list(iter_sections(digest))
+
+        assert data[readme.offset:readme.offset + readme.length].startswith(b"# Hello World")
+        assert data[main.offset:main.offset + main.length].rstrip() == b'def main():\n    print("Hello")'
+
+    def test_line_numbers(self, tmp_path):
+        """Test line numbers point at the first content line."""
+        digest = tmp_path / "digest.txt"
+        digest.write_text(DIGEST, encoding='utf-8')
+        lines = DIGEST.splitlines()
+
+        for section in iter_sections(digest):
+            first_line = read_section(digest, section).splitlines()[0]
+            assert lines[section.line - 1] == first_line
+
+    def test_legacy_separator_width(self, tmp_path):
+        """Test 80-character separators are recognised."""
+        digest = tmp_path / "digest.txt"
+        digest.write_text(DIGEST.replace(SEP, "=" * 80), encoding='utf-8')
+
+        assert [s.path for s in iter_sections(digest)] == ["README.md", "src/main.py"]
+
+    def test_separator_inside_content(self, tmp_path):
+        """Test separator-like lines in content don't start a section."""
+        digest = tmp_path / "digest.txt"
+        digest.write_text(f"""{SEP}
+FILE: notes.rst
+{SEP}
+Title
+{SEP}
+FILE: is not followed by a separator
+Body text
+
+""", encoding='utf-8')
+
+        sections = list(iter_sections(digest))
+
+        assert len(sections) == 1
+        assert "Body text" in read_section(digest, sections[0])
+
+    def test_no_sections(self, tmp_path):
+        """Test tree-only output yields no sections."""
+        digest = tmp_path / "tree.txt"
+        digest.write_text("Directory structure:\n└── repo/\n", encoding='utf-8')
+
+        assert list(iter_sections(digest)) == []
+
+    def test_missing_file(self, tmp_path):
+        """Test missing digest raises FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            list(iter_sections(tmp_path / "missing.txt"))
+
+    def test_crlf_digest(self, tmp_path):
+        """Test Windows line endings are handled."""
+        digest = tmp_path / "digest.txt"
+        digest.write_bytes(DIGEST.replace("\n", "\r\n").encode('utf-8'))
+
+        sections = list(iter_sections(digest))
+
+        assert [s.path for s in sections] == ["README.md", "src/main.py"]
+        assert read_section(digest, sections[1]).startswith("def main():")
+
+
+class TestIterStreamSections:
+    """Tests for iter_stream_sections() function."""
+
+    def test_round_trip(self):
+        """Test the preamble and sections reassemble the stream."""
+        parts = list(iter_stream_sections(io.BytesIO(DIGEST.encode('utf-8'))))
+
+        assert [path for path, _, _ in parts] == [None, "README.md", "src/main.py"]
+        assert b''.join(header + content for _, header, content in parts) == DIGEST.encode('utf-8')
+        assert parts[0][2].startswith(b"Directory structure:")
+        assert parts[1][1] == f"{SEP}\nFILE: README.md\n{SEP}\n".encode('utf-8')
+
+    def test_matches_iter_sections(self, tmp_path):
+        """Test section content matches the offsets found by iter_sections()."""
+        digest = tmp_path / "digest.txt"
+        digest.write_bytes(DIGEST.replace("\n", "\r\n").encode('utf-8'))
+        data = digest.read_bytes()
+
+        parts = list(iter_stream_sections(io.BytesIO(data)))[1:]
+
+        assert [content for _, _, content in parts] == [
+            data[s.offset:s.offset + s.length] for s in iter_sections(digest)
+        ]
+
+    def test_no_sections(self):
+        """Test tree-only output is yielded as the preamble."""
+        assert list(iter_stream_sections(io.BytesIO(b"Directory structure:\n"))) == [
+            (None, b'', b"Directory structure:\n")
+        ]
+
+
+class TestIterStreamPieces:
+    """Tests for iter_stream_pieces() function."""
+
+    def test_round_trip(self):
+        """Test pieces reassemble the stream and carry their section path."""
+        pieces = list(iter_stream_pieces(io.BytesIO(DIGEST.encode('utf-8'))))
+
+        assert b''.join(piece for _, piece, _ in pieces) == DIGEST.encode('utf-8')
+        headers = [(path, piece) for path, piece, is_header in pieces if is_header]
+        assert headers[0] == ("README.md", f"{SEP}\nFILE: README.md\n{SEP}\n".encode('utf-8'))
+        assert [path for path, _ in headers] == ["README.md", "src/main.py"]
+        assert pieces[0][0] is None
+
+    def test_long_lines_in_pieces(self):
+        """Test long lines are split without splitting characters."""
+        line = ("x" * 7 + "é") * 500 + "\n"
+        data = f"{SEP}\nFILE: a.txt\n{SEP}\n{line}".encode('utf-8')
+
+        pieces = [piece for _, piece, is_header in iter_stream_pieces(io.BytesIO(data), piece_bytes=64)
+                  if not is_header]
+
+        assert b''.join(pieces) == line.encode('utf-8')
+        assert max(len(piece) for piece in pieces) <= 65
+        assert all(piece.decode('utf-8') for piece in pieces)
+
+    def test_separator_in_content(self):
+        """Test a separator not followed by a FILE line stays content."""
+        data = f"{SEP}\nFILE: a.txt\n{SEP}\n{SEP}\nplain\n".encode('utf-8')
+
+        pieces = list(iter_stream_pieces(io.BytesIO(data)))
+
+        assert [is_header for _, _, is_header in pieces] == [True, False, False]
+
+
+class TestReadSection:
+    """Tests for read_section() function."""
+
+    def test_strips_trailing_blank_lines(self, tmp_path):
+        """Test trailing separator padding is removed."""
+        digest = tmp_path / "digest.txt"
+        digest.write_text(DIGEST, encoding='utf-8')
+
+        readme = next(iter_sections(digest))
+
+        assert read_section(digest, readme) == "# Hello World\nThis is a test repository."
+
+    def test_reads_unicode(self, tmp_path):
+        """Test multi-byte content round-trips."""
+        digest = tmp_path / "digest.txt"
+        digest.write_text(f"{SEP}\nFILE: docs/日本語.md\n{SEP}\nこんにちは\n", encoding='utf-8')
+
+        section = next(iter_sections(digest))
+
+        assert section.path == "docs/日本語.md"
+        assert read_section(digest, section) == "こんにちは"
+
+    def test_open_handle(self, tmp_path):
+        """Test sections can be read through one open handle, in any order."""
+        digest = tmp_path / "digest.txt"
+        digest.write_text(DIGEST, encoding='utf-8')
+        sections = list(iter_sections(digest))
+
+        with open(digest, 'rb') as f:
+            texts = [read_section(f, section) for section in reversed(sections)]
+
+        assert texts == [read_section(digest, section) for section in reversed(sections)]
+
+
+
+class TestTree:
+    """Tests for read_tree() and parse_tree() functions."""
+
+    def test_read_tree(self, tmp_path):
+        """Test the tree stops at the first section."""
+        digest = tmp_path / "digest.txt"
+        digest.write_text(DIGEST, encoding='utf-8')
+
+        tree = read_tree(digest)
+
+        assert tree.startswith("Directory structure:")
+        assert tree.endswith("└── main.py")
+        assert "FILE:" not in tree
+
+    def test_parse_tree_paths(self):
+        """Test nested entries resolve to repository-relative paths."""
+        tree = DIGEST.split(SEP)[0]
+
+        entries = parse_tree(tree)
+
+        assert [e.path for e in entries] == ['', 'README.md', 'src/', 'src/main.py']
+        assert [e.depth for e in entries] == [0, 1, 1, 2]
+        assert [e.is_dir for e in entries] == [True, False, True, False]
+
+    def test_parse_tree_sibling_after_nested_dir(self):
+        """Test the directory stack unwinds for later siblings."""
+        tree = (
+            "└── repo/\n"
+            "    ├── a/\n"
+            "    │   ├── b/\n"
+            "    │   │   └── deep.py\n"
+            "    │   └── mid.py\n"
+            "    └── top.py"
+        )
+
+        assert [e.path for e in parse_tree(tree)] == ['', 'a/', 'a/b/', 'a/b/deep.py', 'a/mid.py', 'top.py']
\ No newline at end of file
@@ -0,0 +1,173 @@
+"""
+Unit tests for digest_grep module.
+
+Tests cover:
+- Pattern compilation (regex, literal, case-insensitive, invalid)
+- File attribution and in-file line numbers
+- Digest discovery and repository labels
+- Chunk planning and parallel scanning
+"""
+
+import pytest
+
+from digest import format_section
+from digest_grep import (
+    compile_pattern,
+    find_digests,
+    grep_digests,
+    plan_tasks,
+    GrepMatch,
+)
+from exceptions import ValidationError
+
+
+def _write_digest(path, sections):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        "Directory structure:\n└── repo/\n\n"
+        + ''.join(format_section(name, content) for name, content in sections),
+        encoding='utf-8'
+    )
+    return path
+
+
+@pytest.fixture
+def store(tmp_path):
+    _write_digest(tmp_path / "fastapi" / "digest.txt", [
+        ("fastapi/routing.py", "import re\n\ndef get_route():\n    return route_handler\n"),
+        ("README.md", "FastAPI route docs"),
+    ])
+    _write_digest(tmp_path / "flask" / "docs-content.txt", [
+        ("docs/index.md", "Intro\nroute decorators\n"),
+    ])
+    return tmp_path
+
+
+class TestCompilePattern:
+    """Tests for compile_pattern() function."""
+
+    def test_regex(self):
+        """Test regular expressions match bytes."""
+        assert compile_pattern(r"def \w+").search(b"def main():")
+
+    def test_fixed_strings(self):
+        """Test literal mode escapes regex metacharacters."""
+        pattern = compile_pattern("a.b(", fixed_strings=True)
+        assert pattern.search(b"x = a.b(1)")
+        assert not pattern.search(b"axb(")
+
+    def test_ignore_case(self):
+        """Test case-insensitive matching."""
+        assert compile_pattern("todo", ignore_case=True).search(b"# TODO: fix")
+
+    @pytest.mark.parametrize("pattern", ["", "(unclosed"])
+    def test_invalid(self, pattern):
+        """Test empty and malformed patterns raise ValidationError."""
+        with pytest.raises(ValidationError):
+            compile_pattern(pattern)
+
+
+class TestFindDigests:
+    """Tests for find_digests() function."""
+
+    def test_labels(self, store):
+        """Test store labels are used when known, directory names otherwise."""
+        fastapi = (store / "fastapi" / "digest.txt").resolve()
+
+        found = find_digests(store, {str(fastapi): "fastapi/fastapi"})
+
+        assert found == [
+            (fastapi, "fastapi/fastapi"),
+            ((store / "flask" / "docs-content.txt").resolve(), "flask"),
+        ]
+
+    def test_versions_skipped(self, store):
+        """Test archived versions aren't searched next to their artifact."""
+        _write_digest(store / "fastapi" / "versions" / "abc1234" / "digest.txt", [("a.py", "route\n")])
+
+        assert [path for path, _ in find_digests(store)] == [
+            (store / "fastapi" / "digest.txt").resolve(),
+            (store / "flask" / "docs-content.txt").resolve(),
+        ]
+
+    def test_full_digest_preferred(self, store):
+        """Test content files beside a full digest, and outline or relevant content, aren't searched."""
+        for name in ("code-content.txt", "outline-content.txt", "relevant-content.txt"):
+            _write_digest(store / "fastapi" / name, [("fastapi/routing.py", "def get_route(): ...\n")])
+        _write_digest(store / "flask" / "outline-content.txt", [("flask/app.py", "def route(): ...\n")])
+
+        assert [path for path, _ in find_digests(store)] == [
+            (store / "fastapi" / "digest.txt").resolve(),
+            (store / "flask" / "docs-content.txt").resolve(),
+        ]
+        matches = list(grep_digests(find_digests(store), compile_pattern("def get_route"), workers=1))
+        assert matches == [GrepMatch("fastapi", "fastapi/routing.py", 3, "def get_route():")]
+
+
+class TestGrepDigests:
+    """Tests for grep_digests() function."""
+
+    def test_file_attribution(self, store):
+        """Test matches report file paths and in-file line numbers."""
+        matches = sorted(grep_digests(find_digests(store), compile_pattern("route"), workers=1))
+
+        assert matches == [
+            GrepMatch("fastapi", "README.md", 1, "FastAPI route docs"),
+            GrepMatch("fastapi", "fastapi/routing.py", 3, "def get_route():"),
+            GrepMatch("fastapi", "fastapi/routing.py", 4, "    return route_handler"),
+            GrepMatch("flask", "docs/index.md", 2, "route decorators"),
+        ]
+
+    def test_one_result_per_line(self, store):
+        """Test several matches on one line are reported once."""
+        matches = list(grep_digests(find_digests(store), compile_pattern("o"), path_glob="README.md", workers=1))
+        assert matches == [GrepMatch("fastapi", "README.md", 1, "FastAPI route docs")]
+
+    def test_section_separators_not_matched(self, store):
+        """Test blank lines between sections and headers never match."""
+        assert list(grep_digests(find_digests(store), compile_pattern("^(=+|FILE:.*)?$"), workers=1)) == [
+            GrepMatch("fastapi", "fastapi/routing.py", 2, ""),
+        ]
+
+    def test_path_glob(self, store):
+        """Test the path filter limits scanned files."""
+        matches = list(grep_digests(find_digests(store), compile_pattern("route"), path_glob="docs/*", workers=1))
+        assert [m.path for m in matches] == ["docs/index.md"]
+
+    def test_parallel_matches_serial(self, store):
+        """Test a process pool finds the same matches as in-process scanning."""
+        digests = find_digests(store)
+        pattern = compile_pattern("route")
+
+        serial = sorted(grep_digests(digests, pattern, workers=1))
+        parallel = sorted(grep_digests(digests, pattern, workers=2))
+
+        assert parallel == serial
+
+    def test_file_in_several_content_files(self, store):
+        """Test a file in two content files of one directory is reported once."""
+        _write_digest(store / "flask" / "code-content.txt", [("docs/index.md", "Intro\nroute decorators\n")])
+
+        matches = list(grep_digests(find_digests(store, {}), compile_pattern("decorators"), workers=1))
+
+        assert matches == [GrepMatch("flask", "docs/index.md", 2, "route decorators")]
+
+    def test_no_digests(self, tmp_path):
+        """Test an empty store yields nothing."""
+        assert list(grep_digests(find_digests(tmp_path), compile_pattern("x"), workers=2)) == []
+
+
+class TestPlanTasks:
+    """Tests for plan_tasks() function."""
+
+    def test_chunks_cover_all_sections(self, store, monkeypatch):
+        """Test small chunk sizes split digests without losing sections."""
+        import digest_grep
+        monkeypatch.setattr(digest_grep, 'MIN_CHUNK_BYTES', 1)
+
+        tasks = plan_tasks(find_digests(store), workers=4)
+
+        assert len(tasks) == 3
+        assert sorted(s.path for task in tasks for s in task.sections) == [
+            "README.md", "docs/index.md", "fastapi/routing.py"
+        ]
\ No newline at end of file
@@ -4,19 +4,27 @@ Unit tests for extractor module.
 Tests cover:
 - Full repository extraction
 - Tree structure extraction
-- Selective content extraction
+- Selective content extraction, optionally capped at a token budget
 - GitIngest subprocess execution
 - Encoding error detection
 - Error handling for network, timeout, and filesystem errors
 """
 
+import io
+import json
 import pytest
 import subprocess
 from unittest.mock import Mock, patch, call
 from pathlib import Path
+from digest import iter_sections
 from exceptions import GitIngestError, StorageError, ValidationError
+from file_caps import FileCaps
+from prefilter import Prefilter
+from reader import DigestReader
+from artifact_store import ArtifactStore
 from extractor import (
     _check_encoding_errors,
+    _ingest_filtered,
     _run_gitingest,
     extract_full,
     extract_tree,
@@ -605,4 +613,874 @@ class TestIntegration:
         assert Path(tree_path).exists()
         assert tree_content == "Tree structure"
         assert Path(docs_path).exists()
-        assert "docs-content.txt" in docs_path
\ No newline at end of file
+        assert "docs-content.txt" in docs_path
+
+
+class TestArtifactQuota:
+    """Tests for artifact index registration and quota enforcement."""
+
+    @patch('extractor._run_gitingest')
+    @patch('extractor.ensure_data_directory')
+    def test_extraction_recorded_in_index(self, mock_ensure_dir, mock_run_gitingest, tmp_path, monkeypatch):
+        """Test a new extraction is registered in the artifact index."""
+        from artifact_store import ArtifactStore
+        monkeypatch.delenv('GITINGEST_AGENT_QUOTA', raising=False)
+        data_dir = tmp_path / "data" / "repo"
+        data_dir.mkdir(parents=True)
+        mock_ensure_dir.return_value = data_dir
+        (data_dir / "digest.txt").write_text("content", encoding='utf-8')
+
+        extract_full("https://github.com/user/repo", "repo")
+
+        with ArtifactStore(tmp_path / "data") as store:
+            assert store.get_size(data_dir / "digest.txt") == len("content")
+
+    @patch('extractor._run_gitingest')
+    @patch('extractor.ensure_data_directory')
+    def test_extraction_evicts_lru_over_quota(self, mock_ensure_dir, mock_run_gitingest, tmp_path, monkeypatch):
+        """Test older artifacts are evicted when a new extraction exceeds the quota."""
+        from artifact_store import ArtifactStore
+        monkeypatch.setenv('GITINGEST_AGENT_QUOTA', '150')
+        root = tmp_path / "data"
+        old = root / "old" / "digest.txt"
+        old.parent.mkdir(parents=True)
+        old.write_bytes(b"x" * 100)
+        with ArtifactStore(root) as store:
+            store.record(old, 'digest')
+
+        data_dir = root / "repo"
+        data_dir.mkdir()
+        mock_ensure_dir.return_value = data_dir
+        (data_dir / "digest.txt").write_bytes(b"y" * 100)
+
+        result_path, _ = extract_full("https://github.com/user/repo", "repo")
+
+        assert Path(result_path).exists()
+        assert not old.exists()
+
+
+class TestSearchIndexing:
+    """Tests for automatic search indexing of new extractions."""
+
+    @patch('extractor._run_gitingest')
+    @patch('extractor.ensure_data_directory')
+    def test_extract_full_indexes_digest(self, mock_ensure_dir, mock_run_gitingest, tmp_path):
+        """Test extract_full adds the digest to the search index."""
+        from search_index import SearchIndex
+        data_dir = tmp_path / "data" / "repo"
+        data_dir.mkdir(parents=True)
+        mock_ensure_dir.return_value = data_dir
+        sep = "=" * 48
+        (data_dir / "digest.txt").write_text(f"{sep}\nFILE: main.py\n{sep}\nunique_token = 1\n",
+                                             encoding='utf-8')
+
+        extract_full("https://github.com/user/repo", "repo")
+
+        with SearchIndex.for_root(tmp_path / "data") as index:
+            results = index.search("unique_token")
+        assert [(r['repo'], r['path']) for r in results] == [("user/repo", "main.py")]
+
+    @patch('extractor._run_gitingest')
+    @patch('extractor.ensure_data_directory')
+    @patch('extractor.get_filters_for_type')
+    def test_extract_specific_indexes_content(self, mock_get_filters, mock_ensure_dir, mock_run_gitingest, tmp_path):
+        """Test extract_specific adds the content file to the search index."""
+        from search_index import SearchIndex
+        data_dir = tmp_path / "data" / "repo"
+        data_dir.mkdir(parents=True)
+        mock_ensure_dir.return_value = data_dir
+        mock_get_filters.return_value = {'include': ['*.md'], 'exclude': []}
+        sep = "=" * 48
+        (data_dir / "docs-content.txt").write_text(f"{sep}\nFILE: README.md\n{sep}\nInstall guide\n",
+                                                   encoding='utf-8')
+
+        extract_specific("https://github.com/user/repo", "repo", "docs")
+
+        with SearchIndex.for_root(tmp_path / "data") as index:
+            assert len(index.search("install")) == 1
+
+
+class TestExtractRelevant:
+    """Tests for extract_relevant() function."""
+
+    @patch('extractor.ensure_data_directory')
+    def test_extract_relevant_from_local_source(self, mock_ensure_dir, tmp_path):
+        """Test ranking a local checkout writes content and manifest."""
+        import json
+        from extractor import extract_relevant
+        data_dir = tmp_path / "data" / "repo"
+        data_dir.mkdir(parents=True)
+        mock_ensure_dir.return_value = data_dir
+        checkout = tmp_path / "checkout"
+        (checkout / "auth").mkdir(parents=True)
+        (checkout / "auth" / "settings.py").write_text("AUTH_PROVIDER = 'oauth'\n" * 4, encoding='utf-8')
+        (checkout / "big_auth_notes.md").write_text("auth " * 400, encoding='utf-8')
+        (checkout / "unrelated.py").write_text("x = 1", encoding='utf-8')
+
+        path, manifest_path, tokens = extract_relevant(
+            "https://github.com/user/repo", "repo", "auth settings", budget=100, source=checkout,
+            tokenizer='heuristic')
+
+        content = Path(path).read_text(encoding='utf-8')
+        manifest = json.loads(Path(manifest_path).read_text(encoding='utf-8'))
+        assert "FILE: auth/settings.py" in content
+        assert "unrelated.py" not in content
+        assert manifest['files'][0]['path'] == "auth/settings.py"
+        assert manifest['files'][0]['score'] > 0
+        assert [f['path'] for f in manifest['skipped']] == ["big_auth_notes.md"]
+        assert tokens == manifest['tokens'] <= 100
+        assert manifest['tokenizer'] == 'heuristic'
+
+    @patch('extractor.extract_full')
+    @patch('extractor.ensure_data_directory')
+    def test_extract_relevant_extracts_digest_when_missing(self, mock_ensure_dir, mock_extract_full, tmp_path):
+        """Test a full extraction is run when no digest is stored."""
+        from extractor import extract_relevant
+        data_dir = tmp_path / "data" / "repo"
+        data_dir.mkdir(parents=True)
+        mock_ensure_dir.return_value = data_dir
+        digest = data_dir / "digest.txt"
+        sep = "=" * 48
+
+        def fake_extract(url, repo_name, output_dir=None, prefilter=None, mirror=None):
+            digest.write_text(f"{sep}\nFILE: auth.py\n{sep}\nauth = True\n", encoding='utf-8')
+            return str(digest), []
+        mock_extract_full.side_effect = fake_extract
+
+        path, _, _ = extract_relevant("https://github.com/user/repo", "repo", "auth", budget=1000)
+
+        mock_extract_full.assert_called_once()
+        assert "FILE: auth.py" in Path(path).read_text(encoding='utf-8')
+
+    def test_extract_relevant_invalid_budget(self):
+        """Test non-positive budget raises ValidationError."""
+        from extractor import extract_relevant
+        with pytest.raises(ValidationError):
+            extract_relevant("https://github.com/user/repo", "repo", "auth", budget=0)
+
+
+class TestExtractOutline:
+    """Tests for extract_specific() with the outline content type."""
+
+    @patch('extractor._run_gitingest')
+    @patch('extractor.ensure_data_directory')
+    def test_extract_outline(self, mock_ensure_dir, mock_run_gitingest, tmp_path):
+        """Test outline extraction writes outline-content.txt from a temporary source digest."""
+        data_dir = tmp_path / "data" / "repo"
+        data_dir.mkdir(parents=True)
+        mock_ensure_dir.return_value = data_dir
+        sep = "=" * 48
+
+        def fake_gitingest(args, timeout):
+            output = Path(args[args.index('-o') + 1])
+            output.write_text(f"{sep}\nFILE: app.py\n{sep}\ndef run(x):\n    return x * 2\n",
+                              encoding='utf-8')
+        mock_run_gitingest.side_effect = fake_gitingest
+
+        path, errors = extract_specific("https://github.com/user/repo", "repo", "outline")
+
+        assert path.endswith("outline-content.txt")
+        content = Path(path).read_text(encoding='utf-8')
+        assert "def run(x):" in content
+        assert "return x * 2" not in content
+        assert not (data_dir / "outline-source.txt").exists()
+        assert errors == []
+
+
+class TestExtractLayers:
+    """Tests for extract_layers() function."""
+
+    @patch('extractor.extract_full')
+    @patch('extractor.ensure_data_directory')
+    def test_extract_layers_uses_stored_digest(self, mock_ensure_dir, mock_extract_full, tmp_path):
+        """Test layers are built from an existing digest without a new ingest."""
+        import json
+        from extractor import extract_layers
+        data_dir = tmp_path / "data" / "repo"
+        data_dir.mkdir(parents=True)
+        mock_ensure_dir.return_value = data_dir
+        sep = "=" * 48
+        (data_dir / "digest.txt").write_text(
+            "Directory structure:\n└── user-repo/\n    ├── README.md\n    └── app.py\n\n"
+            f"{sep}\nFILE: README.md\n{sep}\n# Repo\n\n"
+            f"{sep}\nFILE: app.py\n{sep}\ndef run():\n    return 1\n",
+            encoding='utf-8')
+
+        manifest_path, built = extract_layers("https://github.com/user/repo", "repo")
+
+        mock_extract_full.assert_not_called()
+        manifest = json.loads(Path(manifest_path).read_text(encoding='utf-8'))
+        assert [layer['name'] for layer in manifest['layers']] == ['tree', 'overview', 'docs', 'outline', 'full']
+        assert (data_dir / "layer-3-outline.txt").exists()
+        assert built[4].path == data_dir / "digest.txt"
+
+    @patch('extractor.extract_full')
+    @patch('extractor.ensure_data_directory')
+    def test_extract_layers_refresh(self, mock_ensure_dir, mock_extract_full, tmp_path):
+        """Test --refresh runs a new full extraction first."""
+        from extractor import extract_layers
+        data_dir = tmp_path / "data" / "repo"
+        data_dir.mkdir(parents=True)
+        mock_ensure_dir.return_value = data_dir
+        (data_dir / "digest.txt").write_text("Directory structure:\n└── user-repo/\n", encoding='utf-8')
+
+        extract_layers("https://github.com/user/repo", "repo", refresh=True)
+
+        mock_extract_full.assert_called_once_with("https://github.com/user/repo", "repo", output_dir=None, prefilter=None,
+                                                  mirror=None)
+
+    @patch('extractor.ensure_data_directory')
+    def test_extract_layers_caches_token_counts(self, mock_ensure_dir, tmp_path):
+        """Test layer counts use the tokenizer and unchanged files aren't recounted."""
+        import json
+        from extractor import extract_layers
+        from token_backends import HeuristicBackend
+
+        class CountingBackend(HeuristicBackend):
+            calls = 0
+
+            def count_file(self, file_path, workers=None):
+                CountingBackend.calls += 1
+                return super().count_file(file_path, workers)
+
+        data_dir = tmp_path / "data" / "repo"
+        data_dir.mkdir(parents=True)
+        mock_ensure_dir.return_value = data_dir
+        sep = "=" * 48
+        (data_dir / "digest.txt").write_text(
+            f"Directory structure:\n└── user-repo/\n    └── app.py\n\n{sep}\nFILE: app.py\n{sep}\nx = 1\n",
+            encoding='utf-8')
+
+        manifest_path, built = extract_layers("https://github.com/user/repo", "repo", tokenizer=CountingBackend())
+        first_calls = CountingBackend.calls
+        extract_layers("https://github.com/user/repo", "repo", tokenizer=CountingBackend())
+
+        manifest = json.loads(Path(manifest_path).read_text(encoding='utf-8'))
+        assert manifest['tokenizer'] == 'heuristic'
+        assert first_calls == 5
+        # Layers L0-L3 are rewritten, the digest (L4) count comes from the cache
+        assert CountingBackend.calls - first_calls == 4
+
+
+class TestExtractSpecificBudget:
+    """Tests for extract_specific() with a token budget."""
+
+    SEP = "=" * 48
+    TREE = ("Directory structure:\n└── user-repo/\n    ├── a.md\n    ├── b.md\n"
+            "    ├── c.md\n    └── d.md\n\n")
+
+    def digest(self):
+        return self.TREE + ''.join(
+            f"{self.SEP}\nFILE: {name}\n{self.SEP}\n" + "word " * 400 + "\n\n\n"
+            for name in ("a.md", "b.md", "c.md", "d.md")
+        )
+
+    def process(self, output, returncode=0, error_output=b""):
+        """Fake gitingest process streaming output, plus a Popen side effect returning it."""
+        process = Mock()
+        process.stdout = io.BytesIO(output.encode('utf-8'))
+        process.wait.return_value = returncode
+
+        def popen(cmd, stdout, stderr):
+            stderr.write(error_output)
+            return process
+        return process, popen
+
+    @pytest.fixture
+    def data_dir(self, tmp_path):
+        data_dir = tmp_path / "data" / "repo"
+        data_dir.mkdir(parents=True)
+        with patch('extractor.ensure_data_directory', return_value=data_dir):
+            yield data_dir
+
+    def test_under_budget(self, data_dir):
+        """Test a digest within the budget is written whole."""
+        process, popen = self.process(self.digest())
+        with patch('extractor.subprocess.Popen', side_effect=popen) as mock_popen:
+            path, errors = extract_specific("https://github.com/user/repo", "repo", "docs",
+                                            budget=100_000, tokenizer='heuristic')
+
+        assert mock_popen.call_args[0][0][-2:] == ['-o', '-']
+        assert Path(path).read_text(encoding='utf-8') == self.digest()
+        manifest = json.loads((data_dir / "docs-content.skipped.json").read_text(encoding='utf-8'))
+        assert manifest['complete'] is True
+        assert manifest['files'] == 4
+        assert manifest['skipped'] == []
+        assert manifest['tokenizer'] == 'heuristic'
+        process.kill.assert_not_called()
+
+    def test_stops_at_budget(self, data_dir):
+        """Test the ingest stops at the budget and lists the skipped files."""
+        process, popen = self.process(self.digest(), returncode=-9)
+        with patch('extractor.subprocess.Popen', side_effect=popen):
+            path, errors = extract_specific("https://github.com/user/repo", "repo", "docs",
+                                            budget=1_200, tokenizer='heuristic')
+
+        process.kill.assert_called_once()
+        sections = list(iter_sections(path))
+        assert [s.path for s in sections] == ["a.md", "b.md"]
+        assert Path(path).read_text(encoding='utf-8').startswith("Directory structure:")
+        manifest = json.loads((data_dir / "docs-content.skipped.json").read_text(encoding='utf-8'))
+        assert manifest['complete'] is False
+        assert manifest['skipped'] == ["c.md", "d.md"]
+        assert manifest['tokens'] <= 1_200
+        assert manifest['url'] == "https://github.com/user/repo"
+
+    def test_outline_budget_counts_outlines(self, data_dir):
+        """Test outlines are built while streaming and count against the budget."""
+        source = (f"{self.SEP}\nFILE: app.py\n{self.SEP}\ndef run(x):\n" + "    x += 1\n" * 500
+                  + "    return x\n\n\n")
+        process, popen = self.process(source)
+        with patch('extractor.subprocess.Popen', side_effect=popen):
+            path, errors = extract_specific("https://github.com/user/repo", "repo", "outline",
+                                            budget=100, tokenizer='heuristic')
+
+        content = Path(path).read_text(encoding='utf-8')
+        assert "def run(x):" in content
+        assert "x += 1" not in content
+        assert not (data_dir / "outline-source.txt").exists()
+
+    def test_gitingest_failure(self, data_dir):
+        """Test a failing ingest raises GitIngestError."""
+        process, popen = self.process("", returncode=1, error_output=b"Repository not found")
+        with patch('extractor.subprocess.Popen', side_effect=popen):
+            with pytest.raises(GitIngestError, match="Repository not found"):
+                extract_specific("https://github.com/user/repo", "repo", "docs", budget=1_000)
+
+    def test_invalid_budget(self, data_dir):
+        """Test a non-positive budget is rejected."""
+        with pytest.raises(ValidationError):
+            extract_specific("https://github.com/user/repo", "repo", "docs", budget=0)
+
+    @patch('extractor._run_gitingest')
+    def test_unbudgeted_run_removes_stale_manifest(self, mock_run_gitingest, data_dir):
+        """Test an extraction without a budget drops an earlier skipped manifest."""
+        (data_dir / "docs-content.txt").write_text("docs", encoding='utf-8')
+        manifest = data_dir / "docs-content.skipped.json"
+        manifest.write_text("{}", encoding='utf-8')
+
+        extract_specific("https://github.com/user/repo", "repo", "docs")
+
+        assert not manifest.exists()
+
+    def lines_digest(self):
+        """The digest with each file's words spread over lines, so caps keep a head and tail."""
+        return self.digest().replace("word " * 400, ("word " * 10 + "\n") * 40)
+
+    @pytest.fixture
+    def profile(self, tmp_path, monkeypatch):
+        """Configure a 'notes' profile with per-file caps; returns its config file."""
+        monkeypatch.setenv('XDG_CONFIG_HOME', str(tmp_path / "user"))
+        config = tmp_path / "project.toml"
+        monkeypatch.setenv('GITINGEST_AGENT_CONFIG', str(config))
+        config.write_text('[profiles.notes]\ninclude = ["*.md"]\nfile_caps = ["100"]\n', encoding='utf-8')
+        return config
+
+    def test_profile_caps_and_budget(self, data_dir, profile):
+        """Test a configured profile's default budget and caps are applied."""
+        profile.write_text(profile.read_text(encoding='utf-8') + 'budget = 550\n', encoding='utf-8')
+        process, popen = self.process(self.lines_digest(), returncode=-9)
+        with patch('extractor.subprocess.Popen', side_effect=popen) as mock_popen:
+            path, errors = extract_specific("https://github.com/user/repo", "repo", "notes",
+                                            tokenizer='heuristic')
+
+        assert '*.md' in mock_popen.call_args[0][0]
+        sections = [s.path for s in iter_sections(path)]
+        assert sections == ["a.md", "b.md"]
+        manifest = json.loads((data_dir / "notes-content.skipped.json").read_text(encoding='utf-8'))
+        assert manifest['budget'] == 550
+        assert manifest['skipped'] == ["c.md", "d.md"]
+        with DigestReader(Path(path)) as reader:
+            assert list(reader.truncations()) == ["a.md", "b.md"]
+
+    def test_profile_caps_without_budget(self, data_dir, profile):
+        """Test a configured profile's caps apply to an unbudgeted extraction."""
+        process, popen = self.process(self.lines_digest())
+        with patch('extractor.subprocess.Popen', side_effect=popen):
+            path, errors = extract_specific("https://github.com/user/repo", "repo", "notes",
+                                            tokenizer='heuristic')
+
+        assert [s.path for s in iter_sections(path)] == ["a.md", "b.md", "c.md", "d.md"]
+        assert not (data_dir / "notes-content.skipped.json").exists()
+        with DigestReader(Path(path)) as reader:
+            assert list(reader.truncations()) == ["a.md", "b.md", "c.md", "d.md"]
+
+
+class TestExtractFullCaps:
+    """Tests for extract_full() with per-file token caps."""
+
+    SEP = "=" * 48
+
+    def digest(self):
+        return ("Directory structure:\n└── user-repo/\n    ├── a.py\n    └── big.json\n\n"
+                f"{self.SEP}\nFILE: a.py\n{self.SEP}\nprint(1)\n\n\n"
+                f"{self.SEP}\nFILE: big.json\n{self.SEP}\n" + "[1, 2, 3, 4, 5, 6, 7, 8]\n" * 2000 + "\n\n")
+
+    @pytest.fixture
+    def data_dir(self, tmp_path):
+        data_dir = tmp_path / "data" / "repo"
+        data_dir.mkdir(parents=True)
+        with patch('extractor.ensure_data_directory', return_value=data_dir):
+            yield data_dir
+
+    def test_caps_streamed_and_recorded(self, data_dir):
+        """Test oversized files are capped while streaming and recorded in the index."""
+        process = Mock()
+        process.stdout = io.BytesIO(self.digest().encode('utf-8'))
+        process.wait.return_value = 0
+        with patch('extractor.subprocess.Popen', return_value=process) as mock_popen:
+            path, errors = extract_full("https://github.com/user/repo", "repo",
+                                        caps=FileCaps(100), tokenizer='heuristic')
+
+        assert mock_popen.call_args[0][0][-2:] == ['-o', '-']
+        assert "tokens omitted" in Path(path).read_text(encoding='utf-8')
+        assert [s.path for s in iter_sections(path)] == ["a.py", "big.json"]
+        with DigestReader(Path(path)) as reader:
+            truncations = reader.truncations()
+        assert list(truncations) == ["big.json"]
+        tokens, kept, elided = truncations["big.json"]
+        assert kept <= 200
+        assert kept + elided == tokens
+
+    def test_caps_gitingest_failure(self, data_dir):
+        """Test a failing ingest raises GitIngestError."""
+        process = Mock()
+        process.stdout = io.BytesIO(b"")
+        process.wait.return_value = 1
+
+        def popen(cmd, stdout, stderr):
+            stderr.write(b"Repository not found")
+            return process
+
+        with patch('extractor.subprocess.Popen', side_effect=popen):
+            with pytest.raises(GitIngestError, match="Repository not found"):
+                extract_full("https://github.com/user/repo", "repo", caps=FileCaps(100))
+
+
+class TestExtractAutoCode:
+    """Tests for extract_specific() with the synthesized auto-code profile."""
+
+    SEP = "=" * 48
+    TREE = ("Directory structure:\n└── user-repo/\n    ├── README.md\n    ├── cmd/\n"
+            "    │   ├── main.go\n    │   └── main_test.go\n    └── internal/\n"
+            "        └── db.go\n\n")
+
+    @pytest.fixture
+    def data_dir(self, tmp_path):
+        data_dir = tmp_path / "data" / "repo"
+        data_dir.mkdir(parents=True)
+        with patch('extractor.ensure_data_directory', return_value=data_dir):
+            yield data_dir
+
+    @patch('extractor._run_gitingest')
+    def test_tree_from_stored_digest(self, mock_run_gitingest, data_dir):
+        """Test the stored digest's tree is analyzed without an extra ingest."""
+        (data_dir / "digest.txt").write_text(
+            self.TREE + f"{self.SEP}\nFILE: README.md\n{self.SEP}\n# Repo\n\n", encoding='utf-8')
+
+        with patch('extractor.subprocess.Popen') as mock_popen:
+            path, errors = extract_specific("https://github.com/user/repo", "repo", "auto-code")
+
+        mock_popen.assert_not_called()
+        args = mock_run_gitingest.call_args[0][0]
+        assert args[:9] == ["https://github.com/user/repo", '-i', 'cmd/**/*.go', '-i', 'internal/**/*.go',
+                            '-e', '*_test.go', '-o', str(data_dir / "auto-code-content.txt")]
+        profile = json.loads((data_dir / "auto-code-content.profile.json").read_text(encoding='utf-8'))
+        assert profile['languages'] == {'Go': 2}
+        assert profile['roots'] == ['cmd', 'internal']
+        assert profile['files'] == 2
+        assert profile['url'] == "https://github.com/user/repo"
+
+    @patch('extractor._run_gitingest')
+    def test_tree_from_ingest(self, mock_run_gitingest, data_dir):
+        """Test without a stored digest the ingest is stopped after its tree."""
+        process = Mock()
+        process.stdout = io.BytesIO((self.TREE + f"{self.SEP}\nFILE: README.md\n{self.SEP}\n# Repo\n\n").encode('utf-8'))
+        process.wait.return_value = -9
+        with patch('extractor.subprocess.Popen', return_value=process) as mock_popen:
+            extract_specific("https://github.com/user/repo", "repo", "auto-code")
+
+        assert mock_popen.call_args[0][0] == ['gitingest', "https://github.com/user/repo", '-o', '-']
+        process.kill.assert_called_once()
+        assert 'cmd/**/*.go' in mock_run_gitingest.call_args[0][0]
+
+    @patch('extractor._run_gitingest')
+    def test_no_source_code(self, mock_run_gitingest, data_dir):
+        """Test a tree without source code fails before extracting."""
+        (data_dir / "digest.txt").write_text(
+            "Directory structure:\n└── user-repo/\n    └── README.md\n\n", encoding='utf-8')
+
+        with pytest.raises(ValidationError, match="No source code"):
+            extract_specific("https://github.com/user/repo", "repo", "auto-code")
+
+        mock_run_gitingest.assert_not_called()
+
+
+class TestExtractPrefilter:
+    """Tests for the prefilter in each extraction mode."""
+
+    SEP = "=" * 48
+
+    def digest(self):
+        return ("Directory structure:\n└── user-repo/\n\n"
+                f"{self.SEP}\nFILE: auth.py\n{self.SEP}\nAUTH_PROVIDER = 'oauth'\n\n\n"
+                f"{self.SEP}\nFILE: vendor/lib/auth.py\n{self.SEP}\nauth = 'vendored'\n\n\n"
+                f"{self.SEP}\nFILE: yarn.lock\n{self.SEP}\n" + "auth@1.0.0:\n  version 1.0.0\n" * 300 + "\n\n")
+
+    def process(self):
+        process = Mock()
+        process.stdout = io.BytesIO(self.digest().encode('utf-8'))
+        process.wait.return_value = 0
+        return process
+
+    @pytest.fixture
+    def data_dir(self, tmp_path):
+        data_dir = tmp_path / "data" / "repo"
+        data_dir.mkdir(parents=True)
+        with patch('extractor.ensure_data_directory', return_value=data_dir):
+            yield data_dir
+
+    def test_extract_full(self, data_dir):
+        """Test the full digest is filtered as it streams."""
+        prefilter = Prefilter(tokenizer='heuristic')
+        with patch('extractor.subprocess.Popen', return_value=self.process()):
+            path, errors = extract_full("https://github.com/user/repo", "repo", prefilter=prefilter)
+
+        assert [s.path for s in iter_sections(path)] == ["auth.py", "yarn.lock"]
+        assert "tokens omitted: dependency lockfile" in Path(path).read_text(encoding='utf-8')
+        assert set(prefilter.report()['rules']) == {'vendored', 'lockfile'}
+
+    def test_extract_specific(self, data_dir):
+        """Test filtered content is streamed for a content type."""
+        prefilter = Prefilter(tokenizer='heuristic')
+        with patch('extractor.subprocess.Popen', return_value=self.process()) as mock_popen:
+            path, errors = extract_specific("https://github.com/user/repo", "repo", "code", prefilter=prefilter)
+
+        assert '-i' in mock_popen.call_args[0][0]
+        assert [s.path for s in iter_sections(path)] == ["auth.py", "yarn.lock"]
+
+    def test_extract_specific_budget(self, data_dir):
+        """Test filtered files don't count against the budget and aren't listed as skipped."""
+        prefilter = Prefilter(tokenizer='heuristic')
+        with patch('extractor.subprocess.Popen', return_value=self.process()):
+            path, errors = extract_specific("https://github.com/user/repo", "repo", "code",
+                                            budget=200, tokenizer='heuristic', prefilter=prefilter)
+
+        manifest = json.loads((data_dir / "code-content.skipped.json").read_text(encoding='utf-8'))
+        assert manifest['complete'] is True
+        assert manifest['skipped'] == []
+        assert "tokens omitted: dependency lockfile" in Path(path).read_text(encoding='utf-8')
+
+    def test_extract_relevant(self, data_dir, tmp_path):
+        """Test filtered files are left out of the ranking."""
+        from extractor import extract_relevant
+        source = tmp_path / "source.txt"
+        source.write_text(self.digest(), encoding='utf-8')
+
+        path, manifest_path, tokens = extract_relevant(
+            "https://github.com/user/repo", "repo", "auth", budget=10_000, source=source,
+            tokenizer='heuristic', prefilter=Prefilter(tokenizer='heuristic'))
+
+        manifest = json.loads(Path(manifest_path).read_text(encoding='utf-8'))
+        assert [f['path'] for f in manifest['files']] == ["auth.py"]
+
+
+class TestExtractFromMirror:
+    """Tests for extraction from a local mirror, including the installation fast path."""
+
+    @pytest.fixture
+    def data_dir(self, tmp_path):
+        data_dir = tmp_path / "data" / "repo"
+        data_dir.mkdir(parents=True)
+        with patch('extractor.ensure_data_directory', return_value=data_dir):
+            yield data_dir
+
+    @pytest.fixture
+    def mirror(self, tmp_path):
+        from git_mirror import GitMirror
+        repo = tmp_path / "remote" / "tool"
+        files = {
+            "pyproject.toml": "[project]\nname = 'tool'\nversion = '1.0'\ndependencies = ['click>=8']\n",
+            "package.json": '{"name": "tool-web", "scripts": {"build": "vite build"}}',
+            "requirements.txt": "httpx\n",
+            "README.md": "# Tool\n\npip install tool\n",
+            "docs/installation.md": "## Install\n",
+            "src/tool/cli.py": "def main():\n    pass\n",
+        }
+        for name, text in files.items():
+            (repo / name).parent.mkdir(parents=True, exist_ok=True)
+            (repo / name).write_text(text, encoding='utf-8')
+        git = ['git', '-C', str(repo), '-c', 'user.name=Test', '-c', 'user.email=test@example.com']
+        subprocess.run(git + ['init', '--quiet'], check=True)
+        subprocess.run(git + ['add', '--all'], check=True)
+        subprocess.run(git + ['commit', '--quiet', '-m', 'init'], check=True)
+        subprocess.run(git + ['config', 'uploadpack.allowFilter', 'true'], check=True)
+        return GitMirror(str(repo), root=tmp_path / "mirrors")
+
+    @patch('extractor._run_gitingest')
+    def test_reads_from_mirror(self, mock_run_gitingest, data_dir, mirror):
+        """Test the summary and selected files are written without running gitingest."""
+        path, errors = extract_specific("https://github.com/user/tool", "repo", "installation", mirror=mirror)
+
+        mock_run_gitingest.assert_not_called()
+        assert errors == []
+        assert mirror.strategy() == 'partial'
+        assert [transfer.operation for transfer in mirror.transfers] == ['clone', 'prefetch']
+        assert mirror.ls_tree(paths=["src/tool/cli.py"])[0].oid in mirror.missing()
+        content = Path(path).read_text(encoding='utf-8')
+        assert content.startswith("Installation summary: tool 1.0 (pyproject.toml, package.json, requirements.txt)\n")
+        assert [s.path for s in iter_sections(path)] == [
+            "README.md", "docs/installation.md", "package.json", "pyproject.toml"
+        ]
+        summary = json.loads((data_dir / "installation-content.summary.json").read_text(encoding='utf-8'))
+        assert summary['dependencies'] == {'python': ["click>=8", "httpx"]}
+        assert summary['scripts'] == {'build': "vite build"}
+
+    def test_budget(self, data_dir, mirror):
+        """Test files past the budget are skipped and listed."""
+        path, errors = extract_specific("https://github.com/user/tool", "repo", "installation", mirror=mirror,
+                                        budget=80, tokenizer='heuristic')
+
+        manifest = json.loads((data_dir / "installation-content.skipped.json").read_text(encoding='utf-8'))
+        assert manifest['complete'] is False
+        assert manifest['url'] == "https://github.com/user/tool"
+        assert [s.path for s in iter_sections(path)] + manifest['skipped'] == [
+            "README.md", "docs/installation.md", "package.json", "pyproject.toml"
+        ]
+        assert manifest['tokens'] <= 80
+
+    @patch('extractor._run_gitingest')
+    def test_other_types_read_from_mirror(self, mock_run_gitingest, data_dir, mirror):
+        """Test content types without a fast path are ingested from the mirror with their filters."""
+        path, errors = extract_specific("https://github.com/user/tool", "repo", "docs", mirror=mirror)
+
+        mock_run_gitingest.assert_not_called()
+        assert errors == []
+        assert mirror.strategy() == 'partial'
+        assert not (data_dir / "docs-content.summary.json").exists()
+        assert Path(path).read_text(encoding='utf-8').startswith(
+            "Directory structure:\n└── user-tool/\n    ├── README.md\n    └── docs/\n"
+        )
+        assert [s.path for s in iter_sections(path)] == ["README.md", "docs/installation.md"]
+
+    @patch('extractor._gitingest_stream')
+    @patch('extractor._run_gitingest')
+    def test_extract_full(self, mock_run_gitingest, mock_stream, data_dir, mirror):
+        """Test a full digest is streamed from the mirror without gitingest."""
+        path, errors = extract_full("https://github.com/user/tool", "repo", mirror=mirror)
+
+        mock_run_gitingest.assert_not_called()
+        mock_stream.assert_not_called()
+        assert errors == []
+        assert mirror.strategy() == 'shallow'
+        assert [s.path for s in iter_sections(path)] == [
+            "README.md", "package.json", "pyproject.toml", "requirements.txt", "docs/installation.md",
+            "src/tool/cli.py"
+        ]
+
+    def test_extract_full_budget(self, data_dir, mirror):
+        """Test file caps apply to a digest read from the mirror."""
+        path, errors = extract_full("https://github.com/user/tool", "repo", mirror=mirror,
+                                    caps=FileCaps(2), tokenizer='heuristic')
+
+        assert "tokens omitted" in Path(path).read_text(encoding='utf-8')
+        with DigestReader(Path(path)) as reader:
+            assert "pyproject.toml" in reader.truncations()
+
+    @patch('extractor._run_gitingest')
+    def test_extract_tree(self, mock_run_gitingest, data_dir, mirror):
+        """Test the tree lists every file without reading any."""
+        path, tree, errors = extract_tree("https://github.com/user/tool", "repo", mirror=mirror)
+
+        mock_run_gitingest.assert_not_called()
+        assert mirror.strategy() == 'partial'
+        assert [transfer.operation for transfer in mirror.transfers] == ['clone']
+        assert tree.splitlines()[:3] == ["Directory structure:", "└── user-tool/", "    ├── README.md"]
+        assert "            └── cli.py" in tree.splitlines()
+        assert "FILE:" not in tree
+
+
+    @pytest.fixture
+    def monorepo(self, mirror):
+        """The mirror's remote with tag v1.0, then a packages/web package tagged v2.0."""
+        repo = Path(mirror.url)
+        git = ['git', '-C', str(repo), '-c', 'user.name=Test', '-c', 'user.email=test@example.com']
+        subprocess.run(git + ['tag', 'v1.0'], check=True)
+        (repo / "packages" / "web").mkdir(parents=True)
+        (repo / "packages" / "web" / "package.json").write_text('{"name": "web", "version": "2.0.0"}',
+                                                                encoding='utf-8')
+        (repo / "packages" / "web" / "README.md").write_text("# Web\n", encoding='utf-8')
+        (repo / "packages" / "web" / "app.js").write_text("export default 1;\n", encoding='utf-8')
+        subprocess.run(git + ['add', '--all'], check=True)
+        subprocess.run(git + ['commit', '--quiet', '-m', 'web'], check=True)
+        subprocess.run(git + ['tag', 'v2.0'], check=True)
+        return mirror
+
+    def test_installation_at_ref_and_subpath(self, data_dir, monorepo):
+        """Test the installation fast path reads the subpath's files and manifests at the ref."""
+        path, errors = extract_specific("user/tool@v2.0:packages/web", "repo", "installation", mirror=monorepo)
+
+        assert Path(path).read_text(encoding='utf-8').startswith(
+            "Installation summary: web 2.0.0 (packages/web/package.json)\n"
+        )
+        assert [s.path for s in iter_sections(path)] == ["packages/web/README.md", "packages/web/package.json"]
+
+    @patch('extractor._run_gitingest')
+    def test_extract_tree_at_ref(self, mock_run_gitingest, data_dir, monorepo):
+        """Test a pinned ref gets that commit's tree, and a subpath is the tree's root."""
+        _, old_tree, _ = extract_tree("https://github.com/user/tool/tree/v1.0", "repo", mirror=monorepo)
+        _, web_tree, _ = extract_tree("https://github.com/user/tool/tree/v2.0/packages/web", "repo",
+                                      mirror=monorepo)
+
+        mock_run_gitingest.assert_not_called()
+        assert "packages/" not in old_tree
+        assert web_tree == (
+            "Directory structure:\n"
+            "└── web/\n"
+            "    ├── README.md\n"
+            "    ├── app.js\n"
+            "    └── package.json\n"
+        )
+
+    def test_extract_full_subpath(self, data_dir, monorepo):
+        """Test a full extraction of a subpath holds only its files, by repository path."""
+        path, errors = extract_full("user/tool@v2.0:packages/web", "repo", mirror=monorepo)
+
+        assert [s.path for s in iter_sections(path)] == [
+            "packages/web/README.md", "packages/web/app.js", "packages/web/package.json"
+        ]
+
+    def test_subpath_is_not_a_cache_hit(self, data_dir, monorepo):
+        """Test the same commit under another subpath isn't taken for the stored extraction."""
+        extract_full("user/tool@v2.0", "repo", mirror=monorepo)
+
+        path, errors = extract_full("user/tool@v2.0:packages/web", "repo", mirror=monorepo)
+
+        assert [s.path for s in iter_sections(path)][0] == "packages/web/README.md"
+
+    def test_missing_subpath(self, data_dir, monorepo):
+        """Test a subpath that doesn't exist at the ref raises GitIngestError."""
+        with pytest.raises(GitIngestError, match="Path not found"):
+            extract_full("user/tool@v1.0:packages/web", "repo", mirror=monorepo)
+
+
+    def test_unchanged_commit_is_cached(self, data_dir, mirror):
+        """Test extracting the same commit with the same settings again is a no-op."""
+        with patch('extractor._ingest_filtered', wraps=_ingest_filtered) as spy:
+            path, _ = extract_full("https://github.com/user/tool", "repo", mirror=mirror)
+            again, errors = extract_full("https://github.com/user/tool", "repo", mirror=mirror)
+            assert spy.call_count == 1
+            extract_full("https://github.com/user/tool", "repo", mirror=mirror, caps=FileCaps(2), tokenizer='heuristic')
+            assert spy.call_count == 2
+
+        commit = mirror.resolve()
+        assert (again, errors) == (path, [])
+        with ArtifactStore(data_dir.parent) as store:
+            assert store.latest_version(Path(path))['commit'] == commit
+        version = data_dir / "versions" / commit / "digest.txt"
+        assert version.read_bytes() == Path(path).read_bytes()
+
+    def test_new_commit_keeps_old_version(self, data_dir, mirror):
+        """Test a new commit gets a version of its own, and older versions are left as they were."""
+        path, _ = extract_full("https://github.com/user/tool", "repo", mirror=mirror)
+        first = mirror.resolve()
+        old = (data_dir / "versions" / first / "digest.txt").read_bytes()
+        repo = Path(mirror.url)
+        (repo / "NEWS.md").write_text("# News\n", encoding='utf-8')
+        git = ['git', '-C', str(repo), '-c', 'user.name=Test', '-c', 'user.email=test@example.com']
+        subprocess.run(git + ['add', '--all'], check=True)
+        subprocess.run(git + ['commit', '--quiet', '-m', 'news'], check=True)
+        mirror.max_age = 0
+
+        extract_full("https://github.com/user/tool", "repo", mirror=mirror)
+
+        second = mirror.resolve()
+        assert second != first
+        assert (data_dir / "versions" / first / "digest.txt").read_bytes() == old
+        assert "FILE: NEWS.md" in Path(path).read_text(encoding='utf-8')
+        assert (data_dir / "versions" / second / "digest.txt").read_bytes() == Path(path).read_bytes()
+        with ArtifactStore(data_dir.parent) as store:
+            assert [v['commit'] for v in store.versions(Path(path))] == [second, first]
+
+    def test_gitingest_run_clears_latest(self, data_dir, mirror):
+        """Test an extraction from an unknown commit isn't taken for the cached version."""
+        path, _ = extract_full("https://github.com/user/tool", "repo", mirror=mirror)
+        version = data_dir / "versions" / mirror.resolve() / "digest.txt"
+
+        def write(args, timeout):
+            Path(args[args.index('-o') + 1]).write_text("gitingest\n", encoding='utf-8')
+
+        with patch('extractor._run_gitingest', side_effect=write):
+            extract_full("https://github.com/user/tool", "repo")
+
+        assert version.read_text(encoding='utf-8') != "gitingest\n"
+        with ArtifactStore(data_dir.parent) as store:
+            assert store.latest_version(Path(path)) is None
+
+    def _commit(self, mirror, name):
+        repo = Path(mirror.url)
+        (repo / name).write_text(f"# {name}\n", encoding='utf-8')
+        git = ['git', '-C', str(repo), '-c', 'user.name=Test', '-c', 'user.email=test@example.com']
+        subprocess.run(git + ['add', '--all'], check=True)
+        subprocess.run(git + ['commit', '--quiet', '-m', name], check=True)
+
+    def test_skip_unchanged_without_fetch(self, data_dir, mirror):
+        """Test an unchanged remote commit returns the stored content without refreshing the mirror."""
+        path, _ = extract_specific("https://github.com/user/tool", "repo", "docs", mirror=mirror)
+        mirror.max_age = 0
+        mirror.transfers.clear()
+
+        with patch('extractor._ingest_filtered') as mock_ingest:
+            again, errors = extract_specific("https://github.com/user/tool", "repo", "docs", mirror=mirror,
+                                             skip_unchanged=True)
+
+        assert (again, errors) == (path, [])
+        mock_ingest.assert_not_called()
+        assert mirror.transfers == []
+
+    def test_skip_unchanged_fetches_stale_mirror(self, data_dir, mirror):
+        """Test a mirror behind the remote commit is fetched even before its max_age."""
+        path, _ = extract_full("https://github.com/user/tool", "repo", mirror=mirror)
+        self._commit(mirror, "NEWS.md")
+
+        extract_full("https://github.com/user/tool", "repo", mirror=mirror, skip_unchanged=True)
+
+        assert [transfer.operation for transfer in mirror.transfers][-1] == 'fetch'
+        assert "FILE: NEWS.md" in Path(path).read_text(encoding='utf-8')
+        with ArtifactStore(data_dir.parent) as store:
+            assert store.latest_version(Path(path))['commit'] == mirror.resolve()
+
+    def test_skip_unchanged_gitingest(self, data_dir, mirror):
+        """Test without a mirror the commit comes from ls-remote, versions the digest and skips gitingest."""
+        runs = []
+
+        def write(args, timeout):
+            runs.append(args)
+            Path(args[args.index('-o') + 1]).write_text(f"run {len(runs)}\n", encoding='utf-8')
+
+        with patch('extractor.repository_url', return_value=mirror.url), \
+                patch('extractor._run_gitingest', side_effect=write):
+            path, _ = extract_full("https://github.com/user/tool", "repo", skip_unchanged=True)
+            extract_full("https://github.com/user/tool", "repo", skip_unchanged=True)
+            assert len(runs) == 1
+            self._commit(mirror, "NEWS.md")
+            extract_full("https://github.com/user/tool", "repo", skip_unchanged=True)
+            assert len(runs) == 2
+
+        with ArtifactStore(data_dir.parent) as store:
+            versions = store.versions(Path(path))
+        assert [Path(v['path']).read_text(encoding='utf-8') for v in versions] == ["run 2\n", "run 1\n"]
+
+    def test_mirror_digest_not_reused_by_gitingest(self, data_dir, mirror):
+        """Test a digest built from the mirror isn't taken for gitingest's digest of the same commit."""
+        path, _ = extract_full("https://github.com/user/tool", "repo", mirror=mirror)
+
+        def write(args, timeout):
+            Path(args[args.index('-o') + 1]).write_text("gitingest\n", encoding='utf-8')
+
+        with patch('extractor.repository_url', return_value=mirror.url), \
+                patch('extractor._run_gitingest', side_effect=write) as mock_run:
+            extract_full("https://github.com/user/tool", "repo", skip_unchanged=True)
+
+        mock_run.assert_called_once()
+        assert Path(path).read_text(encoding='utf-8') == "gitingest\n"
\ No newline at end of file
@@ -0,0 +1,138 @@
+"""
+Unit tests for file_caps module.
+
+Tests cover:
+- Cap specs, defaults and glob overrides
+- Head/tail retention with an elision marker
+- Uncapped digests copied byte for byte
+- Long lines capped in pieces without splitting characters
+- Capping a digest file on disk
+"""
+
+import io
+
+import pytest
+
+from digest import format_section, iter_sections
+from exceptions import ValidationError
+from file_caps import FileCaps, Truncation, cap_digest, cap_stream
+
+
+TREE = "Directory structure:\n└── repo/\n    ├── a.py\n    └── data/\n        └── big.json\n\n"
+
+
+def _digest(big_lines: int = 2000) -> str:
+    big = "".join(f'{{"id": {i}, "value": "row {i}"}}\n' for i in range(big_lines))
+    return (
+        TREE
+        + format_section("a.py", "print('hello')\n")
+        + format_section("data/big.json", big)
+        + format_section("z.md", "# Notes\n")
+    )
+
+
+def _cap(text: str, caps: FileCaps) -> tuple[str, list[Truncation]]:
+    out = io.BytesIO()
+    truncations = cap_stream(io.BytesIO(text.encode('utf-8')), out, caps, 'heuristic')
+    return out.getvalue().decode('utf-8'), truncations
+
+
+class TestFileCaps:
+    """Tests for FileCaps."""
+
+    def test_default_and_globs(self):
+        """Test the first matching glob wins over the default."""
+        caps = FileCaps.from_specs(["2000", "*.json=500", "docs/**=0", "*.md=0"])
+
+        assert caps.cap_for("main.py") == 2000
+        assert caps.cap_for("src/data/fixture.json") == 500
+        assert caps.cap_for("docs/guide/intro.txt") is None
+        assert caps.cap_for("README.md") is None
+
+    def test_no_default(self):
+        """Test files matching no glob are uncapped without a default."""
+        caps = FileCaps.from_specs(["*.lock=100"])
+
+        assert caps.cap_for("poetry.lock") == 100
+        assert caps.cap_for("main.py") is None
+        assert caps
+
+    def test_empty(self):
+        """Test caps without any positive cap are falsy."""
+        assert not FileCaps.from_specs([])
+        assert not FileCaps.from_specs(["0", "*.md=0"])
+
+    @pytest.mark.parametrize("spec", ["", "lots", "-5", "*.json=", "=100", "*.json=-1"])
+    def test_invalid_spec(self, spec):
+        """Test malformed specs raise ValidationError."""
+        with pytest.raises(ValidationError):
+            FileCaps.from_specs([spec])
+
+
+class TestCapStream:
+    """Tests for cap_stream()."""
+
+    def test_caps_oversized_file(self):
+        """Test an oversized file keeps its head and tail around a marker."""
+        capped, truncations = _cap(_digest(), FileCaps(200))
+
+        assert len(truncations) == 1
+        truncation = truncations[0]
+        assert truncation.path == "data/big.json"
+        assert truncation.kept <= 400
+        assert truncation.kept + truncation.elided == truncation.tokens
+
+        text = capped.split("FILE: data/big.json\n" + "=" * 48 + "\n")[1].split("=" * 48)[0]
+        assert text.startswith('{"id": 0,')
+        assert '{"id": 1999,' in text
+        assert f"[... {truncation.elided:,} tokens omitted" in text
+        assert '{"id": 1000,' not in text
+
+    def test_small_files_unchanged(self):
+        """Test files within their cap, the tree and headers are copied as-is."""
+        capped, _ = _cap(_digest(), FileCaps(200))
+
+        assert capped.startswith(TREE + format_section("a.py", "print('hello')\n"))
+        assert capped.endswith(format_section("z.md", "# Notes\n"))
+
+    def test_uncapped_copy_is_identical(self):
+        """Test a digest with nothing over its cap is copied byte for byte."""
+        digest = _digest()
+        capped, truncations = _cap(digest, FileCaps.from_specs(["200", "*.json=0"]))
+
+        assert capped == digest
+        assert truncations == []
+
+    def test_long_line(self):
+        """Test a single long line is capped in pieces without splitting characters."""
+        digest = format_section("dist/app.min.js", "var a=1;" * 5000 + "é" * 3000)
+        capped, truncations = _cap(digest, FileCaps(300))
+
+        assert [t.path for t in truncations] == ["dist/app.min.js"]
+        assert len(capped) < len(digest) // 4
+        assert "tokens omitted" in capped
+        assert capped.rstrip().endswith("é")
+
+    def test_separator_inside_content(self):
+        """Test separator lines that don't start a header stay in the content."""
+        content = "=" * 48 + "\nnot a header\n" + "line\n" * 5
+        capped, truncations = _cap(format_section("notes.txt", content), FileCaps(1000))
+
+        assert capped == format_section("notes.txt", content)
+        assert truncations == []
+
+
+class TestCapDigest:
+    """Tests for cap_digest()."""
+
+    def test_cap_digest_file(self, tmp_path):
+        """Test a digest file is capped into a new file."""
+        source = tmp_path / "digest.txt"
+        source.write_text(_digest(), encoding='utf-8')
+        output = tmp_path / "capped.txt"
+
+        truncations = cap_digest(source, output, FileCaps.from_specs(["*.json=100"]), 'heuristic')
+
+        assert [t.path for t in truncations] == ["data/big.json"]
+        assert output.stat().st_size < source.stat().st_size // 10
+        assert [s.path for s in iter_sections(output)] == ["a.py", "data/big.json", "z.md"]
\ No newline at end of file
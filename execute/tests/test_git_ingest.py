@@ -0,0 +1,238 @@
+"""
+Unit tests for git_ingest module.
+
+Tests cover:
+- gitingest's default ignore list and tree order
+- Text, empty and binary file contents
+- Exact digests of local repositories, with symlinks, size limits and subpaths
+- Streaming the digest to the digest readers
+"""
+
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from digest import SEPARATOR, iter_stream_sections
+from exceptions import GitIngestError
+from git_ingest import (
+    DigestStream, blob_text, format_tree, ingest_filter, iter_digest, open_digest, select_files
+)
+from git_mirror import GitMirror, TreeItem
+
+
+def _git(repo: Path, *args: str) -> None:
+    subprocess.run(['git', '-C', str(repo), '-c', 'user.name=Test', '-c', 'user.email=test@example.com', *args],
+                   check=True, capture_output=True)
+
+
+@pytest.fixture
+def mirror(tmp_path):
+    """Mirror of a local repository with text, empty, binary, ignored and symlinked files."""
+    repo = tmp_path / "remote" / "tool"
+    files = {
+        "src/app.py": b"print('hi')\n",
+        "README.md": b"# Tool\n",
+        ".env.example": b"KEY=1\n",
+        "docs/empty.md": b"",
+        "assets/logo.dat": b"\x89PNG\r\n\x1a\n\xff\xfe",
+        "node_modules/lib/index.js": b"module.exports = 1;\n",
+        "package-lock.json": b"{}\n",
+        ".github/ci.yml": b"on: push\n",
+    }
+    for name, data in files.items():
+        (repo / name).parent.mkdir(parents=True, exist_ok=True)
+        (repo / name).write_bytes(data)
+    (repo / "latest.py").symlink_to("src/app.py")
+    _git(repo, 'init', '--quiet')
+    _git(repo, 'add', '--all')
+    _git(repo, 'commit', '--quiet', '-m', 'init')
+    with GitMirror(str(repo), root=tmp_path / "mirrors").ensure() as mirror:
+        yield mirror
+
+
+def section(header: str, text: str) -> str:
+    return f"{SEPARATOR}\n{header}\n{SEPARATOR}\n{text}\n\n"
+
+
+class TestIngestFilter:
+    """Tests for ingest_filter()."""
+
+    @pytest.mark.parametrize("path, included", [
+        ("src/app.py", True),
+        ("node_modules/lib/index.js", False),
+        ("app/__pycache__/app.cpython-312.pyc", False),
+        ("package-lock.json", False),
+        ("build/out.js", False),
+        ("docs/build.md", True),
+    ])
+    def test_default_ignores(self, path, included):
+        """Test gitingest's built-in ignore patterns apply without any -e pattern."""
+        assert ingest_filter().matches(path) == included
+
+    def test_include_and_exclude(self):
+        """Test -i and -e patterns are combined with the defaults."""
+        path_filter = ingest_filter(include=["*.py", "*.lock"], exclude=["tests/"])
+
+        assert path_filter.matches("src/app.py")
+        assert not path_filter.matches("tests/test_app.py")
+        assert not path_filter.matches("README.md")
+        assert not path_filter.matches("poetry.lock")
+
+
+class TestFormatTree:
+    """Tests for format_tree()."""
+
+    def test_order(self):
+        """Test README, files, dotfiles, directories and dot-directories, each case-insensitively."""
+        names = ["zeta.py", ".github/ci.yml", "src/b.py", "Alpha.py", ".env", "README.md", "docs/a.md",
+                 "src/A.py", ".config/x"]
+        files = [TreeItem('100644', 'blob', str(index), name) for index, name in enumerate(names)]
+
+        tree, ordered = format_tree(files, "user-tool", {"zeta.py": "target"})
+
+        assert tree.splitlines() == [
+            "└── user-tool/",
+            "    ├── README.md",
+            "    ├── Alpha.py",
+            "    ├── zeta.py -> target",
+            "    ├── .env",
+            "    ├── docs/",
+            "    │   └── a.md",
+            "    ├── src/",
+            "    │   ├── A.py",
+            "    │   └── b.py",
+            "    ├── .config/",
+            "    │   └── x",
+            "    └── .github/",
+            "        └── ci.yml",
+        ]
+        assert [item.path for item in ordered] == ["README.md", "Alpha.py", "zeta.py", ".env", "docs/a.md",
+                                                   "src/A.py", "src/b.py", ".config/x", ".github/ci.yml"]
+
+
+class TestBlobText:
+    """Tests for blob_text()."""
+
+    @pytest.mark.parametrize("data, expected", [
+        (b"caf\xc3\xa9\n", "café\n"),
+        (b"", "[Empty file]"),
+        (b"\x89PNG\r\n\x1a\n\xff", "[Binary file]"),
+        (b"a" * 1023 + "é".encode('utf-8'), "a" * 1023 + "é"),
+        (b"a" * 2000 + b"\xff", "a" * 2000 + "�"),
+    ])
+    def test_blob_text(self, data, expected):
+        """Test text is decoded, and only the first 1024 bytes decide binary files."""
+        assert blob_text(data) == expected
+
+
+class TestIterDigest:
+    """Tests for iter_digest() and select_files()."""
+
+    def test_digest(self, mirror):
+        """Test the whole digest matches gitingest's layout byte for byte."""
+        digest = b"".join(iter_digest(mirror, ingest_filter(), "user-tool")).decode('utf-8')
+
+        assert digest == (
+            "Directory structure:\n"
+            "└── user-tool/\n"
+            "    ├── README.md\n"
+            "    ├── latest.py -> app.py\n"
+            "    ├── .env.example\n"
+            "    ├── assets/\n"
+            "    │   └── logo.dat\n"
+            "    ├── docs/\n"
+            "    │   └── empty.md\n"
+            "    ├── src/\n"
+            "    │   └── app.py\n"
+            "    └── .github/\n"
+            "        └── ci.yml\n"
+            "\n"
+            + "\n".join([
+                section("FILE: README.md", "# Tool\n"),
+                section("SYMLINK: latest.py -> app.py", ""),
+                section("FILE: .env.example", "KEY=1\n"),
+                section("FILE: assets/logo.dat", "[Binary file]"),
+                section("FILE: docs/empty.md", "[Empty file]"),
+                section("FILE: src/app.py", "print('hi')\n"),
+                section("FILE: .github/ci.yml", "on: push\n"),
+            ])
+        )
+
+    def test_tree_only(self, mirror):
+        """Test contents=False stops after the tree."""
+        chunks = list(iter_digest(mirror, ingest_filter(include=["*.py"]), "user-tool", contents=False))
+
+        assert b"".join(chunks).decode('utf-8') == (
+            "Directory structure:\n"
+            "└── user-tool/\n"
+            "    ├── latest.py -> app.py\n"
+            "    └── src/\n"
+            "        └── app.py\n"
+        )
+
+    def test_partial_mirror(self, mirror, tmp_path):
+        """Test a partial mirror downloads the blobs of the selected files only, in one fetch."""
+        _git(Path(mirror.url), 'config', 'uploadpack.allowFilter', 'true')
+        partial = GitMirror(mirror.url, root=tmp_path / "partial").ensure('partial')
+        path_filter = ingest_filter(include=["*.md"])
+
+        digest = b"".join(iter_digest(partial, path_filter, "user-tool"))
+        tree = b"".join(iter_digest(partial, ingest_filter(), "user-tool", max_file_size=None, contents=False))
+
+        assert digest == b"".join(iter_digest(mirror, path_filter, "user-tool"))
+        assert tree == b"".join(iter_digest(mirror, ingest_filter(), "user-tool", contents=False))
+        assert [transfer.operation for transfer in partial.transfers] == ['clone', 'prefetch', 'prefetch']
+        app = partial.ls_tree(paths=["src/app.py"])[0].oid
+        assert app in partial.missing()
+
+    def test_max_file_size(self, mirror):
+        """Test files over the size limit are left out, but not symlinks."""
+        files = select_files(mirror, ingest_filter(), max_file_size=6)
+
+        assert sorted(item.path for item in files) == [".env.example", "docs/empty.md", "latest.py"]
+
+    def test_subpath(self, mirror):
+        """Test a subpath is the tree's root, while FILE headers keep repository paths."""
+        digest = b"".join(iter_digest(mirror, ingest_filter(), "docs", subpath="docs/")).decode('utf-8')
+
+        assert digest == (
+            "Directory structure:\n"
+            "└── docs/\n"
+            "    └── empty.md\n"
+            "\n" + section("FILE: docs/empty.md", "[Empty file]")
+        )
+
+    def test_missing_subpath(self, mirror):
+        """Test a subpath without files raises GitIngestError."""
+        with pytest.raises(GitIngestError, match="Path not found"):
+            select_files(mirror, ingest_filter(), subpath="lib")
+
+
+class TestDigestStream:
+    """Tests for DigestStream and open_digest()."""
+
+    def test_sections(self, mirror):
+        """Test the digest readers parse a mirror stream like gitingest's output."""
+        path_filter = ingest_filter(include=["*.md", "src/"])
+        with open_digest(mirror, path_filter, "user-tool") as stream:
+            parts = list(iter_stream_sections(stream))
+
+        assert [(path, content) for path, _, content in parts[1:]] == [
+            ("README.md", b"# Tool\n\n\n\n"),
+            ("docs/empty.md", b"[Empty file]\n\n\n"),
+            ("src/app.py", b"print('hi')\n\n\n"),
+        ]
+        assert b"".join(header + content for _, header, content in parts) == b"".join(
+            iter_digest(mirror, path_filter, "user-tool")
+        )
+
+    def test_close_stops_reader(self, mirror):
+        """Test closing a stream part way through closes the blob stream."""
+        stream = DigestStream(iter_digest(mirror, ingest_filter(), "user-tool"))
+        stream.read(1)
+
+        stream.close()
+
+        assert stream.closed
+        assert mirror.blobs()._process is None
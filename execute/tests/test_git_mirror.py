@@ -0,0 +1,340 @@
+"""
+Unit tests for git_mirror module.
+
+Tests cover:
+- Mirror directory naming per remote URL
+- Creating, reusing and refreshing mirrors of local repositories
+- Listing trees and reading blobs from the object database
+- The long-lived cat-file process behind BlobReader
+- Partial, shallow and full clones, prefetching and transfer records
+- Resolving refs on the remote without fetching
+- git failures surfacing as GitIngestError
+"""
+
+import json
+import os
+import subprocess
+import time
+from pathlib import Path
+
+import pytest
+
+from exceptions import GitIngestError, ValidationError
+from git_mirror import (
+    MIRROR_ROOT_ENV_VAR, TRANSFER_LOG, BlobReader, GitMirror, clone_strategy, mirror_path, mirror_root, remote_commit,
+    run_git
+)
+
+
+def _git(repo: Path, *args: str) -> None:
+    subprocess.run(['git', '-C', str(repo), '-c', 'user.name=Test', '-c', 'user.email=test@example.com', *args],
+                   check=True, capture_output=True)
+
+
+def make_repo(path: Path, files: dict[str, str]) -> Path:
+    """Create a git repository at path with one commit holding files."""
+    path.mkdir(parents=True)
+    _git(path, 'init', '--quiet', '--initial-branch=main')
+    commit(path, files)
+    return path
+
+
+def commit(repo: Path, files: dict[str, str], message: str = "update") -> None:
+    """Write files into a repository and commit them."""
+    for name, text in files.items():
+        file = repo / name
+        file.parent.mkdir(parents=True, exist_ok=True)
+        file.write_text(text, encoding='utf-8')
+    _git(repo, 'add', '--all')
+    _git(repo, 'commit', '--quiet', '-m', message)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    return make_repo(tmp_path / "src" / "tool", {
+        "pyproject.toml": "[project]\nname = 'tool'\n",
+        "README.md": "# Tool\n",
+        "src/tool/__init__.py": "",
+        "src/tool/cli.py": "def main():\n    pass\n",
+    })
+
+
+class TestMirrorPath:
+    """Tests for mirror_path() and mirror_root()."""
+
+    @pytest.mark.parametrize("url, expected", [
+        ("https://github.com/fastapi/fastapi", "github.com/fastapi/fastapi.git"),
+        ("https://github.com/fastapi/fastapi.git", "github.com/fastapi/fastapi.git"),
+        ("https://gitlab.example.com:8443/group/sub/project", "gitlab.example.com/group/sub/project.git"),
+        ("file:///srv/git/tool.git", "local/srv/git/tool.git"),
+        ("/home/me/my repo", "local/home/me/my_repo.git"),
+        ("https://host/../../etc", "host/etc.git"),
+    ])
+    def test_mirror_path(self, url, expected):
+        """Test each remote gets a directory below the root, without escaping it."""
+        assert mirror_path(url, Path("/m")) == Path("/m") / expected
+
+    def test_no_path(self):
+        """Test a URL without a repository path raises GitIngestError."""
+        with pytest.raises(GitIngestError, match="Cannot mirror"):
+            mirror_path("https://github.com/", Path("/m"))
+
+    def test_mirror_root(self, monkeypatch, tmp_path):
+        """Test the root comes from the environment, else the XDG cache directory."""
+        monkeypatch.setenv(MIRROR_ROOT_ENV_VAR, str(tmp_path / "mirrors"))
+        assert mirror_root() == tmp_path / "mirrors"
+
+        monkeypatch.delenv(MIRROR_ROOT_ENV_VAR)
+        monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / "cache"))
+        assert mirror_root() == tmp_path / "cache" / "gitingest-agent" / "mirrors"
+
+
+class TestGitMirror:
+    """Tests for GitMirror against local repositories."""
+
+    def test_ensure_creates_mirror(self, repo, tmp_path):
+        """Test ensure() clones a bare mirror on first use."""
+        mirror = GitMirror(str(repo), root=tmp_path / "mirrors")
+        assert not mirror.exists()
+        assert mirror.age() is None
+
+        assert mirror.ensure() is mirror
+
+        assert mirror.exists()
+        assert (mirror.path / "HEAD").is_file()
+        assert not (mirror.path / "README.md").exists()
+        assert not mirror.path.with_name("tool.git.partial").exists()
+
+    def test_ensure_fetches_stale_mirror(self, repo, tmp_path):
+        """Test a mirror is only fetched again once it is older than max_age."""
+        mirror = GitMirror(str(repo), root=tmp_path / "mirrors").ensure()
+        first = mirror.resolve()
+        commit(repo, {"CHANGELOG.md": "# Changes\n"})
+
+        assert mirror.ensure().resolve() == first
+
+        stamp = time.time() - mirror.max_age - 10
+        os.utime(mirror.path / "HEAD", (stamp, stamp))
+        assert mirror.ensure().resolve() != first
+        assert mirror.age() < 10
+
+    def test_ls_tree(self, repo, tmp_path):
+        """Test ls_tree() lists files recursively, or one level, with modes and ids."""
+        mirror = GitMirror(str(repo), root=tmp_path / "mirrors").ensure()
+
+        items = mirror.ls_tree()
+        top = mirror.ls_tree(recursive=False)
+
+        assert [item.path for item in items] == ["README.md", "pyproject.toml", "src/tool/__init__.py",
+                                                 "src/tool/cli.py"]
+        assert {item.mode for item in items} == {'100644'}
+        assert [(item.type, item.path) for item in top] == [('blob', "README.md"), ('blob', "pyproject.toml"),
+                                                             ('tree', "src")]
+        assert [item.path for item in mirror.ls_tree(paths=["src/tool"])] == ["src/tool/__init__.py",
+                                                                              "src/tool/cli.py"]
+
+    def test_ls_files(self, repo, tmp_path):
+        """Test ls_files() lists the same paths as ls_tree()."""
+        mirror = GitMirror(str(repo), root=tmp_path / "mirrors").ensure()
+
+        assert mirror.ls_files() == [item.path for item in mirror.ls_tree()]
+
+    def test_read_blobs(self, repo, tmp_path):
+        """Test read_blobs() returns contents in order, and None for non-blobs."""
+        mirror = GitMirror(str(repo), root=tmp_path / "mirrors").ensure()
+        head = mirror.resolve()
+        cli_oid = mirror.ls_tree(paths=["src/tool/cli.py"])[0].oid
+
+        contents = mirror.read_blobs([f"{head}:README.md", cli_oid, f"{head}:missing.txt", f"{head}:src",
+                                      f"{head}:src/tool/__init__.py"])
+
+        assert contents == [b"# Tool\n", b"def main():\n    pass\n", None, None, b""]
+        assert mirror.read_blobs([]) == []
+
+    def test_resolve_unknown_ref(self, repo, tmp_path):
+        """Test resolving a missing ref raises GitIngestError."""
+        mirror = GitMirror(str(repo), root=tmp_path / "mirrors").ensure()
+
+        assert len(mirror.resolve('main')) == 40
+        with pytest.raises(GitIngestError, match="git rev-parse failed"):
+            mirror.resolve('no-such-branch')
+
+    def test_clone_failure(self, tmp_path):
+        """Test a remote that can't be cloned raises GitIngestError and leaves nothing behind."""
+        mirror = GitMirror(str(tmp_path / "missing"), root=tmp_path / "mirrors")
+
+        with pytest.raises(GitIngestError, match="git clone failed"):
+            mirror.ensure()
+
+        assert not mirror.path.exists()
+        assert not mirror.path.with_name("missing.git.partial").exists()
+
+    def test_run_git_timeout(self, monkeypatch):
+        """Test a git command over its timeout raises TimeoutError."""
+        def expire(*args, **kwargs):
+            raise subprocess.TimeoutExpired(args[0], 1)
+        monkeypatch.setattr(subprocess, 'run', expire)
+
+        with pytest.raises(TimeoutError, match="git fetch timed out after 1s"):
+            run_git(['fetch'], timeout=1)
+
+
+class TestBlobReader:
+    """Tests for BlobReader, the mirror's long-lived cat-file process."""
+
+    def test_read(self, repo, tmp_path):
+        """Test single reads share one process until close()."""
+        with GitMirror(str(repo), root=tmp_path / "mirrors").ensure() as mirror:
+            reader = mirror.blobs()
+
+            assert reader.read("HEAD:README.md") == b"# Tool\n"
+            pid = reader._process.pid
+            assert reader.read("HEAD:missing.txt") is None
+            assert reader.read("HEAD:src") is None
+            assert mirror.read_blobs(["HEAD:src/tool/cli.py"]) == [b"def main():\n    pass\n"]
+            assert reader._process.pid == pid
+
+        assert reader._process is None
+
+    def test_iter_blobs(self, repo, tmp_path):
+        """Test iter_blobs() streams many names in order through one process."""
+        mirror = GitMirror(str(repo), root=tmp_path / "mirrors").ensure()
+        names = ["HEAD:README.md", "HEAD:pyproject.toml"] * 300
+
+        with BlobReader(mirror.path) as reader:
+            blobs = list(reader.iter_blobs(names))
+
+        assert [name for name, _ in blobs] == names
+        assert [data for _, data in blobs[:2]] == [b"# Tool\n", b"[project]\nname = 'tool'\n"]
+        assert len({data for _, data in blobs}) == 2
+
+    def test_abandoned_stream(self, repo, tmp_path):
+        """Test a stream closed part way kills the process, and the next read starts another."""
+        mirror = GitMirror(str(repo), root=tmp_path / "mirrors").ensure()
+
+        with BlobReader(mirror.path) as reader:
+            blobs = reader.iter_blobs(["HEAD:README.md"] * 1000)
+            next(blobs)
+            blobs.close()
+
+            assert reader._process is None
+            assert reader.read("HEAD:README.md") == b"# Tool\n"
+
+
+@pytest.fixture
+def remote(repo):
+    """file:// URL of the repository, serving partial clones."""
+    _git(repo, 'config', 'uploadpack.allowFilter', 'true')
+    commit(repo, {"docs/guide.md": "# Guide\n", "src/tool/big.py": "x = 1\n" * 5000}, "second")
+    return repo.as_uri()
+
+
+class TestCloneStrategies:
+    """Tests for partial, shallow and full mirrors and their transfer records."""
+
+    @pytest.mark.parametrize("include, tree_only, expected", [
+        ([], False, 'shallow'),
+        (["*.md"], False, 'partial'),
+        ([], True, 'partial'),
+    ])
+    def test_clone_strategy(self, include, tree_only, expected):
+        """Test filtered or tree-only extractions get a partial clone, others a shallow one."""
+        assert clone_strategy(include, tree_only) == expected
+
+    def test_partial(self, remote, tmp_path):
+        """Test a partial mirror holds no blobs until prefetch() downloads the wanted ones in one fetch."""
+        mirror = GitMirror(remote, root=tmp_path / "mirrors").ensure('partial')
+        items = mirror.ls_tree()
+        guide = next(item.oid for item in items if item.path == "docs/guide.md")
+
+        assert mirror.strategy() == 'partial'
+        assert mirror.missing() == {item.oid for item in items}
+        assert mirror.prefetch([guide]) == 1
+        assert mirror.prefetch([guide]) == 0
+        assert mirror.missing() == {item.oid for item in items} - {guide}
+        assert mirror.sizes([guide]) == {guide: 8}
+        assert mirror.git('rev-list', '--count', 'HEAD') == b"1\n"
+
+        clone, prefetch = mirror.transfers
+        assert (clone.operation, clone.strategy) == ('clone', 'partial')
+        assert (prefetch.operation, prefetch.strategy) == ('prefetch', 'partial')
+        assert 0 < prefetch.bytes < clone.bytes
+        assert 0 < clone.first_byte <= clone.seconds
+        log = (mirror.path / TRANSFER_LOG).read_text(encoding='utf-8').splitlines()
+        assert [json.loads(line)['operation'] for line in log] == ['clone', 'prefetch']
+
+    def test_shallow(self, remote, tmp_path):
+        """Test a shallow mirror has every blob of the tip commit only, and downloads more than a partial one."""
+        shallow = GitMirror(remote, root=tmp_path / "shallow").ensure('shallow')
+        partial = GitMirror(remote, root=tmp_path / "partial").ensure('partial')
+
+        assert shallow.strategy() == 'shallow'
+        assert shallow.missing() == set()
+        assert shallow.prefetch([item.oid for item in shallow.ls_tree()]) == 0
+        assert shallow.git('rev-list', '--count', 'HEAD') == b"1\n"
+        assert shallow.transfers[0].bytes > partial.transfers[0].bytes
+
+    def test_fetch_keeps_strategy(self, remote, repo, tmp_path):
+        """Test fetching a partial mirror stays shallow and blobless."""
+        mirror = GitMirror(remote, root=tmp_path / "mirrors").ensure('partial')
+        commit(repo, {"CHANGELOG.md": "# Changes\n"})
+
+        mirror.fetch()
+
+        assert mirror.strategy() == 'partial'
+        assert mirror.git('rev-list', '--count', 'HEAD') == b"1\n"
+        assert "CHANGELOG.md" in mirror.ls_files()
+        assert mirror.transfers[-1].operation == 'fetch'
+
+    def test_local_path(self, remote, repo, tmp_path):
+        """Test a local path is cloned through file:// so filters apply."""
+        mirror = GitMirror(str(repo), root=tmp_path / "mirrors").ensure('partial')
+
+        assert mirror.strategy() == 'partial'
+        assert mirror.missing()
+
+    def test_unknown_strategy(self, repo, tmp_path):
+        """Test an unknown strategy raises ValidationError."""
+        with pytest.raises(ValidationError, match="Unknown clone strategy"):
+            GitMirror(str(repo), root=tmp_path / "mirrors").clone('sparse')
+
+
+    def test_pin(self, repo, remote, tmp_path):
+        """Test a ref behind a shallow mirror's tips is fetched once into refs/pins/, and pruned by fetch()."""
+        first = subprocess.run(['git', '-C', str(repo), 'rev-parse', 'HEAD~1'], check=True,
+                               capture_output=True, text=True).stdout.strip()
+        _git(repo, 'tag', 'v1.0', first)
+        mirror = GitMirror(remote, root=tmp_path / "mirrors").ensure('partial')
+
+        assert mirror.pin('v1.0') == first
+        assert mirror.pin('v1.0') == first
+        assert mirror.pin(first) == first
+        assert [transfer.operation for transfer in mirror.transfers] == ['clone', 'pin']
+        assert mirror.ls_tree('refs/pins/v1.0')
+        with pytest.raises(GitIngestError):
+            mirror.pin('v9.9')
+
+        mirror.fetch()
+        assert mirror.git('for-each-ref', 'refs/pins/') == b""
+
+
+class TestRemoteCommit:
+    """Tests for remote_commit()."""
+
+    def test_refs(self, repo, remote):
+        """Test HEAD, branches and tags resolve without a mirror, annotated tags to their commit."""
+        head = run_git(['rev-parse', 'HEAD'], repo / ".git").decode('ascii').strip()
+        first = run_git(['rev-parse', 'HEAD~1'], repo / ".git").decode('ascii').strip()
+        _git(repo, 'tag', '--annotate', '-m', 'release', 'v1.0', first)
+        _git(repo, 'branch', 'feature/v1.0')
+
+        assert remote_commit(remote) == head
+        assert remote_commit(remote, 'main') == head
+        assert remote_commit(remote, 'v1.0') == first
+        assert remote_commit(str(repo), 'refs/heads/feature/v1.0') == head
+        assert remote_commit(remote, "0" * 40) == "0" * 40
+
+    def test_missing_ref(self, remote):
+        """Test a ref the remote lacks raises GitIngestError."""
+        with pytest.raises(GitIngestError, match="Ref not found"):
+            remote_commit(remote, 'v9.9')
\ No newline at end of file
@@ -0,0 +1,214 @@
+"""
+Unit tests for globmatch module.
+
+Tests cover:
+- Pattern semantics pinned against gitingest's matcher (pathspec gitwildmatch)
+- Negated patterns and pattern order
+- gitingest's include/exclude rules: exclude wins, pruned directories,
+  empty includes, pattern splitting
+- Filters of the built-in content types
+- Throughput of the compiled matcher
+"""
+
+import pytest
+
+from exceptions import ValidationError
+from globmatch import GlobSet, PathFilter, benchmark, compile_pattern, parse_patterns
+from workflow import FILTER_PATTERNS
+
+
+# (pattern, path, matched) - expected values are what
+# pathspec.PathSpec.from_lines("gitwildmatch", [pattern]).match_file(path)
+# returns, which is how gitingest evaluates -i and -e
+GITWILDMATCH_CASES = [
+    ('*.md', 'README.md', True),
+    ('*.md', 'docs/guide/intro.md', True),
+    ('*.md', 'notes.md/x.txt', True),
+    ('*.md', 'README.mdx', False),
+    ('README*', 'README', True),
+    ('README*', 'pkg/README.rst', True),
+    ('README*', 'READ.md', False),
+    ('docs/*', 'docs/a.md', True),
+    ('docs/*', 'docs/api/a.md', True),
+    ('docs/*', 'site/docs/a.md', False),
+    ('docs/**/*', 'docs/a.md', True),
+    ('docs/**/*', 'docs/api/v1/a.md', True),
+    ('docs/**/*', 'docs', False),
+    ('src/**/*.py', 'src/a.py', True),
+    ('src/**/*.py', 'src/pkg/sub/a.py', True),
+    ('src/**/*.py', 'lib/src/a.py', False),
+    ('src/**/*.py', 'src/a.pyc', False),
+    ('**/tests', 'tests/a.py', True),
+    ('**/tests', 'pkg/tests/unit/a.py', True),
+    ('**/tests', 'pkg/tests.py', False),
+    ('build/', 'build/out.o', True),
+    ('build/', 'pkg/build/out.o', True),
+    ('build/', 'build', False),
+    ('/setup.py', 'setup.py', True),
+    ('/setup.py', 'pkg/setup.py', False),
+    ('tests/*', 'tests/unit/test_a.py', True),
+    ('examples/*', 'pkg/examples/a.py', False),
+    ('a/**/b', 'a/b', True),
+    ('a/**/b', 'a/x/y/b', True),
+    ('a/**/b', 'a/x/b/c.txt', True),
+    ('a/**', 'a', False),
+    ('a/**', 'a/b', True),
+    ('**', 'anything/at/all', True),
+    ('**/', 'top.txt', False),
+    ('**/', 'dir/file.txt', True),
+    ('?.py', 'a.py', True),
+    ('?.py', 'ab.py', False),
+    ('[abc]*.py', 'b.py', True),
+    ('[!abc]*.py', 'b.py', False),
+    ('[!abc]*.py', 'd.py', True),
+    ('*.test.*', 'web/app.test.ts', True),
+    ('test_*.py', 'tests/test_cli.py', True),
+    ('*_test.go', 'x_test.go', True),
+    ('\\#notes.txt', '#notes.txt', True),
+    ('#notes.txt', '#notes.txt', False),
+    ('', 'a.txt', False),
+    ('*.PY', 'a.py', False),
+]
+
+
+class TestGlobSet:
+    """Tests for GlobSet."""
+
+    @pytest.mark.parametrize("pattern, path, matched", GITWILDMATCH_CASES)
+    def test_gitwildmatch_semantics(self, pattern, path, matched):
+        """Test single patterns match like gitingest's matcher."""
+        assert GlobSet([pattern]).match(path) is matched
+
+    def test_combined_set(self):
+        """Test a set matches a path if any of its patterns does."""
+        globs = GlobSet(['docs/**/*', '*.md', 'README*', '*.rst'])
+
+        assert globs.match('docs/api/index.html')
+        assert globs.match('src/pkg/CHANGES.md')
+        assert globs.match('README')
+        assert not globs.match('src/main.py')
+
+    def test_results_independent_of_cache(self):
+        """Test cached directory states give the same answer as fresh ones."""
+        patterns = ['src/**/*.py', '**/tests', 'a/*/c/*', '[a-c]*.txt']
+        paths = ['src/a.py', 'src/x/tests/b.md', 'a/b/c/d', 'a/b/c', 'b.txt', 'src/x/y.py', 'd.txt']
+        shared = GlobSet(patterns)
+
+        assert [shared.match(p) for p in paths * 2] == [GlobSet(patterns).match(p) for p in paths * 2]
+
+    def test_negation_last_match_wins(self):
+        """Test a negated pattern re-includes paths an earlier pattern matched."""
+        globs = GlobSet(['*.py', '!keep.py'])
+
+        assert globs.match('src/a.py')
+        assert not globs.match('src/keep.py')
+        assert GlobSet(['!keep.py', '*.py']).match('src/keep.py')
+
+    def test_negation_prune(self):
+        """Test pruned sets keep matching beneath a matched directory."""
+        patterns = ['build', '!build/keep.txt']
+
+        assert not GlobSet(patterns).match('build/keep.txt')
+        assert GlobSet(patterns, prune=True).match('build/keep.txt')
+        assert GlobSet(patterns, prune=True).match('build/other.txt')
+
+    def test_empty(self):
+        """Test an empty set matches nothing."""
+        globs = GlobSet(['', '# comment'])
+
+        assert not globs
+        assert not globs.match('a.py')
+
+    @pytest.mark.parametrize("pattern", ["!", "foo\\"])
+    def test_invalid_pattern(self, pattern):
+        """Test invalid patterns raise ValidationError."""
+        with pytest.raises(ValidationError, match="Invalid glob pattern"):
+            compile_pattern(pattern)
+
+
+class TestPathFilter:
+    """Tests for PathFilter."""
+
+    def test_exclude_wins(self):
+        """Test exclude patterns win over include patterns."""
+        path_filter = PathFilter(['*.py'], ['tests/*'])
+
+        assert path_filter.matches('src/a.py')
+        assert not path_filter.matches('tests/test_a.py')
+        assert not path_filter.matches('src/a.md')
+
+    def test_no_include_keeps_everything(self):
+        """Test an empty include set keeps every file not excluded."""
+        path_filter = PathFilter(exclude=['*.lock'])
+
+        assert path_filter('src/a.py')
+        assert not path_filter('poetry.lock')
+
+    def test_excluded_directory_hides_subtree(self):
+        """Test files beneath an excluded directory can't be re-included."""
+        path_filter = PathFilter(exclude=['build', '!build/keep.txt'])
+
+        assert not path_filter.matches('build/keep.txt')
+        assert path_filter.matches('src/keep.txt')
+
+    def test_exclude_also_included_is_dropped(self):
+        """Test exclude patterns listed as includes are ignored, as in gitingest."""
+        path_filter = PathFilter(['*.md'], ['*.md', 'docs/*'])
+
+        assert path_filter.exclude == ['docs/*']
+        assert path_filter.matches('README.md')
+
+    def test_pattern_splitting(self):
+        """Test values are split on commas and whitespace like gitingest's CLI."""
+        assert parse_patterns(['*.md, *.rst', 'docs/ src\\*.py', '*.md']) == ['*.md', '*.rst', 'docs/', 'src/*.py']
+
+    def test_filter_keeps_order(self):
+        """Test filter returns the kept paths in input order."""
+        paths = ['b.md', 'src/a.py', 'a.md', 'docs/x.md']
+
+        assert PathFilter(['*.md']).filter(paths) == ['b.md', 'a.md', 'docs/x.md']
+
+    @pytest.mark.parametrize("content_type, kept", [
+        ('docs', ['README.md', 'docs/guide.md', 'docs/installation.md', 'docs/api/index.html', 'pkg/notes.rst']),
+        ('installation', ['README.md', 'pyproject.toml', 'docs/installation.md']),
+        ('code', ['src/pkg/core.py', 'lib/util.py']),
+        ('auto', ['README.md', 'docs/guide.md', 'docs/installation.md']),
+        ('outline', ['src/pkg/core.py', 'lib/util.py', 'web/app.ts', 'cmd/main.go']),
+        ('auto-code', ['src/pkg/core.py', 'lib/util.py', 'web/app.ts', 'cmd/main.go']),
+    ])
+    def test_content_types(self, content_type, kept):
+        """Test the filters built from FILTER_PATTERNS."""
+        paths = [
+            'README.md', 'pyproject.toml', 'docs/guide.md', 'docs/installation.md', 'docs/api/index.html',
+            'docs/examples/demo.md', 'docs/archive/old.md', 'pkg/notes.rst', 'src/pkg/core.py',
+            'src/pkg/core_test.py', 'lib/util.py', 'tests/test_core.py', 'examples/demo.py',
+            'web/app.ts', 'web/app.test.ts', 'cmd/main.go', 'cmd/main_test.go', 'assets/logo.png',
+        ]
+
+        assert PathFilter.for_type(content_type).filter(paths) == kept
+
+    def test_every_content_type_compiles(self):
+        """Test every built-in content type has a valid filter."""
+        for content_type in FILTER_PATTERNS:
+            assert PathFilter.for_type(content_type).matches('README.md') in (True, False)
+
+    def test_invalid_content_type(self):
+        """Test unknown content types raise ValidationError."""
+        with pytest.raises(ValidationError):
+            PathFilter.for_type('invalid')
+
+
+class TestBenchmark:
+    """Tests for benchmark() function."""
+
+    def test_report(self):
+        paths = [f'src/pkg{i % 50}/module{i}.py' for i in range(20000)] + ['README.md']
+
+        report = benchmark(paths, FILTER_PATTERNS['outline']['include'], FILTER_PATTERNS['outline']['exclude'])
+
+        assert report['paths'] == 20001
+        assert report['kept'] == 20000
+        assert report['seconds'] >= 0
+        # Orders of magnitude above any realistic repository; keeps the
+        # per-path work from regressing to a regex per path and pattern
+        assert report['paths_per_second'] > 50000
\ No newline at end of file
@@ -0,0 +1,46 @@
+"""
+Unit tests for languages module.
+
+Tests cover:
+- Extension-based detection
+- File-name based detection
+- Unknown files
+"""
+
+from languages import detect_language, SOURCE_LANGUAGES
+
+
+class TestDetectLanguage:
+    """Tests for detect_language() function."""
+
+    def test_extensions(self):
+        """Test common source and doc extensions."""
+        assert detect_language("src/app/main.py") == "Python"
+        assert detect_language("web/index.tsx") == "TypeScript"
+        assert detect_language("cmd/server/main.go") == "Go"
+        assert detect_language("docs/guide.md") == "Markdown"
+
+    def test_case_insensitive(self):
+        """Test extensions are matched case-insensitively."""
+        assert detect_language("README.MD") == "Markdown"
+
+    def test_file_names(self):
+        """Test extension-less well-known files."""
+        assert detect_language("Dockerfile") == "Dockerfile"
+        assert detect_language("deploy/Dockerfile.prod") == "Dockerfile"
+        assert detect_language("Makefile") == "Makefile"
+
+    def test_windows_separators(self):
+        """Test Windows paths are handled."""
+        assert detect_language("src\\lib\\mod.rs") == "Rust"
+
+    def test_unknown(self):
+        """Test unknown files map to Other."""
+        assert detect_language("LICENSE") == "Other"
+        assert detect_language("data.bin") == "Other"
+
+    def test_source_languages(self):
+        """Test source language set excludes docs and data."""
+        assert "Python" in SOURCE_LANGUAGES
+        assert "Markdown" not in SOURCE_LANGUAGES
+        assert "JSON" not in SOURCE_LANGUAGES
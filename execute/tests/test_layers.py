@@ -0,0 +1,153 @@
+"""
+Unit tests for layers module.
+
+Tests cover:
+- Classifying files into overview and docs layers
+- Annotating the tree with sizes
+- Building all layers and the manifest from one digest
+"""
+
+from pathlib import Path
+
+from digest import format_section
+from layers import classify_path, annotate_tree, build_layers, write_manifest, load_manifest
+
+
+TREE = (
+    "Directory structure:\n"
+    "└── user-repo/\n"
+    "    ├── README.md\n"
+    "    ├── pyproject.toml\n"
+    "    ├── docs/\n"
+    "    │   └── guide.md\n"
+    "    ├── src/\n"
+    "    │   ├── __init__.py\n"
+    "    │   └── app.py\n"
+    "    └── tests/\n"
+    "        └── __init__.py"
+)
+
+
+def _write_digest(path: Path) -> None:
+    path.write_text(
+        TREE + "\n\n"
+        + format_section("README.md", "# Repo\nIntro")
+        + format_section("pyproject.toml", "[project]\nname = 'repo'")
+        + format_section("docs/guide.md", "Guide text")
+        + format_section("src/__init__.py", "")
+        + format_section("src/app.py", "def run(x):\n    \"\"\"Run.\"\"\"\n    return x * 2")
+        + format_section("tests/__init__.py", ""),
+        encoding='utf-8'
+    )
+
+
+class TestClassifyPath:
+    """Tests for classify_path() function."""
+
+    def test_overview(self):
+        """Test root READMEs and manifests go to L1."""
+        assert classify_path("README.md") == 1
+        assert classify_path("pyproject.toml") == 1
+        assert classify_path("web/package.json") == 1
+
+    def test_docs(self):
+        """Test documentation goes to L2."""
+        assert classify_path("docs/guide.md") == 2
+        assert classify_path("CHANGELOG.md") == 2
+        assert classify_path("src/pkg/README.md") == 2
+        assert classify_path("docs/conf.py") == 2
+
+    def test_source(self):
+        """Test source files belong to neither content layer."""
+        assert classify_path("src/app.py") is None
+
+
+class TestAnnotateTree:
+    """Tests for annotate_tree() function."""
+
+    def test_sizes(self):
+        """Test files get their size and directories the sum below them."""
+        annotated, entries = annotate_tree(TREE, {'docs/guide.md': 100, 'src/app.py': 2048})
+
+        assert entries == 10
+        assert "│   └── guide.md (100 B)" in annotated
+        assert "├── docs/ (100 B)" in annotated
+        assert "│   └── app.py (2.0 KB)" in annotated
+        assert "└── user-repo/ (2.1 KB)" in annotated
+        # Files missing from the digest stay unannotated
+        assert "├── README.md\n" in annotated
+
+    def test_duplicate_names(self):
+        """Test identical tree lines in different directories are sized separately."""
+        annotated, _ = annotate_tree(TREE, {'src/__init__.py': 10, 'tests/__init__.py': 20})
+
+        assert "│   ├── __init__.py (10 B)" in annotated
+        assert "        └── __init__.py (20 B)" in annotated
+
+
+class TestBuildLayers:
+    """Tests for build_layers() and the manifest helpers."""
+
+    def test_build_layers(self, tmp_path):
+        """Test one digest yields all five layers with token counts."""
+        digest = tmp_path / "digest.txt"
+        _write_digest(digest)
+
+        built = build_layers(digest, tmp_path, workers=1)
+
+        assert [(layer.level, layer.name) for layer in built] == [
+            (0, 'tree'), (1, 'overview'), (2, 'docs'), (3, 'outline'), (4, 'full')
+        ]
+        tree, overview, docs, outline_layer, full = built
+        tree_text = tree.path.read_text(encoding='utf-8')
+        assert "├── README.md (12 B)" in tree_text
+        assert "└── __init__.py (0 B)" in tree_text
+        assert overview.files == 2
+        assert "FILE: pyproject.toml" in overview.path.read_text(encoding='utf-8')
+        assert docs.files == 1
+        outline_text = outline_layer.path.read_text(encoding='utf-8')
+        assert '"""Run."""' in outline_text
+        assert "return x * 2" not in outline_text
+        assert full.path == digest
+        assert full.files == 6
+        assert all(layer.tokens > 0 for layer in built)
+        assert outline_layer.tokens < full.tokens
+
+    def test_transform(self, tmp_path):
+        """Test the transform filters overview and docs files."""
+        digest = tmp_path / "digest.txt"
+        _write_digest(digest)
+
+        built = build_layers(
+            digest, tmp_path, workers=1,
+            transform=lambda path, text: None if path == "docs/guide.md" else text.upper()
+        )
+
+        assert built[2].files == 0
+        assert "# REPO" in built[1].path.read_text(encoding='utf-8')
+        assert built[4].files == 6
+
+    def test_manifest_roundtrip(self, tmp_path):
+        """Test the manifest lists every layer with its token count."""
+        digest = tmp_path / "digest.txt"
+        _write_digest(digest)
+        built = build_layers(digest, tmp_path, workers=1)
+
+        write_manifest(built, tmp_path / "layers.json", "https://github.com/user/repo")
+        manifest = load_manifest(tmp_path / "layers.json")
+
+        assert manifest['url'] == "https://github.com/user/repo"
+        assert [entry['level'] for entry in manifest['layers']] == [0, 1, 2, 3, 4]
+        assert manifest['layers'][4]['tokens'] == built[4].tokens
+
+    def test_custom_counter_and_tokenizer(self, tmp_path):
+        """Test layer tokens come from count_file and the tokenizer is recorded."""
+        digest = tmp_path / "digest.txt"
+        _write_digest(digest)
+        built = build_layers(digest, tmp_path, workers=1, count_file=lambda path: 7)
+
+        write_manifest(built, tmp_path / "layers.json", "https://github.com/user/repo", tokenizer='calibrated')
+        manifest = load_manifest(tmp_path / "layers.json")
+
+        assert [layer.tokens for layer in built] == [7] * 5
+        assert manifest['tokenizer'] == 'calibrated'
\ No newline at end of file
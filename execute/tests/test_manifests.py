@@ -0,0 +1,268 @@
+"""
+Unit tests for manifests module.
+
+Tests cover:
+- Each supported manifest (pyproject.toml, setup.py, setup.cfg,
+  requirements*.txt, package.json, Cargo.toml, go.mod)
+- Merging several manifests by priority
+- Unparseable manifests recorded as errors
+- Plain-text summary formatting
+"""
+
+import pytest
+
+from manifests import format_summary, manifest_parser, summarize_manifests
+
+
+PYPROJECT = """
+[project]
+name = "tool"
+version = "1.2.0"
+requires-python = ">=3.10"
+dependencies = ["click>=8.1", "httpx"]
+
+[project.optional-dependencies]
+dev = ["pytest>=7"]
+yaml = ["pyyaml"]
+
+[project.scripts]
+tool = "tool.cli:main"
+
+[dependency-groups]
+lint = ["ruff"]
+"""
+
+POETRY = """
+[tool.poetry]
+name = "legacy"
+version = "0.3.0"
+
+[tool.poetry.dependencies]
+python = "^3.9"
+requests = "^2.31"
+rich = "*"
+uvicorn = {version = ">=0.20", extras = ["standard"]}
+
+[tool.poetry.group.dev.dependencies]
+pytest = "^8.0"
+
+[tool.poetry.scripts]
+legacy = "legacy.main:run"
+"""
+
+SETUP_PY = """
+from setuptools import setup, find_packages
+
+VERSION = open("VERSION").read()
+
+setup(
+    name="oldtool",
+    version=VERSION,
+    python_requires=">=3.8",
+    packages=find_packages(),
+    install_requires=["six", "attrs>=21"],
+    tests_require=["nose"],
+    entry_points={"console_scripts": ["oldtool = oldtool.cli:main"]},
+)
+"""
+
+SETUP_CFG = """
+[metadata]
+name = cfgtool
+version = 2.0
+
+[options]
+python_requires = >=3.7
+install_requires =
+    pyyaml
+    jinja2>=3
+
+[options.entry_points]
+console_scripts =
+    cfgtool = cfgtool.__main__:main
+"""
+
+PACKAGE_JSON = """{
+  "name": "@scope/web",
+  "version": "4.0.1",
+  "engines": {"node": ">=18"},
+  "bin": "./bin/web.js",
+  "scripts": {"build": "vite build", "test": "vitest run"},
+  "dependencies": {"react": "^18.2.0"},
+  "devDependencies": {"vite": "^5.0.0"}
+}"""
+
+CARGO_TOML = """
+[package]
+name = "fastcli"
+version = "0.9.0"
+edition = "2021"
+rust-version = "1.74"
+
+[dependencies]
+serde = { version = "1.0", features = ["derive"] }
+clap = "4"
+
+[dev-dependencies]
+insta = "1"
+
+[[bin]]
+name = "fastcli"
+path = "src/main.rs"
+"""
+
+GO_MOD = """module github.com/acme/server
+
+go 1.22
+
+require github.com/google/uuid v1.6.0
+
+require (
+\tgithub.com/gin-gonic/gin v1.9.1
+\tgolang.org/x/net v0.21.0 // indirect
+)
+"""
+
+
+class TestParsers:
+    """Tests for the individual manifest parsers via summarize_manifests()."""
+
+    def test_pyproject(self):
+        """Test PEP 621 metadata, dev extras, dependency groups and scripts."""
+        summary = summarize_manifests({"pyproject.toml": PYPROJECT})
+
+        assert (summary['name'], summary['version']) == ("tool", "1.2.0")
+        assert summary['runtimes'] == {'python': ">=3.10"}
+        assert summary['dependencies'] == {'python': ["click>=8.1", "httpx"]}
+        assert summary['dev_dependencies'] == {'python': ["pytest>=7", "ruff"]}
+        assert summary['entry_points'] == {'tool': "tool.cli:main"}
+
+    def test_poetry(self):
+        """Test Poetry tables are normalized to requirement strings."""
+        summary = summarize_manifests({"pyproject.toml": POETRY})
+
+        assert summary['name'] == "legacy"
+        assert summary['runtimes'] == {'python': "^3.9"}
+        assert summary['dependencies'] == {'python': ["requests ^2.31", "rich", "uvicorn>=0.20"]}
+        assert summary['dev_dependencies'] == {'python': ["pytest ^8.0"]}
+        assert summary['entry_points'] == {'legacy': "legacy.main:run"}
+
+    def test_setup_py(self):
+        """Test literal setup() arguments are read and computed ones skipped."""
+        summary = summarize_manifests({"setup.py": SETUP_PY})
+
+        assert (summary['name'], summary['version']) == ("oldtool", None)
+        assert summary['runtimes'] == {'python': ">=3.8"}
+        assert summary['dependencies'] == {'python': ["six", "attrs>=21"]}
+        assert summary['dev_dependencies'] == {'python': ["nose"]}
+        assert summary['entry_points'] == {'oldtool': "oldtool.cli:main"}
+
+    def test_setup_cfg(self):
+        """Test setup.cfg metadata, options and console scripts."""
+        summary = summarize_manifests({"setup.cfg": SETUP_CFG})
+
+        assert (summary['name'], summary['version']) == ("cfgtool", "2.0")
+        assert summary['dependencies'] == {'python': ["pyyaml", "jinja2>=3"]}
+        assert summary['entry_points'] == {'cfgtool': "cfgtool.__main__:main"}
+
+    def test_requirements(self):
+        """Test requirements files skip comments and options; dev variants are dev dependencies."""
+        summary = summarize_manifests({
+            "requirements.txt": "# pinned\n-r base.txt\nflask==3.0.0  # web\n\nredis\n",
+            "requirements-dev.txt": "pytest\nflask==2.0\n",
+        })
+
+        assert summary['dependencies'] == {'python': ["flask==3.0.0", "redis"]}
+        assert summary['dev_dependencies'] == {'python': ["pytest", "flask==2.0"]}
+
+    def test_package_json(self):
+        """Test engines, dependencies, scripts and a string bin."""
+        summary = summarize_manifests({"package.json": PACKAGE_JSON})
+
+        assert summary['runtimes'] == {'node': ">=18"}
+        assert summary['dependencies'] == {'node': ["react@^18.2.0"]}
+        assert summary['dev_dependencies'] == {'node': ["vite@^5.0.0"]}
+        assert summary['scripts'] == {'build': "vite build", 'test': "vitest run"}
+        assert summary['entry_points'] == {'web': "./bin/web.js"}
+
+    def test_cargo_toml(self):
+        """Test package metadata, dependency tables and [[bin]] targets."""
+        summary = summarize_manifests({"Cargo.toml": CARGO_TOML})
+
+        assert summary['runtimes'] == {'rust': ">=1.74"}
+        assert summary['dependencies'] == {'rust': ["serde@1.0", "clap@4"]}
+        assert summary['dev_dependencies'] == {'rust': ["insta@1"]}
+        assert summary['entry_points'] == {'fastcli': "src/main.rs"}
+
+    def test_go_mod(self):
+        """Test single and block requires; indirect ones are dev dependencies."""
+        summary = summarize_manifests({"go.mod": GO_MOD})
+
+        assert summary['name'] == "github.com/acme/server"
+        assert summary['runtimes'] == {'go': ">=1.22"}
+        assert summary['dependencies'] == {'go': ["github.com/google/uuid@v1.6.0", "github.com/gin-gonic/gin@v1.9.1"]}
+        assert summary['dev_dependencies'] == {'go': ["golang.org/x/net@v0.21.0"]}
+
+
+class TestSummarizeManifests:
+    """Tests for merging, priority and errors."""
+
+    def test_priority(self):
+        """Test pyproject.toml wins over setup.py and package.json whatever the input order."""
+        summary = summarize_manifests({
+            "package.json": PACKAGE_JSON, "setup.py": SETUP_PY, "README.md": "# Tool", "pyproject.toml": PYPROJECT,
+        })
+
+        assert summary['manifests'] == ["pyproject.toml", "setup.py", "package.json"]
+        assert (summary['name'], summary['version']) == ("tool", "1.2.0")
+        assert summary['runtimes'] == {'python': ">=3.10", 'node': ">=18"}
+        assert summary['dependencies']['python'] == ["click>=8.1", "httpx", "six", "attrs>=21"]
+
+    @pytest.mark.parametrize("path, text", [
+        ("pyproject.toml", "[project\nname = 1"),
+        ("package.json", "{not json"),
+        ("setup.py", "setup(name='x'"),
+        ("setup.cfg", "no section header"),
+    ])
+    def test_errors(self, path, text):
+        """Test a manifest that doesn't parse is recorded instead of raising."""
+        summary = summarize_manifests({path: text, "requirements.txt": "click\n"})
+
+        assert summary['manifests'] == ["requirements.txt"]
+        assert list(summary['errors']) == [path]
+        assert summary['dependencies'] == {'python': ["click"]}
+
+    def test_empty(self):
+        """Test no manifests give an empty summary without errors."""
+        summary = summarize_manifests({"README.md": "# Tool"})
+
+        assert summary['manifests'] == []
+        assert 'errors' not in summary
+        assert format_summary(summary) == "Installation summary: (unnamed) (no manifests)"
+
+    @pytest.mark.parametrize("path, supported", [
+        ("pyproject.toml", True), ("sub/Cargo.toml", True), ("requirements/prod.txt", False),
+        ("requirements-test.txt", True), ("package-lock.json", False),
+    ])
+    def test_manifest_parser(self, path, supported):
+        """Test manifests are recognized by file name."""
+        assert (manifest_parser(path) is not None) == supported
+
+
+class TestFormatSummary:
+    """Tests for format_summary()."""
+
+    def test_full_summary(self):
+        """Test every non-empty field gets a line."""
+        text = format_summary(summarize_manifests({"pyproject.toml": PYPROJECT, "package.json": PACKAGE_JSON}))
+
+        assert text.splitlines() == [
+            "Installation summary: tool 1.2.0 (pyproject.toml, package.json)",
+            "  runtime: python >=3.10, node >=18",
+            "  dependencies (python): click>=8.1, httpx",
+            "  dependencies (node): react@^18.2.0",
+            "  dev dependencies (python): pytest>=7, ruff",
+            "  dev dependencies (node): vite@^5.0.0",
+            "  scripts: build = vite build, test = vitest run",
+            "  entry points: tool = tool.cli:main, web = ./bin/web.js",
+        ]
\ No newline at end of file
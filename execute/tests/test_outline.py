@@ -0,0 +1,216 @@
+"""
+Unit tests for outline module.
+
+Tests cover:
+- Python outlines (signatures, docstrings, fields, dropped bodies)
+- Brace-language outlines (TypeScript, Go, Rust)
+- Parser registration and unknown languages
+- Digest outlining in-process and across worker processes
+"""
+
+from pathlib import Path
+
+from outline import (
+    outline_python,
+    outline_file,
+    outline_digest,
+    register_parser,
+    OUTLINE_PARSERS,
+    CHUNK_SIZE,
+    PENDING_CHUNKS_PER_WORKER,
+    _map_outline,
+)
+from digest import format_section
+
+
+PYTHON_SOURCE = '''"""Module doc."""
+import os
+
+MAX_RETRIES = 3
+
+
+class Client(Base):
+    """HTTP client."""
+    timeout: float = 5.0
+
+    def get(self, url: str, *, retries: int = MAX_RETRIES) -> bytes:
+        """Fetch a URL."""
+        for attempt in range(retries):
+            data = os.urandom(8)
+        return data
+
+
+@cache
+async def fetch(url):
+    return await Client().get(url)
+'''
+
+
+class TestOutlinePython:
+    """Tests for outline_python() function."""
+
+    def test_keeps_signatures_and_docstrings(self):
+        """Test signatures, decorators and docstrings are kept."""
+        result = outline_python(PYTHON_SOURCE)
+        assert '"""Module doc."""' in result
+        assert "class Client(Base):" in result
+        assert "    def get(self, url: str, *, retries: int=MAX_RETRIES) -> bytes:" in result
+        assert '        """Fetch a URL."""' in result
+        assert "@cache" in result
+        assert "async def fetch(url):" in result
+
+    def test_keeps_fields_and_constants(self):
+        """Test class fields and module constants are kept."""
+        result = outline_python(PYTHON_SOURCE)
+        assert "    timeout: float = 5.0" in result
+        assert "MAX_RETRIES = 3" in result
+
+    def test_drops_bodies(self):
+        """Test function bodies and imports are removed."""
+        result = outline_python(PYTHON_SOURCE)
+        assert "os.urandom" not in result
+        assert "return await" not in result
+        assert "import os" not in result
+        assert "        ..." in result
+
+    def test_outline_is_smaller(self):
+        """Test the outline is shorter than the source."""
+        assert len(outline_python(PYTHON_SOURCE)) < len(PYTHON_SOURCE)
+
+
+class TestOutlineBraced:
+    """Tests for brace-language outlines via outline_file()."""
+
+    def test_typescript(self):
+        """Test functions collapse while interfaces keep their members."""
+        source = (
+            "/** Docs */\n"
+            "export function f(a: number): void {\n"
+            "  console.log(a);\n"
+            "}\n"
+            "export interface Config {\n"
+            "  name: string;\n"
+            "}\n"
+            "export class Client {\n"
+            "  get(url: string): Promise<Response> {\n"
+            "    return fetch(url);\n"
+            "  }\n"
+            "}\n"
+        )
+        result = outline_file("src/index.ts", source)
+        assert "/** Docs */" in result
+        assert "export function f(a: number): void { ... }" in result
+        assert "  name: string;" in result
+        assert "  get(url: string): Promise<Response> { ... }" in result
+        assert "console.log" not in result
+        assert "return fetch" not in result
+
+    def test_go(self):
+        """Test Go funcs collapse and structs are kept."""
+        source = (
+            "package main\n\n"
+            "// Server serves.\n"
+            "type Server struct {\n"
+            "\tAddr string\n"
+            "}\n\n"
+            "func (s *Server) Start() error {\n"
+            "\treturn nil\n"
+            "}\n"
+        )
+        result = outline_file("main.go", source)
+        assert "// Server serves." in result
+        assert "\tAddr string" in result
+        assert "func (s *Server) Start() error { ... }" in result
+        assert "return nil" not in result
+
+    def test_rust(self):
+        """Test impl blocks are scanned for member signatures."""
+        source = (
+            "impl Thing {\n"
+            "    /// make it\n"
+            "    pub fn new(a: u32) -> Self {\n"
+            "        Thing { a }\n"
+            "    }\n"
+            "}\n"
+        )
+        result = outline_file("src/lib.rs", source)
+        assert "impl Thing {" in result
+        assert "    /// make it" in result
+        assert "    pub fn new(a: u32) -> Self { ... }" in result
+        assert "Thing { a }" not in result
+
+
+class TestOutlineFile:
+    """Tests for outline_file() dispatch."""
+
+    def test_unknown_language_returns_none(self):
+        """Test files without a parser are not outlined."""
+        assert outline_file("README.md", "# Title") is None
+
+    def test_python_syntax_error_falls_back(self):
+        """Test unparseable Python still yields def/class lines."""
+        result = outline_file("bad.py", "def ok(a):\n    return (\nclass Broken:\n")
+        assert "def ok(a):" in result
+        assert "class Broken:" in result
+
+    def test_register_parser(self, monkeypatch):
+        """Test registering a parser for a new language."""
+        monkeypatch.setitem(OUTLINE_PARSERS, 'Ruby', None)
+        register_parser('Ruby', lambda source: "def greet")
+        assert outline_file("lib/greet.rb", "def greet\n  puts 'hi'\nend\n") == "def greet"
+
+
+class TestOutlineDigest:
+    """Tests for outline_digest() function."""
+
+    def _write_digest(self, path: Path) -> None:
+        path.write_text(
+            "Directory structure:\n└── repo/\n\n"
+            + format_section("app.py", PYTHON_SOURCE)
+            + format_section("README.md", "# Title")
+            + format_section("main.go", "func main() {\n\tprintln(1)\n}"),
+            encoding='utf-8'
+        )
+
+    def test_outline_digest_in_process(self, tmp_path):
+        """Test sections are outlined in order and unparsed files skipped."""
+        source = tmp_path / "source.txt"
+        output = tmp_path / "outline.txt"
+        self._write_digest(source)
+
+        stats = outline_digest(source, output, workers=1)
+
+        content = output.read_text(encoding='utf-8')
+        assert stats.files == 2
+        assert stats.skipped == 1
+        assert stats.outline_tokens < stats.source_tokens
+        assert content.index("FILE: app.py") < content.index("FILE: main.go")
+        assert "README.md" not in content
+        assert "func main() { ... }" in content
+
+    def test_outline_digest_with_workers(self, tmp_path):
+        """Test a process pool produces the same output as in-process."""
+        source = tmp_path / "source.txt"
+        self._write_digest(source)
+
+        outline_digest(source, tmp_path / "serial.txt", workers=1)
+        outline_digest(source, tmp_path / "parallel.txt", workers=2)
+
+        assert (tmp_path / "serial.txt").read_text(encoding='utf-8') == \
+            (tmp_path / "parallel.txt").read_text(encoding='utf-8')
+
+    def test_workers_read_ahead_bounded(self):
+        """Test a process pool only reads a few chunks per worker ahead of the results."""
+        read = []
+
+        def items():
+            for index in range(20 * CHUNK_SIZE):
+                read.append(index)
+                yield f"f{index}.py", "x = 1\n"
+
+        results = _map_outline(items(), workers=2)
+        first = next(results)
+
+        assert first[0] == "f0.py"
+        assert len(read) <= 2 * PENDING_CHUNKS_PER_WORKER * CHUNK_SIZE + 1
+        assert [path for path, _, _ in results][-1] == f"f{20 * CHUNK_SIZE - 1}.py"
\ No newline at end of file
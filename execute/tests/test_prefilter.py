@@ -0,0 +1,194 @@
+"""
+Unit tests for prefilter module.
+
+Tests cover:
+- Content statistics (line length, entropy, non-printable ratio)
+- Path and content classification rules
+- Dropping and stubbing files with a savings report
+- Streaming filter matching the section-level filter
+"""
+
+import base64
+import io
+import random
+
+import pytest
+
+from digest import format_section, iter_stream_sections
+from exceptions import ValidationError
+from prefilter import SNIFF_CHARS, Prefilter, classify, content_stats, format_report
+
+
+def _encoded(size: int) -> str:
+    rng = random.Random(1)
+    return base64.encodebytes(bytes(rng.randrange(256) for _ in range(size))).decode('ascii')
+
+
+CODE = "def main():\n    return compute(values, factor=2)\n\n" * 50
+MINIFIED = ("var a=function(b){return b*2},c=a(3);" * 200 + "\n") * 3
+
+
+def _digest() -> str:
+    return (
+        "Directory structure:\n└── repo/\n\n"
+        + format_section("src/main.py", CODE)
+        + format_section("package-lock.json", '{"name": "lodash", "version": "4.17.21"}\n' * 500)
+        + format_section("node_modules/lodash/index.js", "module.exports = require('./lodash');\n" * 40)
+        + format_section("static/app.js", MINIFIED)
+        + format_section("README.md", "# Project\n")
+    )
+
+
+class TestContentStats:
+    """Tests for content_stats()."""
+
+    def test_code(self):
+        """Test ordinary source code has short lines and moderate entropy."""
+        stats = content_stats(CODE)
+
+        assert stats.lines == 150
+        assert stats.mean_line_length < 40
+        assert stats.entropy < 5
+        assert stats.nonprintable == 0
+
+    def test_encoded(self):
+        """Test base64 data has high entropy."""
+        assert content_stats(_encoded(6000)).entropy > 5.8
+
+    def test_binary(self):
+        """Test control and replacement characters count as non-printable."""
+        assert content_stats("\x00\x01�ab").nonprintable == pytest.approx(0.6)
+
+    def test_empty(self):
+        """Test empty text has zero statistics."""
+        assert content_stats("").chars == 0
+
+
+class TestClassify:
+    """Tests for classify()."""
+
+    @pytest.mark.parametrize("path, rule", [
+        ("vendor/github.com/pkg/errors/errors.go", 'vendored'),
+        ("web/node_modules/react/index.js", 'vendored'),
+        ("yarn.lock", 'lockfile'),
+        ("backend/poetry.lock", 'lockfile'),
+        ("api/service_pb2.py", 'generated'),
+        ("src/__snapshots__/App.test.js.snap", 'snapshot'),
+        ("assets/logo.svg", 'svg'),
+        ("dist/app.min.js", 'minified'),
+    ])
+    def test_path_rules(self, path, rule):
+        """Test files recognized by their path alone."""
+        assert classify(path).name == rule
+
+    def test_generated_marker(self):
+        """Test a generated-code marker near the top of a file."""
+        assert classify("api/client.go", "// Code generated by protoc-gen-go. DO NOT EDIT.\n" + CODE).name == 'generated'
+
+    def test_content_rules(self):
+        """Test files recognized by their content statistics."""
+        assert classify("static/app.js", MINIFIED).name == 'minified'
+        assert classify("data/blob.txt", _encoded(6000)).name == 'encoded'
+        assert classify("data/raw.dat", "\x00\x01\x02 text " * 300).name == 'binary'
+
+    def test_kept(self):
+        """Test ordinary files, and short files whatever their content, are kept."""
+        assert classify("src/main.py", CODE) is None
+        assert classify("README.md", "# Project\n") is None
+        assert classify("data/key.txt", _encoded(100)) is None
+
+    def test_rule_selection(self):
+        """Test only the selected rules apply."""
+        assert classify("yarn.lock", rules=['svg']) is None
+
+
+class TestPrefilter:
+    """Tests for Prefilter."""
+
+    def test_apply_stub(self):
+        """Test a stubbed file is replaced and its savings recorded."""
+        prefilter = Prefilter(tokenizer='heuristic')
+        text = '{"name": "lodash"}\n' * 400
+
+        stub = prefilter.apply("package-lock.json", text)
+
+        assert stub == "[... 1,900 tokens omitted: dependency lockfile ...]"
+        report = prefilter.report()
+        assert report['files'] == 1
+        assert report['rules']['lockfile'] == {'action': 'stub', 'files': 1, 'tokens': 1900 - len(stub) // 4}
+
+    def test_apply_drop(self):
+        """Test dropped files (and stubs with stub=False) return None."""
+        prefilter = Prefilter(tokenizer='heuristic')
+
+        assert prefilter.apply("vendor/lib.go", "package lib\n") is None
+        assert prefilter.apply("yarn.lock", "x" * 400, stub=False) is None
+        assert prefilter.apply("src/main.py", CODE) == CODE
+        assert prefilter.report()['rules']['lockfile']['tokens'] == 100
+
+    def test_unknown_rule(self):
+        """Test unknown rule names raise ValidationError."""
+        with pytest.raises(ValidationError):
+            Prefilter(rules=['lockfile', 'bogus'])
+
+    def test_filter_stream(self):
+        """Test the streaming filter drops, stubs and keeps sections."""
+        prefilter = Prefilter(tokenizer='heuristic')
+        out = io.BytesIO()
+
+        prefilter.filter_stream(io.BytesIO(_digest().encode('utf-8')), out)
+
+        sections = {path: content.decode('utf-8') for path, _, content in iter_stream_sections(io.BytesIO(out.getvalue()))}
+        assert list(sections) == [None, "src/main.py", "package-lock.json", "static/app.js", "README.md"]
+        assert sections["src/main.py"].startswith(CODE)
+        assert "tokens omitted: dependency lockfile" in sections["package-lock.json"]
+        assert "tokens omitted: minified bundle" in sections["static/app.js"]
+        assert set(prefilter.report()['rules']) == {'vendored', 'lockfile', 'minified'}
+
+    def test_filter_stream_matches_apply(self):
+        """Test streaming and section-level filtering report the same savings."""
+        streamed = Prefilter(tokenizer='heuristic')
+        streamed.filter_stream(io.BytesIO(_digest().encode('utf-8')), io.BytesIO())
+        sectioned = Prefilter(tokenizer='heuristic')
+        for path, _, content in iter_stream_sections(io.BytesIO(_digest().encode('utf-8'))):
+            if path is not None:
+                sectioned.apply(path, content.decode('utf-8'))
+
+        assert streamed.report() == sectioned.report()
+
+    def test_filter_stream_large_kept_file(self):
+        """Test a kept file longer than the sniff window streams through intact."""
+        content = CODE * (SNIFF_CHARS // len(CODE) + 2)
+        digest = format_section("src/big.py", content)
+        out = io.BytesIO()
+
+        Prefilter(tokenizer='heuristic').filter_stream(io.BytesIO(digest.encode('utf-8')), out)
+
+        assert out.getvalue().decode('utf-8') == digest
+
+    def test_unfiltered_copy_is_identical(self):
+        """Test a digest with nothing to filter is copied byte for byte."""
+        digest = "Directory structure:\n└── repo/\n\n" + format_section("src/main.py", CODE)
+        out = io.BytesIO()
+
+        Prefilter(tokenizer='heuristic').filter_stream(io.BytesIO(digest.encode('utf-8')), out)
+
+        assert out.getvalue().decode('utf-8') == digest
+
+
+class TestFormatReport:
+    """Tests for format_report()."""
+
+    def test_format(self):
+        """Test the report lists each rule's savings."""
+        prefilter = Prefilter(tokenizer='heuristic')
+        prefilter.apply("yarn.lock", "x" * 4000)
+
+        text = format_report(prefilter.report())
+
+        assert text.splitlines()[0] == "Prefilter: 1 file(s) filtered, 988 tokens saved"
+        assert "lockfile" in text
+
+    def test_empty(self):
+        """Test an empty report."""
+        assert format_report(Prefilter().report()) == "Prefilter: 0 file(s) filtered, 0 tokens saved"
\ No newline at end of file
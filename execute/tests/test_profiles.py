@@ -0,0 +1,201 @@
+"""
+Unit tests for profiles module.
+
+Tests cover:
+- Built-in profiles from FILTER_PATTERNS
+- Profile validation (names, keys, globs, caps, budget)
+- User and project config files, project overriding user
+- Cache keyed by file modification time
+- get_filters_for_type() picking up configured profiles
+"""
+
+import os
+
+import pytest
+
+from exceptions import ValidationError
+from profiles import (
+    CONFIG_ENV_VAR,
+    build_profile,
+    builtin_profiles,
+    config_paths,
+    content_types,
+    get_profile,
+    load_config_file,
+    load_profiles,
+    parse_profiles,
+)
+from workflow import FILTER_PATTERNS, get_filters_for_type
+
+
+GO_PROFILE = """
+[profiles.go]
+description = "Go sources without tests"
+include = ["*.go", "go.mod"]
+exclude = ["*_test.go", "vendor/"]
+file_caps = ["4000", "*.pb.go=500"]
+budget = 150000
+"""
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    """Isolate config lookup: empty user config dir, project config at a known path."""
+    monkeypatch.setenv('XDG_CONFIG_HOME', str(tmp_path / "user"))
+    project = tmp_path / "project.toml"
+    monkeypatch.setenv(CONFIG_ENV_VAR, str(project))
+    return project
+
+
+def _touch(path, seconds: int):
+    """Move a file's modification time, as an edit later in time would."""
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + seconds * 1_000_000_000))
+
+
+class TestBuildProfile:
+    """Tests for build_profile() and parse_profiles()."""
+
+    def test_full_profile(self):
+        """Test every key is validated and compiled."""
+        profile = parse_profiles(GO_PROFILE)['go']
+
+        assert profile.include == ["*.go", "go.mod"]
+        assert profile.exclude == ["*_test.go", "vendor/"]
+        assert profile.caps.cap_for("api/types.pb.go") == 500
+        assert profile.caps.cap_for("main.go") == 4000
+        assert profile.budget == 150000
+        assert profile.description == "Go sources without tests"
+        assert profile.path_filter.filter(["cmd/main.go", "cmd/main_test.go", "vendor/x/y.go"]) == ["cmd/main.go"]
+
+    def test_defaults(self):
+        """Test omitted keys mean no filter, no caps and no budget."""
+        profile = build_profile("everything", {})
+
+        assert profile.include == [] and profile.exclude == []
+        assert not profile.caps
+        assert profile.budget is None
+        assert profile.path_filter.matches("any/file.txt")
+
+    @pytest.mark.parametrize("name, table, message", [
+        ("Go", {}, "lowercase"),
+        ("../x", {}, "lowercase"),
+        ("go", {"includes": ["*.go"]}, "unknown key"),
+        ("go", {"include": "*.go"}, "list of strings"),
+        ("go", {"exclude": [1]}, "list of strings"),
+        ("go", {"include": ["!"]}, "Invalid glob pattern"),
+        ("go", {"file_caps": ["lots"]}, "Invalid file cap"),
+        ("go", {"budget": 0}, "budget"),
+        ("go", {"budget": "150k"}, "budget"),
+        ("go", {"budget": True}, "budget"),
+        ("go", {"description": 3}, "description"),
+    ])
+    def test_invalid(self, name, table, message):
+        """Test invalid definitions raise ValidationError naming the profile."""
+        with pytest.raises(ValidationError, match=message) as exc_info:
+            build_profile(name, table)
+
+        assert f"profile '{name}'" in str(exc_info.value)
+
+    @pytest.mark.parametrize("text", ["[profiles.go\ninclude = 1", "profiles = 3"])
+    def test_invalid_file(self, text):
+        """Test broken TOML or a non-table [profiles] raise ValidationError."""
+        with pytest.raises(ValidationError, match="Invalid config file"):
+            parse_profiles(text)
+
+    def test_builtin_profiles(self):
+        """Test built-in profiles share FILTER_PATTERNS' filter dicts."""
+        profiles = builtin_profiles()
+
+        assert list(profiles) == list(FILTER_PATTERNS)
+        for name, profile in profiles.items():
+            assert profile.filters is FILTER_PATTERNS[name]
+            assert profile.source is None
+
+
+class TestLoadProfiles:
+    """Tests for config lookup, merging and caching."""
+
+    def test_no_config(self, config):
+        """Test only built-in profiles exist without config files."""
+        assert content_types() == list(FILTER_PATTERNS)
+
+    def test_project_profiles(self, config):
+        """Test project profiles are added after built-in ones."""
+        config.write_text(GO_PROFILE, encoding='utf-8')
+
+        profiles = load_profiles()
+
+        assert list(profiles) == list(FILTER_PATTERNS) + ['go']
+        assert profiles['go'].source == config
+
+    def test_project_overrides_user(self, config, tmp_path):
+        """Test project profiles replace user ones, which replace built-in ones."""
+        user = tmp_path / "user" / "gitingest-agent" / "config.toml"
+        user.parent.mkdir(parents=True)
+        user.write_text('[profiles.code]\ninclude = ["*.rs"]\n[profiles.go]\ninclude = ["*.go"]\n', encoding='utf-8')
+        config.write_text('[profiles.go]\ninclude = ["cmd/**/*.go"]\n', encoding='utf-8')
+
+        profiles = load_profiles()
+
+        assert profiles['code'].include == ["*.rs"]
+        assert profiles['go'].include == ["cmd/**/*.go"]
+
+    def test_nearest_project_config(self, tmp_path, monkeypatch):
+        """Test the project config is searched for from a directory upwards."""
+        monkeypatch.setenv('XDG_CONFIG_HOME', str(tmp_path / "user"))
+        monkeypatch.delenv(CONFIG_ENV_VAR, raising=False)
+        (tmp_path / "repo" / "execute").mkdir(parents=True)
+        (tmp_path / "repo" / ".gitingest-agent.toml").write_text(GO_PROFILE, encoding='utf-8')
+
+        paths = config_paths(tmp_path / "repo" / "execute")
+
+        assert paths[-1] == tmp_path / "repo" / ".gitingest-agent.toml"
+        assert 'go' in load_profiles(tmp_path / "repo" / "execute")
+
+    def test_cached_until_modified(self, config):
+        """Test a config file is parsed once, and again after it changes."""
+        config.write_text(GO_PROFILE, encoding='utf-8')
+
+        first = load_config_file(config)
+        assert load_config_file(config) is first
+
+        config.write_text(GO_PROFILE.replace("150000", "90000"), encoding='utf-8')
+        _touch(config, 1)
+
+        assert load_config_file(config)['go'].budget == 90000
+
+    def test_removed_file(self, config):
+        """Test profiles of a deleted config file disappear."""
+        config.write_text(GO_PROFILE, encoding='utf-8')
+        assert 'go' in content_types()
+
+        config.unlink()
+
+        assert 'go' not in content_types()
+
+    def test_invalid_config_raises(self, config):
+        """Test an invalid config file raises ValidationError on lookup."""
+        config.write_text('[profiles.go]\nbudget = -1\n', encoding='utf-8')
+
+        with pytest.raises(ValidationError, match="budget"):
+            load_profiles()
+
+
+class TestGetProfile:
+    """Tests for get_profile() and get_filters_for_type() with configured profiles."""
+
+    def test_configured_type(self, config):
+        """Test get_filters_for_type() returns configured filters."""
+        config.write_text(GO_PROFILE, encoding='utf-8')
+
+        assert get_filters_for_type('go') == {'include': ["*.go", "go.mod"], 'exclude': ["*_test.go", "vendor/"]}
+
+    def test_unknown_type_lists_configured(self, config):
+        """Test the error for an unknown type lists configured profiles too."""
+        config.write_text(GO_PROFILE, encoding='utf-8')
+
+        with pytest.raises(ValidationError, match="Invalid content type: rust") as exc_info:
+            get_profile('rust')
+
+        assert "go" in str(exc_info.value)
\ No newline at end of file
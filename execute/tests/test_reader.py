@@ -0,0 +1,164 @@
+"""
+Unit tests for reader module.
+
+Tests cover:
+- Pages aligned to FILE boundaries, oversized sections split at lines
+- Reading files and line ranges
+- Persisted index reuse and rebuild after the digest changes
+- Recorded truncations of capped files
+- Line range parsing and error handling
+"""
+
+import os
+import pytest
+
+from digest import format_section
+from exceptions import ValidationError
+from reader import DigestReader, index_path_for, parse_line_range
+
+
+TREE = "Directory structure:\n└── user-repo/\n    ├── a.py\n    └── b.py\n\n"
+
+
+def _numbered(prefix: str, count: int) -> str:
+    return "\n".join(f"{prefix} line {i}" for i in range(1, count + 1))
+
+
+@pytest.fixture
+def digest(tmp_path):
+    path = tmp_path / "digest.txt"
+    path.write_text(
+        TREE
+        + format_section("a.py", _numbered("a", 5))
+        + format_section("b.py", _numbered("b", 200))
+        + format_section("c.py", _numbered("c", 3)),
+        encoding='utf-8'
+    )
+    return path
+
+
+class TestPages:
+    """Tests for page_count() and read_page()."""
+
+    def test_pages_cover_digest(self, digest):
+        """Test pages concatenate back to the whole digest."""
+        with DigestReader(digest) as reader:
+            count = reader.page_count(100)
+            pages = [reader.read_page(n, 100) for n in range(1, count + 1)]
+
+        assert count > 1
+        assert ''.join(pages) == digest.read_text(encoding='utf-8')
+
+    def test_pages_align_to_files(self, digest):
+        """Test small sections start pages and large ones split on line breaks."""
+        with DigestReader(digest) as reader:
+            count = reader.page_count(100)
+            pages = [reader.read_page(n, 100) for n in range(1, count + 1)]
+
+        assert any(page.startswith("=" * 48 + "\nFILE: b.py") for page in pages)
+        assert pages[-1].startswith("=" * 48 + "\nFILE: c.py")
+        assert all(page.endswith("\n") for page in pages)
+        assert all(len(page.encode('utf-8')) <= 400 for page in pages)
+
+    def test_page_out_of_range(self, digest):
+        """Test reading past the last page raises ValidationError."""
+        with DigestReader(digest) as reader:
+            with pytest.raises(ValidationError):
+                reader.read_page(reader.page_count(100) + 1, 100)
+
+    def test_single_page(self, digest):
+        """Test a large page size yields the whole digest as one page."""
+        with DigestReader(digest) as reader:
+            assert reader.page_count(100_000) == 1
+
+
+class TestReadFile:
+    """Tests for files() and read_file()."""
+
+    def test_read_whole_file(self, digest):
+        """Test a file is returned without the section separators."""
+        with DigestReader(digest) as reader:
+            assert reader.read_file("a.py") == _numbered("a", 5)
+
+    def test_read_line_range(self, digest):
+        """Test an inclusive line range is returned."""
+        with DigestReader(digest) as reader:
+            assert reader.read_file("b.py", 10, 12) == "b line 10\nb line 11\nb line 12"
+            assert reader.read_file("c.py", 2) == "c line 2\nc line 3"
+
+    def test_read_past_end(self, digest):
+        """Test ranges beyond the file end are clipped."""
+        with DigestReader(digest) as reader:
+            assert reader.read_file("a.py", 4, 50) == "a line 4\na line 5"
+            assert reader.read_file("a.py", 50) == ""
+
+    def test_missing_file(self, digest):
+        """Test unknown paths raise ValidationError."""
+        with DigestReader(digest) as reader:
+            with pytest.raises(ValidationError):
+                reader.read_file("missing.py")
+
+    def test_files(self, digest):
+        """Test files are listed in digest order."""
+        with DigestReader(digest) as reader:
+            assert [path for path, _ in reader.files()] == ["a.py", "b.py", "c.py"]
+
+
+class TestIndex:
+    """Tests for the persisted offset index."""
+
+    def test_index_persisted(self, digest):
+        """Test the sidecar index is created next to the digest."""
+        with DigestReader(digest) as reader:
+            reader.page_count(100)
+
+        assert index_path_for(digest).exists()
+
+    def test_index_rebuilt_when_digest_changes(self, digest):
+        """Test a rewritten digest invalidates the stored index."""
+        with DigestReader(digest) as reader:
+            reader.page_count(100)
+
+        digest.write_text(TREE + format_section("new.py", "x = 1"), encoding='utf-8')
+        stat = digest.stat()
+        os.utime(digest, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        with DigestReader(digest) as reader:
+            assert [path for path, _ in reader.files()] == ["new.py"]
+            assert reader.page_count(100) == 1
+
+    def test_truncations_recorded(self, digest):
+        """Test recorded truncations persist until the digest changes."""
+        with DigestReader(digest) as reader:
+            reader.record_truncations([("b.py", 5_000, 400, 4_600)])
+
+        with DigestReader(digest) as reader:
+            assert reader.truncations() == {"b.py": (5_000, 400, 4_600)}
+
+        digest.write_text(TREE + format_section("b.py", "x = 1"), encoding='utf-8')
+        stat = digest.stat()
+        os.utime(digest, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        with DigestReader(digest) as reader:
+            assert reader.truncations() == {}
+
+    def test_missing_digest(self, tmp_path):
+        """Test opening a missing digest raises ValidationError."""
+        with pytest.raises(ValidationError):
+            DigestReader(tmp_path / "missing.txt")
+
+
+class TestParseLineRange:
+    """Tests for parse_line_range() function."""
+
+    def test_valid_ranges(self):
+        """Test closed, open and single-line ranges."""
+        assert parse_line_range("10-40") == (10, 40)
+        assert parse_line_range("100-") == (100, None)
+        assert parse_line_range("7") == (7, 7)
+
+    @pytest.mark.parametrize("spec", ["", "a-b", "0-5", "9-3"])
+    def test_invalid_ranges(self, spec):
+        """Test malformed ranges raise ValidationError."""
+        with pytest.raises(ValidationError):
+            parse_line_range(spec)
\ No newline at end of file
@@ -0,0 +1,160 @@
+"""
+Unit tests for relevance module.
+
+Tests cover:
+- Query/document tokenization (camelCase, snake_case, stemming, stopwords)
+- Loading documents from digests and local checkouts
+- BM25 ranking with path boosting
+- Token budget selection
+"""
+
+import pytest
+from exceptions import ValidationError
+from relevance import (
+    Document,
+    RankedDocument,
+    tokenize,
+    load_documents,
+    rank_documents,
+    select_within_budget,
+)
+
+
+SEP = "=" * 48
+
+
+class TestTokenize:
+    """Tests for tokenize() function."""
+
+    def test_splits_identifiers(self):
+        """Test camelCase and snake_case identifiers are split."""
+        assert tokenize("APIRouter") == ["api", "router"]
+        assert tokenize("api_router") == ["api", "router"]
+
+    def test_drops_stopwords(self):
+        """Test question words are dropped."""
+        assert tokenize("how is the auth configured") == ["auth", "configur"]
+
+    def test_stems_suffixes(self):
+        """Test common suffixes are stemmed consistently."""
+        assert tokenize("configured")[0] == tokenize("configuration")[0]
+        assert tokenize("tokens") == tokenize("token")
+
+
+class TestLoadDocuments:
+    """Tests for load_documents() function."""
+
+    def test_from_digest(self, tmp_path):
+        """Test digest FILE sections become documents."""
+        digest = tmp_path / "digest.txt"
+        digest.write_text(f"{SEP}\nFILE: a.py\n{SEP}\nx = 1\n\n{SEP}\nFILE: b.md\n{SEP}\n# B\n",
+                          encoding='utf-8')
+
+        docs = list(load_documents(digest))
+
+        assert [(d.path, d.text) for d in docs] == [("a.py", "x = 1"), ("b.md", "# B")]
+
+    def test_from_directory(self, tmp_path):
+        """Test text files of a checkout become documents, binaries and .git skipped."""
+        (tmp_path / "src").mkdir()
+        (tmp_path / "src" / "app.py").write_text("print('hi')", encoding='utf-8')
+        (tmp_path / "logo.png").write_bytes(b"\x89PNG\x00\x00")
+        (tmp_path / ".git").mkdir()
+        (tmp_path / ".git" / "config").write_text("[core]", encoding='utf-8')
+
+        docs = list(load_documents(tmp_path))
+
+        assert [d.path for d in docs] == ["src/app.py"]
+
+    def test_missing_source(self, tmp_path):
+        """Test missing source raises ValidationError."""
+        with pytest.raises(ValidationError):
+            load_documents(tmp_path / "missing")
+
+
+class TestRankDocuments:
+    """Tests for rank_documents() function."""
+
+    DOCS = [
+        Document("src/auth/config.py", "AUTH_BACKENDS = ['jwt']\ndef configure_auth(app): ..."),
+        Document("src/db/models.py", "class User(Model):\n    name = Column()"),
+        Document("README.md", "Install with pip. Authentication is optional."),
+        Document("docs/changelog.md", "Fixed a bug in the database layer."),
+    ]
+
+    def test_best_match_first(self):
+        """Test the file about the question ranks first."""
+        ranked = rank_documents(self.DOCS, "how is auth configured")
+
+        assert ranked[0].path == "src/auth/config.py"
+
+    def test_non_matching_excluded(self):
+        """Test documents without query terms are not returned."""
+        ranked = rank_documents(self.DOCS, "how is auth configured")
+
+        assert "docs/changelog.md" not in [doc.path for doc in ranked]
+        assert "src/db/models.py" not in [doc.path for doc in ranked]
+
+    def test_path_boost(self):
+        """Test path matches outrank a single body mention."""
+        docs = [
+            Document("notes.txt", "the models are described elsewhere " * 3),
+            Document("app/models.py", "class A: pass"),
+        ]
+
+        ranked = rank_documents(docs, "models")
+
+        assert ranked[0].path == "app/models.py"
+
+    def test_scores_and_tokens(self):
+        """Test ranked documents carry positive scores and token estimates."""
+        ranked = rank_documents(self.DOCS, "auth")
+
+        assert all(doc.score > 0 for doc in ranked)
+        assert ranked[0].tokens == len(ranked[0].read_text()) // 4
+
+    def test_tokenizer(self):
+        """Test ranked documents are sized with the selected tokenizer."""
+        docs = [Document("docs/auth.md", "認証の設定 auth " * 20)]
+
+        heuristic = rank_documents(docs, "auth", tokenizer='heuristic')
+        calibrated = rank_documents(docs, "auth", tokenizer='calibrated')
+
+        assert calibrated[0].tokens > heuristic[0].tokens
+
+    def test_empty_query(self):
+        """Test stopword-only query raises ValidationError."""
+        with pytest.raises(ValidationError):
+            rank_documents(self.DOCS, "how is the")
+
+    def test_no_documents(self):
+        """Test empty corpus returns no results."""
+        assert rank_documents([], "auth") == []
+
+    def test_text_read_from_digest(self, tmp_path):
+        """Test ranked digest sections keep their location only, and read their text back."""
+        digest = tmp_path / "digest.txt"
+        digest.write_text(f"{SEP}\nFILE: auth.py\n{SEP}\nAUTH = 1\n\n{SEP}\nFILE: b.md\n{SEP}\n# B\n",
+                          encoding='utf-8')
+
+        ranked = rank_documents(load_documents(digest), "auth")
+
+        assert [(doc.path, doc.text) for doc in ranked] == [("auth.py", None)]
+        assert ranked[0].read_text() == "AUTH = 1"
+
+
+class TestSelectWithinBudget:
+    """Tests for select_within_budget() function."""
+
+    def test_greedy_skip(self):
+        """Test oversized documents are skipped and smaller ones still fit."""
+        ranked = [
+            RankedDocument("a", 3.0, 60),
+            RankedDocument("b", 2.0, 50),
+            RankedDocument("c", 1.0, 30),
+        ]
+
+        selected, skipped = select_within_budget(ranked, 100)
+
+        assert [d.path for d in selected] == ["a", "c"]
+        assert [d.path for d in skipped] == ["b"]
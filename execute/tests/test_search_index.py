@@ -0,0 +1,230 @@
+"""
+Unit tests for search_index module.
+
+Tests cover:
+- FTS5 query construction
+- Incremental indexing of digests
+- Searching with repo/language/path facets
+- Line attribution of matches
+- Removal and pruning of digests
+"""
+
+import os
+import pytest
+from pathlib import Path
+from exceptions import StorageError, ValidationError
+from search_index import SearchIndex, build_fts_query, SEARCH_INDEX_FILENAME
+
+
+SEP = "=" * 48
+
+
+def _digest(path: Path, files: dict[str, str]) -> Path:
+    parts = ["Directory structure:\n└── repo/\n"]
+    for name, content in files.items():
+        parts.append(f"{SEP}\nFILE: {name}\n{SEP}\n{content}\n\n")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("\n".join(parts), encoding='utf-8')
+    return path
+
+
+@pytest.fixture
+def index(tmp_path):
+    with SearchIndex.for_root(tmp_path) as search_index:
+        yield search_index
+
+
+class TestBuildFtsQuery:
+    """Tests for build_fts_query() function."""
+
+    def test_quotes_terms(self):
+        """Test identifiers with punctuation are quoted."""
+        assert build_fts_query("app.get router") == '"app.get" "router"'
+
+    def test_prefix(self):
+        """Test trailing * becomes a prefix query."""
+        assert build_fts_query("Depend*") == '"Depend"*'
+
+    def test_escapes_quotes(self):
+        """Test embedded quotes are escaped."""
+        assert build_fts_query('say"hi') == '"say""hi"'
+
+    def test_empty_query(self):
+        """Test empty query raises ValidationError."""
+        with pytest.raises(ValidationError):
+            build_fts_query("  * ")
+
+
+class TestIndexing:
+    """Tests for index_digest() and removal."""
+
+    def test_index_file_location(self, index, tmp_path):
+        """Test index lives at the store root."""
+        assert index.db_path == tmp_path / SEARCH_INDEX_FILENAME
+        assert index.db_path.exists()
+
+    def test_index_counts_sections(self, index, tmp_path):
+        """Test every FILE section is indexed."""
+        digest = _digest(tmp_path / "fastapi" / "digest.txt", {
+            "README.md": "# FastAPI",
+            "fastapi/routing.py": "class APIRouter:\n    pass",
+        })
+
+        assert index.index_digest(digest, "fastapi/fastapi") == 2
+
+    def test_unchanged_digest_skipped(self, index, tmp_path):
+        """Test re-indexing an unchanged digest is a no-op."""
+        digest = _digest(tmp_path / "repo" / "digest.txt", {"a.py": "x = 1"})
+        index.index_digest(digest, "user/repo")
+
+        assert index.index_digest(digest, "user/repo") == 0
+
+    def test_changed_digest_replaced(self, index, tmp_path):
+        """Test re-extracted digests replace their old sections."""
+        digest = _digest(tmp_path / "repo" / "digest.txt", {"a.py": "old_symbol = 1"})
+        index.index_digest(digest, "user/repo")
+        _digest(digest, {"a.py": "new_symbol = 2", "b.py": "other = 3"})
+        stat = digest.stat()
+        os.utime(digest, (stat.st_atime, stat.st_mtime + 5))
+
+        assert index.index_digest(digest, "user/repo") == 2
+        assert index.search("old_symbol") == []
+        assert len(index.search("new_symbol")) == 1
+
+    def test_remove_digest(self, index, tmp_path):
+        """Test removed digests no longer match."""
+        digest = _digest(tmp_path / "repo" / "digest.txt", {"a.py": "needle = 1"})
+        index.index_digest(digest, "user/repo")
+
+        index.remove_digest(digest)
+
+        assert index.search("needle") == []
+        assert index.indexed_digests() == []
+
+    def test_move_directory(self, index, tmp_path):
+        """Test digests under a moved directory are re-keyed and still searchable."""
+        digest = _digest(tmp_path / "repo" / "digest.txt", {"a.py": "needle = 1"})
+        index.index_digest(digest, "user/repo")
+        (tmp_path / "ab" / "user").mkdir(parents=True)
+        (tmp_path / "repo").rename(tmp_path / "ab" / "user" / "repo")
+
+        index.move(tmp_path / "repo", tmp_path / "ab" / "user" / "repo")
+
+        moved = str((tmp_path / "ab" / "user" / "repo" / "digest.txt").resolve())
+        assert index.indexed_digests() == [moved]
+        assert index.prune() == 0
+        assert index.search("needle")[0]['digest'] == moved
+
+    def test_prune_missing(self, index, tmp_path):
+        """Test digests deleted from disk are pruned."""
+        digest = _digest(tmp_path / "repo" / "digest.txt", {"a.py": "needle = 1"})
+        index.index_digest(digest, "user/repo")
+        digest.unlink()
+
+        assert index.prune() == 1
+        assert index.search("needle") == []
+
+    def test_content_next_to_digest_not_indexed(self, index, tmp_path):
+        """Test content files beside a full digest are left out, so each file matches once."""
+        files = {"lib/a.py": "def f(x):\n    \"\"\"Doc\"\"\""}
+        digest = _digest(tmp_path / "repo" / "digest.txt", files)
+        code = _digest(tmp_path / "repo" / "code-content.txt", files)
+        index.index_digest(code, "user/repo")
+
+        index.index_digest(digest, "user/repo")
+
+        assert index.index_digest(code, "user/repo") == 0
+        assert index.indexed_digests() == [str(digest.resolve())]
+        assert [r['path'] for r in index.search("Doc")] == ["lib/a.py"]
+        assert index.facet_counts("Doc", "repo") == {"user/repo": 1}
+
+    def test_outline_and_relevant_not_indexed(self, index, tmp_path):
+        """Test outline and relevant content aren't indexed even without a full digest."""
+        for name in ("outline-content.txt", "relevant-content.txt"):
+            content = _digest(tmp_path / "repo" / name, {"a.py": "def f(x): ..."})
+            assert index.index_digest(content, "user/repo") == 0
+        docs = _digest(tmp_path / "repo" / "docs-content.txt", {"README.md": "Install guide"})
+
+        assert index.index_digest(docs, "user/repo") == 1
+        assert index.indexed_digests() == [str(docs.resolve())]
+
+
+class TestSearch:
+    """Tests for search() and facet_counts()."""
+
+    @pytest.fixture(autouse=True)
+    def populated(self, index, tmp_path):
+        self.fastapi = _digest(tmp_path / "fastapi" / "digest.txt", {
+            "README.md": "# FastAPI\nUse APIRouter to split apps.",
+            "fastapi/routing.py": "import typing\n\nclass APIRouter:\n    def include_router(self):\n        pass",
+        })
+        self.starlette = _digest(tmp_path / "starlette" / "digest.txt", {
+            "starlette/routing.py": "class Router:\n    def mount(self):\n        pass",
+            "docs/routing.md": "Mounting a Router under APIRouter-style prefixes",
+        })
+        index.index_digest(self.fastapi, "fastapi/fastapi")
+        index.index_digest(self.starlette, "encode/starlette")
+
+    def test_search_returns_attribution(self, index):
+        """Test results carry repo, file and line of the match."""
+        results = index.search("include_router")
+
+        assert len(results) == 1
+        result = results[0]
+        assert result['repo'] == "fastapi/fastapi"
+        assert result['path'] == "fastapi/routing.py"
+        assert result['file_line'] == 4
+        assert result['snippet'] == "def include_router(self):"
+
+    def test_digest_line_matches_file(self, index):
+        """Test digest line numbers point at the matching line."""
+        result = index.search("include_router")[0]
+        lines = Path(result['digest']).read_text(encoding='utf-8').splitlines()
+
+        assert "include_router" in lines[result['line'] - 1]
+
+    def test_all_terms_must_match(self, index):
+        """Test multi-term queries are conjunctive."""
+        results = index.search("class mount")
+
+        assert [r['path'] for r in results] == ["starlette/routing.py"]
+
+    def test_repo_facet_filter(self, index):
+        """Test filtering by repository."""
+        results = index.search("APIRouter", repo="encode/starlette")
+
+        assert [r['path'] for r in results] == ["docs/routing.md"]
+
+    def test_language_facet_filter(self, index):
+        """Test filtering by language."""
+        results = index.search("APIRouter", language="python")
+
+        assert [r['path'] for r in results] == ["fastapi/routing.py"]
+
+    def test_path_glob_filter(self, index):
+        """Test filtering by path glob."""
+        results = index.search("Router*", path_glob="docs/*")
+
+        assert [r['path'] for r in results] == ["docs/routing.md"]
+
+    def test_facet_counts(self, index):
+        """Test counting matches per repository."""
+        counts = index.facet_counts("APIRouter", "repo")
+
+        assert counts == {"fastapi/fastapi": 2, "encode/starlette": 1}
+
+    def test_invalid_facet(self, index):
+        """Test invalid facet raises ValidationError."""
+        with pytest.raises(ValidationError):
+            index.facet_counts("APIRouter", "owner")
+
+    def test_facet_counts_index_error(self, index):
+        """Test an index that can't be queried raises StorageError, as search() does."""
+        index._conn.execute("DROP TABLE section_text")
+
+        with pytest.raises(StorageError, match="Search index error"):
+            index.facet_counts("APIRouter", "repo")
+
+    def test_limit(self, index):
+        """Test result limit."""
+        assert len(index.search("APIRouter", limit=1)) == 1
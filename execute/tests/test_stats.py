@@ -0,0 +1,129 @@
+"""
+Unit tests for stats module.
+
+Tests cover:
+- Streaming file stats from digests and checkouts
+- Grouping by directory, extension and language
+- Histogram totals, percentages and largest files
+- Table rendering
+"""
+
+import pytest
+
+from digest import format_section
+from exceptions import ValidationError
+from stats import FileStat, compute_stats, format_table, group_key, iter_file_stats
+
+
+FILES = [
+    FileStat("src/app.py", 4000, 1000),
+    FileStat("src/util.py", 800, 200),
+    FileStat("docs/index.md", 1200, 300),
+    FileStat("README.md", 400, 100),
+    FileStat("Makefile", 40, 10),
+]
+
+
+class TestIterFileStats:
+    """Tests for iter_file_stats() function."""
+
+    def test_digest(self, tmp_path):
+        """Test sections of a digest are measured."""
+        digest = tmp_path / "digest.txt"
+        digest.write_text("tree\n\n" + format_section("a.py", "x" * 40) + format_section("b.md", "y" * 8),
+                          encoding='utf-8')
+
+        assert list(iter_file_stats(digest)) == [FileStat("a.py", 40, 10), FileStat("b.md", 8, 2)]
+
+    def test_directory(self, tmp_path):
+        """Test a checkout is walked and binary files skipped."""
+        (tmp_path / "src").mkdir()
+        (tmp_path / "src" / "main.py").write_text("z" * 20, encoding='utf-8')
+        (tmp_path / "logo.png").write_bytes(b"\x89PNG\x00\x00")
+
+        assert list(iter_file_stats(tmp_path)) == [FileStat("src/main.py", 20, 5)]
+
+    def test_tokenizer(self, tmp_path):
+        """Test per-file counts come from the selected tokenizer."""
+        digest = tmp_path / "digest.txt"
+        digest.write_text(format_section("a.py", "x" * 3690), encoding='utf-8')
+
+        assert list(iter_file_stats(digest, tokenizer='calibrated')) == [FileStat("a.py", 3690, 1000)]
+
+    def test_missing(self, tmp_path):
+        """Test a missing source raises ValidationError."""
+        with pytest.raises(ValidationError):
+            list(iter_file_stats(tmp_path / "missing"))
+
+
+class TestGroupKey:
+    """Tests for group_key() function."""
+
+    def test_directory(self):
+        """Test top-level directories and root files."""
+        assert group_key("src/app/main.py", "directory") == "src/"
+        assert group_key("README.md", "directory") == "(root)"
+
+    def test_extension(self):
+        """Test lowercase extensions and extension-less files."""
+        assert group_key("docs/INDEX.MD", "extension") == ".md"
+        assert group_key("Makefile", "extension") == "(none)"
+
+    def test_language(self):
+        """Test language detection."""
+        assert group_key("src/app.py", "language") == "Python"
+
+    def test_invalid(self):
+        """Test unknown groupings raise ValidationError."""
+        with pytest.raises(ValidationError):
+            group_key("a.py", "owner")
+
+
+class TestComputeStats:
+    """Tests for compute_stats() function."""
+
+    def test_groups_by_directory(self):
+        """Test groups are ordered by tokens with percentages."""
+        report = compute_stats(FILES, by='directory')
+
+        assert report['total_tokens'] == 1610
+        assert report['total_files'] == 5
+        assert [(g['name'], g['files'], g['tokens']) for g in report['groups']] == [
+            ("src/", 2, 1200), ("docs/", 1, 300), ("(root)", 2, 110)
+        ]
+        assert report['groups'][0]['percent'] == 74.5
+
+    def test_largest_files(self):
+        """Test only the N largest files are kept, largest first."""
+        report = compute_stats(FILES, top=2)
+        assert report['largest'] == [
+            {'path': "src/app.py", 'tokens': 1000},
+            {'path': "docs/index.md", 'tokens': 300},
+        ]
+
+    def test_empty(self):
+        """Test an empty source yields an empty report."""
+        report = compute_stats([], by='language')
+        assert report['total_tokens'] == 0
+        assert report['groups'] == []
+        assert report['largest'] == []
+
+    def test_records_tokenizer(self):
+        """Test the tokenizer spec is recorded in the report."""
+        assert compute_stats(FILES, tokenizer='calibrated')['tokenizer'] == 'calibrated'
+        assert "Tokenizer: calibrated" in format_table(compute_stats(FILES, tokenizer='calibrated'))
+
+
+class TestFormatTable:
+    """Tests for format_table() function."""
+
+    def test_table(self):
+        """Test the table lists groups, totals and largest files."""
+        table = format_table(compute_stats(FILES, by='extension', top=1))
+
+        lines = table.splitlines()
+        assert lines[0].startswith("By extension")
+        assert lines[1].startswith(".py") and "1,200" in lines[1] and lines[1].endswith("#" * 30)
+        assert "Total" in table
+        assert "Largest 1 files:" in table
+        assert table.endswith("src/app.py")
\ No newline at end of file
@@ -17,7 +17,10 @@ from storage import (
     ensure_data_directory,
     ensure_analyze_directory,
     save_analysis,
+    get_storage_root,
+    migrate_layout,
 )
+from storage_manager import StorageManager
 
 
 class TestParseRepoName:
@@ -86,6 +89,14 @@ class TestParseRepoName:
         # Works because we extract last component regardless of domain
         assert parse_repo_name("https://github.company.com/user/repo") == "repo"
 
+    def test_parse_repo_name_ref_and_subpath(self):
+        """Test URLs pinned to a ref or subpath get names of their own."""
+        assert parse_repo_name("https://github.com/vercel/turbo/tree/main") == "turbo@main"
+        assert parse_repo_name("https://github.com/vercel/turbo/tree/v2.0/packages/turbo-codemod") == (
+            "turbo@v2.0+packages-turbo-codemod~4ad5735a"
+        )
+        assert parse_repo_name("vercel/turbo@release/2.x:docs") == "turbo@release-2.x+docs~854df6d2"
+
 
 class TestEnsureDataDirectory:
     """Tests for ensure_data_directory() function."""
@@ -476,4 +487,137 @@ class TestSaveAnalysis:
                 assert "Failed to write analysis file" in str(exc_info.value)
             finally:
                 # Restore permissions for cleanup
-                output_file.chmod(0o644)
\ No newline at end of file
+                output_file.chmod(0o644)
+
+
+class TestGetStorageRoot:
+    """Tests for get_storage_root() function."""
+
+    def test_storage_root_from_project_root(self, tmp_path, monkeypatch):
+        """Test Phase 1.0 root when running from the project root."""
+        (tmp_path / "execute").mkdir()
+        (tmp_path / "execute" / "cli.py").touch()
+        (tmp_path / "execute" / "main.py").touch()
+        monkeypatch.chdir(tmp_path)
+
+        assert get_storage_root() == (tmp_path / "data").resolve()
+
+    def test_storage_root_from_execute_dir(self, tmp_path, monkeypatch):
+        """Test Phase 1.0 root when running from execute/."""
+        execute_dir = tmp_path / "execute"
+        execute_dir.mkdir()
+        (execute_dir / "cli.py").touch()
+        (execute_dir / "main.py").touch()
+        monkeypatch.chdir(execute_dir)
+
+        assert get_storage_root() == (tmp_path / "data").resolve()
+
+    def test_storage_root_other_directory(self, tmp_path, monkeypatch):
+        """Test Phase 1.5 root in any other directory."""
+        monkeypatch.chdir(tmp_path)
+
+        assert get_storage_root() == (tmp_path / "context" / "related-repos").resolve()
+
+    def test_storage_root_custom_output_dir(self, tmp_path):
+        """Test custom output directory is the root."""
+        custom = tmp_path / "custom"
+        custom.mkdir()
+
+        assert get_storage_root(custom) == custom.resolve()
+
+    def test_save_analysis_pinned_in_index(self, tmp_path):
+        """Test saved analyses are pinned in the artifact index."""
+        from artifact_store import ArtifactStore
+        result = save_analysis("# Analysis", "https://github.com/user/repo", "installation",
+                               output_dir=tmp_path)
+
+        with ArtifactStore(tmp_path) as store:
+            entries = store.entries()
+        assert len(entries) == 1
+        assert entries[0]['path'] == Path(result)
+        assert entries[0]['pinned'] is True
+        assert entries[0]['kind'] == 'analysis'
+
+
+class TestMigrateLayout:
+    """Tests for migrate_layout()."""
+
+    @pytest.fixture
+    def flat_store(self, tmp_path):
+        """A flat Phase 1.5 store with root files, a root version, a repository directory and an unlabeled file."""
+        from artifact_store import ArtifactStore
+        from search_index import SearchIndex
+        root = (tmp_path / "ctx").resolve()
+        files = {
+            "fastapi-fastapi-digest.txt": "fastapi/fastapi",
+            "fastapi-fastapi-digest.skipped.json": None,
+            "fastapi-fastapi-digest.txt.idx": None,
+            "versions/abc1234/fastapi-fastapi-digest.txt": "fastapi/fastapi",
+            "react/digest.txt": "facebook/react",
+            "react/versions/abc1234/digest.txt": "facebook/react",
+            "notes.txt": "",
+        }
+        with ArtifactStore(root) as store:
+            for name, repo in files.items():
+                (root / name).parent.mkdir(parents=True, exist_ok=True)
+                (root / name).write_text("x", encoding='utf-8')
+                if repo is not None:
+                    store.record(root / name, 'digest', repo=repo)
+        with SearchIndex.for_root(root) as index:
+            index.index_digest(root / "fastapi-fastapi-digest.txt", "fastapi/fastapi")
+        return root
+
+    def test_dry_run(self, flat_store):
+        """Test a dry run plans the moves without touching the store."""
+        moves = migrate_layout(flat_store, dry_run=True)
+
+        assert (flat_store / "react", flat_store / "8c" / "facebook" / "react") in moves
+        assert (flat_store / "react" / "digest.txt").exists()
+        assert StorageManager(output_dir=flat_store).layout == 'flat'
+
+    def test_migrate(self, flat_store):
+        """Test files and directories move under their shard, with sidecars and index entries."""
+        from artifact_store import ArtifactStore
+        from search_index import SearchIndex
+        fastapi = flat_store / "a2" / "fastapi" / "fastapi"
+        react = flat_store / "8c" / "facebook" / "react"
+
+        moves = migrate_layout(flat_store)
+
+        assert sorted(target.relative_to(flat_store).as_posix() for _, target in moves) == [
+            "8c/facebook/react",
+            "a2/fastapi/fastapi/digest.skipped.json",
+            "a2/fastapi/fastapi/digest.txt",
+            "a2/fastapi/fastapi/digest.txt.idx",
+            "a2/fastapi/fastapi/versions/abc1234/digest.txt",
+        ]
+        assert (react / "versions" / "abc1234" / "digest.txt").exists()
+        assert (flat_store / "notes.txt").exists()
+        with ArtifactStore(flat_store) as store:
+            assert store.get_layout() == 'sharded'
+            assert sorted(e['path'].relative_to(flat_store).as_posix() for e in store.entries()) == [
+                "8c/facebook/react/digest.txt",
+                "8c/facebook/react/versions/abc1234/digest.txt",
+                "a2/fastapi/fastapi/digest.txt",
+                "a2/fastapi/fastapi/versions/abc1234/digest.txt",
+                "notes.txt",
+            ]
+        with SearchIndex.for_root(flat_store) as index:
+            assert index.indexed_digests() == [str(fastapi / "digest.txt")]
+        assert migrate_layout(flat_store) == []
+
+    def test_extractions_use_sharded_layout(self, flat_store):
+        """Test data directories of a migrated store are the repositories' shard directories."""
+        migrate_layout(flat_store)
+
+        data_dir = ensure_data_directory("react", output_dir=flat_store, repo_url="https://github.com/facebook/react")
+
+        assert data_dir == flat_store / "8c" / "facebook" / "react"
+
+    def test_phase_1_0_rejected(self, tmp_path):
+        """Test Phase 1.0 stores keep their layout."""
+        (tmp_path / "execute").mkdir()
+        (tmp_path / "execute" / "cli.py").touch()
+
+        with pytest.raises(ValidationError, match="Phase 1.5"):
+            migrate_layout(tmp_path)
\ No newline at end of file
@@ -8,6 +8,7 @@ and Phase 1.0/1.5 mode switching.
 import pytest
 from pathlib import Path
 from unittest.mock import patch, MagicMock
+from exceptions import ValidationError
 from storage_manager import StorageManager
 
 
@@ -112,6 +113,20 @@ class TestStorageManagerPaths:
         expected = context_dir / "facebook-react-digest.txt"
         assert path == expected
 
+    def test_extraction_path_commit(self, tmp_path):
+        """Versions: versions/{commit}/ next to the artifact, under its name"""
+        context_dir = tmp_path / "context" / "related-repos"
+        context_dir.mkdir(parents=True)
+        commit = "3f2a9c1e" * 5
+
+        manager = StorageManager(output_dir=context_dir)
+
+        path = manager.get_extraction_path("https://github.com/facebook/react", "digest", commit=commit)
+
+        assert path == context_dir / "versions" / commit / "facebook-react-digest.txt"
+        with pytest.raises(ValidationError, match="Invalid commit id"):
+            manager.get_extraction_path("https://github.com/facebook/react", "digest", commit="../main")
+
     def test_analysis_path_phase_1_0(self, tmp_path):
         """Phase 1.0: analyze/{type}/{repo}.md"""
         project_dir = tmp_path / "gitingest-agent-project"
@@ -197,6 +212,17 @@ class TestStorageManagerRepoNameParsing:
         assert owner == "vuejs"
         assert repo == "vue-next"
 
+    def test_parse_ref_and_subpath(self, tmp_path):
+        """Should give each ref and subpath its own repo name."""
+        manager = StorageManager(output_dir=tmp_path)
+
+        assert manager._parse_repo_full_name("https://github.com/vercel/next.js/tree/canary/docs") == (
+            "vercel", "next.js@canary+docs"
+        )
+        assert manager._parse_repo_full_name("vercel/turbo@v2.0:packages/turbo-codemod") == (
+            "vercel", "turbo@v2.0+packages-turbo-codemod~4ad5735a"
+        )
+
 
 class TestStorageManagerPhaseDetection:
     """Test Phase 1.0 vs 1.5 mode detection."""
@@ -254,3 +280,67 @@ class TestStorageManagerEdgeCases:
         path2 = manager.get_analysis_path("https://github.com/facebook/react", "installation")
 
         assert path1 == path2
+
+
+class TestStorageManagerStorageRoot:
+    """Test artifact store root resolution."""
+
+    def test_storage_root_phase_1_0(self, tmp_path):
+        """Phase 1.0: artifacts live under data/"""
+        project_dir = tmp_path / "gitingest-agent-project"
+        (project_dir / "execute").mkdir(parents=True)
+        (project_dir / "execute" / "cli.py").touch()
+
+        manager = StorageManager(output_dir=project_dir)
+
+        assert manager.get_storage_root() == project_dir / "data"
+
+    def test_storage_root_phase_1_5(self, tmp_path):
+        """Phase 1.5: artifacts live directly in the output directory."""
+        context_dir = tmp_path / "context" / "related-repos"
+        context_dir.mkdir(parents=True)
+
+        manager = StorageManager(output_dir=context_dir)
+
+        assert manager.get_storage_root() == context_dir
+
+
+class TestStorageManagerShardedLayout:
+    """Test the hash-sharded Phase 1.5 layout."""
+
+    def test_shard_dir(self):
+        """Shard prefix, owner and repo are each a path component."""
+        assert StorageManager.shard_dir("facebook", "react") == Path("8c", "facebook", "react")
+        assert StorageManager.shard_dir("fastapi", "fastapi") == Path("a2", "fastapi", "fastapi")
+
+    def test_sharded_paths(self, tmp_path):
+        """Sharded: {shard}/{owner}/{repo}/{type}.txt and .md, with versions inside the repo directory."""
+        manager = StorageManager(output_dir=tmp_path, layout='sharded')
+        url = "https://github.com/facebook/react"
+        repo_dir = tmp_path / "8c" / "facebook" / "react"
+
+        assert manager.get_extraction_path(url, "digest") == repo_dir / "digest.txt"
+        assert manager.get_extraction_path(url, "digest", commit="abc1234") == \
+            repo_dir / "versions" / "abc1234" / "digest.txt"
+        assert manager.get_analysis_path(url, "installation") == repo_dir / "installation.md"
+
+    def test_layout_read_from_index(self, tmp_path):
+        """The layout recorded in the artifact index is used by default."""
+        from artifact_store import ArtifactStore
+        assert StorageManager(output_dir=tmp_path).layout == 'flat'
+
+        with ArtifactStore(tmp_path) as store:
+            store.set_layout('sharded')
+
+        assert StorageManager(output_dir=tmp_path).layout == 'sharded'
+
+    def test_unknown_layout(self, tmp_path):
+        """Unknown layouts are rejected."""
+        with pytest.raises(ValidationError, match="Unknown layout"):
+            StorageManager(output_dir=tmp_path, layout='nested')
+
+    def test_sharded_root(self, tmp_path):
+        """Only a <shard>/<owner>/<repo> directory has a sharded root."""
+        assert StorageManager.sharded_root(tmp_path / "8c" / "facebook" / "react") == tmp_path
+        assert StorageManager.sharded_root(tmp_path / "ff" / "facebook" / "react") is None
+        assert StorageManager.sharded_root(tmp_path / "react") is None
\ No newline at end of file
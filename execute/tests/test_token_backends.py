@@ -0,0 +1,191 @@
+"""
+Unit tests for token_backends module.
+
+Tests cover:
+- Backend selection from specs and the environment
+- Heuristic, calibrated and bytes backends
+- Pure-Python BPE counting from rank files and tokenizer.json
+- Batched counting of digests across a process pool
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+import byte_estimator
+import token_backends
+from digest import format_section, iter_sections
+from exceptions import ValidationError
+from token_backends import (
+    TOKENIZER_ENV_VAR,
+    BpeBackend,
+    BytePairEncoder,
+    BytesBackend,
+    CalibratedBackend,
+    HeuristicBackend,
+    get_backend,
+    load_vocabulary,
+    resolve_tokenizer,
+)
+from token_estimator import estimate_digest_tokens
+
+
+VOCAB = Path(__file__).parent / "fixtures" / "tiny_vocab.tiktoken"
+
+
+@pytest.fixture
+def digest(tmp_path):
+    path = tmp_path / "digest.txt"
+    path.write_text(
+        "Directory structure:\n└── repo/\n    ├── a.py\n    └── b.md\n\n"
+        + format_section("a.py", "the thing and the other thing\n" * 50)
+        + format_section("b.md", "hello and thanks\n" * 30),
+        encoding='utf-8'
+    )
+    return path
+
+
+class TestGetBackend:
+    """Tests for get_backend() and resolve_tokenizer() functions."""
+
+    def test_default_is_heuristic(self, monkeypatch):
+        monkeypatch.delenv(TOKENIZER_ENV_VAR, raising=False)
+
+        assert isinstance(get_backend(), HeuristicBackend)
+        assert get_backend(default='calibrated').spec == 'calibrated'
+
+    def test_environment_variable(self, monkeypatch):
+        monkeypatch.setenv(TOKENIZER_ENV_VAR, 'calibrated')
+
+        assert resolve_tokenizer() == 'calibrated'
+        assert isinstance(get_backend(), CalibratedBackend)
+        assert get_backend('heuristic').spec == 'heuristic'
+
+    def test_bpe_spec(self):
+        backend = get_backend(f"bpe:{VOCAB}")
+
+        assert isinstance(backend, BpeBackend)
+        assert backend.spec == f"bpe:{VOCAB.resolve()}"
+
+    def test_instance_passes_through(self):
+        backend = CalibratedBackend()
+
+        assert get_backend(backend) is backend
+
+    @pytest.mark.parametrize("spec", ["exact", "bpe", "heuristic:x", "bpe:/no/such/vocab.tiktoken"])
+    def test_invalid_spec(self, spec):
+        with pytest.raises(ValidationError):
+            get_backend(spec)
+
+
+class TestEstimateBackends:
+    """Tests for the heuristic, calibrated and bytes backends."""
+
+    def test_heuristic(self, digest):
+        backend = HeuristicBackend()
+
+        assert backend.count("a" * 400) == 100
+        assert backend.count_file(digest) == len(digest.read_text(encoding='utf-8')) // 4
+
+    def test_calibrated(self, digest):
+        backend = CalibratedBackend()
+
+        assert backend.count_file(digest) == estimate_digest_tokens(digest)
+        assert backend.count("漢字" * 100, "notes.md") > backend.count("ab" * 100, "notes.md")
+
+    def test_bytes(self, digest):
+        pytest.importorskip("numpy")
+        backend = get_backend('bytes')
+
+        assert isinstance(backend, BytesBackend)
+        assert backend.count_file(digest) == byte_estimator.estimate_bytes_tokens(digest.read_bytes())
+        assert backend.count("hello world") > 0
+
+    def test_bytes_without_numpy(self, monkeypatch):
+        monkeypatch.setattr(byte_estimator, 'np', None)
+
+        with pytest.raises(ValidationError, match="NumPy"):
+            get_backend('bytes')
+
+    def test_count_sections(self, digest):
+        counts = list(HeuristicBackend().count_sections(digest, iter_sections(digest)))
+
+        # Section content excludes the trailing line break (see digest.read_section)
+        assert counts == [len(("the thing and the other thing\n" * 50).rstrip('\n')) // 4,
+                          len(("hello and thanks\n" * 30).rstrip('\n')) // 4]
+
+
+class TestBytePairEncoder:
+    """Tests for BytePairEncoder and load_vocabulary()."""
+
+    def test_rank_file(self):
+        encoder = load_vocabulary(VOCAB)
+
+        assert encoder.count("the") == 1
+        assert encoder.count("thing") == 2  # th + ing
+        assert encoder.count(" the cat") == 5  # " the" + " ", "c", "a", "t"
+        assert encoder.count("hello") == 4  # he + l, l, o
+        assert encoder.count("") == 0
+
+    def test_lowest_rank_merges_first(self):
+        encoder = BytePairEncoder({b'ab': 1, b'bc': 0})
+
+        assert encoder.count("abc") == 2  # a + bc, not ab + c
+        assert encoder.count("abab") == 2
+
+    def test_tokenizer_json(self, tmp_path):
+        vocab = tmp_path / "tokenizer.json"
+        vocab.write_text(json.dumps({
+            'normalizer': {'type': 'NFKC'},
+            'model': {'type': 'BPE', 'merges': ["t h", "th e", "Ġ t", "Ġt he"]},
+        }), encoding='utf-8')
+        encoder = load_vocabulary(vocab)
+
+        assert encoder.count("the") == 1
+        assert encoder.count("ｔｈｅ") == 1  # full-width letters normalize to ASCII
+        # Merges apply to listed pairs only: "th" forms first, so "Ġt" never
+        # does and " the" stays two tokens although "Ġt" + "he" spells it
+        assert encoder.count(" the") == 2
+
+    def test_invalid_vocabulary(self, tmp_path):
+        vocab = tmp_path / "bad.tiktoken"
+        vocab.write_text("not-base64!! x\n", encoding='utf-8')
+
+        with pytest.raises(ValidationError, match="line 1"):
+            load_vocabulary(vocab)
+
+    def test_invalid_tokenizer_json(self, tmp_path):
+        vocab = tmp_path / "tokenizer.json"
+        vocab.write_text('{"model": {}}', encoding='utf-8')
+
+        with pytest.raises(ValidationError):
+            load_vocabulary(vocab)
+
+
+class TestBpeBackend:
+    """Tests for BpeBackend batched counting."""
+
+    def test_count_file_matches_whole_text(self, digest):
+        backend = BpeBackend(VOCAB)
+
+        assert backend.count_file(digest, workers=1) == backend.count(digest.read_text(encoding='utf-8'))
+
+    def test_process_pool_matches_serial(self, digest, monkeypatch):
+        backend = BpeBackend(VOCAB)
+        serial = backend.count_file(digest, workers=1)
+        sections = list(iter_sections(digest))
+        serial_sections = list(backend.count_sections(digest, sections, workers=1))
+
+        monkeypatch.setattr(token_backends, 'PARALLEL_MIN_BYTES', 0)
+        monkeypatch.setattr(token_backends, 'BATCH_BYTES', 256)
+
+        assert backend.count_file(digest, workers=2) == serial
+        assert list(backend.count_sections(digest, sections, workers=2)) == serial_sections
+
+    def test_count_sections(self, digest):
+        backend = BpeBackend(VOCAB)
+        counts = list(backend.count_sections(digest, iter_sections(digest), workers=1))
+
+        assert counts[0] == backend.count(("the thing and the other thing\n" * 50).rstrip('\n'))
+        assert len(counts) == 2
\ No newline at end of file
@@ -5,6 +5,7 @@ Tests cover:
 - Token counting with GitIngest integration (mocked)
 - Token parsing and fallback estimation
 - File-based token counting
+- Sampled estimates with escalation near the threshold
 - Routing decision logic
 - Error handling for timeouts and GitIngest failures
 """
@@ -13,10 +14,13 @@ import pytest
 import subprocess
 from unittest.mock import Mock, patch
 from pathlib import Path
+from digest import format_section
 from exceptions import GitIngestError, ValidationError
+from prefilter import Prefilter
 from token_counter import (
     count_tokens,
     count_tokens_from_file,
+    count_tokens_sampled,
     should_extract_full,
 )
 
@@ -207,6 +211,37 @@ class TestCountTokens:
         assert call_kwargs['check'] == True
 
 
+class TestCountTokensPrefilter:
+    """Tests for count_tokens() with a prefilter."""
+
+    def test_counts_filtered_digest(self):
+        """Test the count covers the digest as the prefilter leaves it."""
+        digest = (format_section("src/main.py", "print('hello')\n" * 10)
+                  + format_section("package-lock.json", '{"name": "x"}\n' * 2000))
+
+        def run(cmd, **kwargs):
+            Path(cmd[3]).write_text("Estimated tokens: 999999\n" + digest, encoding='utf-8')
+            return Mock(returncode=0)
+
+        prefilter = Prefilter(tokenizer='heuristic')
+        with patch('token_counter.subprocess.run', side_effect=run):
+            count = count_tokens("https://github.com/user/repo", prefilter=prefilter)
+
+        assert count < 500
+        assert prefilter.report()['rules']['lockfile']['files'] == 1
+
+    def test_tokenizer(self):
+        """Test a tokenizer counts the digest instead of GitIngest's estimate."""
+        def run(cmd, **kwargs):
+            Path(cmd[3]).write_text("Estimated tokens: 999999\n" + "a" * 4000, encoding='utf-8')
+            return Mock(returncode=0)
+
+        with patch('token_counter.subprocess.run', side_effect=run):
+            count = count_tokens("https://github.com/user/repo", tokenizer='heuristic')
+
+        assert count == len("Estimated tokens: 999999\n" + "a" * 4000) // 4
+
+
 class TestCountTokensFromFile:
     """Tests for count_tokens_from_file() function."""
 
@@ -276,6 +311,71 @@ class TestCountTokensFromFile:
         expected = len(content) // 4
         assert count == expected
 
+    def test_count_tokens_from_file_calibrated_cjk(self, tmp_path):
+        """Test calibrated counting charges CJK text per character."""
+        test_file = tmp_path / "notes.md"
+        test_file.write_text("令牌" * 1000, encoding='utf-8')
+
+        heuristic = count_tokens_from_file(str(test_file))
+        calibrated = count_tokens_from_file(str(test_file), tokenizer='calibrated')
+
+        assert heuristic == 500
+        assert calibrated == 2200
+
+    def test_count_tokens_from_file_calibrated_digest(self, tmp_path):
+        """Test calibrated counting estimates each FILE section by language."""
+        separator = "=" * 48
+        test_file = tmp_path / "digest.txt"
+        test_file.write_text(
+            f"{separator}\nFILE: main.go\n{separator}\n" + "x := y\n" * 100 + "\n\n",
+            encoding='utf-8'
+        )
+
+        count = count_tokens_from_file(str(test_file), tokenizer='calibrated')
+
+        # 700 chars at Go's ratio, plus the FILE header
+        assert 260 < count < 280
+
+
+class TestCountTokensSampled:
+    """Tests for count_tokens_sampled() and count_tokens_from_file(sample=True)."""
+
+    @pytest.fixture
+    def digest(self, tmp_path):
+        separator = "=" * 48
+        path = tmp_path / "digest.txt"
+        path.write_text(
+            ''.join(f"{separator}\nFILE: f{i}.py\n{separator}\n" + "value = compute(x)\n" * (50 + i) + "\n\n"
+                    for i in range(200)),
+            encoding='utf-8'
+        )
+        return path
+
+    def test_settled_estimate_is_returned(self, digest):
+        estimate = count_tokens_sampled(str(digest), 'heuristic', threshold=10_000, sample_bytes=64 * 1024)
+
+        assert not estimate.exact
+        assert estimate.low >= 10_000
+
+    def test_straddling_estimate_escalates(self, digest):
+        full = count_tokens_from_file(str(digest))
+
+        estimate = count_tokens_sampled(str(digest), 'heuristic', threshold=full, sample_bytes=64 * 1024)
+
+        assert estimate.exact
+        assert estimate.tokens == full
+
+    def test_count_tokens_from_file_sample(self, digest):
+        full = count_tokens_from_file(str(digest))
+
+        count = count_tokens_from_file(str(digest), sample=True)
+
+        assert count == full  # smaller than the default sample budget
+
+    def test_missing_file(self):
+        with pytest.raises(FileNotFoundError):
+            count_tokens_sampled("nonexistent.txt")
+
 
 class TestShouldExtractFull:
     """Tests for should_extract_full() function."""
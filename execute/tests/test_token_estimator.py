@@ -0,0 +1,163 @@
+"""
+Unit tests for token_estimator module.
+
+Tests cover:
+- Character classes and minified detection
+- Per-language ratios and CJK weighting
+- Streaming digest estimates
+- Calibration against a reference counter
+- Accuracy on the fixture corpus versus the len // 4 heuristic
+"""
+
+from pathlib import Path
+
+import pytest
+
+from digest import format_section
+from token_estimator import (
+    CHARS_PER_TOKEN,
+    DEFAULT_CHARS_PER_TOKEN,
+    SECTION_HEADER_TOKENS,
+    CharClasses,
+    accuracy_report,
+    calibrate,
+    char_classes,
+    chars_per_token,
+    estimate_digest_tokens,
+    estimate_file_tokens,
+    estimate_text_tokens,
+    format_accuracy_report,
+    is_minified,
+    load_corpus,
+)
+
+
+CORPUS = Path(__file__).parent / "fixtures" / "token_corpus"
+
+
+class TestCharClasses:
+    """Tests for char_classes() and is_minified() functions."""
+
+    def test_ascii_only(self):
+        assert char_classes("def main():") == CharClasses(11, 0, 0, 0, 0)
+
+    def test_mixed_classes(self):
+        classes = char_classes("a漢字한├─é")
+
+        assert classes == CharClasses(ascii=1, cjk=2, hangul=1, box=2, other=1)
+
+    def test_minified(self):
+        assert is_minified("var a=1;" * 100)
+        assert not is_minified("var a = 1;\n" * 100)
+
+
+class TestEstimateTextTokens:
+    """Tests for estimate_text_tokens() and chars_per_token() functions."""
+
+    def test_empty(self):
+        assert estimate_text_tokens("") == 0
+
+    def test_language_ratio(self):
+        text = "x" * 3690
+
+        assert estimate_text_tokens(text, 'Python') == 1000
+
+    def test_unknown_language_uses_default(self):
+        assert chars_per_token('Brainfuck') == DEFAULT_CHARS_PER_TOKEN
+
+    def test_minified_ratio(self):
+        assert chars_per_token('JavaScript', minified=True) < CHARS_PER_TOKEN['JavaScript']
+        assert chars_per_token('Python', minified=True) == CHARS_PER_TOKEN['Python']
+
+    def test_cjk_costs_more_than_ascii(self):
+        """CJK text costs about a token per character, far above len // 4."""
+        text = "日本語のドキュメント" * 100
+
+        assert estimate_text_tokens(text, 'Markdown') > len(text)
+        assert len(text) // 4 < estimate_text_tokens(text, 'Markdown') / 4
+
+    def test_file_language_from_path(self):
+        text = "x" * 2740
+
+        assert estimate_file_tokens("cmd/main.go", text) == 1000
+
+
+class TestEstimateDigestTokens:
+    """Tests for estimate_digest_tokens() function."""
+
+    def test_sections_estimated_per_language(self, tmp_path):
+        digest = tmp_path / "digest.txt"
+        python_code = "x" * 3690
+        go_code = "y" * 2740
+        digest.write_text(
+            format_section("a.py", python_code) + format_section("b.go", go_code),
+            encoding='utf-8'
+        )
+
+        expected = (
+            2 * SECTION_HEADER_TOKENS
+            + estimate_text_tokens("a.py") + estimate_text_tokens("b.go")
+            + 2000
+        )
+        assert abs(estimate_digest_tokens(digest) - expected) <= 2
+
+    def test_plain_file(self, tmp_path):
+        path = tmp_path / "notes.md"
+        path.write_text("z" * 3410, encoding='utf-8')
+
+        assert estimate_digest_tokens(path) == 1000
+
+
+class TestCalibrate:
+    """Tests for calibrate() function."""
+
+    def test_ratios_from_reference_counter(self):
+        samples = [(f"m{i}.py", "abcd\n" * 100) for i in range(25)]
+        samples += [(f"m{i}.go", "abcd\n" * 100) for i in range(5)]
+
+        ratios = calibrate(samples, lambda text: len(text) // 2)
+
+        assert ratios == {'Python': 2.0}
+
+    def test_skips_non_ascii_and_minified(self):
+        samples = [("a.py", "漢字" * 100), ("b.py", "x=1;" * 200)]
+
+        assert calibrate(samples, len, min_samples=1) == {}
+
+
+class TestAccuracyReport:
+    """Tests for accuracy_report() on the fixture corpus."""
+
+    def test_load_corpus(self):
+        samples = list(load_corpus(CORPUS))
+
+        assert len(samples) >= 10
+        assert all(tokens > 0 for _, _, tokens in samples)
+
+    def test_calibrated_beats_heuristic(self):
+        report = accuracy_report(load_corpus(CORPUS))
+
+        assert report['calibrated']['mean_abs_error'] < report['heuristic']['mean_abs_error']
+        assert report['calibrated']['mean_abs_error'] < 0.15
+        assert abs(report['calibrated']['total_error']) < 0.10
+
+    def test_cjk_within_bound(self):
+        report = accuracy_report(load_corpus(CORPUS))
+        cjk = [f for f in report['files'] if f['path'] in ('guide_ja.md', 'notes_zh.md')]
+
+        assert len(cjk) == 2
+        assert all(abs(f['calibrated_error']) < 0.2 for f in cjk)
+        assert all(f['heuristic_error'] < -0.5 for f in cjk)
+
+    def test_format(self):
+        text = format_accuracy_report(accuracy_report(load_corpus(CORPUS)))
+
+        assert "app.js" in text
+        assert "calibrated: mean absolute error" in text
+
+    def test_custom_estimators(self):
+        report = accuracy_report(load_corpus(CORPUS), {'chars': lambda path, text: len(text)})
+
+        assert report['methods'] == ['chars']
+        assert report['chars']['total_error'] > 1
+        assert "chars: mean absolute error" in format_accuracy_report(report)
\ No newline at end of file
@@ -0,0 +1,118 @@
+"""
+Unit tests for token_sampling module.
+
+Tests cover:
+- Exact counts for files within the sample budget
+- Stratified sampling of digests and plain text files
+- Confidence intervals covering the full count
+- Routing decisions settled by an interval
+"""
+
+import random
+
+import pytest
+
+from digest import format_section
+from reader import index_path_for
+from token_backends import HeuristicBackend
+from token_sampling import TokenEstimate, sample_tokens
+
+
+@pytest.fixture
+def big_digest(tmp_path):
+    """Digest of ~1.2 MB with files of several languages and sizes."""
+    rng = random.Random(3)
+    parts = ["Directory structure:\n└── repo/\n\n"]
+    for number in range(300):
+        extension = ('py', 'md', 'json', 'go')[number % 4]
+        line = {'py': "def f(x):\n    return x * 2\n", 'md': "Some prose about the project.\n",
+                'json': '{"key": [1, 2, 3]}\n', 'go': "x := y + 1\n"}[extension]
+        parts.append(format_section(f"src/file{number}.{extension}", line * rng.randint(10, 300)))
+    path = tmp_path / "digest.txt"
+    path.write_text(''.join(parts), encoding='utf-8')
+    return path
+
+
+class TestSampleTokens:
+    """Tests for sample_tokens() function."""
+
+    def test_small_file_counted_exactly(self, tmp_path):
+        path = tmp_path / "small.txt"
+        path.write_text("hello world\n" * 100, encoding='utf-8')
+
+        estimate = sample_tokens(path, 'heuristic')
+
+        assert estimate.exact
+        assert estimate.tokens == estimate.low == estimate.high == 300
+        assert estimate.sampled_bytes == estimate.total_bytes
+
+    def test_samples_part_of_digest(self, big_digest):
+        estimate = sample_tokens(big_digest, 'heuristic', sample_bytes=128 * 1024, block_bytes=4096)
+
+        assert not estimate.exact
+        assert estimate.sampled_bytes < estimate.total_bytes / 3
+        assert estimate.low <= estimate.tokens <= estimate.high
+        assert index_path_for(big_digest).exists()
+
+    def test_interval_covers_full_count(self, big_digest):
+        backend = HeuristicBackend()
+        full = backend.count_file(big_digest)
+
+        estimates = [
+            sample_tokens(big_digest, backend, sample_bytes=128 * 1024, seed=seed, block_bytes=4096)
+            for seed in range(10)
+        ]
+        covered = sum(estimate.low <= full <= estimate.high for estimate in estimates)
+
+        assert covered >= 9
+
+    def test_estimate_close_to_full_count(self, big_digest):
+        full = HeuristicBackend().count_file(big_digest)
+
+        estimate = sample_tokens(big_digest, 'heuristic', sample_bytes=128 * 1024, block_bytes=4096)
+
+        assert estimate.tokens == pytest.approx(full, rel=0.05)
+
+    def test_seed_is_deterministic(self, big_digest):
+        first = sample_tokens(big_digest, 'calibrated', sample_bytes=64 * 1024, seed=7, block_bytes=4096)
+        second = sample_tokens(big_digest, 'calibrated', sample_bytes=64 * 1024, seed=7, block_bytes=4096)
+
+        assert first == second
+
+    def test_plain_text_file(self, tmp_path):
+        path = tmp_path / "notes.txt"
+        path.write_text("a plain line of text\n" * 20000, encoding='utf-8')
+
+        estimate = sample_tokens(path, 'heuristic', sample_bytes=32 * 1024, block_bytes=1024)
+
+        assert not estimate.exact
+        assert estimate.tokens == pytest.approx(105000, rel=0.01)
+
+    def test_duplicate_paths_are_covered(self, tmp_path):
+        path = tmp_path / "digest.txt"
+        section = format_section("a.py", "x = 1\n" * 2000)
+        path.write_text(section * 20, encoding='utf-8')
+
+        estimate = sample_tokens(path, 'heuristic', sample_bytes=16 * 1024, block_bytes=1024)
+
+        assert estimate.tokens == pytest.approx(len(section) * 20 // 4, rel=0.02)
+
+    def test_missing_file(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            sample_tokens(tmp_path / "missing.txt", 'heuristic')
+
+
+class TestTokenEstimate:
+    """Tests for TokenEstimate.straddles()."""
+
+    @pytest.mark.parametrize("threshold,expected", [
+        (150_000, False),
+        (190_000, True),
+        (210_000, True),
+        (250_000, False),
+        (180_000, False),
+    ])
+    def test_straddles(self, threshold, expected):
+        estimate = TokenEstimate(200_000, 180_000, 220_000, 0.95, 1000, 100_000, False)
+
+        assert estimate.straddles(threshold) is expected
\ No newline at end of file
@@ -3,6 +3,7 @@ Unit tests for workflow module.
 
 Tests cover:
 - GitHub URL validation and parsing
+- Ref and subpath specs (/tree/<ref>/<subpath>, owner/repo@ref:path)
 - Token count formatting
 - Content type filter mapping
 - Edge cases and error handling
@@ -12,6 +13,10 @@ import pytest
 from exceptions import ValidationError
 from workflow import (
     validate_github_url,
+    parse_repo_spec,
+    ingest_url,
+    repository_url,
+    RepoSpec,
     format_token_count,
     get_filters_for_type,
     FILTER_PATTERNS,
@@ -106,13 +111,16 @@ class TestValidateGithubUrl:
         assert "Invalid GitHub URL format" in str(exc_info.value)
 
     def test_validate_github_url_extra_path_components(self):
-        """Test URL with extra path components (e.g., /tree/main)."""
-        # Note: regex.match() only matches from start, so extra paths cause no match
-        # The URL doesn't match the pattern because it has extra components
+        """Test URL with extra path components other than /tree/<ref>/<subpath>."""
         with pytest.raises(ValidationError) as exc_info:
-            validate_github_url("https://github.com/user/repo/tree/main")
+            validate_github_url("https://github.com/user/repo/issues/3")
         assert "Invalid GitHub URL format" in str(exc_info.value)
 
+    def test_validate_github_url_tree_ref(self):
+        """Test URLs pinned to a ref (and subpath) still give owner and repo."""
+        assert validate_github_url("https://github.com/user/repo/tree/main") == ("user", "repo")
+        assert validate_github_url("user/repo@v1.0:docs") == ("user", "repo")
+
     def test_validate_github_url_special_characters(self):
         """Test ValidationError for special characters in owner/repo."""
         # Regex only allows \w (alphanumeric + underscore) and hyphens
@@ -302,4 +310,65 @@ class TestIntegration:
         for content_type in ['docs', 'installation', 'code', 'auto']:
             filters = get_filters_for_type(content_type)
             assert 'include' in filters
-            assert 'exclude' in filters
\ No newline at end of file
+            assert 'exclude' in filters
+
+
+class TestParseRepoSpec:
+    """Tests for parse_repo_spec(), ingest_url() and repository_url()."""
+
+    @pytest.mark.parametrize("url, spec", [
+        ("https://github.com/vercel/turbo", RepoSpec("vercel", "turbo")),
+        ("https://github.com/vercel/turbo.git", RepoSpec("vercel", "turbo")),
+        ("https://github.com/vercel/turbo/tree/main", RepoSpec("vercel", "turbo", "main")),
+        ("https://github.com/vercel/turbo/tree/v2.0/packages/turbo-codemod/",
+         RepoSpec("vercel", "turbo", "v2.0", "packages/turbo-codemod")),
+        ("vercel/turbo", RepoSpec("vercel", "turbo")),
+        ("vercel/turbo@release/2.x", RepoSpec("vercel", "turbo", "release/2.x")),
+        ("vercel/turbo@v2.0:packages/turbo-codemod", RepoSpec("vercel", "turbo", "v2.0", "packages/turbo-codemod")),
+    ])
+    def test_parse(self, url, spec):
+        """Test /tree/ URLs and the shorthand give owner, repo, ref and subpath."""
+        assert parse_repo_spec(url) == spec
+
+    @pytest.mark.parametrize("url, message", [
+        ("vercel/turbo:packages/cli", "needs a ref"),
+        ("https://github.com/vercel/turbo/tree/main/../secrets", "Invalid"),
+        ("vercel/turbo@main:packages//cli", "Invalid"),
+        ("vercel/turbo@-x", "Invalid"),
+        ("vercel/turbo@a..b", "Invalid"),
+        ("https://gitlab.com/vercel/turbo", "Invalid GitHub URL format"),
+    ])
+    def test_invalid(self, url, message):
+        """Test malformed refs and subpaths are rejected."""
+        with pytest.raises(ValidationError, match=message):
+            parse_repo_spec(url)
+
+    def test_urls_and_name(self):
+        """Test the gitingest URL, repository URL and storage name of a spec."""
+        spec = parse_repo_spec("vercel/turbo@v2.0:packages/turbo-codemod")
+
+        assert spec.url == "https://github.com/vercel/turbo/tree/v2.0/packages/turbo-codemod"
+        assert spec.repo_url == "https://github.com/vercel/turbo"
+        assert spec.name == "turbo@v2.0+packages-turbo-codemod~4ad5735a"
+        assert parse_repo_spec("vercel/turbo@v2.0").name == "turbo@v2.0"
+        assert parse_repo_spec("vercel/turbo").name == "turbo"
+
+    @pytest.mark.parametrize("first, second", [
+        ("vercel/turbo@release/2.x", "vercel/turbo@release-2.x"),
+        ("vercel/turbo@main:packages/web", "vercel/turbo@main:packages-web"),
+        ("vercel/turbo@v1+2", "vercel/turbo@v1-2"),
+    ])
+    def test_names_do_not_collide(self, first, second):
+        """Test specs differing only in characters a file name can't hold get different names."""
+        assert parse_repo_spec(first).name != parse_repo_spec(second).name
+
+    @pytest.mark.parametrize("url, ingest, repository", [
+        ("https://github.com/vercel/turbo.git", "https://github.com/vercel/turbo.git", "https://github.com/vercel/turbo"),
+        ("vercel/turbo", "https://github.com/vercel/turbo", "https://github.com/vercel/turbo"),
+        ("vercel/turbo@main:docs", "https://github.com/vercel/turbo/tree/main/docs", "https://github.com/vercel/turbo"),
+        ("/tmp/local-repo", "/tmp/local-repo", "/tmp/local-repo"),
+    ])
+    def test_ingest_and_repository_url(self, url, ingest, repository):
+        """Test shorthands become gitingest URLs, and other URLs pass through."""
+        assert ingest_url(url) == ingest
+        assert repository_url(url) == repository
\ No newline at end of file
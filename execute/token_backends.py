@@ -0,0 +1,467 @@
+"""
+Pluggable tokenizer backends.
+
+Token counts are produced by one of four interchangeable backends:
+
+    heuristic   4 characters per token (default; what GitIngest assumes)
+    calibrated  Per-language calibrated estimate (see token_estimator.py)
+    bytes       Vectorized byte-class estimate (see byte_estimator.py; needs NumPy)
+    bpe         Exact byte-pair encoding with a local vocabulary file
+
+A backend is selected with a spec string: 'heuristic', 'calibrated', 'bytes'
+or 'bpe:PATH'. The spec can be given per command (--tokenizer) or through the
+GITINGEST_AGENT_TOKENIZER environment variable, and is recorded next to every
+token count written to a manifest or cache, so counts from different
+backends are never mixed up.
+
+The BPE backend is pure Python. Vocabularies are read from tiktoken-style
+rank files (one "base64-token rank" pair per line) or from the vocab/merges
+of a byte-level BPE tokenizer.json. Large files are counted in batches of
+FILE sections across a process pool; every worker loads the vocabulary once.
+"""
+
+import base64
+import json
+import os
+import re
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+from digest import DigestSection, iter_sections, read_section
+from byte_estimator import estimate_bytes_tokens, estimate_stream_tokens, require_numpy
+from exceptions import ValidationError
+from token_estimator import estimate_digest_tokens, estimate_file_tokens
+
+
+# Environment variable selecting the default backend (e.g. "bpe:/path/vocab.tiktoken")
+TOKENIZER_ENV_VAR = "GITINGEST_AGENT_TOKENIZER"
+
+# Backend used when neither a spec nor the environment variable is given
+DEFAULT_TOKENIZER = 'heuristic'
+
+# Backend names accepted in specs
+TOKENIZER_NAMES = ('heuristic', 'calibrated', 'bytes', 'bpe')
+
+# Bytes of text handed to a BPE worker at a time
+BATCH_BYTES = 1024 * 1024
+
+# Files smaller than this are counted in-process (pool startup isn't worth it)
+PARALLEL_MIN_BYTES = 4 * 1024 * 1024
+
+# Pre-tokenization patterns splitting text into words, numbers, punctuation
+# runs and whitespace before BPE merges, expressed with the character classes
+# available in the re module. tiktoken rank files use the cl100k-style split,
+# tokenizer.json files with a ByteLevel pre-tokenizer the GPT-2 split.
+CL100K_SPLIT_RE = re.compile(
+    r"""'(?i:[sdmt]|ll|ve|re)"""
+    r"""|(?:[^\r\n\w]|_)?[^\W\d_]+"""
+    r"""|\d{1,3}"""
+    r"""| ?(?:[^\s\w]|_)+[\r\n]*"""
+    r"""|\s*[\r\n]+"""
+    r"""|\s+(?!\S)"""
+    r"""|\s+"""
+)
+GPT2_SPLIT_RE = re.compile(
+    r"""'(?:[sdmt]|ll|ve|re)| ?[^\W\d_]+| ?\d+| ?(?:[^\s\w]|_)+|\s+(?!\S)|\s+"""
+)
+
+# Pre-tokenized pieces whose token count is memoized per encoder
+PIECE_CACHE_SIZE = 100_000
+
+
+class TokenizerBackend:
+    """
+    Base class of tokenizer backends.
+
+    Subclasses implement count(); count_file() and count_sections() fall back
+    to streaming over the file with count().
+
+    Attributes:
+        name: Backend name (one of TOKENIZER_NAMES)
+    """
+
+    name = ''
+
+    @property
+    def spec(self) -> str:
+        """Spec string identifying this backend, recorded with token counts."""
+        return self.name
+
+    def count(self, text: str, path: str = '') -> int:
+        """
+        Count the tokens of a piece of text.
+
+        Args:
+            text: Text to count
+            path: File the text comes from (used by language-aware backends)
+
+        Returns:
+            Token count
+        """
+        raise NotImplementedError
+
+    def count_file(self, file_path: str | Path, workers: Optional[int] = None) -> int:
+        """
+        Count the tokens of a whole digest or text file.
+
+        Args:
+            file_path: File to count
+            workers: Worker processes for backends that count in parallel
+
+        Returns:
+            Token count
+        """
+        path = Path(file_path)
+        return self.count(path.read_text(encoding='utf-8', errors='replace'), path.name)
+
+    def count_sections(
+        self,
+        file_path: str | Path,
+        sections: Iterable[DigestSection],
+        workers: Optional[int] = None
+    ) -> Iterator[int]:
+        """
+        Count the content tokens of FILE sections of a digest.
+
+        Args:
+            file_path: Digest holding the sections
+            sections: Sections to count, e.g. from digest.iter_sections()
+            workers: Worker processes for backends that count in parallel
+
+        Yields:
+            Token count of each section, in the order given
+        """
+        for section in sections:
+            yield self.count(read_section(file_path, section), section.path)
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {self.spec}>"
+
+
+class HeuristicBackend(TokenizerBackend):
+    """Character-based estimate: 4 characters per token."""
+
+    name = 'heuristic'
+
+    def count(self, text: str, path: str = '') -> int:
+        return len(text) // 4
+
+
+class CalibratedBackend(TokenizerBackend):
+    """Per-language calibrated estimate from token_estimator."""
+
+    name = 'calibrated'
+
+    def count(self, text: str, path: str = '') -> int:
+        return estimate_file_tokens(path, text)
+
+    def count_file(self, file_path: str | Path, workers: Optional[int] = None) -> int:
+        return estimate_digest_tokens(file_path)
+
+
+class BytesBackend(TokenizerBackend):
+    """Vectorized byte-class estimate from byte_estimator (needs NumPy)."""
+
+    name = 'bytes'
+
+    def __init__(self):
+        require_numpy()
+
+    def count(self, text: str, path: str = '') -> int:
+        return estimate_bytes_tokens(text)
+
+    def count_file(self, file_path: str | Path, workers: Optional[int] = None) -> int:
+        return estimate_stream_tokens(file_path)
+
+
+def _bytes_to_unicode() -> dict[str, int]:
+    """Map the printable characters of byte-level BPE vocabularies back to bytes."""
+    printable = list(range(ord('!'), ord('~') + 1)) + list(range(0xa1, 0xad)) + list(range(0xae, 0x100))
+    mapping = {chr(b): b for b in printable}
+    extra = 0
+    for b in range(256):
+        if b not in printable:
+            mapping[chr(256 + extra)] = b
+            extra += 1
+    return mapping
+
+
+class BytePairEncoder:
+    """
+    Byte-level BPE token counter.
+
+    Text is split with the vocabulary's pre-tokenization pattern, then each
+    piece's UTF-8 bytes are merged pairwise, lowest rank first, until no
+    adjacent pair can be merged. Only the number of resulting tokens is kept.
+
+    Ranks are keyed either by the merged byte sequence (tiktoken rank files)
+    or by the (left, right) pair (merge lists of tokenizer.json files). Text
+    is Unicode-normalized first when the vocabulary declares a normalization.
+
+    Examples:
+        >>> encoder = BytePairEncoder({b'th': 0, b'he': 1, b'the': 2})
+        >>> encoder.count("the")
+        1
+    """
+
+    def __init__(
+        self,
+        ranks: dict,
+        pattern: re.Pattern = CL100K_SPLIT_RE,
+        pair_ranks: bool = False,
+        normalization: Optional[str] = None
+    ):
+        self.ranks = ranks
+        self.pattern = pattern
+        self.pair_ranks = pair_ranks
+        self.normalization = normalization
+        self._cache: dict[str, int] = {}
+
+    def _merge(self, data: bytes) -> int:
+        ranks = self.ranks
+        if not self.pair_ranks and data in ranks:
+            return 1
+        parts = [data[i:i + 1] for i in range(len(data))]
+        while len(parts) > 1:
+            best = best_rank = None
+            for i in range(len(parts) - 1):
+                key = (parts[i], parts[i + 1]) if self.pair_ranks else parts[i] + parts[i + 1]
+                rank = ranks.get(key)
+                if rank is not None and (best_rank is None or rank < best_rank):
+                    best, best_rank = i, rank
+            if best is None:
+                break
+            parts[best:best + 2] = [parts[best] + parts[best + 1]]
+        return len(parts)
+
+    def count(self, text: str) -> int:
+        """Return the number of tokens text encodes to."""
+        if self.normalization:
+            text = unicodedata.normalize(self.normalization, text)
+        cache = self._cache
+        total = 0
+        for piece in self.pattern.findall(text):
+            tokens = cache.get(piece)
+            if tokens is None:
+                tokens = self._merge(piece.encode('utf-8'))
+                if len(cache) < PIECE_CACHE_SIZE:
+                    cache[piece] = tokens
+            total += tokens
+        return total
+
+
+def load_vocabulary(vocab_path: str | Path) -> BytePairEncoder:
+    """
+    Load a BPE encoder from a local vocabulary file.
+
+    Args:
+        vocab_path: tiktoken-style rank file ("base64-token rank" per line) or
+            a tokenizer.json with a byte-level BPE model
+
+    Returns:
+        Encoder for the vocabulary
+
+    Raises:
+        ValidationError: If the file is missing or not a supported vocabulary
+    """
+    vocab_path = Path(vocab_path)
+    if not vocab_path.is_file():
+        raise ValidationError(f"Tokenizer vocabulary not found: {vocab_path}")
+    text = vocab_path.read_text(encoding='utf-8')
+
+    if vocab_path.suffix == '.json':
+        try:
+            config = json.loads(text)
+            merges = config['model']['merges']
+        except (ValueError, KeyError, TypeError) as e:
+            raise ValidationError(f"Not a BPE tokenizer.json: {vocab_path} ({e})")
+        normalizer = (config.get('normalizer') or {}).get('type')
+        to_byte = _bytes_to_unicode()
+        pairs: dict[tuple[bytes, bytes], int] = {}
+        for rank, merge in enumerate(merges):
+            left, right = merge.split(' ', 1) if isinstance(merge, str) else merge
+            try:
+                pair = (bytes(to_byte[c] for c in left), bytes(to_byte[c] for c in right))
+            except KeyError:
+                raise ValidationError(f"Not a byte-level BPE vocabulary: {vocab_path}")
+            pairs.setdefault(pair, rank)
+        return BytePairEncoder(
+            pairs, GPT2_SPLIT_RE, pair_ranks=True,
+            normalization=normalizer if normalizer in ('NFC', 'NFD', 'NFKC', 'NFKD') else None
+        )
+
+    ranks: dict[bytes, int] = {}
+    for lineno, line in enumerate(text.splitlines(), 1):
+        if not line.strip():
+            continue
+        try:
+            token, rank = line.split()
+            ranks[base64.b64decode(token, validate=True)] = int(rank)
+        except ValueError:
+            raise ValidationError(f"Invalid vocabulary line {lineno} in {vocab_path}")
+    return BytePairEncoder(ranks, CL100K_SPLIT_RE)
+
+
+@lru_cache(maxsize=4)
+def _load_encoder(vocab_path: str) -> BytePairEncoder:
+    return load_vocabulary(vocab_path)
+
+
+def _count_ranges(vocab_path: str, file_path: str, ranges: list[tuple[int, int]], strip: bool = False) -> list[int]:
+    """Worker entry point: count byte ranges of a file with a (cached) encoder."""
+    encoder = _load_encoder(vocab_path)
+    counts = []
+    with open(file_path, 'rb') as f:
+        for start, end in ranges:
+            f.seek(start)
+            text = f.read(end - start).decode('utf-8', errors='replace')
+            counts.append(encoder.count(text.rstrip('\r\n') if strip else text))
+    return counts
+
+
+def _batch_ranges(ranges: list[tuple[int, int]], batch_bytes: int) -> list[list[tuple[int, int]]]:
+    """Group consecutive ranges into batches of about batch_bytes."""
+    batches: list[list[tuple[int, int]]] = []
+    current: list[tuple[int, int]] = []
+    size = 0
+    for start, end in ranges:
+        current.append((start, end))
+        size += end - start
+        if size >= batch_bytes:
+            batches.append(current)
+            current, size = [], 0
+    if current:
+        batches.append(current)
+    return batches
+
+
+class BpeBackend(TokenizerBackend):
+    """
+    Exact byte-pair-encoding counts from a local vocabulary file.
+
+    Attributes:
+        vocab_path: Resolved vocabulary file
+    """
+
+    name = 'bpe'
+
+    def __init__(self, vocab_path: str | Path):
+        self.vocab_path = Path(vocab_path).resolve()
+        self.encoder = _load_encoder(str(self.vocab_path))
+
+    @property
+    def spec(self) -> str:
+        return f"bpe:{self.vocab_path}"
+
+    def count(self, text: str, path: str = '') -> int:
+        return self.encoder.count(text)
+
+    def count_ranges(
+        self,
+        file_path: str | Path,
+        ranges: list[tuple[int, int]],
+        workers: Optional[int] = None,
+        strip: bool = False
+    ) -> list[int]:
+        """
+        Count byte ranges of a file, in batches across a process pool.
+
+        Args:
+            file_path: File to read
+            ranges: (start, end) byte offsets; ranges should start at line starts
+            workers: Worker processes (default: CPU count; 1 counts in-process)
+            strip: Drop trailing line breaks of each range before counting
+                (like digest.read_section())
+
+        Returns:
+            Token count of each range, in the order given
+        """
+        file_path = str(file_path)
+        workers = workers or os.cpu_count() or 1
+        total_bytes = sum(end - start for start, end in ranges)
+        if workers == 1 or total_bytes < PARALLEL_MIN_BYTES:
+            return _count_ranges(str(self.vocab_path), file_path, ranges, strip)
+
+        batches = _batch_ranges(ranges, BATCH_BYTES)
+        counts: list[int] = []
+        with ProcessPoolExecutor(max_workers=min(workers, len(batches))) as pool:
+            futures = [
+                pool.submit(_count_ranges, str(self.vocab_path), file_path, batch, strip)
+                for batch in batches
+            ]
+            for future in futures:
+                counts.extend(future.result())
+        return counts
+
+    def count_file(self, file_path: str | Path, workers: Optional[int] = None) -> int:
+        # Split at FILE section starts so batches line up with whole files
+        size = Path(file_path).stat().st_size
+        boundaries = [0] + [section.offset for section in iter_sections(file_path)] + [size]
+        ranges = [(start, end) for start, end in zip(boundaries, boundaries[1:]) if end > start]
+        return sum(self.count_ranges(file_path, ranges, workers))
+
+    def count_sections(
+        self,
+        file_path: str | Path,
+        sections: Iterable[DigestSection],
+        workers: Optional[int] = None
+    ) -> Iterator[int]:
+        sections = list(sections)
+        ranges = [(section.offset, section.offset + section.length) for section in sections]
+        yield from self.count_ranges(file_path, ranges, workers, strip=True)
+
+
+def resolve_tokenizer(spec: Optional[str] = None, default: str = DEFAULT_TOKENIZER) -> str:
+    """
+    Return the effective tokenizer spec.
+
+    An explicit spec wins, then the GITINGEST_AGENT_TOKENIZER environment
+    variable, then the given default.
+    """
+    return spec or os.environ.get(TOKENIZER_ENV_VAR) or default
+
+
+def get_backend(
+    spec: "str | TokenizerBackend | None" = None,
+    default: str = DEFAULT_TOKENIZER
+) -> TokenizerBackend:
+    """
+    Create the tokenizer backend for a spec.
+
+    Args:
+        spec: 'heuristic', 'calibrated', 'bytes' or 'bpe:PATH' (a backend
+            instance is returned as is; None uses resolve_tokenizer())
+        default: Spec used when neither spec nor the environment variable is set
+
+    Returns:
+        Tokenizer backend
+
+    Raises:
+        ValidationError: If the spec is unknown, the vocabulary can't be
+            loaded or NumPy is missing for the bytes backend
+
+    Examples:
+        >>> get_backend('calibrated').spec
+        'calibrated'
+        >>> get_backend('bpe:vocab/cl100k.tiktoken').count("hello world")
+        2
+    """
+    if isinstance(spec, TokenizerBackend):
+        return spec
+    spec = resolve_tokenizer(spec, default)
+    name, _, argument = spec.partition(':')
+    if name == 'heuristic' and not argument:
+        return HeuristicBackend()
+    if name == 'calibrated' and not argument:
+        return CalibratedBackend()
+    if name == 'bytes' and not argument:
+        return BytesBackend()
+    if name == 'bpe':
+        if not argument:
+            raise ValidationError("The bpe tokenizer needs a vocabulary file: bpe:PATH")
+        return BpeBackend(argument)
+    raise ValidationError(
+        f"Invalid tokenizer: {spec}. Valid tokenizers: heuristic, calibrated, bytes, bpe:PATH"
+    )
@@ -9,16 +9,32 @@ import re
 import subprocess
 import tempfile
 from pathlib import Path
+from typing import Optional
 from exceptions import GitIngestError
-from workflow import validate_github_url
+from prefilter import Prefilter
+from token_backends import TokenizerBackend, get_backend
+from token_estimator import estimate_digest_tokens
+from token_sampling import DEFAULT_CONFIDENCE, SAMPLE_BYTES, TokenEstimate, sample_tokens
+from workflow import ingest_url, validate_github_url
 
 
-def count_tokens(url: str) -> int:
+def count_tokens(
+    url: str,
+    prefilter: Optional[Prefilter] = None,
+    tokenizer: str | TokenizerBackend | None = None
+) -> int:
     """
     Count tokens in repository using GitIngest.
 
     Args:
-        url: GitHub repository URL
+        url: GitHub repository URL, optionally pinned to a ref or narrowed
+            to a subpath (see workflow.parse_repo_spec)
+        prefilter: Optional prefilter; the count then covers the digest with
+            generated, vendored and binary-like files dropped or stubbed, as
+            an extraction with the same prefilter would write it
+        tokenizer: Optional tokenizer backend or spec to count the digest
+            with (see count_tokens_from_file); by default GitIngest's own
+            estimate is used, or the calibrated estimate of a filtered digest
 
     Returns:
         Estimated token count
@@ -34,6 +50,8 @@ def count_tokens(url: str) -> int:
     """
     # Validate URL format before attempting GitIngest call
     validate_github_url(url)
+    # Ref and subpath shorthands (owner/repo@ref:path) as gitingest's /tree/ URLs
+    url = ingest_url(url)
 
     # Use temporary file to avoid Windows stdout encoding issues
     with tempfile.NamedTemporaryFile(mode='w', encoding='utf-8', suffix='.txt', delete=False) as tmp:
@@ -51,6 +69,21 @@ def count_tokens(url: str) -> int:
             check=True
         )
 
+        if prefilter is not None:
+            # GitIngest's own estimate covers the unfiltered digest
+            filtered_path = tmp_path + '.filtered'
+            try:
+                with open(tmp_path, 'rb') as source, open(filtered_path, 'wb') as out:
+                    prefilter.filter_stream(source, out)
+                if tokenizer is not None:
+                    return count_tokens_from_file(filtered_path, tokenizer)
+                return estimate_digest_tokens(filtered_path)
+            finally:
+                Path(filtered_path).unlink(missing_ok=True)
+
+        if tokenizer is not None:
+            return count_tokens_from_file(tmp_path, tokenizer)
+
         # Read the temp file to get content
         content = Path(tmp_path).read_text(encoding='utf-8')
 
@@ -59,8 +92,8 @@ def count_tokens(url: str) -> int:
         if match:
             return int(match.group(1))
 
-        # Fallback: Character-based estimation (4 chars ≈ 1 token)
-        return len(content) // 4
+        # Fallback: calibrated per-language estimate of the digest
+        return estimate_digest_tokens(tmp_path)
 
     except subprocess.TimeoutExpired:
         raise TimeoutError(
@@ -88,7 +121,13 @@ def count_tokens(url: str) -> int:
             pass  # Ignore cleanup errors
 
 
-def count_tokens_from_file(file_path: str) -> int:
+def count_tokens_from_file(
+    file_path: str,
+    tokenizer: str | TokenizerBackend | None = None,
+    workers: int | None = None,
+    sample: bool = False,
+    threshold: int = 200_000
+) -> int:
     """
     Count tokens in already-extracted file.
 
@@ -96,26 +135,107 @@ def count_tokens_from_file(file_path: str) -> int:
 
     Args:
         file_path: Path to extracted content file
+        tokenizer: Tokenizer backend or spec ('heuristic', 'calibrated',
+            'bytes' or 'bpe:PATH'; default: GITINGEST_AGENT_TOKENIZER, else heuristic)
+        workers: Worker processes for the bpe backend (default: CPU count)
+        sample: Estimate from a random sample of the file, counting it fully
+            only when the result is too close to threshold to route on
+            (see count_tokens_sampled)
+        threshold: Routing threshold used when sampling
 
     Returns:
-        Estimated token count
+        Estimated token count (exact with the bpe backend)
 
     Raises:
         FileNotFoundError: If file doesn't exist
+        ValidationError: If the tokenizer spec is invalid
 
     Examples:
         >>> count_tokens_from_file("data/fastapi/docs-content.txt")
         89450
+        >>> count_tokens_from_file("data/fastapi/docs-content.txt", tokenizer="calibrated")
+        104210
+    """
+    if sample:
+        return count_tokens_sampled(file_path, tokenizer, threshold=threshold, workers=workers).tokens
+
+    path = Path(file_path)
+
+    if not path.exists():
+        raise FileNotFoundError(f"File not found: {file_path}")
+
+    return get_backend(tokenizer).count_file(path, workers=workers)
+
+
+def count_tokens_sampled(
+    file_path: str,
+    tokenizer: str | TokenizerBackend | None = None,
+    threshold: int = 200_000,
+    confidence: float = DEFAULT_CONFIDENCE,
+    sample_bytes: int = SAMPLE_BYTES,
+    workers: int | None = None
+) -> TokenEstimate:
+    """
+    Estimate tokens from a sample, escalating to a full count near the threshold.
+
+    The file is estimated from a stratified random sample of blocks (see
+    token_sampling.sample_tokens). If the confidence interval lies entirely on
+    one side of the threshold, the estimate settles the routing decision and
+    is returned; if it straddles the threshold, the whole file is counted.
+
+    Args:
+        file_path: Path to extracted content file
+        tokenizer: Tokenizer backend or spec (see count_tokens_from_file)
+        threshold: Routing threshold the estimate must settle
+        confidence: Confidence level of the interval
+        sample_bytes: Approximate bytes to sample
+        workers: Worker processes for a full bpe count
+
+    Returns:
+        TokenEstimate; exact is True if the file was counted fully
+
+    Raises:
+        FileNotFoundError: If file doesn't exist
+        ValidationError: If the tokenizer spec is invalid
+
+    Examples:
+        >>> estimate = count_tokens_sampled("data/big-repo/digest.txt")
+        >>> estimate.tokens, estimate.low, estimate.high, estimate.exact
+        (1843210, 1829022, 1857398, False)
     """
     path = Path(file_path)
 
     if not path.exists():
         raise FileNotFoundError(f"File not found: {file_path}")
 
-    content = path.read_text(encoding='utf-8')
+    backend = get_backend(tokenizer)
+    estimate = sample_tokens(path, backend, sample_bytes=sample_bytes, confidence=confidence)
+    if estimate.exact or not estimate.straddles(threshold):
+        return estimate
+
+    tokens = backend.count_file(path, workers=workers)
+    return TokenEstimate(tokens, tokens, tokens, confidence, estimate.total_bytes, estimate.total_bytes, True)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate tokens in a piece of text.
+
+    Uses the same character-based heuristic as count_tokens_from_file, so
+    per-file estimates add up to the file-level count.
 
+    Args:
+        text: Text to estimate
+
+    Returns:
+        Estimated token count
+
+    Examples:
+        >>> estimate_tokens("a" * 400)
+        100
+    """
     # Character-based estimation: 4 chars ≈ 1 token
-    return len(content) // 4
+    return len(text) // 4
 
 
 def should_extract_full(token_count: int, threshold: int = 200_000) -> bool:
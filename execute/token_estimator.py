@@ -0,0 +1,313 @@
+"""
+Calibrated token estimation.
+
+The plain len(text) // 4 heuristic assumes every kind of content tokenizes
+alike. In practice dense code and configuration files produce noticeably more
+tokens per character than prose, minified JavaScript even more, and CJK text
+costs roughly one token per character instead of one per four. Near the 200k
+routing threshold those differences flip decisions.
+
+This module estimates tokens from character classes and per-language ratios:
+
+    tokens = ascii_chars / CHARS_PER_TOKEN[language]
+             + cjk_chars * CJK_TOKENS_PER_CHAR
+             + hangul_chars * HANGUL_TOKENS_PER_CHAR
+             + box_drawing_chars * BOX_TOKENS_PER_CHAR
+             + other_non_ascii_chars * OTHER_TOKENS_PER_CHAR
+
+The ratios were calibrated offline with calibrate() against a byte-level BPE
+tokenizer (65k vocabulary) on a sample of ~6,000 source, documentation and
+data files. Estimation is a single streaming pass over a digest with a cost
+close to a character count: no tokenization happens at run time.
+
+Run this module with a corpus directory to print an accuracy report:
+
+    python token_estimator.py tests/fixtures/token_corpus
+"""
+
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional
+from digest import iter_sections, read_section, read_tree
+from languages import detect_language
+
+
+# ASCII characters per token, by language (calibrated, see module docstring)
+CHARS_PER_TOKEN = {
+    'C': 2.97,
+    'C++': 3.27,
+    'CSS': 2.82,
+    'Go': 2.74,
+    'HTML': 3.08,
+    'INI': 2.58,
+    'JSON': 2.77,
+    'JavaScript': 3.56,
+    'Markdown': 3.41,
+    'Python': 3.69,
+    'Ruby': 3.61,
+    'Rust': 3.05,
+    'Shell': 3.00,
+    'TOML': 2.81,
+    'Text': 3.17,
+    'TypeScript': 3.95,
+    'XML': 4.05,
+    'YAML': 2.89,
+    'reStructuredText': 3.83,
+}
+
+# Ratio for languages without a calibrated entry
+DEFAULT_CHARS_PER_TOKEN = 3.32
+
+# Minified files (very long lines) pack many more tokens per character
+MINIFIED_CHARS_PER_TOKEN = {
+    'CSS': 2.62,
+    'JavaScript': 2.36,
+    'JSON': 1.65,
+}
+
+# Average line length (characters) above which a file counts as minified
+MINIFIED_LINE_LENGTH = 200
+
+# Tokens per non-ASCII character, by character class
+CJK_TOKENS_PER_CHAR = 1.1
+HANGUL_TOKENS_PER_CHAR = 1.5
+BOX_TOKENS_PER_CHAR = 1.0
+OTHER_TOKENS_PER_CHAR = 2.1
+
+# Tokens used by a FILE header's separator lines, on top of the path itself
+SECTION_HEADER_TOKENS = 9
+
+_NON_ASCII_RE = re.compile(r'[^\x00-\x7f]')
+_CJK_RE = re.compile(r'[\u3000-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff00-\uffef]')
+_HANGUL_RE = re.compile(r'[\u1100-\u11ff\u3130-\u318f\uac00-\ud7af]')
+_BOX_RE = re.compile(r'[\u2500-\u257f]')
+
+
+class CharClasses(NamedTuple):
+    """Character counts by class."""
+    ascii: int
+    cjk: int
+    hangul: int
+    box: int
+    other: int
+
+
+def char_classes(text: str) -> CharClasses:
+    """
+    Count the characters of text by class.
+
+    Examples:
+        >>> char_classes("def 関数():")
+        CharClasses(ascii=7, cjk=2, hangul=0, box=0, other=0)
+    """
+    ascii_count = len(text.encode('ascii', 'ignore'))
+    if ascii_count == len(text):
+        return CharClasses(ascii_count, 0, 0, 0, 0)
+    non_ascii = ''.join(_NON_ASCII_RE.findall(text))
+    cjk = len(_CJK_RE.findall(non_ascii))
+    hangul = len(_HANGUL_RE.findall(non_ascii))
+    box = len(_BOX_RE.findall(non_ascii))
+    return CharClasses(ascii_count, cjk, hangul, box, len(non_ascii) - cjk - hangul - box)
+
+
+def is_minified(text: str) -> bool:
+    """Return True if text has the very long lines typical of minified files."""
+    return len(text) / (text.count('\n') + 1) > MINIFIED_LINE_LENGTH
+
+
+def chars_per_token(language: str, minified: bool = False) -> float:
+    """Return the ASCII characters-per-token ratio for a language."""
+    if minified and language in MINIFIED_CHARS_PER_TOKEN:
+        return MINIFIED_CHARS_PER_TOKEN[language]
+    return CHARS_PER_TOKEN.get(language, DEFAULT_CHARS_PER_TOKEN)
+
+
+def estimate_text_tokens(text: str, language: str = 'Text') -> int:
+    """
+    Estimate the tokens of a piece of text in a given language.
+
+    Args:
+        text: Text to estimate
+        language: Language name as returned by languages.detect_language()
+
+    Returns:
+        Estimated token count
+
+    Examples:
+        >>> estimate_text_tokens("import os\\nprint(os.getcwd())\\n", "Python")
+        8
+    """
+    if not text:
+        return 0
+    classes = char_classes(text)
+    tokens = (
+        classes.ascii / chars_per_token(language, is_minified(text))
+        + classes.cjk * CJK_TOKENS_PER_CHAR
+        + classes.hangul * HANGUL_TOKENS_PER_CHAR
+        + classes.box * BOX_TOKENS_PER_CHAR
+        + classes.other * OTHER_TOKENS_PER_CHAR
+    )
+    return round(tokens)
+
+
+def estimate_file_tokens(path: str, text: str) -> int:
+    """Estimate the tokens of one file, using its path to pick the language."""
+    return estimate_text_tokens(text, detect_language(path))
+
+
+def estimate_digest_tokens(file_path: str | Path) -> int:
+    """
+    Estimate the tokens of a digest (or any text file) in one streaming pass.
+
+    The directory tree and each FILE section are estimated separately so that
+    every file gets the ratio of its own language. Files without FILE sections
+    are estimated as a whole, using the language of the file itself.
+
+    Args:
+        file_path: Digest, content file or plain text file
+
+    Returns:
+        Estimated token count
+    """
+    file_path = Path(file_path)
+    total = 0
+    sections = 0
+    for section in iter_sections(file_path):
+        content = read_section(file_path, section)
+        total += SECTION_HEADER_TOKENS + estimate_text_tokens(section.path, 'Text')
+        total += estimate_file_tokens(section.path, content)
+        sections += 1
+
+    preamble = read_tree(file_path)
+    if sections:
+        return total + estimate_text_tokens(preamble, 'Text')
+    return estimate_file_tokens(file_path.name, preamble)
+
+
+# Calibration and accuracy reporting (offline tooling)
+
+def calibrate(
+    samples: Iterable[tuple[str, str]],
+    count_tokens: Callable[[str], int],
+    min_samples: int = 20
+) -> dict[str, float]:
+    """
+    Derive ASCII characters-per-token ratios from a reference tokenizer.
+
+    Only predominantly ASCII (>= 98%), non-minified samples are used, so the
+    ratios describe the ASCII term of the model. Paste the result into
+    CHARS_PER_TOKEN to recalibrate.
+
+    Args:
+        samples: (path, text) pairs
+        count_tokens: Reference tokenizer, returning the exact token count of a text
+        min_samples: Minimum samples for a language to get its own ratio
+
+    Returns:
+        Mapping of language to characters per token, rounded to 2 decimals
+    """
+    chars: dict[str, int] = {}
+    tokens: dict[str, int] = {}
+    counts: dict[str, int] = {}
+    for path, text in samples:
+        if not text or is_minified(text):
+            continue
+        ascii_count = len(text.encode('ascii', 'ignore'))
+        if ascii_count < 0.98 * len(text):
+            continue
+        language = detect_language(path)
+        chars[language] = chars.get(language, 0) + ascii_count
+        tokens[language] = tokens.get(language, 0) + count_tokens(text)
+        counts[language] = counts.get(language, 0) + 1
+    return {
+        language: round(chars[language] / tokens[language], 2)
+        for language in sorted(chars)
+        if counts[language] >= min_samples and tokens[language]
+    }
+
+
+REFERENCE_FILENAME = "reference_tokens.json"
+
+
+def load_corpus(directory: str | Path) -> Iterator[tuple[str, str, int]]:
+    """
+    Load a fixture corpus with reference token counts.
+
+    The directory holds sample files plus a reference_tokens.json mapping each
+    file name to its exact token count under the reference tokenizer.
+
+    Yields:
+        (file name, text, reference tokens) tuples
+    """
+    directory = Path(directory)
+    reference = json.loads((directory / REFERENCE_FILENAME).read_text(encoding='utf-8'))
+    for name, expected in sorted(reference['files'].items()):
+        yield name, (directory / name).read_text(encoding='utf-8'), expected
+
+
+def accuracy_report(
+    samples: Iterable[tuple[str, str, int]],
+    estimators: Optional[dict[str, Callable[[str, str], int]]] = None
+) -> dict:
+    """
+    Compare token estimators to reference counts.
+
+    Args:
+        samples: (path, text, reference tokens) tuples, e.g. from load_corpus()
+        estimators: Mapping of method name to a (path, text) -> tokens
+            function; defaults to the len // 4 heuristic and the calibrated
+            estimator
+
+    Returns:
+        Dict with per-file results and, for each method, the mean absolute
+        relative error per file and the relative error of the corpus total
+    """
+    estimators = estimators or {
+        'heuristic': lambda path, text: len(text) // 4,
+        'calibrated': estimate_file_tokens,
+    }
+    files = []
+    for path, text, reference in samples:
+        result = {'path': path, 'language': detect_language(path), 'reference': reference}
+        for method, estimate in estimators.items():
+            result[method] = estimate(path, text)
+            result[f'{method}_error'] = round((result[method] - reference) / reference, 4)
+        files.append(result)
+
+    report = {'methods': list(estimators), 'files': files}
+    total = sum(f['reference'] for f in files)
+    for method in estimators:
+        report[method] = {
+            'mean_abs_error': round(sum(abs(f[f'{method}_error']) for f in files) / len(files), 4) if files else 0.0,
+            'total_error': round((sum(f[method] for f in files) - total) / total, 4) if total else 0.0,
+        }
+    return report
+
+
+def format_accuracy_report(report: dict) -> str:
+    """Render an accuracy report as a text table."""
+    methods = report['methods']
+    width = max([len(f['path']) for f in report['files']] + [4])
+    columns = [max(len(method), 9) for method in methods]
+    header = f"{'File':<{width}}  {'Reference':>9}"
+    for method, column in zip(methods, columns):
+        header += f"  {method:>{column}}  {'Error':>7}"
+    lines = [header]
+    for f in report['files']:
+        line = f"{f['path']:<{width}}  {f['reference']:>9,}"
+        for method, column in zip(methods, columns):
+            line += f"  {f[method]:>{column},}  {f[f'{method}_error']:>+7.1%}"
+        lines.append(line)
+    for method in methods:
+        lines.append(
+            f"{method}: mean absolute error {report[method]['mean_abs_error']:.1%}, "
+            f"total error {report[method]['total_error']:+.1%}"
+        )
+    return '\n'.join(lines)
+
+
+if __name__ == "__main__":
+    corpus = sys.argv[1] if len(sys.argv) > 1 else Path(__file__).parent / "tests" / "fixtures" / "token_corpus"
+    print(format_accuracy_report(accuracy_report(load_corpus(corpus))))
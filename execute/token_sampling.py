@@ -0,0 +1,255 @@
+"""
+Sampling-based token estimates for very large digests.
+
+A routing decision only needs to know on which side of the threshold a digest
+falls. For multi-GB digests even a streaming pass is slow, so this module
+counts a stratified random sample of blocks and extrapolates:
+
+- The digest's offset index (see reader.py) gives every FILE section and its
+  size without reading the content. Sections are grouped into strata by
+  language, since tokens per byte differ most between languages.
+- Each stratum is cut into fixed-size blocks (snapped to line breaks) and a
+  random sample of blocks is counted with the selected tokenizer backend.
+  Blocks are allocated to strata in proportion to their size.
+- A ratio estimator (tokens per byte within each stratum) extrapolates the
+  total; its variance gives a normal-approximation confidence interval,
+  widened by a small margin for the difference between counting blocks
+  separately and counting the whole file.
+
+The preamble (directory tree and first header) is always counted exactly.
+Files smaller than the sample budget are counted exactly as well. The first
+estimate of a digest builds its offset index (one scan); later estimates read
+only the sampled blocks.
+"""
+
+import bisect
+import math
+import mmap
+import random
+from pathlib import Path
+from statistics import NormalDist
+from typing import NamedTuple, Optional
+from languages import detect_language
+from reader import DigestReader
+from token_backends import TokenizerBackend, get_backend
+
+
+# Size of a sampled block, before snapping to line breaks
+BLOCK_BYTES = 64 * 1024
+
+# Bytes sampled per estimate (files up to this size are counted exactly)
+SAMPLE_BYTES = 4 * 1024 * 1024
+
+# Default confidence level of the reported interval
+DEFAULT_CONFIDENCE = 0.95
+
+# Strata beyond the largest MAX_STRATA - 1 languages are merged into one
+MAX_STRATA = 8
+
+# Minimum blocks drawn per stratum, so its variance can be estimated
+MIN_STRATUM_BLOCKS = 2
+
+# Relative difference allowed between counting blocks separately and counting
+# the whole file (per-file headers, tokens spanning block boundaries); the
+# interval is widened by this much on top of the sampling error
+SYSTEMATIC_ERROR = 0.005
+
+
+class TokenEstimate(NamedTuple):
+    """
+    Token count of a file, exact or extrapolated from a sample.
+
+    Attributes:
+        tokens: Estimated (or exact) token count
+        low: Lower bound of the confidence interval
+        high: Upper bound of the confidence interval
+        confidence: Confidence level of the interval (e.g. 0.95)
+        sampled_bytes: Bytes actually counted
+        total_bytes: Size of the file
+        exact: True if the whole file was counted (low == tokens == high)
+    """
+    tokens: int
+    low: int
+    high: int
+    confidence: float
+    sampled_bytes: int
+    total_bytes: int
+    exact: bool
+
+    def straddles(self, threshold: int) -> bool:
+        """
+        Return True if the interval doesn't settle a routing decision.
+
+        The decision (token_counter.should_extract_full) is tokens < threshold,
+        so it is settled when both bounds fall on the same side.
+        """
+        return self.low < threshold <= self.high
+
+
+class _Stratum:
+    """Regions (byte ranges) of one language and their block layout."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.regions: list[tuple[int, int, str]] = []  # (start, end, path)
+        self.block_offsets: list[int] = []  # cumulative block count before each region
+        self.blocks = 0
+        self.size = 0
+
+    def add(self, start: int, end: int, path: str, block_bytes: int) -> None:
+        self.regions.append((start, end, path))
+        self.block_offsets.append(self.blocks)
+        self.blocks += math.ceil((end - start) / block_bytes)
+        self.size += end - start
+
+    def block(self, number: int, block_bytes: int) -> tuple[int, int, int, int, str]:
+        """Return (nominal start, nominal end, region start, region end, path) of a block."""
+        index = bisect.bisect_right(self.block_offsets, number) - 1
+        start, end, path = self.regions[index]
+        block_start = start + (number - self.block_offsets[index]) * block_bytes
+        return block_start, min(block_start + block_bytes, end), start, end, path
+
+
+def _strata(file_path: Path, size: int, block_bytes: int) -> tuple[int, list[_Stratum]]:
+    """
+    Split a digest into an exactly counted preamble and language strata.
+
+    Returns:
+        (preamble end offset, strata)
+    """
+    with DigestReader(file_path) as reader:
+        sections = reader.sections()
+
+    if not sections:
+        stratum = _Stratum(detect_language(file_path.name))
+        stratum.add(0, size, file_path.name, block_bytes)
+        return 0, [stratum]
+
+    # Section i's region runs from the end of section i - 1 (its header
+    # included) to the end of its content; the first header belongs to the
+    # preamble, which is counted exactly. Anything after the last indexed
+    # section (sections with duplicate paths aren't indexed) joins its region.
+    by_language: dict[str, list[tuple[int, int, str]]] = {}
+    previous_end = sections[0].offset
+    for number, section in enumerate(sections, 1):
+        end = section.offset + section.length if number < len(sections) else size
+        if end > previous_end:
+            by_language.setdefault(detect_language(section.path), []).append((previous_end, end, section.path))
+        previous_end = end
+
+    sizes = {language: sum(e - s for s, e, _ in regions) for language, regions in by_language.items()}
+    ranked = sorted(sizes, key=lambda language: -sizes[language])
+    strata: dict[str, _Stratum] = {}
+    for rank, language in enumerate(ranked):
+        name = language if rank < MAX_STRATA - 1 else 'Other'
+        stratum = strata.setdefault(name, _Stratum(name))
+        for start, end, path in by_language[language]:
+            stratum.add(start, end, path, block_bytes)
+    return sections[0].offset, list(strata.values())
+
+
+def _snap(mm, position: int, region_start: int, region_end: int) -> int:
+    """Move a block boundary to just after the next line break in its region."""
+    if position <= region_start or position >= region_end:
+        return position
+    newline = mm.find(b'\n', position, region_end)
+    return newline + 1 if newline >= 0 else region_end
+
+
+def _allocate(strata: list[_Stratum], sample_bytes: int) -> list[int]:
+    """
+    Allocate sample blocks to strata in proportion to their size.
+
+    Blocks are cut short at file ends, so a stratum of small files has many
+    small blocks; allocating by block count keeps each stratum's share of the
+    sampled bytes proportional to its share of the digest.
+    """
+    total = sum(stratum.size for stratum in strata)
+    return [
+        min(stratum.blocks, max(MIN_STRATUM_BLOCKS, round(sample_bytes * stratum.blocks / total)))
+        for stratum in strata
+    ]
+
+
+def sample_tokens(
+    file_path: str | Path,
+    tokenizer: "str | TokenizerBackend | None" = None,
+    sample_bytes: int = SAMPLE_BYTES,
+    confidence: float = DEFAULT_CONFIDENCE,
+    seed: Optional[int] = 0,
+    block_bytes: int = BLOCK_BYTES
+) -> TokenEstimate:
+    """
+    Estimate the tokens of a digest from a stratified random sample of blocks.
+
+    Args:
+        file_path: Digest (or any text file) to estimate
+        tokenizer: Tokenizer backend or spec used to count sampled blocks
+        sample_bytes: Approximate bytes to count; smaller files are counted exactly
+        confidence: Confidence level of the reported interval
+        seed: Random seed (None for a different sample on every call)
+        block_bytes: Size of a sampled block
+
+    Returns:
+        TokenEstimate with the extrapolated total and confidence interval
+
+    Raises:
+        FileNotFoundError: If the file doesn't exist
+        ValidationError: If the tokenizer spec is invalid
+
+    Examples:
+        >>> estimate = sample_tokens("data/big-repo/digest.txt", "calibrated")
+        >>> estimate.tokens, estimate.low, estimate.high
+        (1843210, 1829022, 1857398)
+    """
+    path = Path(file_path)
+    backend = get_backend(tokenizer)
+    size = path.stat().st_size
+    if size <= sample_bytes:
+        tokens = backend.count_file(path)
+        return TokenEstimate(tokens, tokens, tokens, confidence, size, size, True)
+
+    preamble_end, strata = _strata(path, size, block_bytes)
+    allocation = _allocate(strata, sample_bytes)
+    rng = random.Random(seed)
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        def count(start: int, end: int, file: str) -> int:
+            return backend.count(mm[start:end].decode('utf-8', errors='replace'), file)
+
+        total = count(0, preamble_end, path.name) if preamble_end else 0
+        sampled = preamble_end
+        variance = 0.0
+        for stratum, n in zip(strata, allocation):
+            xs, ys = [], []
+            for number in rng.sample(range(stratum.blocks), n):
+                nominal_start, nominal_end, region_start, region_end, file = stratum.block(number, block_bytes)
+                start = _snap(mm, nominal_start, region_start, region_end)
+                end = _snap(mm, nominal_end, region_start, region_end)
+                xs.append(end - start)
+                ys.append(count(start, end, file) if end > start else 0)
+            sampled += sum(xs)
+
+            if n == stratum.blocks:
+                total += sum(ys)
+                continue
+            ratio = sum(ys) / sum(xs) if sum(xs) else 0.0
+            total += ratio * stratum.size
+            # Variance of the ratio estimator, with finite population correction
+            mean_x = sum(xs) / n
+            residuals = sum((y - ratio * x) ** 2 for x, y in zip(xs, ys)) / (n - 1) if n > 1 else 0.0
+            if mean_x:
+                variance += (1 - n / stratum.blocks) * stratum.size ** 2 * residuals / (n * mean_x ** 2)
+
+    half_width = z * math.sqrt(variance) + SYSTEMATIC_ERROR * total
+    tokens = round(total)
+    return TokenEstimate(
+        tokens,
+        max(0, math.floor(total - half_width)),
+        math.ceil(total + half_width),
+        confidence,
+        sampled,
+        size,
+        sampled >= size
+    )
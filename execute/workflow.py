@@ -6,11 +6,13 @@ and user-friendly formatting. These utilities maintain consistent validation and
 display logic across the application.
 """
 
+import hashlib
 import re
+from typing import NamedTuple, Optional
 from exceptions import ValidationError
 
 
-# Filter patterns for content type mapping
+# Filter patterns of the built-in content types (more can be configured, see profiles.py)
 FILTER_PATTERNS = {
     'docs': {
         'include': ['docs/**/*', '*.md', 'README*', '*.rst'],
@@ -30,14 +32,155 @@ FILTER_PATTERNS = {
     'auto': {
         'include': ['README*', 'docs/**/*.md'],
         'exclude': ['docs/examples/*', 'docs/archive/*']
+    },
+    'outline': {
+        'include': ['*.py', '*.pyi', '*.js', '*.jsx', '*.ts', '*.tsx', '*.go', '*.rs'],
+        'exclude': ['tests/*', '*_test.py', 'test_*.py', '*_test.go', '*.test.*', '*.spec.*', 'examples/*']
+    },
+    # Generic fallback: extract_specific synthesizes these from the repository
+    # tree (dominant languages and source roots, see code_profile.py)
+    'auto-code': {
+        'include': [
+            '*.py', '*.js', '*.jsx', '*.ts', '*.tsx', '*.go', '*.rs', '*.java', '*.kt',
+            '*.rb', '*.php', '*.cs', '*.c', '*.h', '*.cc', '*.cpp', '*.hpp', '*.swift'
+        ],
+        'exclude': [
+            'tests/', 'test/', 'testdata/', 'examples/', 'vendor/', 'third_party/', 'node_modules/',
+            'test_*.py', '*_test.py', '*_test.go', '*.test.*', '*.spec.*'
+        ]
     }
 }
 
 
+# https?://github.com/owner/repo[/tree/<ref>[/<subpath>]]
+# Only alphanumeric, hyphens and underscores in owner names (and dots in repo names)
+GITHUB_URL_RE = re.compile(r'https?://github\.com/([\w-]+)/([\w.-]+)(?:/tree/([^/\s]+)(?:/(\S+))?)?')
+
+# owner/repo[@<ref>][:<subpath>] shorthand
+REPO_SPEC_RE = re.compile(r'([\w-]+)/([\w.-]+)(?:@([^:\s]+))?(?::(\S+))?')
+
+# Characters of refs and subpaths kept in storage names
+_NAME_UNSAFE_RE = re.compile(r'[^\w.-]+')
+
+
+class RepoSpec(NamedTuple):
+    """
+    A GitHub repository, optionally pinned to a ref and narrowed to a subpath.
+
+    Attributes:
+        owner: Repository owner
+        repo: Repository name
+        ref: Branch, tag or commit (None: the default branch)
+        subpath: Directory inside the repository ('' for the whole tree)
+    """
+    owner: str
+    repo: str
+    ref: Optional[str] = None
+    subpath: str = ''
+
+    @property
+    def repo_url(self) -> str:
+        """URL of the repository itself (what is cloned)."""
+        return f"https://github.com/{self.owner}/{self.repo}"
+
+    @property
+    def url(self) -> str:
+        """
+        URL of the spec as gitingest takes it: the repository, or its
+        /tree/<ref>[/<subpath>] page, which gitingest clones sparsely.
+        """
+        if self.ref is None:
+            return self.repo_url
+        return f"{self.repo_url}/tree/{self.ref}" + (f"/{self.subpath}" if self.subpath else "")
+
+    @property
+    def name(self) -> str:
+        """
+        Storage name: the repository name, plus @ref and +subpath when set,
+        so each ref and subtree gets its own artifacts.
+
+        Characters a file name can't hold (such as '/') become '-'. As that
+        is lossy (release/2.x and release-2.x would share a name), such names
+        end in '~' and a short hash of the raw ref and subpath; '~' never
+        appears in a name kept as is, since git refs can't contain it.
+
+        Examples:
+            >>> RepoSpec('vercel', 'turbo', 'v2.0').name
+            'turbo@v2.0'
+            >>> RepoSpec('vercel', 'turbo', 'v2.0', 'packages/turbo-codemod').name
+            'turbo@v2.0+packages-turbo-codemod~4ad5735a'
+        """
+        pinned = ""
+        if self.ref is not None:
+            pinned += "@" + _NAME_UNSAFE_RE.sub('-', self.ref)
+        if self.subpath:
+            pinned += "+" + _NAME_UNSAFE_RE.sub('-', self.subpath)
+        if pinned != (f"@{self.ref}" if self.ref is not None else "") + (f"+{self.subpath}" if self.subpath else ""):
+            raw = f"{self.ref or ''}:{self.subpath or ''}"
+            pinned += "~" + hashlib.sha256(raw.encode('utf-8')).hexdigest()[:8]
+        return self.repo + pinned
+
+
+def parse_repo_spec(url: str) -> RepoSpec:
+    """
+    Parse a GitHub URL or owner/repo@ref:path shorthand.
+
+    Accepted forms:
+    - https://github.com/owner/repo (optionally .git or a trailing slash)
+    - https://github.com/owner/repo/tree/<ref>[/<subpath>]; a ref containing
+      '/' can't be told apart from the subpath here: use the shorthand
+    - owner/repo, owner/repo@<ref> and owner/repo@<ref>:<subpath>
+
+    Args:
+        url: GitHub repository URL or shorthand
+
+    Returns:
+        RepoSpec with the owner, repo, ref and subpath
+
+    Raises:
+        ValidationError: If the format is invalid, the subpath leaves the
+            repository, or a subpath is given without a ref
+
+    Examples:
+        >>> parse_repo_spec("https://github.com/vercel/turbo/tree/main/packages/turbo-codemod")
+        RepoSpec(owner='vercel', repo='turbo', ref='main', subpath='packages/turbo-codemod')
+        >>> parse_repo_spec("vercel/turbo@v2.0:packages/turbo-codemod").url
+        'https://github.com/vercel/turbo/tree/v2.0/packages/turbo-codemod'
+        >>> parse_repo_spec("https://github.com/tiangolo/fastapi.git")
+        RepoSpec(owner='tiangolo', repo='fastapi', ref=None, subpath='')
+    """
+    if not url or not isinstance(url, str):
+        raise ValidationError("URL must be a non-empty string")
+
+    # Remove trailing slashes and .git suffix
+    clean_url = url.rstrip('/')
+    if clean_url.endswith('.git'):
+        clean_url = clean_url[:-4]
+
+    match = GITHUB_URL_RE.fullmatch(clean_url) or REPO_SPEC_RE.fullmatch(clean_url)
+    if not match:
+        raise ValidationError(f"Invalid GitHub URL format: {url}")
+    owner, repo, ref, subpath = match.groups()
+    if repo in ('.', '..'):
+        raise ValidationError(f"Invalid GitHub URL format: {url}")
+
+    subpath = (subpath or '').strip('/')
+    if subpath and ref is None:
+        raise ValidationError(f"A subpath needs a ref (owner/repo@ref:path): {url}")
+    parts = subpath.split('/') if subpath else []
+    if any(part in ('', '.', '..') for part in parts) or (ref is not None and (ref.startswith('-') or '..' in ref)):
+        raise ValidationError(f"Invalid ref or subpath: {url}")
+
+    return RepoSpec(owner, repo, ref, '/'.join(parts))
+
+
 def validate_github_url(url: str) -> tuple[str, str]:
     """
     Validate GitHub URL and extract owner/repo.
 
+    /tree/<ref>/<subpath> URLs and owner/repo@ref:path shorthands are valid
+    too (see parse_repo_spec); only the repository is returned.
+
     Args:
         url: GitHub repository URL
 
@@ -54,28 +197,43 @@ def validate_github_url(url: str) -> tuple[str, str]:
         ('tiangolo', 'fastapi')
         >>> validate_github_url("https://github.com/tiangolo/fastapi/")
         ('tiangolo', 'fastapi')
+        >>> validate_github_url("https://github.com/tiangolo/fastapi/tree/0.110.0/docs")
+        ('tiangolo', 'fastapi')
     """
-    if not url or not isinstance(url, str):
-        raise ValidationError("URL must be a non-empty string")
+    spec = parse_repo_spec(url)
+    return spec.owner, spec.repo
 
-    # Remove trailing slashes and .git suffix
-    clean_url = url.rstrip('/')
-    if clean_url.endswith('.git'):
-        clean_url = clean_url[:-4]
 
-    # Strict regex pattern: https?://github.com/owner/repo
-    # Only allows alphanumeric, hyphens, underscores in owner/repo names
-    # $ ensures we match the entire URL (no extra path components)
-    pattern = r'https?://github\.com/([\w-]+)/([\w-]+)$'
+def ingest_url(url: str) -> str:
+    """
+    Return the URL gitingest ingests for a URL or shorthand.
 
-    match = re.match(pattern, clean_url)
-    if not match:
-        raise ValidationError(f"Invalid GitHub URL format: {url}")
+    Shorthands with a ref become /tree/ URLs, and owner/repo becomes the
+    repository URL; other URLs are returned unchanged.
+
+    Examples:
+        >>> ingest_url("vercel/turbo@main:docs")
+        'https://github.com/vercel/turbo/tree/main/docs'
+    """
+    try:
+        spec = parse_repo_spec(url)
+    except ValidationError:
+        return url
+    return spec.url if spec.ref is not None or '://' not in url else url
 
-    owner = match.group(1)
-    repo = match.group(2)
 
-    return owner, repo
+def repository_url(url: str) -> str:
+    """
+    Return the URL of the repository a URL or shorthand points into.
+
+    Examples:
+        >>> repository_url("https://github.com/vercel/turbo/tree/main/docs")
+        'https://github.com/vercel/turbo'
+    """
+    try:
+        return parse_repo_spec(url).repo_url
+    except ValidationError:
+        return url
 
 
 def format_token_count(count: int) -> str:
@@ -103,14 +261,18 @@ def get_filters_for_type(content_type: str) -> dict[str, list[str]]:
     """
     Map content type to GitIngest filter patterns.
 
+    Built-in types come from FILTER_PATTERNS; profiles defined in config
+    files (see profiles.py) add types or replace built-in ones.
+
     Args:
-        content_type: Type of content to extract (docs, installation, code, auto)
+        content_type: Type of content to extract (docs, installation, code, auto,
+            outline, or a configured profile)
 
     Returns:
         Dict with 'include' and 'exclude' pattern lists
 
     Raises:
-        ValidationError: If content_type is invalid
+        ValidationError: If content_type is invalid, or a config file is invalid
 
     Examples:
         >>> filters = get_filters_for_type('docs')
@@ -122,11 +284,6 @@ def get_filters_for_type(content_type: str) -> dict[str, list[str]]:
         >>> 'README*' in filters['include']
         True
     """
-    if content_type not in FILTER_PATTERNS:
-        valid_types = ', '.join(FILTER_PATTERNS.keys())
-        raise ValidationError(
-            f"Invalid content type: {content_type}. "
-            f"Valid types: {valid_types}"
-        )
-
-    return FILTER_PATTERNS[content_type]
\ No newline at end of file
+    from profiles import get_profile
+
+    return get_profile(content_type).filters
\ No newline at end of file